@@ -0,0 +1,253 @@
+"""In-process tool adapters for Terminal AI Workflow CLI.
+
+A tool in role_config.json can name a Python entry point instead of a
+command:
+
+    "sim": {"name": "Simulator", "adapter": "cli.adapters:SimulatorAdapter",
+            "options": {"delay": 0.1}}
+
+The executor then runs the task inside the CLI process, skipping the
+fork/exec and pipe I/O of an external tool. Output, exit codes, saved files
+and health telemetry work as for command tools.
+
+The entry point is either a ToolAdapter subclass, instantiated with the
+tool id and its "options", or a plain function taking the task. Functions
+may return a string, or be (async) generators yielding output chunks.
+"""
+
+import asyncio
+import importlib
+import inspect
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from .config import ToolConfig
+
+
+class AdapterExit(Exception):
+    """Raised by an adapter to end a task with a non-zero exit code.
+
+    Args:
+        exit_code: Exit code reported for the task
+        message: Optional text appended to the output
+    """
+
+    def __init__(self, exit_code: int = 1, message: str = ""):
+        self.exit_code = exit_code
+        self.message = message
+        super().__init__(message or f"exit code {exit_code}")
+
+
+class ToolAdapter:
+    """Base class for in-process tools.
+
+    Subclasses implement stream(), astream(), or both; each default runs
+    the other, so an adapter written for one works from sync and async
+    callers alike.
+
+    Args:
+        tool_id: Tool identifier from role_config.json
+        options: The tool's "options" object
+    """
+
+    # Shown as the tool version in /status
+    version: Optional[str] = None
+
+    def __init__(self, tool_id: str, options: Optional[Dict[str, Any]] = None):
+        self.tool_id = tool_id
+        self.options = dict(options or {})
+
+    def stream(self, task: str) -> Iterator[str]:
+        """Yield output chunks for a task."""
+        if type(self).astream is ToolAdapter.astream:
+            raise NotImplementedError(f"{type(self).__name__} implements neither stream nor astream")
+
+        # Drive the async variant on a private event loop
+        loop = asyncio.new_event_loop()
+        chunks = self.astream(task)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.close()
+
+    async def astream(self, task: str) -> AsyncIterator[str]:
+        """Yield output chunks for a task without blocking the event loop."""
+        if type(self).stream is ToolAdapter.stream:
+            raise NotImplementedError(f"{type(self).__name__} implements neither stream nor astream")
+
+        # Pull each chunk of the sync variant on a worker thread
+        loop = asyncio.get_running_loop()
+        chunks = iter(self.stream(task))
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+
+
+class FunctionAdapter(ToolAdapter):
+    """Adapter around a plain function entry point."""
+
+    def __init__(self, tool_id: str, func: Callable, options: Optional[Dict[str, Any]] = None):
+        super().__init__(tool_id, options)
+        self.func = func
+        self.version = getattr(func, "version", None)
+
+    def stream(self, task: str) -> Iterator[str]:
+        if inspect.isasyncgenfunction(self.func) or inspect.iscoroutinefunction(self.func):
+            yield from super().stream(task)
+            return
+        result = self.func(task)
+        if isinstance(result, str):
+            yield result
+        elif result is not None:
+            yield from result
+
+    async def astream(self, task: str) -> AsyncIterator[str]:
+        if inspect.isasyncgenfunction(self.func):
+            async for chunk in self.func(task):
+                yield chunk
+        elif inspect.iscoroutinefunction(self.func):
+            result = await self.func(task)
+            if result is not None:
+                yield result
+        else:
+            async for chunk in super().astream(task):
+                yield chunk
+
+
+class SimulatorAdapter(ToolAdapter):
+    """Answers every task with a canned response, for trying out routing.
+
+    Options:
+        delay: Seconds to wait before each output line (default 0)
+        response: Text to answer with; "{task}" and "{tool}" are filled in
+    """
+
+    version = "simulator"
+
+    def stream(self, task: str) -> Iterator[str]:
+        delay = float(self.options.get("delay", 0))
+        response = self.options.get("response", "[{tool}] simulated response to: {task}")
+        for line in response.format(tool=self.tool_id, task=task).splitlines():
+            if delay:
+                time.sleep(delay)
+            yield line + "\n"
+
+
+def resolve_entry_point(spec: str) -> Any:
+    """Import the object a "module:attr" entry point names.
+
+    Raises:
+        ValueError: If the spec is not of the form "module:attr"
+        ImportError / AttributeError: If the module or attribute is missing
+    """
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Adapter entry point must look like 'module:attr', got '{spec}'")
+    target = importlib.import_module(module_name)
+    for part in attr.split("."):
+        target = getattr(target, part)
+    return target
+
+
+# Loaded adapters by tool id, with the settings they were built from
+_adapters: Dict[str, Tuple[Tuple[str, str], ToolAdapter]] = {}
+_adapters_lock = threading.Lock()
+
+
+def get_adapter(tool_id: str, tool_config: ToolConfig) -> ToolAdapter:
+    """Get the adapter for a tool, loading it on first use or after a config change."""
+    key = (tool_config.adapter, repr(sorted(tool_config.options.items())))
+    with _adapters_lock:
+        current = _adapters.get(tool_id)
+        if current is not None and current[0] == key:
+            return current[1]
+
+    target = resolve_entry_point(tool_config.adapter)
+    if inspect.isclass(target) and issubclass(target, ToolAdapter):
+        adapter = target(tool_id, tool_config.options)
+    elif isinstance(target, ToolAdapter):
+        adapter = target
+    elif callable(target):
+        adapter = FunctionAdapter(tool_id, target, tool_config.options)
+    else:
+        raise TypeError(f"Adapter '{tool_config.adapter}' is not a ToolAdapter or callable")
+
+    with _adapters_lock:
+        _adapters[tool_id] = (key, adapter)
+    return adapter
+
+
+def check_adapter(tool_id: str, tool_config: ToolConfig) -> Tuple[bool, Optional[str]]:
+    """Check that a tool's adapter loads.
+
+    Returns:
+        Tuple of (loaded, version_or_error)
+    """
+    try:
+        adapter = get_adapter(tool_id, tool_config)
+    except Exception as e:
+        return False, f"Adapter not loadable: {e}"
+    return True, adapter.version or "in-process"
+
+
+def run_adapter(
+    tool_id: str,
+    tool_config: ToolConfig,
+    task: str,
+    on_output: Callable[[str], None]
+) -> Tuple[str, int]:
+    """Run a task on a tool's adapter, streaming its output.
+
+    Returns:
+        Tuple of (output, exit_code)
+    """
+    adapter = get_adapter(tool_id, tool_config)
+    chunks = []
+    exit_code = 0
+    try:
+        for chunk in adapter.stream(task):
+            chunks.append(chunk)
+            on_output(chunk)
+    except AdapterExit as e:
+        exit_code = e.exit_code
+        if e.message:
+            chunks.append(e.message + "\n")
+            on_output(e.message + "\n")
+    return "".join(chunks), exit_code
+
+
+async def arun_adapter(
+    tool_id: str,
+    tool_config: ToolConfig,
+    task: str,
+    on_output: Callable[[str], None]
+) -> Tuple[str, int]:
+    """Async variant of run_adapter."""
+    adapter = get_adapter(tool_id, tool_config)
+    chunks = []
+    exit_code = 0
+    try:
+        async for chunk in adapter.astream(task):
+            chunks.append(chunk)
+            on_output(chunk)
+    except AdapterExit as e:
+        exit_code = e.exit_code
+        if e.message:
+            chunks.append(e.message + "\n")
+            on_output(e.message + "\n")
+    return "".join(chunks), exit_code
+
+
+def _reset_adapters() -> None:
+    """Forget loaded adapters (for tests)."""
+    with _adapters_lock:
+        _adapters.clear()
@@ -4,10 +4,8 @@ import typer
 from typing import Optional
 from pathlib import Path
 
-from . import display
-from .repl import run_repl
-from .executor import get_tools_status
-from .config import get_config, reload_config
+# Keep module-level imports minimal: this module is loaded for every invocation,
+# including `--version` and `--status` from scripts. Commands import what they use.
 
 app = typer.Typer(
     name="workflow",
@@ -16,8 +14,9 @@ app = typer.Typer(
 )
 
 
-@app.command()
+@app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed routing info"),
     debug: bool = typer.Option(False, "--debug", "-d", help="Enable debug mode"),
     status: bool = typer.Option(False, "--status", "-s", help="Show tool status and exit"),
@@ -28,13 +27,19 @@ def main(
 
     Routes your requests to Claude, Gemini, or OpenAI based on keywords.
     """
+    if ctx.invoked_subcommand is not None:
+        return
+
     if version:
         from . import __version__
-        display.console.print(f"Terminal AI Workflow CLI v{__version__}")
+        typer.echo(f"Terminal AI Workflow CLI v{__version__}")
         raise typer.Exit()
 
+    from . import display
+
     if status:
         try:
+            from .executor import get_tools_status
             tools_status = get_tools_status()
             display.show_status(tools_status)
         except Exception as e:
@@ -54,6 +59,7 @@ def main(
             verbose = True
             display.show_info("Debug mode enabled")
 
+        from .repl import run_repl
         run_repl(verbose=verbose)
     except KeyboardInterrupt:
         display.console.print("\n[dim]Goodbye![/dim]")
@@ -62,6 +68,30 @@ def main(
         raise typer.Exit(1)
 
 
+@app.command("train-router")
+def train_router_command(
+    full: bool = typer.Option(False, "--full", help="Retrain from scratch instead of incrementally"),
+):
+    """Train the learned router from recorded route history."""
+    from . import display
+    from .learned import train_router, ROUTE_HISTORY_PATH, ROUTER_MODEL_PATH
+
+    if not ROUTE_HISTORY_PATH.exists():
+        display.show_error(
+            f"No route history found: {ROUTE_HISTORY_PATH} "
+            "(set routing.record_history to true in role_config.json to record it)"
+        )
+        raise typer.Exit(1)
+
+    stats = train_router(full=full)
+    display.show_success(
+        f"Trained on {stats.examples_added} new examples "
+        f"({stats.total_examples} total) -> {ROUTER_MODEL_PATH}"
+    )
+    for role, count in stats.roles.items():
+        display.console.print(f"  [cyan]{role}[/cyan]: {count}")
+
+
 def cli():
     """Entry point for the CLI."""
     app()
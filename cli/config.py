@@ -3,18 +3,46 @@
 import json
 import os
 import shutil
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
 
 from .errors import (
     ConfigNotFoundError, ConfigParseError, ConfigValidationError,
     validate_config_data, ValidationResult
 )
 
+CONFIG_PATH = Path("config/role_config.json")
 
-@dataclass
+
+def _parse_worker(data: Optional[dict]) -> Optional["WorkerConfig"]:
+    """Build a WorkerConfig from a tool's "worker" block (None = no pool)."""
+    if not data or not data.get("enabled", True):
+        return None
+    defaults = WorkerConfig()
+    return WorkerConfig(
+        size=int(data.get("size", defaults.size)),
+        args=list(data.get("args", defaults.args)),
+        sentinel=data.get("sentinel", defaults.sentinel),
+        max_requests=int(data.get("max_requests", defaults.max_requests)),
+        max_memory_mb=float(data.get("max_memory_mb", defaults.max_memory_mb)),
+        timeout=float(data.get("timeout", defaults.timeout)),
+    )
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    """Persistent worker pool settings for a tool (see cli/workers.py)."""
+    size: int = 2  # warm workers kept per tool
+    args: List[str] = field(default_factory=list)  # args that start a session instead of one run
+    sentinel: str = "<<<WORKFLOW-END>>>"  # ends a request on stdin and a response on stdout
+    max_requests: int = 50  # recycle a worker after this many tasks
+    max_memory_mb: float = 0  # recycle a worker above this RSS (0 = no limit)
+    timeout: float = 600  # seconds a task may run before its worker is killed (0 = no limit)
+
+
+@dataclass(frozen=True)
 class ToolConfig:
     """Configuration for a single AI tool."""
     name: str
@@ -22,32 +50,85 @@ class ToolConfig:
     context_file: str
     role: str = ""
     args: List[str] = field(default_factory=list)
+    input_mode: str = "argv"  # how the task is passed: 'argv', 'stdin' or 'tempfile'
+    worker: Optional[WorkerConfig] = None  # run tasks on pooled persistent workers
+    adapter: Optional[str] = None  # "module:attr" entry point run in-process instead of command
+    options: Dict[str, Any] = field(default_factory=dict)  # passed to the adapter
 
 
-@dataclass
+@dataclass(frozen=True)
 class RoleConfig:
     """Configuration for a routing role."""
     keywords: List[str]
     primary: str
     fallback: List[str] = field(default_factory=list)
     description: str = ""
-
-
-@dataclass
+    weights: Dict[str, float] = field(default_factory=dict)  # keyword -> weight (default 1.0)
+
+
+@dataclass(frozen=True)
+class RoutingConfig:
+    """Routing strategy settings."""
+    strategy: str = "first_match"  # 'first_match' or 'scored'
+    first_word_bonus: float = 1.0
+    position_weight: float = 0.5
+    min_confidence: float = 0.0
+    fallback_role: Optional[str] = None
+    learned_min_confidence: float = 0.6  # learned router, for sentences with no keyword match
+    record_history: bool = False  # append routed prompts to logs/routes.jsonl for train-router
+
+
+@dataclass(frozen=True)
+class ExecutionConfig:
+    """Tool execution settings."""
+    max_task_chars: int = 8000  # consolidated tasks longer than this are split into chunks
+    max_parallel: int = 4  # concurrent chunk runs
+    reduce_prompt: Optional[str] = None  # prompt used to merge chunk outputs (None = concatenate)
+    speculative: bool = False  # pre-launch the likely stdin-mode tool while the user types
+    speculative_idle_ms: int = 300  # typing pause before the partial input is routed
+
+
+@dataclass(frozen=True)
+class KnowledgeConfig:
+    """Document Library search settings."""
+    engine: str = "python"  # 'python' (built-in index) or 'sqlite' (SQLite FTS5)
+    scorer: str = "bm25"  # 'bm25' (BM25F with a weighted title field) or 'tfidf'
+    bm25_k1: float = 1.2  # term frequency saturation
+    bm25_b: float = 0.75  # document length normalization (0 = none, 1 = full)
+    title_weight: float = 2.0  # BM25F weight of title matches relative to the body
+    semantic: bool = False  # fuse hashed-vector similarity with keyword ranking (needs NumPy)
+    index_workers: int = 0  # processes that parse files on refresh (0 = one per CPU, 1 = none)
+
+
+@dataclass(frozen=True)
 class Config:
-    """Main configuration container."""
+    """Main configuration container.
+
+    Instances are immutable snapshots: a config reload builds a new Config and
+    swaps it in, so code holding a snapshot keeps a consistent view.
+    """
     roles: Dict[str, RoleConfig]
     tools: Dict[str, ToolConfig]
     auth_status: Dict[str, object]
+    routing: RoutingConfig = field(default_factory=RoutingConfig)
+    execution: ExecutionConfig = field(default_factory=ExecutionConfig)
+    knowledge: KnowledgeConfig = field(default_factory=KnowledgeConfig)
     _warnings: List[str] = field(default_factory=list)
 
     @classmethod
-    def load(cls, config_path: Optional[Path] = None, validate: bool = True) -> "Config":
+    def load(cls, config_path: Optional[Path] = None, validate: bool = True,
+             use_cache: bool = True, override_env: bool = False) -> "Config":
         """Load configuration from role_config.json and .env files.
 
+        A validated, compiled snapshot is cached next to the config file and
+        reused while neither the config nor the .env file changes.
+
         Args:
             config_path: Path to config file (defaults to config/role_config.json)
             validate: Whether to validate the config (default True)
+            use_cache: Whether to use the compiled config cache (default True)
+            override_env: Let .env values replace variables already in the
+                environment (for reloads after .env was edited)
 
         Returns:
             Config instance
@@ -57,20 +138,27 @@ class Config:
             ConfigParseError: If config file contains invalid JSON
             ConfigValidationError: If validation fails
         """
-        # Load .env file
-        load_dotenv()
-
         # Determine config path
         if config_path is None:
-            config_path = Path("config/role_config.json")
+            config_path = CONFIG_PATH
+
+        if use_cache:
+            cached = _load_compiled_config(config_path, override_env)
+            if cached is not None:
+                return cached
+
+        # Load .env file (imported here to keep CLI startup light)
+        from dotenv import load_dotenv
+        env_path = _find_env_file()
+        load_dotenv(env_path or None, override=override_env)
 
         if not config_path.exists():
             raise ConfigNotFoundError(str(config_path))
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            raw = config_path.read_bytes()
+            data = json.loads(raw.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             raise ConfigParseError(str(config_path), str(e))
 
         # Validate configuration
@@ -88,7 +176,8 @@ class Config:
                 keywords=role_data.get("keywords", []),
                 primary=role_data.get("primary", "claude"),
                 fallback=role_data.get("fallback", []),
-                description=role_data.get("description", "")
+                description=role_data.get("description", ""),
+                weights={k: float(v) for k, v in role_data.get("weights", {}).items()}
             )
 
         # Parse tools
@@ -107,14 +196,62 @@ class Config:
                 command=tool_data.get("command", tool_name),
                 context_file=tool_data.get("context_file", f"{tool_name.upper()}.md"),
                 role=tool_data.get("role", ""),
-                args=tool_args
+                args=tool_args,
+                input_mode=tool_data.get("input_mode", "argv"),
+                worker=_parse_worker(tool_data.get("worker")),
+                adapter=tool_data.get("adapter"),
+                options=dict(tool_data.get("options", {}))
             )
 
         # Parse auth status
         auth_status = data.get("auth_status", {})
 
-        config = cls(roles=roles, tools=tools, auth_status=auth_status)
-        config._warnings = warnings
+        # Parse routing strategy
+        routing_data = data.get("routing", {})
+        defaults = RoutingConfig()
+        routing = RoutingConfig(
+            strategy=routing_data.get("strategy", defaults.strategy),
+            first_word_bonus=float(routing_data.get("first_word_bonus", defaults.first_word_bonus)),
+            position_weight=float(routing_data.get("position_weight", defaults.position_weight)),
+            min_confidence=float(routing_data.get("min_confidence", defaults.min_confidence)),
+            fallback_role=routing_data.get("fallback_role", defaults.fallback_role),
+            learned_min_confidence=float(routing_data.get(
+                "learned_min_confidence", defaults.learned_min_confidence)),
+            record_history=bool(routing_data.get("record_history", defaults.record_history))
+        )
+
+        # Parse execution settings
+        execution_data = data.get("execution", {})
+        exec_defaults = ExecutionConfig()
+        execution = ExecutionConfig(
+            max_task_chars=int(execution_data.get("max_task_chars", exec_defaults.max_task_chars)),
+            max_parallel=int(execution_data.get("max_parallel", exec_defaults.max_parallel)),
+            reduce_prompt=execution_data.get("reduce_prompt", exec_defaults.reduce_prompt),
+            speculative=bool(execution_data.get("speculative", exec_defaults.speculative)),
+            speculative_idle_ms=int(execution_data.get(
+                "speculative_idle_ms", exec_defaults.speculative_idle_ms))
+        )
+
+        # Parse Document Library search settings
+        knowledge_data = data.get("knowledge", {})
+        knowledge_defaults = KnowledgeConfig()
+        knowledge = KnowledgeConfig(
+            engine=knowledge_data.get("engine", knowledge_defaults.engine),
+            scorer=knowledge_data.get("scorer", knowledge_defaults.scorer),
+            bm25_k1=float(knowledge_data.get("bm25_k1", knowledge_defaults.bm25_k1)),
+            bm25_b=float(knowledge_data.get("bm25_b", knowledge_defaults.bm25_b)),
+            title_weight=float(knowledge_data.get("title_weight", knowledge_defaults.title_weight)),
+            semantic=knowledge_data.get("semantic", knowledge_defaults.semantic),
+            index_workers=int(knowledge_data.get("index_workers", knowledge_defaults.index_workers))
+        )
+
+        config = cls(roles=roles, tools=tools, auth_status=auth_status,
+                     routing=routing, execution=execution, knowledge=knowledge,
+                     _warnings=warnings)
+
+        # Only validated snapshots are cached
+        if use_cache and validate:
+            _save_compiled_config(config_path, raw, env_path, config)
         return config
 
     @property
@@ -156,9 +293,16 @@ class Config:
         return self._detect_auth_status(tool)
 
     def is_tool_installed(self, tool: str) -> bool:
-        """Check if a tool's command is available on PATH."""
+        """Check if a tool's command is available on PATH (or its adapter module exists)."""
         if tool not in self.tools:
             return False
+        adapter = self.tools[tool].adapter
+        if adapter:
+            import importlib.util
+            try:
+                return importlib.util.find_spec(adapter.partition(":")[0]) is not None
+            except (ImportError, ValueError):
+                return False
         command = self.get_tool_command(tool)
         return shutil.which(command) is not None
 
@@ -188,29 +332,214 @@ class Config:
         return tool
 
 
+# Compiled config cache: a validated Config as JSON plus the fingerprints of
+# the files it was built from. It never holds .env values, which are loaded
+# again on a cache hit. Bump the version when the dataclasses change.
+CONFIG_CACHE_VERSION = 11
+# Sources modified this close to (or after) the cache build time are verified
+# by content hash, since coarse mtimes can hide a same-size rewrite.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _config_cache_path(config_path: Path) -> Path:
+    """Cache file stored next to the config file."""
+    return config_path.with_name(f".{config_path.stem}.cache")
+
+
+def _env_candidates() -> List[Path]:
+    """Places load_dotenv() looks for .env, nearest first (mirrors find_dotenv)."""
+    start = Path(__file__).resolve().parent
+    return [directory / ".env" for directory in [start] + list(start.parents)]
+
+
+def _find_env_file() -> str:
+    """Path of the .env file load_dotenv() would use, or '' if none."""
+    for candidate in _env_candidates():
+        if candidate.is_file():
+            return str(candidate)
+    return ""
+
+
+def _fingerprint(path: Path, content: Optional[bytes] = None) -> Optional[tuple]:
+    """(mtime_ns, size, sha256) for a file, or None if it doesn't exist."""
+    import hashlib
+    try:
+        stat = path.stat()
+        if content is None:
+            content = path.read_bytes()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, hashlib.sha256(content).hexdigest())
+
+
+def _source_unchanged(path: Path, fingerprint: Optional[tuple], built_at_ns: int) -> bool:
+    """Check a source file against its cached fingerprint."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return fingerprint is None
+    if fingerprint is None:
+        return False
+    mtime_ns, size, digest = fingerprint
+    if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+        return False
+    if mtime_ns + _RACY_WINDOW_NS > built_at_ns:
+        # Racily clean: same mtime and size could still hide a rewrite
+        current = _fingerprint(path)
+        return current is not None and current[2] == digest
+    return True
+
+
+def _config_to_json(config: "Config") -> dict:
+    """Plain JSON data of a Config (see _config_from_json)."""
+    from dataclasses import asdict
+    return asdict(config)
+
+
+def _config_from_json(data: dict) -> "Config":
+    """Rebuild a Config from _config_to_json() data."""
+    tools = {}
+    for name, tool in data["tools"].items():
+        worker = tool.get("worker")
+        tools[name] = ToolConfig(**{**tool, "worker": WorkerConfig(**worker) if worker else None})
+    return Config(
+        roles={name: RoleConfig(**role) for name, role in data["roles"].items()},
+        tools=tools,
+        auth_status=data["auth_status"],
+        routing=RoutingConfig(**data["routing"]),
+        execution=ExecutionConfig(**data["execution"]),
+        knowledge=KnowledgeConfig(**data["knowledge"]),
+        _warnings=data["_warnings"],
+    )
+
+
+def _load_compiled_config(config_path: Path, override_env: bool = False) -> Optional["Config"]:
+    """Load a cached Config if it is still valid for its sources."""
+    try:
+        with open(_config_cache_path(config_path), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") != CONFIG_CACHE_VERSION:
+            return None
+        built_at_ns = cached["built_at_ns"]
+        if not _source_unchanged(config_path, cached["config_fingerprint"], built_at_ns):
+            return None
+        # The .env in use must be unchanged and no nearer .env may have appeared
+        env_path = cached["env_path"]
+        for candidate in _env_candidates():
+            if str(candidate) == env_path:
+                if not _source_unchanged(candidate, cached["env_fingerprint"], built_at_ns):
+                    return None
+                break
+            if candidate.exists():
+                return None
+        config = _config_from_json(cached["config"])
+    except Exception:
+        return None
+
+    # The cache holds no .env values, so the (unchanged) file is read again
+    if env_path:
+        from dotenv import load_dotenv
+        load_dotenv(env_path, override=override_env)
+    return config
+
+
+def _save_compiled_config(config_path: Path, raw: bytes, env_path: str, config: "Config") -> None:
+    """Write the compiled config cache next to the config file."""
+    import time
+    try:
+        cached = {
+            "version": CONFIG_CACHE_VERSION,
+            "built_at_ns": time.time_ns(),
+            "config_fingerprint": _fingerprint(config_path, raw),
+            "env_path": env_path,
+            "env_fingerprint": _fingerprint(Path(env_path)) if env_path else None,
+            "config": _config_to_json(config),
+        }
+        cache_path = _config_cache_path(config_path)
+        tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        pass  # Cache is optional
+
+
 # Global config instance
 _config: Optional[Config] = None
 
+# Bumped whenever the global config is replaced, so caches can tell snapshots apart
+_config_generation = 0
+
+# Serializes loads and swaps of the global config
+_config_lock = threading.RLock()
+
+# Called with the new snapshot after every swap
+_config_listeners: List[Callable[[Config], None]] = []
+
 
 def get_config() -> Config:
-    """Get or load the global config instance."""
-    global _config
-    if _config is None:
-        _config = Config.load()
-    return _config
+    """Get or load the global config instance.
+
+    The returned snapshot is immutable; hold on to it for the duration of an
+    operation to keep a consistent view across config reloads.
+    """
+    config = _config
+    if config is None:
+        with _config_lock:
+            if _config is None:
+                _swap_config(Config.load())
+            config = _config
+    return config
+
+
+def get_config_generation() -> int:
+    """Get the generation number of the global config."""
+    return _config_generation
+
+
+def _swap_config(config: Optional[Config]) -> None:
+    """Atomically replace the global config and notify listeners."""
+    global _config, _config_generation
+    with _config_lock:
+        _config = config
+        _config_generation += 1
+        listeners = list(_config_listeners)
+    if config is not None:
+        for listener in listeners:
+            try:
+                listener(config)
+            except Exception:
+                pass
+
+
+def add_config_listener(listener: Callable[[Config], None]) -> None:
+    """Register a callback invoked with each new config snapshot."""
+    with _config_lock:
+        _config_listeners.append(listener)
+
+
+def remove_config_listener(listener: Callable[[Config], None]) -> None:
+    """Unregister a config listener."""
+    with _config_lock:
+        if listener in _config_listeners:
+            _config_listeners.remove(listener)
 
 
 def reload_config() -> Config:
-    """Force reload of configuration."""
-    global _config
-    _config = Config.load()
-    return _config
+    """Force reload of configuration.
+
+    The new snapshot is built and validated before it replaces the current
+    one, so a broken config file leaves the running config untouched.
+    """
+    with _config_lock:
+        config = Config.load(override_env=True)
+        _swap_config(config)
+    return config
 
 
 def _reset_config() -> None:
     """Reset the config singleton (for testing)."""
-    global _config
-    _config = None
+    _swap_config(None)
 
 
 def load_config(config_path: Path) -> Config:
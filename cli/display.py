@@ -1,15 +1,13 @@
 """Rich display utilities for Terminal AI Workflow CLI."""
 
-from typing import List, Optional, Generator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, List, Optional, Generator
 from rich.console import Console
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.table import Table
-from rich.live import Live
-from rich.spinner import Spinner
-from rich.text import Text
 
-from .router import Route
+# Renderables (Markdown pulls in markdown-it and pygments) are imported inside
+# the functions that use them so `--status` and short commands start quickly.
+if TYPE_CHECKING:
+    from .router import Route
 
 # Global console instance
 console = Console()
@@ -17,6 +15,8 @@ console = Console()
 
 def show_header():
     """Display the CLI header."""
+    from rich.panel import Panel
+
     console.print(Panel.fit(
         "[bold blue]Terminal AI Workflow[/bold blue]\n"
         "[dim]Type /help for commands, /exit to quit[/dim]",
@@ -25,8 +25,10 @@ def show_header():
     console.print()
 
 
-def show_routing(routes: List[Route], verbose: bool = False):
+def show_routing(routes: List["Route"], verbose: bool = False):
     """Display routing information."""
+    from rich.table import Table
+
     if not verbose:
         return
 
@@ -53,6 +55,9 @@ def show_tool_footer():
 
 def stream_output(output_generator: Generator[str, None, None], tool_name: str):
     """Stream output with live markdown rendering."""
+    from rich.markdown import Markdown
+    from rich.live import Live
+
     buffer = ""
 
     show_tool_header(tool_name)
@@ -72,6 +77,8 @@ def stream_output(output_generator: Generator[str, None, None], tool_name: str):
 
 def show_output(text: str, tool_name: str):
     """Display static output with markdown rendering."""
+    from rich.markdown import Markdown
+
     show_tool_header(tool_name)
     console.print(Markdown(text))
     show_tool_footer()
@@ -82,6 +89,31 @@ def show_spinner(message: str):
     return console.status(f"[bold blue]{message}[/bold blue]", spinner="dots")
 
 
+@contextmanager
+def show_progress(message: str) -> Generator[Callable[[int, int], None], None, None]:
+    """Show a progress bar while the block runs; yields an update(done, total) callback.
+
+    The bar appears on the first update, so quick operations print nothing.
+    """
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+    progress = Progress(TextColumn(f"[bold blue]{message}[/bold blue]"), BarColumn(),
+                        MofNCompleteColumn(), console=console, transient=True)
+    task = None
+
+    def update(done: int, total: int):
+        nonlocal task
+        if task is None:
+            progress.start()
+            task = progress.add_task(message, total=total)
+        progress.update(task, completed=done, total=total)
+
+    try:
+        yield update
+    finally:
+        progress.stop()
+
+
 def show_error(message: str):
     """Display an error message."""
     console.print(f"[bold red]Error:[/bold red] {message}")
@@ -99,6 +131,8 @@ def show_info(message: str):
 
 def show_help():
     """Display help information."""
+    from rich.markdown import Markdown
+
     help_text = """
 ## Commands
 
@@ -106,6 +140,7 @@ def show_help():
 |---------|-------------|
 | `/help` | Show this help message |
 | `/status` | Check tool availability |
+| `/stats` | Show routing cache statistics |
 | `/tasks` | Show current task files |
 | `/log` | Show recent log entries |
 | `/clear` | Clear the screen |
@@ -117,7 +152,9 @@ def show_help():
 |---------|-------------|
 | `/docs` | Browse Document Library |
 | `/docs <name>` | View specific document |
-| `/docs search <query>` | Search all documents |
+| `/docs search <query>` | Search all documents ("phrase", AND, OR, NOT) |
+| `/docs <number>` | Open a section from the last search |
+| `/docs export [path]` | Export the document index as JSON |
 | `/ref` | CLI command reference overview |
 | `/ref <tool>` | Commands for claude/gemini/openai |
 | `/workflow` | 3-model workflow overview |
@@ -145,20 +182,47 @@ def show_help():
 
 def show_status(tools_status: dict):
     """Display tool availability status."""
+    from rich.table import Table
+
     table = Table(title="Tool Status", show_header=True, header_style="bold cyan")
     table.add_column("Tool", style="bold")
     table.add_column("Command")
     table.add_column("Status")
+    table.add_column("Version", style="dim")
+    table.add_column("Probe", justify="right", style="dim")
+    table.add_column("Recent runs", justify="right")
 
     for tool, info in tools_status.items():
         status = info.get("status")
         if status is None:
             status = "[green]Available[/green]" if info["available"] else "[red]Unavailable[/red]"
-        table.add_row(info["name"], info["command"], status)
+        probe_ms = info.get("probe_ms")
+        success_rate = info.get("success_rate")
+        table.add_row(
+            info["name"], info["command"], status,
+            info.get("version") or "",
+            f"{probe_ms:.0f} ms" if probe_ms is not None else "",
+            f"{success_rate:.0%} ok" if success_rate is not None else "",
+        )
 
     console.print(table)
 
 
+def show_stats(sections: dict):
+    """Display runtime statistics, one table per section."""
+    from rich.table import Table
+
+    for title, stats in sections.items():
+        table = Table(title=title, show_header=True, header_style="bold cyan")
+        table.add_column("Metric", style="bold")
+        table.add_column("Value", justify="right")
+        for key, value in stats.items():
+            if isinstance(value, float):
+                value = f"{value:.3f}"
+            table.add_row(key.replace("_", " "), str(value))
+        console.print(table)
+
+
 def clear_screen():
     """Clear the terminal screen."""
     console.clear()
@@ -166,6 +230,9 @@ def clear_screen():
 
 def show_document(title: str, content: str):
     """Display a document with markdown rendering."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
     console.print(Panel(
         Markdown(content),
         title=f"[bold cyan]{title}[/bold cyan]",
@@ -175,6 +242,8 @@ def show_document(title: str, content: str):
 
 def show_document_list(documents: list):
     """Display a list of documents in the library."""
+    from rich.table import Table
+
     if not documents:
         show_info("No documents found in docs/library")
         return
@@ -191,7 +260,9 @@ def show_document_list(documents: list):
 
 
 def show_search_results(results: list, query: str):
-    """Display search results."""
+    """Display search results, highlighting matches in each fragment."""
+    from rich.text import Text
+
     if not results:
         show_info(f"No results found for '{query}'")
         return
@@ -200,12 +271,23 @@ def show_search_results(results: list, query: str):
 
     for i, result in enumerate(results, 1):
         console.print(f"[bold green]{i}. {result.name}[/bold green]")
-        console.print(f"   [dim]{result.title}[/dim]")
-        console.print(f"   {result.snippet}\n")
+        console.print(f"   [dim]{result.section or result.title}[/dim]")
+        if not result.fragments:
+            console.print(Text(f"   {result.snippet}"))
+        for fragment in result.fragments:
+            line = Text(f"   {fragment.text}")
+            for start, end in fragment.matches:
+                line.stylize("bold yellow", start + 3, end + 3)
+            console.print(line)
+        console.print()
+
+    console.print("[dim]Use /docs <number> to open a result's section[/dim]\n")
 
 
 def show_command_table(tool: str, commands: list):
     """Display CLI commands as a Rich table."""
+    from rich.table import Table
+
     if not commands:
         show_info(f"No commands found for {tool}")
         return
@@ -241,6 +323,9 @@ def show_tools_overview(overviews: list):
 
 def show_workflow_overview(text: str):
     """Display the workflow overview."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
     console.print(Panel(
         Markdown(text),
         title="[bold cyan]3-Model Workflow[/bold cyan]",
@@ -250,6 +335,9 @@ def show_workflow_overview(text: str):
 
 def show_workflow_diagram(diagram: str):
     """Display the ASCII workflow diagram."""
+    from rich.panel import Panel
+    from rich.text import Text
+
     console.print(Panel(
         Text(diagram, style="cyan"),
         title="[bold]Workflow Diagram[/bold]",
@@ -259,6 +347,9 @@ def show_workflow_diagram(diagram: str):
 
 def show_role_info(role):
     """Display detailed role information for a tool."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
     content = f"""## {role.role_title}
 **Tool:** {role.name} (`{role.tool_id}`)
 
@@ -287,6 +378,9 @@ def show_role_info(role):
 
 def show_handoff_advice(advice: str):
     """Display handoff advice between tools."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
     console.print(Panel(
         Markdown(advice),
         title="[bold]Handoff Guide[/bold]",
@@ -139,6 +139,17 @@ class IndexError(KnowledgeError):
         )
 
 
+# Valid values for routing.strategy in role_config.json
+ROUTING_STRATEGIES = ("first_match", "scored")
+
+# Valid values for tools[].input_mode in role_config.json
+INPUT_MODES = ("argv", "stdin", "tempfile")
+
+# Valid values for knowledge.engine and knowledge.scorer in role_config.json
+KNOWLEDGE_ENGINES = ("python", "sqlite")
+KNOWLEDGE_SCORERS = ("bm25", "tfidf")
+
+
 @dataclass
 class ValidationResult:
     """Result of configuration validation."""
@@ -155,6 +166,27 @@ class ValidationResult:
         return cls(valid=False, errors=errors, warnings=warnings or [])
 
 
+def _validate_worker(tool_name: str, worker: Any) -> List[str]:
+    """Validate a tool's "worker" pool block."""
+    if not isinstance(worker, dict):
+        return [f"Tool '{tool_name}' worker must be an object"]
+    errors = []
+    for key in ("size", "max_requests"):
+        value = worker.get(key, 1)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            errors.append(f"Tool '{tool_name}' worker '{key}' must be a positive integer")
+    for key in ("max_memory_mb", "timeout"):
+        value = worker.get(key, 0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            errors.append(f"Tool '{tool_name}' worker '{key}' must be a non-negative number")
+    sentinel = worker.get("sentinel", "-")
+    if not isinstance(sentinel, str) or not sentinel.strip():
+        errors.append(f"Tool '{tool_name}' worker 'sentinel' must be a non-empty string")
+    if not isinstance(worker.get("args", []), list):
+        errors.append(f"Tool '{tool_name}' worker 'args' must be a list")
+    return errors
+
+
 def validate_config_data(data: Dict[str, Any]) -> ValidationResult:
     """Validate configuration data structure.
 
@@ -197,6 +229,17 @@ def validate_config_data(data: Dict[str, Any]) -> ValidationResult:
             if "primary" not in role_data:
                 errors.append(f"Role '{role_name}' missing 'primary' tool")
 
+            weights = role_data.get("weights", {})
+            if not isinstance(weights, dict):
+                errors.append(f"Role '{role_name}' weights must be an object")
+            else:
+                keywords = [k.lower() for k in role_data.get("keywords", []) if isinstance(k, str)]
+                for keyword, weight in weights.items():
+                    if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                        errors.append(f"Role '{role_name}' weight for '{keyword}' must be a number")
+                    elif keyword.lower() not in keywords:
+                        warnings.append(f"Role '{role_name}' weight for unknown keyword: '{keyword}'")
+
     # Validate tools
     tools = data.get("tools", {})
     if not tools:
@@ -207,9 +250,32 @@ def validate_config_data(data: Dict[str, Any]) -> ValidationResult:
                 errors.append(f"Tool '{tool_name}' must be an object")
                 continue
 
-            if "command" not in tool_data:
+            adapter = tool_data.get("adapter")
+            if adapter is not None:
+                module_name, _, attr = adapter.partition(":") if isinstance(adapter, str) else ("", "", "")
+                if not module_name or not attr:
+                    errors.append(
+                        f"Tool '{tool_name}' adapter must be a 'module:attr' entry point"
+                    )
+                if tool_data.get("worker") is not None:
+                    warnings.append(f"Tool '{tool_name}' has an adapter - its worker block is ignored")
+            elif "command" not in tool_data:
                 warnings.append(f"Tool '{tool_name}' missing 'command' - will use tool name")
 
+            if not isinstance(tool_data.get("options", {}), dict):
+                errors.append(f"Tool '{tool_name}' options must be an object")
+
+            input_mode = tool_data.get("input_mode", "argv")
+            if input_mode not in INPUT_MODES:
+                errors.append(
+                    f"Tool '{tool_name}' has unknown input_mode: '{input_mode}' "
+                    f"(expected one of: {', '.join(INPUT_MODES)})"
+                )
+
+            worker = tool_data.get("worker")
+            if worker is not None:
+                errors.extend(_validate_worker(tool_name, worker))
+
     # Validate auth_status
     auth_status = data.get("auth_status", {})
     if not auth_status:
@@ -226,6 +292,73 @@ def validate_config_data(data: Dict[str, Any]) -> ValidationResult:
                 if fallback not in tools:
                     warnings.append(f"Role '{role_name}' fallback references unknown tool: '{fallback}'")
 
+    # Validate routing strategy
+    routing = data.get("routing", {})
+    if not isinstance(routing, dict):
+        errors.append("'routing' must be an object")
+    else:
+        strategy = routing.get("strategy", "first_match")
+        if strategy not in ROUTING_STRATEGIES:
+            errors.append(
+                f"Unknown routing strategy: '{strategy}' "
+                f"(expected one of: {', '.join(ROUTING_STRATEGIES)})"
+            )
+        for key in ("first_word_bonus", "position_weight", "min_confidence",
+                    "learned_min_confidence"):
+            value = routing.get(key, 0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"Routing '{key}' must be a number")
+        if not isinstance(routing.get("record_history", False), bool):
+            errors.append("Routing 'record_history' must be true or false")
+        fallback_role = routing.get("fallback_role")
+        if fallback_role is not None and fallback_role not in roles:
+            errors.append(f"Routing fallback_role references unknown role: '{fallback_role}'")
+
+    # Validate execution settings
+    execution = data.get("execution", {})
+    if not isinstance(execution, dict):
+        errors.append("'execution' must be an object")
+    else:
+        for key in ("max_task_chars", "max_parallel", "speculative_idle_ms"):
+            value = execution.get(key, 1)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors.append(f"Execution '{key}' must be a positive integer")
+        reduce_prompt = execution.get("reduce_prompt")
+        if reduce_prompt is not None and not isinstance(reduce_prompt, str):
+            errors.append("Execution 'reduce_prompt' must be a string or null")
+        if not isinstance(execution.get("speculative", False), bool):
+            errors.append("Execution 'speculative' must be true or false")
+
+    # Validate Document Library search settings
+    knowledge = data.get("knowledge", {})
+    if not isinstance(knowledge, dict):
+        errors.append("'knowledge' must be an object")
+    else:
+        engine = knowledge.get("engine", "python")
+        if engine not in KNOWLEDGE_ENGINES:
+            errors.append(
+                f"Unknown knowledge engine: '{engine}' "
+                f"(expected one of: {', '.join(KNOWLEDGE_ENGINES)})"
+            )
+        scorer = knowledge.get("scorer", "bm25")
+        if scorer not in KNOWLEDGE_SCORERS:
+            errors.append(
+                f"Unknown knowledge scorer: '{scorer}' "
+                f"(expected one of: {', '.join(KNOWLEDGE_SCORERS)})"
+            )
+        for key in ("bm25_k1", "bm25_b", "title_weight"):
+            value = knowledge.get(key, 0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                errors.append(f"Knowledge '{key}' must be a non-negative number")
+        b = knowledge.get("bm25_b", 0)
+        if isinstance(b, (int, float)) and b > 1:
+            errors.append("Knowledge 'bm25_b' must be between 0 and 1")
+        if not isinstance(knowledge.get("semantic", False), bool):
+            errors.append("Knowledge 'semantic' must be true or false")
+        workers = knowledge.get("index_workers", 0)
+        if isinstance(workers, bool) or not isinstance(workers, int) or workers < 0:
+            errors.append("Knowledge 'index_workers' must be a non-negative integer")
+
     # Check for tools without auth_status
     for tool_name in tools:
         if tool_name not in auth_status:
@@ -1,16 +1,28 @@
 """Tool execution for Terminal AI Workflow CLI."""
 
+import json
+import os
+import re
 import subprocess
 import shutil
+import signal
+import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Generator, Optional, Callable
-from dataclasses import dataclass
+from typing import Generator, List, Optional, Callable, Tuple
+from dataclasses import dataclass, field, replace
 
-from .config import get_config
+from .config import Config, get_config
+from .health import get_health_registry
 from .router import Route
 
+# Bytes written to a stdin-mode tool per write call
+STDIN_CHUNK_SIZE = 64 * 1024
+
 
 @dataclass
 class ExecutionResult:
@@ -21,6 +33,7 @@ class ExecutionResult:
     exit_code: int
     duration: float
     output_file: Optional[Path] = None
+    chunks: List["ExecutionResult"] = field(default_factory=list)  # map-reduce parts
 
 
 def create_workspace() -> Path:
@@ -36,45 +49,44 @@ def check_tool_available(command: str) -> bool:
     return shutil.which(command) is not None
 
 
-def get_tools_status() -> dict:
-    """Get status of all configured tools."""
-    config = get_config()
-    status = {}
-
-    for tool_name, tool_config in config.tools.items():
-        command = tool_config.command
-        installed = check_tool_available(command)
-        auth = config.get_effective_auth_status(tool_name)
-        if not installed:
-            status_text = "[red]Not installed[/red]"
-        elif auth is False:
-            status_text = "[red]Auth missing[/red]"
-        elif auth is True:
-            status_text = "[green]Available[/green]"
-        else:
-            status_text = "[yellow]Installed (auth unknown)[/yellow]"
+def get_tools_status(config: Optional[Config] = None) -> dict:
+    """Get status of all configured tools from the health registry.
 
-        available = installed and (auth is not False)
+    Reads the registry's snapshot (probing only if there is none yet for this
+    config), so /status never waits on tools while the monitor is running.
+    """
+    status = {}
+    for tool_name, health in get_health_registry().snapshot(config).items():
         status[tool_name] = {
-            "name": tool_config.name,
-            "command": command,
-            "installed": installed,
-            "auth": auth,
-            "available": available,
-            "status": status_text
+            "name": health.name,
+            "command": health.command,
+            "installed": health.installed,
+            "auth": health.auth,
+            "available": health.available,
+            "status": health.status_text,
+            "version": health.version,
+            "probe_ms": health.probe_ms,
+            "success_rate": health.success_rate,
         }
 
     return status
 
 
-def build_tool_command(route: Route) -> str:
+def build_tool_command(route: Route, config: Optional[Config] = None,
+                       task_file: Optional[Path] = None) -> str:
     """Build a tool command as a shell-escaped string.
 
     Returns a string (not list) for proper shell=True handling on Windows.
+
+    Args:
+        route: The route to run
+        config: Config snapshot (defaults to the global config)
+        task_file: File holding the task, for tools in tempfile input mode
     """
     import shlex
 
-    config = get_config()
+    if config is None:
+        config = get_config()
     tool_config = config.tools.get(route.tool)
     if tool_config is None:
         return f'{route.tool} "{route.task}"'
@@ -82,13 +94,26 @@ def build_tool_command(route: Route) -> str:
     command = tool_config.command
     args = list(tool_config.args)
 
-    if any("{task}" in arg for arg in args):
+    if tool_config.input_mode in ("stdin", "tempfile"):
+        # The task travels out of band; drop arguments that would carry it
+        parts = [command] + [arg for arg in args if "{task}" not in arg]
+        if tool_config.input_mode == "tempfile":
+            path = str(task_file) if task_file is not None else "{task_file}"
+            if any("{task_file}" in arg for arg in parts[1:]):
+                parts = [command] + [arg.replace("{task_file}", path) for arg in parts[1:]]
+            else:
+                parts.append(path)
+    elif any("{task}" in arg for arg in args):
         args = [arg.replace("{task}", route.task) for arg in args]
         parts = [command] + args
     else:
         parts = [command] + args + [route.task]
 
-    # Build properly quoted command string for shell execution
+    return join_command(parts)
+
+
+def join_command(parts: List[str]) -> str:
+    """Join command parts into a string for shell execution."""
     # Quote any argument containing spaces
     quoted_parts = []
     for part in parts:
@@ -102,10 +127,144 @@ def build_tool_command(route: Route) -> str:
     return ' '.join(quoted_parts)
 
 
+def new_process_group() -> dict:
+    """Popen arguments that start a process in its own process group.
+
+    Tools run through a shell, so killing the Popen alone may only kill the
+    shell; kill_process_tree() then reaches the tool too.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_tree(process: subprocess.Popen) -> None:
+    """Kill a process and the processes it started (see new_process_group)."""
+    if sys.platform == "win32":
+        try:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           capture_output=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            pass
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass  # Not a group leader, or already gone
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def spawn_tool(route: Route, config: Optional[Config] = None,
+               task_file: Optional[Path] = None, new_group: bool = False) -> subprocess.Popen:
+    """Start a tool process with its output piped.
+
+    Tools in stdin input mode get a stdin pipe and wait for the task on it,
+    so the process can be started before the task is known. Tools in
+    tempfile mode are passed task_file. With new_group, the process gets its
+    own process group, so discard_process() can kill the tool behind the
+    shell (and terminal Ctrl-C no longer reaches it).
+    """
+    if config is None:
+        config = get_config()
+    tool_config = config.tools.get(route.tool)
+    stdin_mode = tool_config is not None and tool_config.input_mode == "stdin"
+
+    return subprocess.Popen(
+        build_tool_command(route, config, task_file),
+        stdin=subprocess.PIPE if stdin_mode else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        encoding='utf-8',
+        errors='replace',
+        shell=True,  # Required for Windows .CMD files (npm-installed CLIs)
+        **(new_process_group() if new_group else {})
+    )
+
+
+def discard_process(process: subprocess.Popen) -> None:
+    """Stop a spawned tool process (and what its shell started) that will not be used."""
+    try:
+        kill_process_tree(process)
+        process.wait(timeout=5)
+    except Exception:
+        pass
+    for stream in (process.stdin, process.stdout):
+        try:
+            if stream is not None:
+                stream.close()
+        except Exception:
+            pass
+
+
+def write_task_file(task: str) -> Path:
+    """Write a task to a private temp file for a tempfile-mode tool.
+
+    The caller deletes the file once the tool has finished.
+    """
+    fd, path = tempfile.mkstemp(prefix="workflow-task-", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(task)
+    return Path(path)
+
+
+def _send_task(process: subprocess.Popen, task: str) -> Optional[threading.Thread]:
+    """Stream the task into a stdin-mode process from a writer thread.
+
+    Writing on a separate thread lets the caller drain stdout meanwhile, so
+    a tool that answers while still reading a large prompt cannot fill both
+    pipes and deadlock. Returns the thread, or None if there is no stdin.
+    """
+    if process.stdin is None:
+        return None
+    writer = threading.Thread(
+        target=_write_stdin, args=(process.stdin, task), name="tool-stdin", daemon=True
+    )
+    writer.start()
+    return writer
+
+
+def _write_stdin(stdin, task: str, chunk_size: int = STDIN_CHUNK_SIZE, close: bool = True) -> None:
+    """Write a task to a pipe in chunks, then close it (unless close is False)."""
+    # Encode once and slice a memoryview, so chunks are not copied again
+    data = memoryview(task.encode("utf-8"))
+    raw = getattr(stdin, "buffer", stdin)
+    try:
+        for offset in range(0, len(data), chunk_size):
+            raw.write(data[offset:offset + chunk_size])
+        raw.flush()
+    except (BrokenPipeError, OSError, ValueError):
+        pass  # Tool exited early; its output explains why
+    finally:
+        if close:
+            try:
+                stdin.close()
+            except (BrokenPipeError, OSError, ValueError):
+                pass
+
+
+def _worker_pool(route: Route, config: Config):
+    """The tool's worker pool, or None if it has none or a worker cannot take the task."""
+    if config.tools[route.tool].worker is None:
+        return None
+    from .workers import get_worker_pool
+    pool = get_worker_pool(route.tool, config)
+    # A task containing the sentinel line falls back to one process per task
+    return pool if pool.accepts(route.task) else None
+
+
 def execute_tool_streaming(
     route: Route,
     workspace: Path,
-    on_output: Callable[[str], None]
+    on_output: Callable[[str], None],
+    output_name: Optional[str] = None,
+    config: Optional[Config] = None,
+    process: Optional[subprocess.Popen] = None
 ) -> ExecutionResult:
     """Execute a tool with streaming output.
 
@@ -113,41 +272,63 @@ def execute_tool_streaming(
         route: The route containing tool and task info
         workspace: Directory to save output files
         on_output: Callback function called for each output chunk
+        output_name: Output file name (defaults to <tool>_output.txt)
+        config: Config snapshot (defaults to the global config)
+        process: Already spawned (stdin-mode) process to hand the task to
 
     Returns:
         ExecutionResult with final output and status
     """
-    config = get_config()
+    if config is None:
+        config = get_config()
     command = config.get_tool_command(route.tool)
 
-    output_file = workspace / f"{route.tool}_output.txt"
+    output_file = workspace / (output_name or f"{route.tool}_output.txt")
     buffer = ""
     start_time = time.time()
     exit_code = 0
 
-    try:
-        process = subprocess.Popen(
-            build_tool_command(route),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            encoding='utf-8',
-            errors='replace',
-            shell=True  # Required for Windows .CMD files (npm-installed CLIs)
-        )
-
-        # Stream output line by line
-        for line in iter(process.stdout.readline, ''):
-            if not line:
-                break
-            buffer += line
-            on_output(line)
-
-        # Wait for completion
-        process.wait()
-        exit_code = process.returncode
+    tool_config = config.tools.get(route.tool)
+    if tool_config is not None and tool_config.adapter:
+        command = tool_config.adapter
+    task_file = None
+    pool = None
 
+    try:
+        if process is None and tool_config is not None and not tool_config.adapter:
+            pool = _worker_pool(route, config)
+        if tool_config is not None and tool_config.adapter:
+            # In-process adapter: no subprocess at all
+            from .adapters import run_adapter
+            buffer, exit_code = run_adapter(route.tool, tool_config, route.task, on_output)
+        elif pool is not None:
+            # Persistent worker session: no process startup per task
+            buffer, exit_code = pool.run(route.task, on_output)
+        else:
+            if process is None:
+                if tool_config is not None and tool_config.input_mode == "tempfile":
+                    task_file = write_task_file(route.task)
+                process = spawn_tool(route, config, task_file)
+            writer = _send_task(process, route.task)
+
+            # Stream output line by line
+            for line in iter(process.stdout.readline, ''):
+                if not line:
+                    break
+                buffer += line
+                on_output(line)
+
+            # Wait for completion
+            process.wait()
+            exit_code = process.returncode
+            if writer is not None:
+                writer.join()
+
+    except KeyboardInterrupt:
+        # A pre-spawned process is in its own group and missed the Ctrl-C
+        if process is not None and process.poll() is None:
+            kill_process_tree(process)
+        raise
     except FileNotFoundError:
         error_msg = f"Command not found: {command}\n"
         buffer = error_msg
@@ -158,37 +339,39 @@ def execute_tool_streaming(
         buffer = error_msg
         on_output(error_msg)
         exit_code = 1
+    finally:
+        if task_file is not None:
+            task_file.unlink(missing_ok=True)
 
-    duration = time.time() - start_time
+    return _finish_execution(route, output_file, buffer, exit_code, start_time)
 
-    # Save output to file
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(buffer)
-    except Exception:
-        pass
 
-    return ExecutionResult(
-        tool=route.tool,
-        task=route.task,
-        output=buffer,
-        exit_code=exit_code,
-        duration=duration,
-        output_file=output_file
-    )
-
-
-def execute_tool_sync(route: Route, workspace: Path) -> ExecutionResult:
+def execute_tool_sync(route: Route, workspace: Path,
+                      config: Optional[Config] = None) -> ExecutionResult:
     """Execute a tool synchronously (non-streaming)."""
-    config = get_config()
+    if config is None:
+        config = get_config()
     command = config.get_tool_command(route.tool)
+    tool_config = config.tools.get(route.tool)
+    stdin_mode = tool_config is not None and tool_config.input_mode == "stdin"
 
     output_file = workspace / f"{route.tool}_output.txt"
     start_time = time.time()
+    task_file = None
 
     try:
+        if tool_config is not None and tool_config.adapter:
+            from .adapters import run_adapter
+            output, exit_code = run_adapter(route.tool, tool_config, route.task, lambda _: None)
+            return _finish_execution(route, output_file, output, exit_code, start_time)
+
+        if tool_config is not None and tool_config.input_mode == "tempfile":
+            task_file = write_task_file(route.task)
+        # communicate() feeds stdin and drains output together, so large
+        # stdin-mode tasks cannot deadlock here
         result = subprocess.run(
-            build_tool_command(route),
+            build_tool_command(route, config, task_file),
+            input=route.task if stdin_mode else None,
             capture_output=True,
             text=True,
             timeout=300,  # 5 minute timeout
@@ -207,8 +390,52 @@ def execute_tool_sync(route: Route, workspace: Path) -> ExecutionResult:
     except Exception as e:
         output = f"Error: {str(e)}"
         exit_code = 1
+    finally:
+        if task_file is not None:
+            task_file.unlink(missing_ok=True)
+
+    return _finish_execution(route, output_file, output, exit_code, start_time)
+
+
+async def execute_tool_async(
+    route: Route,
+    workspace: Path,
+    on_output: Callable[[str], None],
+    output_name: Optional[str] = None,
+    config: Optional[Config] = None
+) -> ExecutionResult:
+    """Async variant of execute_tool_streaming.
+
+    In-process adapters run on the caller's event loop through their async
+    variant; command tools run in a worker thread.
+    """
+    if config is None:
+        config = get_config()
+    tool_config = config.tools.get(route.tool)
+    if tool_config is None or not tool_config.adapter:
+        import asyncio
+        return await asyncio.to_thread(
+            execute_tool_streaming, route, workspace, on_output, output_name, config
+        )
+
+    from .adapters import arun_adapter
 
+    output_file = workspace / (output_name or f"{route.tool}_output.txt")
+    start_time = time.time()
+    try:
+        buffer, exit_code = await arun_adapter(route.tool, tool_config, route.task, on_output)
+    except Exception as e:
+        buffer = f"Error executing {tool_config.adapter}: {str(e)}\n"
+        on_output(buffer)
+        exit_code = 1
+    return _finish_execution(route, output_file, buffer, exit_code, start_time)
+
+
+def _finish_execution(route: Route, output_file: Path, output: str, exit_code: int,
+                      start_time: float) -> ExecutionResult:
+    """Record a run's outcome, save its output and build the result."""
     duration = time.time() - start_time
+    get_health_registry().record_outcome(route.tool, exit_code)
 
     # Save output to file
     try:
@@ -225,3 +452,200 @@ def execute_tool_sync(route: Route, workspace: Path) -> ExecutionResult:
         duration=duration,
         output_file=output_file
     )
+
+
+# Separator consolidate_routes puts between sentences
+_TASK_SEPARATOR = re.compile(r"(?<=\.) ")
+
+
+def chunk_task(task: str, max_chars: int) -> List[str]:
+    """Split a task into pieces of at most max_chars.
+
+    Splits on sentence boundaries first and packs sentences greedily; a
+    single sentence longer than max_chars is split on whitespace.
+    """
+    if len(task) <= max_chars:
+        return [task]
+
+    pieces = []
+    for sentence in _TASK_SEPARATOR.split(task):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _write_chunk_manifest(workspace: Path, tool: str, results: List[ExecutionResult]) -> None:
+    """Record per-chunk results in the workspace."""
+    manifest = [
+        {
+            "index": i,
+            "task_chars": len(r.task),
+            "exit_code": r.exit_code,
+            "duration": round(r.duration, 3),
+            "output_file": r.output_file.name if r.output_file else None,
+        }
+        for i, r in enumerate(results)
+    ]
+    try:
+        (workspace / f"{tool}_chunks.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    except Exception:
+        pass
+
+
+def _label_parts(outputs: List[str]) -> List[str]:
+    """Chunk outputs under "## Part i/n" headings."""
+    return [f"## Part {i + 1}/{len(outputs)}\n\n{output.strip()}"
+            for i, output in enumerate(outputs)]
+
+
+def _reduce_outputs(route: Route, workspace: Path, outputs: List[str],
+                    config: Config) -> Tuple[Optional[str], Optional[Path], int]:
+    """Merge chunk outputs with execution.reduce_prompt, in rounds that fit max_task_chars.
+
+    The labelled outputs are packed into as few groups as fit a reduce task
+    of max_task_chars (an output too long on its own is split like a task),
+    the groups are reduced in parallel, and the results are merged the same
+    way until one is left. If a round does not leave fewer outputs (the
+    tool's answers are no shorter than its input), reducing stops.
+
+    Returns:
+        (merged output, its file, exit code of the first failed run or 0);
+        the output is None if reducing stopped
+    """
+    settings = config.execution
+    prompt = settings.reduce_prompt
+    budget = max(settings.max_task_chars - len(prompt) - 2, settings.max_task_chars // 2)
+    exit_code = 0
+    round_number = 0
+    while True:
+        pieces = [piece for part in _label_parts(outputs) for piece in chunk_task(part, budget)]
+        groups = []
+        for piece in pieces:
+            if groups and len(groups[-1]) + 2 + len(piece) <= budget:
+                groups[-1] += "\n\n" + piece
+            else:
+                groups.append(piece)
+        if len(groups) > 1 and len(groups) >= len(outputs):
+            return None, None, exit_code
+
+        def run_group(i: int) -> ExecutionResult:
+            final = len(groups) == 1
+            return execute_tool_streaming(
+                replace(route, task=f"{prompt}\n\n{groups[i]}"), workspace, lambda _chunk: None,
+                output_name=None if final else
+                f"{route.tool}_reduce_{round_number}_{i:03d}_output.txt",
+                config=config
+            )
+
+        with ThreadPoolExecutor(max_workers=min(settings.max_parallel, len(groups))) as pool:
+            results = list(pool.map(run_group, range(len(groups))))
+        failed = [r.exit_code for r in results if r.exit_code != 0]
+        exit_code = exit_code or (failed[0] if failed else 0)
+        if len(results) == 1:
+            return results[0].output, results[0].output_file, exit_code
+        outputs = [r.output for r in results]
+        round_number += 1
+
+
+def execute_route(
+    route: Route,
+    workspace: Path,
+    on_output: Callable[[str], None],
+    config: Optional[Config] = None,
+    process: Optional[subprocess.Popen] = None
+) -> ExecutionResult:
+    """Execute a (consolidated) route, map-reducing oversized tasks.
+
+    Tasks up to execution.max_task_chars run as a single call. Longer tasks
+    are split into chunks that run in parallel; chunk outputs are passed to
+    on_output in order and then merged, either by running the tool again with
+    execution.reduce_prompt (see _reduce_outputs) or by concatenating them.
+
+    Args:
+        route: The route to execute
+        workspace: Directory to save output files
+        on_output: Callback function called for each output chunk
+        config: Config snapshot (defaults to the global config)
+        process: Pre-spawned (stdin-mode) process for the route's tool; it
+            runs the task, or the first chunk of a chunked task
+
+    Returns:
+        ExecutionResult; for chunked runs, per-chunk results are in .chunks
+    """
+    if config is None:
+        config = get_config()
+    settings = config.execution
+
+    chunks = chunk_task(route.task, settings.max_task_chars)
+    if len(chunks) == 1:
+        return execute_tool_streaming(route, workspace, on_output, config=config,
+                                      process=process)
+
+    start_time = time.time()
+    outputs: List[List[str]] = [[] for _ in chunks]
+    done = [False] * len(chunks)
+    next_to_emit = [0]
+    lock = threading.Lock()
+
+    def run_chunk(i: int) -> ExecutionResult:
+        result = execute_tool_streaming(
+            replace(route, task=chunks[i]), workspace, outputs[i].append,
+            output_name=f"{route.tool}_chunk_{i:03d}_output.txt", config=config,
+            process=process if i == 0 else None
+        )
+        # Release finished chunks to the caller in order
+        with lock:
+            done[i] = True
+            while next_to_emit[0] < len(chunks) and done[next_to_emit[0]]:
+                for line in outputs[next_to_emit[0]]:
+                    on_output(line)
+                next_to_emit[0] += 1
+        return result
+
+    with ThreadPoolExecutor(max_workers=min(settings.max_parallel, len(chunks))) as pool:
+        results = list(pool.map(run_chunk, range(len(chunks))))
+
+    _write_chunk_manifest(workspace, route.tool, results)
+
+    failed = [r.exit_code for r in results if r.exit_code != 0]
+    exit_code = failed[0] if failed else 0
+
+    output = None
+    if settings.reduce_prompt:
+        output, output_file, reduce_exit_code = _reduce_outputs(
+            route, workspace, [r.output for r in results], config)
+        exit_code = exit_code or reduce_exit_code
+    if output is None:
+        output = "\n\n".join(_label_parts([r.output for r in results]))
+        output_file = workspace / f"{route.tool}_output.txt"
+        try:
+            output_file.write_text(output, encoding="utf-8")
+        except Exception:
+            pass
+
+    return ExecutionResult(
+        tool=route.tool,
+        task=route.task,
+        output=output,
+        exit_code=exit_code,
+        duration=time.time() - start_time,
+        output_file=output_file,
+        chunks=results
+    )
@@ -0,0 +1,309 @@
+"""Tool health registry for Terminal AI Workflow CLI.
+
+A single snapshot of every configured tool's health: install state, auth,
+probe latency and recent execution outcomes. A background thread refreshes it
+on an interval (and whenever the config is swapped), so `/status` and routing
+read precomputed state instead of probing tools inline.
+
+Changes are published to subscribers as lists of HealthEvent; the router uses
+them to drop cached decisions when a tool's availability flips.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .config import Config, get_config, add_config_listener, remove_config_listener
+
+# Seconds between background refreshes
+HEALTH_INTERVAL = 30.0
+# Execution outcomes remembered per tool
+OUTCOME_HISTORY = 20
+
+
+@dataclass(frozen=True)
+class ToolHealth:
+    """Health of one configured tool at a point in time."""
+    tool_id: str
+    name: str
+    command: str
+    installed: bool
+    auth: Optional[bool]  # effective auth status (None = unknown)
+    available: bool  # what routing uses
+    version: Optional[str] = None
+    error: Optional[str] = None
+    probe_ms: float = 0.0
+    checked_at: float = 0.0
+    recent_exit_codes: Tuple[int, ...] = ()
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        """Share of recent runs that exited 0, or None if there were none."""
+        if not self.recent_exit_codes:
+            return None
+        return sum(1 for code in self.recent_exit_codes if code == 0) / len(self.recent_exit_codes)
+
+    @property
+    def status_text(self) -> str:
+        """Rich-markup status for the /status table."""
+        if not self.installed:
+            return "[red]Not installed[/red]"
+        if self.auth is False:
+            return "[red]Auth missing[/red]"
+        if self.auth is True:
+            return "[green]Available[/green]"
+        return "[yellow]Installed (auth unknown)[/yellow]"
+
+
+@dataclass(frozen=True)
+class HealthEvent:
+    """A change to one tool's health."""
+    tool_id: str
+    previous: Optional[ToolHealth]
+    current: Optional[ToolHealth]
+
+    @property
+    def availability_changed(self) -> bool:
+        before = self.previous.available if self.previous else None
+        after = self.current.available if self.current else None
+        return before != after
+
+
+def probe_tool(tool_id: str, config: Config) -> ToolHealth:
+    """Probe a tool's install and auth state.
+
+    Availability follows Config.is_tool_available: an explicit auth_status
+    wins, otherwise the tool must be installed and not detected as
+    unauthenticated.
+    """
+    from .tools import check_tool_installed
+
+    tool_config = config.tools[tool_id]
+    start = time.perf_counter()
+    if tool_config.adapter:
+        from .adapters import check_adapter
+        installed, version_or_error = check_adapter(tool_id, tool_config)
+    else:
+        installed, version_or_error = check_tool_installed(tool_config.command)
+    probe_ms = (time.perf_counter() - start) * 1000
+
+    auth = config.get_effective_auth_status(tool_id)
+    configured = config.get_auth_status(tool_id)
+    if configured is True or configured is False:
+        available = configured
+    else:
+        available = installed and auth is not False
+
+    return ToolHealth(
+        tool_id=tool_id,
+        name=tool_config.name,
+        command=tool_config.adapter or tool_config.command,
+        installed=installed,
+        auth=auth,
+        available=available,
+        version=version_or_error if installed else None,
+        error=version_or_error if not installed else None,
+        probe_ms=probe_ms,
+        checked_at=time.time(),
+    )
+
+
+class HealthRegistry:
+    """Holds the latest ToolHealth snapshot and keeps it fresh.
+
+    Args:
+        interval: Seconds between background refreshes
+    """
+
+    def __init__(self, interval: float = HEALTH_INTERVAL):
+        self.interval = interval
+        self._config: Optional[Config] = None
+        self._health: Dict[str, ToolHealth] = {}
+        self._outcomes: Dict[str, Deque[int]] = {}
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[List[HealthEvent]], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._ready = threading.Event()  # set after the first refresh
+
+    # Snapshot access
+
+    def snapshot(self, config: Optional[Config] = None) -> Dict[str, ToolHealth]:
+        """Current health by tool id, in config order.
+
+        Probes synchronously only if there is no snapshot for this config yet.
+        """
+        if config is None:
+            config = get_config()
+        with self._lock:
+            if self._config is config:
+                return dict(self._health)
+        return self.refresh(config)
+
+    def peek(self, config: Config) -> Optional[Dict[str, ToolHealth]]:
+        """Snapshot for this config if one exists, without probing."""
+        with self._lock:
+            if self._config is config:
+                return self._health
+        return None
+
+    def availability(self, config: Config) -> Optional[Tuple[bool, ...]]:
+        """Availability of each configured tool, or None if not yet probed."""
+        health = self.peek(config)
+        if health is None:
+            return None
+        return tuple(health[tool].available for tool in config.tools)
+
+    # Updates
+
+    def refresh(self, config: Optional[Config] = None) -> Dict[str, ToolHealth]:
+        """Probe every tool concurrently and publish what changed."""
+        if config is None:
+            config = get_config()
+        tool_ids = list(config.tools)
+        if len(tool_ids) > 1:
+            with ThreadPoolExecutor(max_workers=len(tool_ids)) as pool:
+                probed = list(pool.map(lambda tool_id: probe_tool(tool_id, config), tool_ids))
+        else:
+            probed = [probe_tool(tool_id, config) for tool_id in tool_ids]
+
+        with self._lock:
+            previous = self._health
+            health = {}
+            for status in probed:
+                outcomes = self._outcomes.get(status.tool_id)
+                if outcomes:
+                    status = replace(status, recent_exit_codes=tuple(outcomes))
+                health[status.tool_id] = status
+            self._config = config
+            self._health = health
+        self._ready.set()
+
+        events = [
+            HealthEvent(tool_id, previous.get(tool_id), health.get(tool_id))
+            for tool_id in list(previous) + [t for t in health if t not in previous]
+            if _state(previous.get(tool_id)) != _state(health.get(tool_id))
+        ]
+        self._publish(events)
+        return dict(health)
+
+    def record_outcome(self, tool_id: str, exit_code: int) -> None:
+        """Record the exit code of a finished run of a tool."""
+        with self._lock:
+            outcomes = self._outcomes.setdefault(tool_id, deque(maxlen=OUTCOME_HISTORY))
+            outcomes.append(exit_code)
+            previous = self._health.get(tool_id)
+            if previous is None:
+                return
+            current = replace(previous, recent_exit_codes=tuple(outcomes))
+            self._health = dict(self._health, **{tool_id: current})
+        self._publish([HealthEvent(tool_id, previous, current)])
+
+    # Events
+
+    def subscribe(self, callback: Callable[[List[HealthEvent]], None]) -> None:
+        """Call callback with the events of every change."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[HealthEvent]], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _publish(self, events: List[HealthEvent]) -> None:
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(events)
+            except Exception:
+                pass  # A broken subscriber must not stop the monitor
+
+    # Background refresh
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, refresh_now: bool = True) -> "HealthRegistry":
+        """Refresh in a daemon thread every interval and on config swaps.
+
+        Args:
+            refresh_now: Probe right away if there is no snapshot yet (False
+                when the caller probes for the first snapshot itself)
+        """
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        if refresh_now and not self._ready.is_set():
+            self._wake.set()  # First refresh right away
+        add_config_listener(self._on_config_swap)
+        self._thread = threading.Thread(target=self._run, name="tool-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        remove_config_listener(self._on_config_swap)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _on_config_swap(self, _config: Config) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception:
+                pass  # Keep the last snapshot; try again next interval
+
+
+def _state(health: Optional[ToolHealth]) -> Optional[tuple]:
+    """The parts of a ToolHealth whose change is worth an event."""
+    if health is None:
+        return None
+    return health.installed, health.auth, health.available, health.version, health.name
+
+
+# Global registry instance
+_registry: Optional[HealthRegistry] = None
+
+
+def get_health_registry() -> HealthRegistry:
+    """Get the global health registry."""
+    global _registry
+    if _registry is None:
+        _registry = HealthRegistry()
+    return _registry
+
+
+def peek_availability(config: Config) -> Optional[Tuple[bool, ...]]:
+    """Availability from the running monitor's snapshot, or None if it isn't running."""
+    registry = _registry
+    if registry is None or not registry.running:
+        return None
+    return registry.availability(config)
+
+
+def _reset_health_registry() -> None:
+    """Stop and drop the global registry (for testing)."""
+    global _registry
+    if _registry is not None:
+        _registry.stop()
+    _registry = None
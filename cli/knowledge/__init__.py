@@ -3,7 +3,10 @@
 Provides document indexing, CLI command reference parsing, and workflow strategy access.
 """
 
-from .index import DocumentIndex, search_documents, get_document, refresh_index
+from .index import (
+    DocumentIndex, RefreshStats, search_documents, get_document, load_result, refresh_index,
+    refresh_index_stats, export_index
+)
 from .commands import get_commands, search_commands, get_all_tools_overview
 from .workflow import get_role_info, get_workflow_overview, get_handoff_advice, get_all_roles
 
@@ -12,7 +15,11 @@ __all__ = [
     "DocumentIndex",
     "search_documents",
     "get_document",
+    "load_result",
     "refresh_index",
+    "refresh_index_stats",
+    "export_index",
+    "RefreshStats",
     # CLI commands
     "get_commands",
     "search_commands",
@@ -0,0 +1,471 @@
+"""SQLite FTS5 engine for the Document Library.
+
+Selected with "engine": "sqlite" in the knowledge section of
+role_config.json. Documents live in config/knowledge_index.db: metadata and
+fingerprints in a plain table, titles and bodies in an FTS5 virtual table
+that SQLite ranks with bm25(). Passages (sections) have their own FTS5
+table, which picks the best section of each result and cuts its snippet with
+snippet(). Only document metadata is held in memory.
+
+Library scanning, fingerprints and the stale-result checks are shared with
+the pure-Python DocumentIndex; each refresh is applied in one transaction,
+so an interrupted refresh leaves the previous index intact.
+"""
+
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .index import DocumentIndex, Fragment, IndexEntry, Passage, SearchResult, _indexable
+from .query import And, Node, Not, Or, Phrase, Query, Term
+
+INDEX_DB_PATH = Path("config/knowledge_index.db")
+# Bump when the schema changes; older databases are rebuilt
+SCHEMA_VERSION = 2
+# Approximate tokens per snippet (the Python engine cuts ~150 characters)
+SNIPPET_TOKENS = 24
+# Vocabulary terms a substring query is expanded to, best completions first
+MAX_SUBSTRING_TERMS = 64
+# Match markers for snippet(), parsed into Fragment.matches
+_MARK_START, _MARK_END = "\x02", "\x03"
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, content);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_doc ON passages (doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(section, content);
+"""
+
+
+def fts5_available() -> bool:
+    """Whether this Python's SQLite was built with FTS5."""
+    try:
+        db = sqlite3.connect(":memory:")
+        try:
+            db.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        finally:
+            db.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class SQLiteDocumentIndex(DocumentIndex):
+    """DocumentIndex stored in SQLite and searched with FTS5.
+
+    Ranking is FTS5's bm25() (k1 = 1.2, b = 0.75, built into SQLite) with
+    title matches weighted by title_weight; the scorer, k1 and b settings
+    apply to the Python engine only.
+
+    Args:
+        title_weight: bm25() weight of the title column relative to the body
+        snippet_markers: Text placed before and after each match in snippets
+        semantic: Fuse the bm25() ranking with passage vector similarity
+        workers: Processes that parse files on refresh (0 = one per CPU)
+    """
+
+    def __init__(self, scorer: str = "bm25", k1: float = 1.2, b: float = 0.75,
+                 title_weight: float = 2.0, snippet_markers: Tuple[str, str] = ("", ""),
+                 semantic: bool = False, workers: int = 0):
+        super().__init__(scorer=scorer, k1=k1, b=b, title_weight=title_weight,
+                         semantic=semantic, workers=workers)
+        self.snippet_markers = snippet_markers
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, (re)creating the schema if needed."""
+        if self._db is None:
+            INDEX_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            # Prewarm opens the index on a background thread
+            db = sqlite3.connect(str(INDEX_DB_PATH), check_same_thread=False)
+            db.executescript(_SCHEMA)
+            row = db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or int(row[0]) != SCHEMA_VERSION:
+                db.executescript("""
+                    DROP TABLE IF EXISTS documents;
+                    DROP TABLE IF EXISTS documents_fts;
+                    DROP TABLE IF EXISTS passages;
+                    DROP TABLE IF EXISTS passages_fts;
+                    DELETE FROM meta;
+                """ + _SCHEMA)
+                with db:
+                    db.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+            self._db = db
+        return self._db
+
+    def close(self):
+        """Close the database connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def build_index(self, force: bool = False,
+                    progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Build or rebuild the document index from scratch.
+
+        Returns the number of documents indexed.
+        """
+        with self._lock:
+            db = self._connect()
+            with db:
+                for table in ("documents", "documents_fts", "passages", "passages_fts"):
+                    db.execute(f"DELETE FROM {table}")
+            return super().build_index(force, progress)
+
+    def refresh(self, progress: Optional[Callable[[int, int], None]] = None):
+        """Bring the index up to date with the library in one transaction."""
+        with self._lock:
+            db = self._connect()
+            try:
+                with db:
+                    return super().refresh(progress)
+            except sqlite3.Error:
+                # Rolled back: go back to what the database holds
+                self._load_cache()
+                raise
+
+    def _add_entry(self, entry: IndexEntry):
+        """Insert a document; only its metadata stays in memory."""
+        db = self._connect()
+        cursor = db.execute(
+            "INSERT INTO documents (name, path, doc_type, title) VALUES (?, ?, ?, ?)",
+            (entry.name, entry.path, entry.doc_type, entry.title)
+        )
+        doc_id = cursor.lastrowid
+        content = (entry.content or "").encode("utf-8")
+        db.execute("INSERT INTO documents_fts (rowid, title, content) VALUES (?, ?, ?)",
+                   (doc_id, entry.title, entry.content or ""))
+        for passage in entry.passages or ():
+            cursor = db.execute(
+                "INSERT INTO passages (doc_id, section, start, end) VALUES (?, ?, ?, ?)",
+                (doc_id, passage.section, passage.start, passage.end)
+            )
+            db.execute("INSERT INTO passages_fts (rowid, section, content) VALUES (?, ?, ?)",
+                       (cursor.lastrowid, passage.section,
+                        content[passage.start:passage.end].decode("utf-8", errors="replace")))
+        self.entries[entry.name] = IndexEntry(
+            name=entry.name, path=entry.path, doc_type=entry.doc_type, title=entry.title,
+            content=None, passages=None
+        )
+        self._term_trigrams = self._name_trigrams = None
+
+    def _remove_entry(self, name: str):
+        """Delete a document."""
+        db = self._connect()
+        row = db.execute("SELECT id FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            db.execute("DELETE FROM passages_fts WHERE rowid IN "
+                       "(SELECT id FROM passages WHERE doc_id = ?)", row)
+            db.execute("DELETE FROM passages WHERE doc_id = ?", row)
+            db.execute("DELETE FROM documents_fts WHERE rowid = ?", row)
+            db.execute("DELETE FROM documents WHERE id = ?", row)
+        self.entries.pop(name, None)
+        self.fingerprints.pop(name, None)
+        self._term_trigrams = self._name_trigrams = None
+
+    def _save_cache(self):
+        """Store fingerprints and the scan time (inside the refresh transaction)."""
+        db = self._connect()
+        db.executemany(
+            "UPDATE documents SET mtime_ns = ?, size = ?, sha256 = ? WHERE name = ?",
+            [(mtime_ns, size, digest, name)
+             for name, (mtime_ns, size, digest) in self.fingerprints.items()]
+        )
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('scanned_at_ns', ?)",
+                   (str(self._scanned_at_ns),))
+
+    def _load_cache(self) -> bool:
+        """Load document metadata from the database.
+
+        Returns False if the database holds no index yet.
+        """
+        db = self._connect()
+        self.entries = {}
+        self.fingerprints = {}
+        for name, path, doc_type, title, mtime_ns, size, digest in db.execute(
+                "SELECT name, path, doc_type, title, mtime_ns, size, sha256 "
+                "FROM documents ORDER BY id"):
+            self.entries[name] = IndexEntry(name=name, path=path, doc_type=doc_type,
+                                            title=title, content=None, passages=None)
+            if digest is not None:
+                self.fingerprints[name] = (mtime_ns, size, digest)
+        row = db.execute("SELECT value FROM meta WHERE key = 'scanned_at_ns'").fetchone()
+        if row is None:
+            return False
+        self._scanned_at_ns = int(row[0])
+        self._loaded = True
+        return True
+
+    def _results(self, query_terms: Dict[str, int],
+                 ranked: List[Tuple[float, str]]) -> List[SearchResult]:
+        """Results for ranked (score, name) pairs, cut by snippet() from each best section."""
+        # Sections are picked by any of the terms, as an AND may span sections
+        any_term = _any_term(query_terms)
+        db = self._connect()
+        results = []
+        for score, name in ranked:
+            doc_id, path, title = db.execute(
+                "SELECT id, path, title FROM documents WHERE name = ?", (name,)).fetchone()
+            # Best section of the document. A document's passages have consecutive
+            # ids, and a rowid range lets FTS5 skip the other documents' passages.
+            first, last = db.execute("SELECT min(id), max(id) FROM passages WHERE doc_id = ?",
+                                     (doc_id,)).fetchone()
+            passage = db.execute(
+                "SELECT p.section, p.start, p.end, snippet(passages_fts, 1, ?, ?, '...', ?) "
+                "FROM passages_fts JOIN passages p ON p.id = passages_fts.rowid "
+                "WHERE passages_fts MATCH ? AND passages_fts.rowid BETWEEN ? AND ? "
+                "ORDER BY bm25(passages_fts) LIMIT 1",
+                (_MARK_START, _MARK_END, SNIPPET_TOKENS, any_term, first, last)
+            ).fetchone() if first is not None else None
+            if passage is not None:
+                section, start, end, snippet = passage
+            else:
+                # Title-only matches keep a snippet of the whole document
+                section, start, end = "", 0, None
+                snippet, = db.execute(
+                    "SELECT snippet(documents_fts, 1, ?, ?, '...', ?) FROM documents_fts "
+                    "WHERE documents_fts MATCH ? AND rowid = ?",
+                    (_MARK_START, _MARK_END, SNIPPET_TOKENS, any_term, doc_id)
+                ).fetchone() or ("",)
+            fragment = _marked_fragment(snippet)
+            results.append(SearchResult(name=name, path=path, title=title, score=score,
+                                        snippet=fragment.marked(*self.snippet_markers),
+                                        section=section, start=start, end=end,
+                                        fragments=[fragment] if fragment.matches else []))
+        return results
+
+    def _rank(self, parsed: Query, query_terms: Dict[str, int],
+              top_k: int) -> List[Tuple[float, str]]:
+        """(score, name) of the top_k matches by bm25(), without sections or snippets."""
+        match = _fts_expression(parsed.root) if parsed.structured else _any_term(query_terms)
+        if match is None:
+            return []
+        # bm25() is lower for better matches
+        return [(-rank, name) for name, rank in self._connect().execute(
+            "SELECT d.name, bm25(documents_fts, ?, 1.0) AS rank "
+            "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+            "WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?",
+            (self.title_weight, match, top_k)
+        )]
+
+    def _substring_search(self, query: str, top_k: int) -> List[SearchResult]:
+        """Fallback substring search for queries without indexable words.
+
+        Alphanumeric queries are expanded to the vocabulary terms containing
+        them (through the trigram index) and matched with FTS5; others are
+        searched for in the text of the documents.
+        """
+        query_lower = query.lower().strip()
+        if query_lower.isalnum():
+            terms = self._term_index().complete(query_lower, MAX_SUBSTRING_TERMS)
+            if not terms:
+                return []
+            rows = self._connect().execute(
+                "SELECT d.name, d.path, d.title, snippet(documents_fts, 1, ?, ?, '...', ?) "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY d.name LIMIT ?",
+                (_MARK_START, _MARK_END, SNIPPET_TOKENS, _any_term(terms), top_k)
+            )
+            results = []
+            for name, path, title, snippet in rows:
+                fragment = _marked_fragment(snippet)
+                results.append(SearchResult(
+                    name=name, path=path, title=title, score=1.0,
+                    snippet=fragment.marked(*self.snippet_markers),
+                    fragments=[fragment] if fragment.matches else []))
+            return results
+
+        rows = self._connect().execute(
+            "SELECT d.name, d.path, d.title, f.content "
+            "FROM documents_fts f JOIN documents d ON d.id = f.rowid "
+            "WHERE instr(lower(f.content), ?) > 0 ORDER BY d.id LIMIT ?",
+            (query_lower, top_k)
+        )
+        return [
+            SearchResult(name=name, path=path, title=title, score=1.0,
+                         snippet=self._extract_snippet(content, [query]))
+            for name, path, title, content in rows
+        ]
+
+    def _vocab_table(self) -> str:
+        """An fts5vocab view of the terms FTS5 has indexed (per term: documents, occurrences)."""
+        self._connect().execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.documents_vocab_row "
+                                "USING fts5vocab(main, documents_fts, row)")
+        return "temp.documents_vocab_row"
+
+    def _vocabulary(self):
+        return [term for term, in self._connect().execute(
+            f"SELECT term FROM {self._vocab_table()}")]
+
+    def _known_term(self, term: str) -> bool:
+        return self._doc_freq(term) > 0
+
+    def _doc_freq(self, term: str) -> int:
+        row = self._connect().execute(
+            f"SELECT doc FROM {self._vocab_table()} WHERE term = ?", (term,)).fetchone()
+        return row[0] if row else 0
+
+    def _content(self, entry: IndexEntry) -> str:
+        """A document's text, read from the database."""
+        row = self._connect().execute(
+            "SELECT f.content FROM documents_fts f JOIN documents d ON d.id = f.rowid "
+            "WHERE d.name = ?", (entry.name,)
+        ).fetchone()
+        return row[0] if row else ""
+
+    def _read_range(self, entry: IndexEntry, start: int, end: Optional[int]) -> str:
+        """A byte range of a document's text; SQLite copies out only that range."""
+        length = -1 if end is None else max(end - start, 0)
+        row = self._connect().execute(
+            "SELECT substr(CAST(f.content AS BLOB), ?, CASE WHEN ? < 0 "
+            "THEN length(CAST(f.content AS BLOB)) ELSE ? END) "
+            "FROM documents_fts f JOIN documents d ON d.id = f.rowid WHERE d.name = ?",
+            (start + 1, length, length, entry.name)
+        ).fetchone()
+        return row[0].decode("utf-8", errors="replace") if row else ""
+
+    def _passages(self, entry: IndexEntry) -> List[Passage]:
+        """A document's passages (without term statistics, which FTS5 keeps)."""
+        return [
+            Passage(section=section, start=start, end=end)
+            for section, start, end in self._connect().execute(
+                "SELECT p.section, p.start, p.end FROM passages p "
+                "JOIN documents d ON d.id = p.doc_id WHERE d.name = ? ORDER BY p.id",
+                (entry.name,))
+        ]
+
+    def highlight(self, name: str, query: str,
+                  markers: Tuple[str, str] = ("**", "**")) -> Optional[str]:
+        """Full text of a document with the query's matches marked.
+
+        Returns None if the document is unknown or does not match the query.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._find_entry(name)
+            query_terms = self._tokenize(query)
+            if entry is None or not query_terms:
+                return None
+            row = self._connect().execute(
+                "SELECT highlight(documents_fts, 1, ?, ?) "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? AND d.name = ?",
+                (markers[0], markers[1], _any_term(query_terms), entry.name)
+            ).fetchone()
+            return row[0] if row else None
+
+    def export_json(self, path: Path) -> int:
+        """Write the index as JSON, for inspection or other tools.
+
+        Postings are the body terms as FTS5 tokenized them.
+
+        Returns the number of documents exported.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            db = self._connect()
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.documents_vocab "
+                       "USING fts5vocab(main, documents_fts, instance)")
+            postings = {}
+            for term, doc_id, freq in db.execute(
+                    "SELECT term, doc, count(*) FROM temp.documents_vocab "
+                    "WHERE col = 'content' GROUP BY term, doc"):
+                postings.setdefault(term, {})[doc_id] = freq
+            names = dict(db.execute("SELECT id, name FROM documents"))
+            data = {
+                "engine": "sqlite",
+                "entries": {
+                    name: {
+                        "name": e.name,
+                        "path": e.path,
+                        "doc_type": e.doc_type,
+                        "title": e.title,
+                        "content": self._content(e),
+                        "passages": [
+                            {"section": p.section, "start": p.start, "end": p.end}
+                            for p in self._passages(e)
+                        ]
+                    }
+                    for name, e in self.entries.items()
+                },
+                "postings": {
+                    term: {names[doc_id]: freq for doc_id, freq in docs.items()}
+                    for term, docs in postings.items()
+                },
+                "fingerprints": self.fingerprints,
+                "scanned_at_ns": self._scanned_at_ns
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            return len(self.entries)
+
+
+def _any_term(terms) -> str:
+    """FTS5 expression matching any of the terms.
+
+    Tokens are [a-z0-9] only, so quoting makes each a plain FTS5 term.
+    """
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def _fts_expression(node: Optional[Node]) -> Optional[str]:
+    """Translate a parsed query into an FTS5 MATCH expression.
+
+    FTS5 has no standalone NOT, so negations only take effect inside an AND
+    ("a NOT b"); elsewhere they are dropped, like stopword terms. Returns
+    None if nothing is left to match.
+    """
+    if isinstance(node, Term):
+        return f'"{node.word}"' if _indexable(node.word) else None
+    if isinstance(node, Phrase):
+        return '"' + " ".join(node.words) + '"'
+    if isinstance(node, And):
+        positives = [_fts_expression(op) for op in node.operands if not isinstance(op, Not)]
+        positives = [expression for expression in positives if expression is not None]
+        if not positives:
+            return None
+        expression = "(" + " AND ".join(positives) + ")"
+        for op in node.operands:
+            if isinstance(op, Not):
+                negated = _fts_expression(op.operand)
+                if negated is not None:
+                    expression = f"({expression} NOT {negated})"
+        return expression
+    if isinstance(node, Or):
+        parts = [_fts_expression(op) for op in node.operands]
+        parts = [part for part in parts if part is not None]
+        return "(" + " OR ".join(parts) + ")" if parts else None
+    return None
+
+
+def _marked_fragment(snippet: str) -> Fragment:
+    """Parse snippet() output marked with _MARK_START/_MARK_END into a Fragment."""
+    text, matches = "", []
+    for i, part in enumerate(re.split(f"[{_MARK_START}{_MARK_END}]", snippet)):
+        part = _WHITESPACE_RE.sub(" ", part)
+        if not text:
+            part = part.lstrip()
+        if i % 2:
+            matches.append((len(text), len(text) + len(part)))
+        text += part
+    return Fragment(text=text.rstrip(), matches=matches)
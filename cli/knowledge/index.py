@@ -1,16 +1,85 @@
 """Document indexing and search functionality for Document Library."""
 
+import bisect
+import hashlib
+import heapq
 import json
+import multiprocessing
+import os
 import re
-from collections import Counter
-from dataclasses import dataclass, field
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Sequence, Set, Tuple
 import math
 
+from .query import (
+    WORD_RE, And, Node, Not, Or, Phrase, Query, Term, parse_query, positive_words, query_words,
+    replace_words
+)
+from .semantic import VectorIndex, VectorRow, fuse, numpy_available, term_weights
+from .storage import (
+    Delta, DeltaPostings, MappedIndex, Passage, StoredDocument, open_delta, open_index,
+    remove_delta, write_delta, write_index
+)
+from .trigrams import TrigramIndex
+
 # Document Library path (relative to project root)
 DOCUMENT_LIBRARY_PATH = Path("docs/library")
-INDEX_CACHE_PATH = Path("config/knowledge_index.json")
+INDEX_CACHE_PATH = Path("config/knowledge_index.bin")
+# Default destination of /docs export
+INDEX_EXPORT_PATH = Path("config/knowledge_index.json")
+# Version of the JSON export layout
+INDEX_CACHE_VERSION = 3
+# Files modified this close to (or after) the previous scan are verified by
+# content hash, since coarse mtimes can hide a same-size rewrite.
+_RACY_WINDOW_NS = 2_000_000_000
+# Seconds between library scans on search; edits inside a returned document
+# are caught immediately regardless
+_RESCAN_INTERVAL = 2.0
+# Ranking functions for DocumentIndex(scorer=...)
+SCORERS = ("bm25", "tfidf")
+# Joins the headings of a passage's section path
+SECTION_SEPARATOR = " > "
+# Snippet fragments: window size in bytes, context before the first match, count
+SNIPPET_BYTES = 150
+SNIPPET_CONTEXT = 30
+MAX_FRAGMENTS = 3
+# Files to read below which a refresh parses them in-process (starting
+# worker processes would cost more than it saves)
+PARALLEL_MIN_FILES = 50
+# Documents added, changed or removed since the index file was written, as a
+# fraction of the library, above which the file is rewritten instead of
+# saving a delta segment
+DELTA_MAX_FRACTION = 0.1
+# Documents taken from each ranking before semantic fusion
+FUSION_DEPTH = 20
+# Edits allowed when correcting an unknown query word: one for words up to
+# SHORT_WORD_LENGTH letters, two for longer ones
+SHORT_WORD_LENGTH = 5
+
+# Words too common to index (and words under 3 letters, see _indexable)
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'shall',
+    'can', 'and', 'or', 'but', 'if', 'then', 'else', 'when',
+    'at', 'by', 'for', 'with', 'about', 'against', 'between',
+    'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on',
+    'off', 'over', 'under', 'again', 'further', 'then', 'once',
+    'here', 'there', 'all', 'each', 'few', 'more', 'most',
+    'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 'just', 'this', 'that'})
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
 
 
 @dataclass
@@ -20,8 +89,47 @@ class IndexEntry:
     path: str
     doc_type: str  # 'markdown' or 'docx'
     title: str
-    content: str
+    content: Optional[str]  # None until read from the index's bodies file
     terms: Dict[str, int] = field(default_factory=dict)  # term -> frequency
+    passages: Optional[List[Passage]] = field(default_factory=list)  # None until read
+    # term -> flat (word position, byte offset) pairs; None until read
+    positions: Optional[Dict[str, array]] = field(default_factory=dict)
+
+
+@dataclass
+class RefreshStats:
+    """What an index refresh changed."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    total: int = 0  # documents in the index afterwards
+    duration: float = 0.0  # seconds
+
+    @property
+    def modified(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass
+class Fragment:
+    """A piece of a document around query matches.
+
+    Attributes:
+        text: The fragment, whitespace squashed, with "..." where it was cut
+        matches: (start, end) character ranges of the matched words in text
+    """
+    text: str
+    matches: List[Tuple[int, int]] = field(default_factory=list)
+
+    def marked(self, before: str = "**", after: str = "**") -> str:
+        """The text with every match wrapped in markers."""
+        parts, cursor = [], 0
+        for start, end in self.matches:
+            parts += [self.text[cursor:start], before, self.text[start:end], after]
+            cursor = end
+        parts.append(self.text[cursor:])
+        return "".join(parts)
 
 
 @dataclass
@@ -32,53 +140,347 @@ class SearchResult:
     title: str
     score: float
     snippet: str
+    section: str = ""  # section path of the best passage ("" = whole document)
+    start: int = 0  # byte range of the best passage in the document
+    end: Optional[int] = None
+    fragments: List[Fragment] = field(default_factory=list)  # best matching pieces
 
 
 class DocumentIndex:
-    """Index for searching Document Library contents."""
-
-    def __init__(self):
+    """Index for searching Document Library contents.
+
+    Args:
+        scorer: Ranking function, 'bm25' (BM25F over title and body) or 'tfidf'
+        k1: BM25 term frequency saturation
+        b: BM25 document length normalization (0 = none, 1 = full)
+        title_weight: BM25F weight of title matches relative to the body
+        semantic: Fuse the keyword ranking with passage vector similarity
+            (see semantic.py; needs NumPy)
+        workers: Processes that parse files on refresh (0 = one per CPU,
+            1 = parse in this process)
+    """
+
+    def __init__(self, scorer: str = "bm25", k1: float = 1.2, b: float = 0.75,
+                 title_weight: float = 2.0, semantic: bool = False, workers: int = 0):
+        if scorer not in SCORERS:
+            raise ValueError(f"Unknown scorer '{scorer}' (expected one of: {', '.join(SCORERS)})")
+        self.scorer = scorer
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.workers = workers
         self.entries: Dict[str, IndexEntry] = {}
         self.idf: Dict[str, float] = {}  # Inverse document frequency
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {document name: frequency}
+        self.title_postings: Dict[str, Dict[str, int]] = {}  # same, for title terms
+        self.norms: Dict[str, Tuple[float, float]] = {}  # document -> BM25 (body, title) length norms
+        self.fingerprints: Dict[str, Tuple[int, int, str]] = {}  # document -> (mtime_ns, size, sha256)
+        self._lengths: Dict[str, Tuple[int, int]] = {}  # document -> (body, title) term counts
+        self._library_mtime: Optional[int] = None  # library directory mtime at the last scan
+        self._scanned_at_ns = 0
+        self._last_scan = 0.0  # time.monotonic() of the last refresh
         self._loaded = False
-
-    def build_index(self, force: bool = False) -> int:
-        """Build or rebuild the document index.
+        # Held by loads, refreshes and queries: the prewarm thread and the
+        # prompt's completer use the same index
+        self._lock = threading.RLock()
+        self._mapped: Optional[MappedIndex] = None  # index file the state is read from, if any
+        # The index file saves extend: its build id and documents, those of
+        # them removed or replaced since (tombstones), and those whose
+        # fingerprint changed without their content
+        self._base_id: Optional[bytes] = None
+        self._base_names: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._touched: Set[str] = set()
+        # Trigram indexes over the vocabulary and document names, built on first use
+        self._term_trigrams: Optional[TrigramIndex] = None
+        self._name_trigrams: Optional[TrigramIndex] = None
+        # Passage vectors, opened on the first refresh
+        self.vectors: Optional[VectorIndex] = VectorIndex() if semantic else None
+
+    def build_index(self, force: bool = False,
+                    progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Build or rebuild the document index from scratch.
 
         Returns the number of documents indexed.
         """
-        if not DOCUMENT_LIBRARY_PATH.exists():
-            return 0
-
-        self.entries = {}
-
-        # Index markdown files
-        for md_file in DOCUMENT_LIBRARY_PATH.glob("*.md"):
-            entry = self._index_markdown(md_file)
-            if entry:
-                self.entries[entry.name] = entry
-
-        # Index Word documents
-        for docx_file in DOCUMENT_LIBRARY_PATH.glob("*.docx"):
-            entry = self._index_docx(docx_file)
-            if entry:
-                self.entries[entry.name] = entry
-
-        # Calculate IDF scores
-        self._calculate_idf()
-
-        # Cache the index
-        self._save_cache()
-        self._loaded = True
-
-        return len(self.entries)
+        with self._lock:
+            if not DOCUMENT_LIBRARY_PATH.exists():
+                return 0
+
+            self._close_mapped()
+            self.entries = {}
+            self.idf = {}
+            self.postings = {}
+            self.title_postings = {}
+            self.norms = {}
+            self.fingerprints = {}
+            self._lengths = {}
+            self._scanned_at_ns = 0
+            self._base_id = None
+            self._base_names = set()
+            self._removed = set()
+            self._touched = set()
+            self._term_trigrams = self._name_trigrams = None
+            if self.vectors is not None:
+                self.vectors.clear()
+            return self.refresh(progress).total
+
+    def refresh(self, progress: Optional[Callable[[int, int], None]] = None) -> RefreshStats:
+        """Bring the index up to date with the library.
+
+        Files whose mtime and size match their fingerprint are skipped
+        without being read; the rest are hashed, and only added, changed or
+        removed files are (re-)indexed. Postings, IDF and length norms are
+        then updated in place, and the cache is saved if anything changed
+        (see _save_cache).
+
+        Args:
+            progress: Called with (files read, files to read) as files are
+                hashed and parsed
+        """
+        with self._lock:
+            start = time.perf_counter()
+            stats = RefreshStats()
+            files = self._scan_library()
+            fingerprints_changed = False
+
+            for name in [name for name in self.entries if name not in files]:
+                self._remove_entry(name)
+                stats.removed.append(name)
+
+            pending = []
+            for name, (path, st) in files.items():
+                known = self.fingerprints.get(name) if name in self.entries else None
+                if known is not None and known[:2] == (st.st_mtime_ns, st.st_size) \
+                        and st.st_mtime_ns < self._scanned_at_ns - _RACY_WINDOW_NS:
+                    stats.unchanged += 1
+                    continue
+                pending.append((name, path, st, known))
+
+            # Files are hashed and parsed in worker processes if there are enough of
+            # them; each result is merged as soon as it (and the ones before it) arrive
+            ingested = self._ingest([(path, known[2] if known else None)
+                                     for _, path, _, known in pending], progress)
+            for (name, path, st, known), (digest, entry) in zip(pending, ingested):
+                if known is not None and known[2] == digest:
+                    # Touched but not modified
+                    self.fingerprints[name] = (st.st_mtime_ns, st.st_size, digest)
+                    self._touched.add(name)
+                    fingerprints_changed = (fingerprints_changed
+                                            or known[:2] != (st.st_mtime_ns, st.st_size))
+                    stats.unchanged += 1
+                    continue
+
+                if name in self.entries:
+                    self._remove_entry(name)
+                    stats.changed.append(name)
+                else:
+                    stats.added.append(name)
+                if entry:
+                    self._add_entry(entry)
+                    self.fingerprints[name] = (st.st_mtime_ns, st.st_size, digest)
+
+            if stats.modified:
+                if self._mapped is None:
+                    self._update_idf()  # Mapped: computed per query term (see _term_idf)
+                self._calculate_norms(self._lengths)
+
+            self._scanned_at_ns = time.time_ns()
+            self._last_scan = time.monotonic()
+            self._library_mtime = _mtime_ns(DOCUMENT_LIBRARY_PATH)
+            self._loaded = True
+            if stats.modified or fingerprints_changed:
+                self._save_cache()
+            if self.vectors is not None:
+                self._update_vectors(stats)
+
+            stats.total = len(self.entries)
+            stats.duration = time.perf_counter() - start
+            return stats
+
+    def _ingest(self, files: List[Tuple[Path, Optional[str]]],
+                progress: Optional[Callable[[int, int], None]] = None
+                ) -> Iterator[Tuple[str, Optional[IndexEntry]]]:
+        """(sha256, entry) for each (path, known sha256), in order.
+
+        Files whose hash is already known are not parsed (entry None). With
+        PARALLEL_MIN_FILES or more files and more than one worker, files are
+        hashed and parsed in a process pool and results are yielded in file
+        order as they come back; if the pool cannot start or breaks, the rest
+        are parsed here.
+        """
+        done = 0
+        workers = min(self.workers or os.cpu_count() or 1, len(files))
+        if workers > 1 and len(files) >= PARALLEL_MIN_FILES:
+            executor = None
+            try:
+                # spawn: forking a process with threads running (the REPL's) is unsafe
+                executor = ProcessPoolExecutor(workers,
+                                               mp_context=multiprocessing.get_context("spawn"))
+                paths, digests = zip(*files)
+                # Chunks amortize the round trips without delaying the first results much
+                chunksize = max(1, len(files) // (workers * 8))
+                for result in executor.map(_ingest_file, paths, digests, chunksize=chunksize):
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(files))
+                    yield result
+            except (OSError, BrokenProcessPool):
+                pass  # The files not done yet are parsed below
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+        for path, known_digest in files[done:]:
+            digest = _hash_file(path)
+            entry = self._index_file(path) if digest != known_digest else None
+            done += 1
+            if progress is not None:
+                progress(done, len(files))
+            yield digest, entry
+
+    def _update_vectors(self, stats: RefreshStats):
+        """Bring the passage vectors in step with the entries.
+
+        Only added and changed documents are vectorized; documents indexed
+        before semantic ranking was enabled are filled in once.
+        """
+        vectors = self.vectors
+        if not vectors.loaded:
+            vectors.load()
+        indexed = vectors.names()
+        changed = set(stats.changed)
+        removed = changed.union(stats.removed, indexed.difference(self.entries))
+        missing = [name for name in self.entries if name not in indexed or name in changed]
+        if not removed and not missing:
+            return
+        vectors.update(removed, [row for name in missing
+                                 for row in self._vector_rows(self.entries[name])])
+        try:
+            vectors.save()
+        except Exception:
+            pass  # Vectors are rebuilt if the file is missing
+
+    def _vector_rows(self, entry: IndexEntry) -> List[Tuple[VectorRow, Dict[str, float]]]:
+        """(row, word weights) for each passage of a document; title words count in each."""
+        title_terms = self._tokenize(entry.title)
+        rows = []
+        for passage in self._passages(entry) or [Passage(section="", start=0, end=None)]:
+            terms = passage.terms or self._tokenize(
+                self._read_range(entry, passage.start, passage.end))
+            weights = term_weights(Counter(terms) + Counter(title_terms))
+            rows.append((VectorRow(entry.name, passage.section, passage.start, passage.end),
+                         weights))
+        return rows
+
+    def _scan_library(self) -> Dict[str, Tuple[Path, os.stat_result]]:
+        """Indexable files in the library by document name, with their stat.
+
+        One scandir pass, so a no-op refresh costs a directory read plus a
+        stat per file.
+        """
+        markdown, docx = {}, {}
+        try:
+            with os.scandir(DOCUMENT_LIBRARY_PATH) as scan:
+                for item in scan:
+                    suffix = os.path.splitext(item.name)[1]
+                    if suffix not in (".md", ".docx"):
+                        continue
+                    try:
+                        if not item.is_file():
+                            continue
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    target = markdown if suffix == ".md" else docx
+                    target[item.name] = (DOCUMENT_LIBRARY_PATH / item.name, st)
+        except OSError:
+            return {}
+        markdown.update(docx)
+        return markdown
+
+    def _index_file(self, path: Path) -> Optional[IndexEntry]:
+        """Index one library file by its type."""
+        if path.suffix.lower() == ".docx":
+            return self._index_docx(path)
+        return self._index_markdown(path)
+
+    def _add_entry(self, entry: IndexEntry):
+        """Add a document to the entries and postings."""
+        self.entries[entry.name] = entry
+        postings, title_postings = self._memory_postings()
+        for term, freq in entry.terms.items():
+            postings.setdefault(term, {})[entry.name] = freq
+        title_terms = self._tokenize(entry.title)
+        for term, freq in title_terms.items():
+            title_postings.setdefault(term, {})[entry.name] = freq
+        self._lengths[entry.name] = (sum(entry.terms.values()), sum(title_terms.values()))
+        if self._term_trigrams is not None:
+            for term in chain(entry.terms, title_terms):
+                self._term_trigrams.add(term)
+        if self._name_trigrams is not None:
+            self._name_trigrams.add(entry.name)
+
+    def _remove_entry(self, name: str):
+        """Remove a document from the entries and postings.
+
+        A document still read from the mapped file is only tombstoned, which
+        hides it in the mapped postings.
+        """
+        entry = self.entries.pop(name)
+        title_terms = self._tokenize(entry.title)
+        if name in self._base_names:
+            self._removed.add(name)
+        if self._mapped is not None and entry.content is None:
+            body_terms = set(chain.from_iterable(
+                passage.terms for passage in self._mapped.read_passages(name)
+            )) if self._term_trigrams is not None else ()
+        else:
+            body_terms = entry.terms
+            for postings, terms in zip(self._memory_postings(), (body_terms, title_terms)):
+                for term in terms:
+                    docs = postings.get(term)
+                    if docs is not None:
+                        docs.pop(name, None)
+                        if not docs:
+                            del postings[term]
+        if self._term_trigrams is not None:
+            for term in chain(body_terms, title_terms):
+                if not self._known_term(term):
+                    self._term_trigrams.discard(term)
+        if self._name_trigrams is not None:
+            self._name_trigrams.discard(name)
+        self._lengths.pop(name, None)
+        self.norms.pop(name, None)
+        self.fingerprints.pop(name, None)
+        self._touched.discard(name)
+
+    def _memory_postings(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """The (body, title) postings documents are added to: the delta's when mapped."""
+        if self._mapped is not None:
+            return self.postings.added, self.title_postings.added
+        return self.postings, self.title_postings
+
+    def _is_stale(self, names: List[str]) -> bool:
+        """Whether any of these documents changed on disk since it was indexed."""
+        for name in names:
+            known = self.fingerprints.get(name)
+            if known is None:
+                continue
+            try:
+                st = Path(self.entries[name].path).stat()
+            except OSError:
+                return True
+            if known[:2] != (st.st_mtime_ns, st.st_size):
+                return True
+        return False
 
     def _index_markdown(self, path: Path) -> Optional[IndexEntry]:
         """Index a markdown file."""
         try:
             content = path.read_text(encoding="utf-8")
             title = self._extract_title(content, path.stem)
-            terms = self._tokenize(content)
+            positions = self._term_positions(content)
 
             return IndexEntry(
                 name=path.name,
@@ -86,7 +488,9 @@ class DocumentIndex:
                 doc_type="markdown",
                 title=title,
                 content=content,
-                terms=terms
+                terms={term: len(pairs) // 2 for term, pairs in positions.items()},
+                passages=self._markdown_passages(content),
+                positions=positions
             )
         except Exception:
             return None
@@ -97,13 +501,15 @@ class DocumentIndex:
             from docx import Document
             doc = Document(str(path))
 
-            # Extract text from paragraphs
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+            # Extract text from paragraphs, with their heading level (0 = body text)
+            blocks = [(p.text, _heading_level(p.style.name if p.style is not None else ""))
+                      for p in doc.paragraphs if p.text.strip()]
+            paragraphs = [text for text, _ in blocks]
             content = "\n".join(paragraphs)
 
             # Use first paragraph or filename as title
             title = paragraphs[0][:100] if paragraphs else path.stem
-            terms = self._tokenize(content)
+            positions = self._term_positions(content)
 
             return IndexEntry(
                 name=path.name,
@@ -111,7 +517,10 @@ class DocumentIndex:
                 doc_type="docx",
                 title=title,
                 content=content,
-                terms=terms
+                terms={term: len(pairs) // 2 for term, pairs in positions.items()},
+                passages=self._split_passages(
+                    (text + "\n", level, text) for text, level in blocks),
+                positions=positions
             )
         except ImportError:
             # python-docx not installed, create placeholder entry
@@ -126,6 +535,51 @@ class DocumentIndex:
         except Exception:
             return None
 
+    def _markdown_passages(self, content: str) -> List[Passage]:
+        """Split markdown into passages at headings (outside code fences)."""
+        def blocks():
+            in_fence = False
+            for line in content.splitlines(keepends=True):
+                if _FENCE_RE.match(line):
+                    in_fence = not in_fence
+                match = None if in_fence else _HEADING_RE.match(line.rstrip("\r\n"))
+                if match:
+                    yield line, len(match.group(1)), match.group(2)
+                else:
+                    yield line, 0, ""
+        return self._split_passages(blocks())
+
+    def _split_passages(self, blocks) -> List[Passage]:
+        """Group (text, heading level, heading) blocks into passages.
+
+        Each heading starts a passage whose section path is the chain of
+        enclosing headings; text before the first heading is a passage with
+        an empty section. Byte offsets assume the blocks concatenate to the
+        UTF-8 body.
+        """
+        passages: List[Passage] = []
+        headings: List[Tuple[int, str]] = []  # (level, heading) of the open sections
+        section, start, offset, parts = "", 0, 0, []
+
+        def close():
+            text = "".join(parts)
+            if text.strip():
+                passages.append(Passage(section=section, start=start, end=offset,
+                                        terms=self._tokenize(text)))
+
+        for text, level, heading in blocks:
+            if level:
+                close()
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, heading.strip()))
+                section = SECTION_SEPARATOR.join(name for _, name in headings)
+                start, parts = offset, []
+            parts.append(text)
+            offset += len(text.encode("utf-8"))
+        close()
+        return passages
+
     def _extract_title(self, content: str, fallback: str) -> str:
         """Extract title from markdown content."""
         # Look for # heading
@@ -136,77 +590,377 @@ class DocumentIndex:
 
     def _tokenize(self, text: str) -> Dict[str, int]:
         """Tokenize text and return term frequencies."""
-        # Convert to lowercase and extract words
-        words = re.findall(r'\b[a-z][a-z0-9]+\b', text.lower())
-        # Filter stopwords
-        stopwords = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
-                     'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                     'would', 'could', 'should', 'may', 'might', 'must', 'shall',
-                     'can', 'and', 'or', 'but', 'if', 'then', 'else', 'when',
-                     'at', 'by', 'for', 'with', 'about', 'against', 'between',
-                     'into', 'through', 'during', 'before', 'after', 'above',
-                     'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on',
-                     'off', 'over', 'under', 'again', 'further', 'then', 'once',
-                     'here', 'there', 'all', 'each', 'few', 'more', 'most',
-                     'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
-                     'same', 'so', 'than', 'too', 'very', 'just', 'this', 'that'}
-        filtered = [w for w in words if w not in stopwords and len(w) > 2]
-        return Counter(filtered)
-
-    def _calculate_idf(self):
-        """Calculate inverse document frequency for all terms."""
-        if not self.entries:
-            return
+        # Convert to lowercase and extract words, without stopwords
+        words = WORD_RE.findall(text.lower())
+        return Counter(w for w in words if _indexable(w))
 
+    def _term_positions(self, text: str) -> Dict[str, array]:
+        """Where each term occurs: flat (word position, byte offset) pairs.
+
+        Word positions count every word, stopwords included, so phrases can
+        be checked by adjacency; byte offsets locate snippets in the stored
+        text without scanning it.
+        """
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = WORD_RE.finditer(lowered)
+        else:
+            # Lowercasing changed the length (e.g. "İ"); match case-insensitively instead
+            matches = re.finditer(WORD_RE.pattern, text, re.IGNORECASE)
+        ascii_text = text.isascii()
+        positions: Dict[str, array] = {}
+        char_pos, byte_pos = 0, 0
+        for word_pos, match in enumerate(matches):
+            word = match.group().lower()
+            if not _indexable(word):
+                continue
+            start = match.start()
+            if ascii_text:
+                byte_pos = start
+            else:
+                byte_pos += len(text[char_pos:start].encode("utf-8"))
+                char_pos = start
+            positions.setdefault(word, array("I")).extend((word_pos, byte_pos))
+        return positions
+
+    def _update_idf(self):
+        """Recalculate IDF from the postings (no document is re-read)."""
         num_docs = len(self.entries)
-        term_doc_count: Dict[str, int] = Counter()
+        self.idf = {term: math.log(num_docs / len(docs)) for term, docs in self.postings.items()}
 
+    def _build_postings(self):
+        """Build the inverted index (term -> documents containing it)."""
+        postings: Dict[str, Dict[str, int]] = defaultdict(dict)
         for entry in self.entries.values():
-            for term in entry.terms:
-                term_doc_count[term] += 1
+            for term, freq in entry.terms.items():
+                postings[term][entry.name] = freq
+        self.postings = dict(postings)
+        self._build_field_stats()
 
-        self.idf = {
-            term: math.log(num_docs / count)
-            for term, count in term_doc_count.items()
+    def _build_field_stats(self):
+        """Build the title postings and precompute per-document BM25 length norms.
+
+        Queries then never need document lengths.
+        """
+        title_postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        lengths: Dict[str, Tuple[int, int]] = {}
+        for entry in self.entries.values():
+            title_terms = self._tokenize(entry.title)
+            for term, freq in title_terms.items():
+                title_postings[term][entry.name] = freq
+            lengths[entry.name] = (sum(entry.terms.values()), sum(title_terms.values()))
+
+        self.title_postings = dict(title_postings)
+        self._lengths = lengths
+        self._calculate_norms(lengths)
+
+    def _calculate_norms(self, lengths: Dict[str, Tuple[int, int]]):
+        """BM25 length norm per field: 1 - b + b * length / average length."""
+        if not lengths:
+            self.norms = {}
+            return
+        avg_body = sum(body for body, _ in lengths.values()) / len(lengths) or 1.0
+        avg_title = sum(title for _, title in lengths.values()) / len(lengths) or 1.0
+        b = self.b
+        self.norms = {
+            name: (1 - b + b * body / avg_body, 1 - b + b * title / avg_title)
+            for name, (body, title) in lengths.items()
         }
 
     def search(self, query: str, top_k: int = 5) -> List[SearchResult]:
-        """Search documents using TF-IDF scoring."""
-        self._ensure_loaded()
+        """Search documents using the index's scorer (BM25F or TF-IDF).
+
+        Only documents in the postings of a query term are scored, and the
+        top_k are picked with a heap, so cost follows the number of matching
+        documents rather than the library size. If a returned document
+        changed on disk, the index is refreshed and the search repeated.
+        With semantic ranking on, plain queries also rank passages by
+        vector similarity and the two rankings are fused.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            ranked = self._search if self.vectors is None else self._fused_search
+            results = ranked(query, top_k)
+            if self._is_stale([result.name for result in results]):
+                self.refresh()
+                results = ranked(query, top_k)
+            return results
+
+    def _fused_search(self, query: str, top_k: int) -> List[SearchResult]:
+        """Keyword and semantic rankings combined by reciprocal rank fusion.
+
+        Both rankings are taken FUSION_DEPTH deep, but passages and snippets
+        are only built for the fused top_k. Structured queries (phrases,
+        operators) are exact filters and keep the keyword ranking alone.
+        """
+        parsed = parse_query(query)
+        if parsed.structured or not self.entries:
+            return self._search(query, top_k)
+        parsed = self._correct_typos(parsed)
+        query_terms = Counter(w for w in positive_words(parsed.root) if _indexable(w))
+        if not query_terms:
+            return self._search(query, top_k)  # Substring search
+
+        depth = max(top_k, FUSION_DEPTH)
+        lexical = {name: score for score, name in self._rank(parsed, query_terms, depth)}
+        total = len(self.entries)
+        weights = {
+            term: (1.0 + math.log(count)) * math.log(1 + total / (1 + self._doc_freq(term)))
+            for term, count in query_terms.items()
+        }
+        similar = {row.name: row for _, row in self.vectors.search(weights, depth)
+                   if row.name in self.entries}
+        fused = fuse([list(lexical), list(similar)])[:top_k]
 
+        # Keyword matches point at their best passage, the others at the most similar one
+        keyword = {result.name: result for result in self._results(
+            query_terms, [(lexical[name], name) for name, _ in fused if name in lexical])}
+        results = []
+        for name, score in fused:
+            result = keyword.get(name)
+            if result is None:
+                result = self._passage_result(self.entries[name], similar[name], query_terms)
+            results.append(replace(result, score=score))
+        return results
+
+    def _passage_result(self, entry: IndexEntry, row: VectorRow, terms) -> SearchResult:
+        """A result pointing at one passage, with fragments around any query terms in it."""
+        fragments = self._fragments(entry, terms, row.start, row.end)
+        if fragments:
+            snippet = fragments[0].text
+        else:
+            snippet = self._extract_snippet(self._read_range(entry, row.start, row.end),
+                                            list(terms))
+        return SearchResult(
+            name=entry.name,
+            path=entry.path,
+            title=entry.title,
+            score=0.0,
+            snippet=snippet,
+            section=row.section,
+            start=row.start,
+            end=row.end,
+            fragments=fragments
+        )
+
+    def _search(self, query: str, top_k: int) -> List[SearchResult]:
         if not self.entries:
             return []
 
-        query_terms = self._tokenize(query)
+        parsed = self._correct_typos(parse_query(query))
+        query_terms = Counter(w for w in positive_words(parsed.root) if _indexable(w))
         if not query_terms:
+            if parsed.structured:
+                return []  # e.g. only negated terms: nothing to rank by
             # If no valid tokens, do substring search
             return self._substring_search(query, top_k)
 
+        return self._results(query_terms, self._rank(parsed, query_terms, top_k))
+
+    def _results(self, query_terms: Dict[str, int],
+                 ranked: List[Tuple[float, str]]) -> List[SearchResult]:
+        """Results for ranked (score, name) pairs, pointing at each document's best passage.
+
+        Passages and snippets are only built for the results actually returned.
+        """
         results = []
-        for entry in self.entries.values():
-            score = self._calculate_score(query_terms, entry)
-            if score > 0:
-                snippet = self._extract_snippet(entry.content, list(query_terms.keys()))
+        for score, name in ranked:
+            entry = self.entries[name]
+            passage = self._best_passage(entry, query_terms)
+            if passage is None:
+                section, start, end = "", 0, None
+            else:
+                section, start, end = passage.section, passage.start, passage.end
+            fragments = self._fragments(entry, query_terms, start, end)
+            if fragments:
+                snippet = fragments[0].text
+            else:
+                # Matched by title only
+                text = self._read_range(entry, start, end)
+                snippet = self._extract_snippet(text, list(query_terms.keys()))
+            results.append(SearchResult(
+                name=entry.name,
+                path=entry.path,
+                title=entry.title,
+                score=score,
+                snippet=snippet,
+                section=section,
+                start=start,
+                end=end,
+                fragments=fragments
+            ))
+        return results
+
+    def _rank(self, parsed: Query, query_terms: Dict[str, int],
+              top_k: int) -> List[Tuple[float, str]]:
+        """(score, name) of the top_k matching documents, best first."""
+        if self.scorer == "bm25":
+            scores = self._score_bm25(query_terms)
+        else:
+            scores = self._score_tfidf(query_terms)
+        if parsed.structured:
+            candidates = self._candidates(parsed.root)
+            if candidates is not None:
+                scores = {name: score for name, score in scores.items() if name in candidates}
+
+        if parsed.structured and _has_phrase(parsed.root):
+            # Phrases are verified from positions in rank order, until top_k pass
+            matches = self._matcher(parsed.root)
+            ranked = sorted(((score, name) for name, score in scores.items() if score > 0),
+                            key=lambda item: item[0], reverse=True)
+            return list(islice((item for item in ranked if matches(item[1])), top_k))
+        return heapq.nlargest(
+            top_k, ((score, name) for name, score in scores.items() if score > 0),
+            key=lambda item: item[0]
+        )
+
+    def _candidates(self, node: Node) -> Optional[set]:
+        """Documents that may match a query expression, by set operations on postings.
+
+        Exact for terms and operators; a phrase gives the documents that
+        contain all of its words, for _matcher to verify. None means no
+        constraint (e.g. a stopword, or a negated phrase).
+        """
+        if isinstance(node, Term):
+            if not _indexable(node.word):
+                return None
+            return ((self.postings.get(node.word) or {}).keys()
+                    | (self.title_postings.get(node.word) or {}).keys())
+        if isinstance(node, Phrase):
+            kept = [Term(word) for word in node.words if _indexable(word)]
+            return set.intersection(*map(self._candidates, kept)) if kept else None
+        if isinstance(node, Not):
+            inner = None if _has_phrase(node.operand) else self._candidates(node.operand)
+            return None if inner is None else set(self.entries) - inner
+        candidates = [c for c in map(self._candidates, node.operands) if c is not None]
+        if not candidates:
+            return None
+        if isinstance(node, And):
+            return set.intersection(*candidates)
+        return set.union(*candidates)
+
+    def _matcher(self, node: Node) -> Optional[Callable[[str], bool]]:
+        """A test of whether a document (by name) matches a query expression.
+
+        Term lookups are built once per query; phrases are verified per
+        document from positions, so only documents that are checked pay for
+        it. Returns None if the expression constrains nothing (e.g. a
+        stopword), so that it is ignored by the enclosing AND/OR.
+        """
+        if isinstance(node, Term):
+            if not _indexable(node.word):
+                return None
+            body = self.postings.get(node.word) or {}
+            title = self.title_postings.get(node.word) or {}
+            return lambda name: name in body or name in title
+        if isinstance(node, Phrase):
+            return self._phrase_matcher(node.words)
+        if isinstance(node, Not):
+            inner = self._matcher(node.operand)
+            return None if inner is None else (lambda name: not inner(name))
+        tests = [t for t in (self._matcher(operand) for operand in node.operands) if t is not None]
+        if not tests:
+            return None
+        if isinstance(node, And):
+            return lambda name: all(test(name) for test in tests)
+        return lambda name: any(test(name) for test in tests)
+
+    def _phrase_matcher(self, words: Tuple[str, ...]) -> Optional[Callable[[str], bool]]:
+        """A test of whether a document contains the words next to each other, in order.
+
+        A document must be in every term's postings, and is then verified by
+        word positions; stopwords in the phrase only count as a gap.
+        """
+        kept = [(i, word) for i, word in enumerate(words) if _indexable(word)]
+        if not kept:
+            return None
+        if len(kept) == 1:
+            return self._matcher(Term(kept[0][1]))
+
+        bodies = [self.postings.get(w) or {} for _, w in kept]
+        titles = [self.title_postings.get(w) or {} for _, w in kept]
+        first_index, first_word = kept[0]
+
+        def matches(name: str) -> bool:
+            if all(name in docs for docs in bodies):
+                entry = self.entries[name]
+                others = [(i - first_index, set(self._word_positions(entry, w)))
+                          for i, w in kept[1:]]
+                if any(all(position + delta in positions for delta, positions in others)
+                       for position in self._word_positions(entry, first_word)):
+                    return True
+            if all(name in docs for docs in titles):
+                title_words = WORD_RE.findall(self.entries[name].title.lower())
+                return any(tuple(title_words[i:i + len(words)]) == tuple(words)
+                           for i in range(len(title_words) - len(words) + 1))
+            return False
+        return matches
+
+    def _best_passage(self, entry: IndexEntry, query_terms: Dict[str, int]) -> Optional[Passage]:
+        """The passage of a document that best matches the query (BM25).
+
+        Lengths are normalized against the document's own passages; a
+        document matched only by its title gets its first passage.
+        """
+        passages = self._passages(entry)
+        if not passages:
+            return None
+        num_docs = len(self.entries)
+        idf = {}
+        for term in query_terms:
+            doc_freq = len(self.postings.get(term) or ())
+            if doc_freq:
+                idf[term] = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = sum(p.length for p in passages) / len(passages) or 1.0
+        k1, b = self.k1, self.b
+
+        best, best_score = passages[0], 0.0
+        for passage in passages:
+            norm = k1 * (1 - b + b * passage.length / avg_length)
+            score = 0.0
+            for term, weight in idf.items():
+                tf = passage.terms.get(term)
+                if tf:
+                    score += query_terms[term] * weight * tf * (k1 + 1) / (tf + norm)
+            if score > best_score:
+                best, best_score = passage, score
+        return best
+
+    def _substring_search(self, query: str, top_k: int) -> List[SearchResult]:
+        """Fallback substring search for queries without indexable words.
+
+        Alphanumeric queries (e.g. "cl", "ui") are matched within the
+        vocabulary through the trigram index, and snippets come from the
+        matching terms' positions. Other queries (e.g. "-p") have no word
+        the index knows, so documents are searched in order until top_k match.
+        """
+        query_lower = query.lower().strip()
+        if query_lower.isalnum():
+            terms = self._term_index().substring(query_lower)
+            names = set()
+            for term in terms:
+                names.update(self.postings.get(term) or ())
+                names.update(self.title_postings.get(term) or ())
+            results = []
+            for name in sorted(names)[:top_k]:
+                entry = self.entries[name]
+                fragments = self._fragments(entry, terms, limit=1)
                 results.append(SearchResult(
                     name=entry.name,
                     path=entry.path,
                     title=entry.title,
-                    score=score,
-                    snippet=snippet
+                    score=1.0,
+                    snippet=fragments[0].text if fragments else self._extract_snippet(
+                        entry.title, [query_lower]),
+                    fragments=fragments
                 ))
+            return results
 
-        # Sort by score descending
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:top_k]
-
-    def _substring_search(self, query: str, top_k: int) -> List[SearchResult]:
-        """Fallback substring search for short queries."""
-        query_lower = query.lower()
         results = []
-
         for entry in self.entries.values():
-            if query_lower in entry.content.lower():
-                snippet = self._extract_snippet(entry.content, [query])
+            content = self._content(entry)
+            if query_lower in content.lower():
+                snippet = self._extract_snippet(content, [query])
                 results.append(SearchResult(
                     name=entry.name,
                     path=entry.path,
@@ -214,18 +968,156 @@ class DocumentIndex:
                     score=1.0,
                     snippet=snippet
                 ))
-
-        return results[:top_k]
-
-    def _calculate_score(self, query_terms: Dict[str, int], entry: IndexEntry) -> float:
-        """Calculate TF-IDF score for a document against query."""
-        score = 0.0
+                if len(results) == top_k:
+                    break
+        return results
+
+    def _term_index(self) -> TrigramIndex:
+        """Trigram index over the vocabulary, built on first use and then kept up to date."""
+        if self._term_trigrams is None:
+            self._term_trigrams = TrigramIndex(self._vocabulary())
+        return self._term_trigrams
+
+    def _vocabulary(self):
+        """Every indexed term, of bodies and titles."""
+        return chain(self.postings, self.title_postings)
+
+    def _known_term(self, term: str) -> bool:
+        return term in self.postings or term in self.title_postings
+
+    def _doc_freq(self, term: str) -> int:
+        if self._mapped is not None:
+            return self.postings.doc_freq(term)
+        return len(self.postings.get(term) or ())
+
+    def _correct_typos(self, parsed: Query) -> Query:
+        """Replace query words the index does not know by the closest known terms.
+
+        Candidates are found through the trigram index and must be within one
+        or two edits (transpositions count as one); ties go to the term in
+        more documents.
+        """
+        corrections = {}
+        for word in query_words(parsed.root):
+            if word in corrections or not _indexable(word) or self._known_term(word):
+                continue
+            max_distance = 1 if len(word) <= SHORT_WORD_LENGTH else 2
+            matches = self._term_index().fuzzy(word, max_distance)
+            if matches:
+                corrections[word] = min(
+                    matches, key=lambda match: (match[0], -self._doc_freq(match[1]), match[1]))[1]
+        if not corrections:
+            return parsed
+        return Query(text=parsed.text, root=replace_words(parsed.root, corrections),
+                     structured=parsed.structured)
+
+    def _score_tfidf(self, query_terms: Dict[str, int]) -> Dict[str, float]:
+        """TF-IDF scores of the documents matching any query term."""
+        scores: Dict[str, float] = defaultdict(float)
         for term, query_freq in query_terms.items():
-            if term in entry.terms:
-                tf = entry.terms[term]
-                idf = self.idf.get(term, 0)
-                score += tf * idf * query_freq
-        return score
+            idf = self._term_idf(term)
+            if not idf:
+                continue
+            for name, tf in self.postings.get(term, {}).items():
+                scores[name] += tf * idf * query_freq
+        return scores
+
+    def _score_bm25(self, query_terms: Dict[str, int]) -> Dict[str, float]:
+        """BM25F scores of the documents matching any query term.
+
+        Title and body frequencies are length-normalized per field and
+        combined with title_weight before saturation. The IDF stays positive
+        for terms found in every document.
+        """
+        num_docs = len(self.entries)
+        k1, title_weight, norms = self.k1, self.title_weight, self.norms
+        scores: Dict[str, float] = defaultdict(float)
+        for term, query_freq in query_terms.items():
+            body = self.postings.get(term, {})
+            title = self.title_postings.get(term, {})
+            doc_freq = len(body) + sum(1 for name in title if name not in body)
+            if not doc_freq:
+                continue
+            idf = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            weight = query_freq * idf * (k1 + 1)
+
+            for name, freq in body.items():
+                body_norm, title_norm = norms[name]
+                tf = freq / body_norm
+                title_freq = title.get(name)
+                if title_freq:
+                    tf += title_weight * title_freq / title_norm
+                scores[name] += weight * tf / (k1 + tf)
+            for name, title_freq in title.items():
+                if name not in body:
+                    tf = title_weight * title_freq / norms[name][1]
+                    scores[name] += weight * tf / (k1 + tf)
+        return scores
+
+    def _term_idf(self, term: str) -> float:
+        """IDF of a term; computed from the document frequency when mapped."""
+        if self._mapped is None:
+            return self.idf.get(term, 0)
+        doc_freq = self.postings.doc_freq(term)
+        return math.log(len(self.entries) / doc_freq) if doc_freq else 0
+
+    def _fragments(self, entry: IndexEntry, terms, start: int = 0, end: Optional[int] = None,
+                   limit: int = MAX_FRAGMENTS) -> List[Fragment]:
+        """The best non-overlapping windows of a document around query terms.
+
+        Occurrences come from the positional index, and windows are ranked
+        by the number of distinct terms, then occurrences, they contain.
+        Only the chosen windows are read from the document's text.
+
+        Args:
+            entry: The document
+            terms: Query terms
+            start, end: Byte range to pick windows from (e.g. the best passage)
+            limit: Maximum number of fragments
+        """
+        occurrences = sorted(
+            (offset, term) for term in terms for _, offset in self._positions(entry, term)
+            if offset >= start and (end is None or offset < end)
+        )
+        if not occurrences:
+            return []
+        offsets = [offset for offset, _ in occurrences]
+
+        windows = []
+        for offset in offsets:
+            window_start = max(start, offset - SNIPPET_CONTEXT)
+            window_end = window_start + SNIPPET_BYTES
+            if end is not None:
+                window_end = min(window_end, end)
+            inside = [(o, t) for o, t in occurrences[bisect.bisect_left(offsets, window_start):
+                                                     bisect.bisect_left(offsets, window_end)]
+                      if o + len(t) <= window_end]
+            windows.append((len({t for _, t in inside}), len(inside), -window_start,
+                            window_end, inside))
+        windows.sort(key=lambda window: window[:3], reverse=True)
+
+        chosen = []
+        for window in windows:
+            if len(chosen) == limit:
+                break
+            window_start, window_end = -window[2], window[3]
+            if all(window_end <= -other[2] or window_start >= other[3] for other in chosen):
+                chosen.append(window)
+        chosen.sort(key=lambda window: -window[2])
+
+        fragments = []
+        for _, _, neg_start, window_end, inside in chosen:
+            window_start = -neg_start
+            # One byte more tells whether the text goes on after the window
+            data = self._read_bytes(entry, window_start, window_end + 1)
+            more = len(data) > window_end - window_start
+            fragments.append(_fragment(
+                data[:window_end - window_start],
+                [(o - window_start, o - window_start + len(t)) for o, t in inside],
+                cut_before=window_start > 0,
+                cut_after=more
+            ))
+        return fragments
 
     def _extract_snippet(self, content: str, terms: List[str], max_len: int = 150) -> str:
         """Extract a relevant snippet containing search terms."""
@@ -259,83 +1151,383 @@ class DocumentIndex:
 
     def get_document(self, name: str) -> Optional[str]:
         """Get full content of a document by name."""
-        self._ensure_loaded()
-
+        with self._lock:
+            self._ensure_loaded()
+
+            entry = self._find_entry(name)
+            if entry is not None and self._is_stale([entry.name]):
+                self.refresh()
+                entry = self._find_entry(name)
+            return self._content(entry) if entry is not None else None
+
+    def _content(self, entry: IndexEntry) -> str:
+        """A document's text, read from the bodies file if not in memory."""
+        if entry.content is None and self._mapped is not None:
+            return self._mapped.read_body(entry.name)
+        return entry.content or ""
+
+    def _read_range(self, entry: IndexEntry, start: int, end: Optional[int]) -> str:
+        """A byte range of a document's text; only that range is read when mapped."""
+        if entry.content is None and self._mapped is not None:
+            return self._mapped.read_body(entry.name, start, end)
+        return (entry.content or "").encode("utf-8")[start:end].decode("utf-8", errors="replace")
+
+    def _read_bytes(self, entry: IndexEntry, start: int, end: Optional[int]) -> bytes:
+        """A byte range of a document's UTF-8 text."""
+        if entry.content is None and self._mapped is not None:
+            return self._mapped.read_bytes(entry.name, start, end)
+        return (entry.content or "").encode("utf-8")[start:end]
+
+    def _positions(self, entry: IndexEntry, term: str) -> List[Tuple[int, int]]:
+        """(word position, byte offset) of each occurrence of a term in a document."""
+        if entry.positions is None and self._mapped is not None:
+            return self._mapped.postings.positions(term, entry.name)
+        pairs = (entry.positions or {}).get(term)
+        if not pairs:
+            return []
+        return list(zip(pairs[::2], pairs[1::2]))
+
+    def _word_positions(self, entry: IndexEntry, term: str) -> Sequence[int]:
+        """Word positions of a term in a document."""
+        if entry.positions is None and self._mapped is not None:
+            return [position for position, _ in self._positions(entry, term)]
+        pairs = (entry.positions or {}).get(term)
+        return pairs[::2] if pairs else ()
+
+    def _passages(self, entry: IndexEntry) -> List[Passage]:
+        """A document's passages, read from the index file if not in memory."""
+        if entry.passages is None and self._mapped is not None:
+            return self._mapped.read_passages(entry.name)
+        return entry.passages or []
+
+    def read_passage(self, name: str, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+        """Read one passage (a byte range) of a document."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._find_entry(name)
+            return self._read_range(entry, start, end) if entry is not None else None
+
+    def _find_entry(self, name: str) -> Optional[IndexEntry]:
+        """Find a document by exact, case-insensitive or partial name.
+
+        Beyond an exact match, the best completion of the name wins, so a
+        case-insensitive match comes before a longer name containing it.
+        """
         # Try exact match
         if name in self.entries:
-            return self.entries[name].content
+            return self.entries[name]
 
-        # Try case-insensitive match
-        name_lower = name.lower()
-        for entry_name, entry in self.entries.items():
-            if entry_name.lower() == name_lower:
-                return entry.content
+        # Try case-insensitive, then partial match
+        matches = self._name_index().complete(name, limit=1)
+        return self.entries[matches[0]] if matches else None
 
-        # Try partial match
-        for entry_name, entry in self.entries.items():
-            if name_lower in entry_name.lower():
-                return entry.content
+    def complete_names(self, prefix: str, limit: int = 10) -> List[str]:
+        """Document names containing prefix, best completions first."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._name_index().complete(prefix, limit)
 
-        return None
+    def _name_index(self) -> TrigramIndex:
+        """Trigram index over document names, built on first use and then kept up to date."""
+        if self._name_trigrams is None:
+            self._name_trigrams = TrigramIndex(self.entries)
+        return self._name_trigrams
 
     def list_documents(self) -> List[Dict[str, str]]:
         """List all indexed documents."""
-        self._ensure_loaded()
-
-        return [
-            {
-                "name": entry.name,
-                "title": entry.title,
-                "type": entry.doc_type
-            }
-            for entry in self.entries.values()
-        ]
+        with self._lock:
+            self._ensure_loaded()
+
+            return [
+                {
+                    "name": entry.name,
+                    "title": entry.title,
+                    "type": entry.doc_type
+                }
+                for entry in self.entries.values()
+            ]
 
     def _ensure_loaded(self):
-        """Ensure the index is loaded."""
-        if not self._loaded:
-            if not self._load_cache():
-                self.build_index()
+        """Ensure the index is loaded and tracks the library.
+
+        The cache is loaded once and refreshed against the library. After
+        that, a change of the library directory (a file added, removed or
+        renamed) triggers another refresh at once, and in-place edits are
+        picked up by a stat-only rescan at most every _RESCAN_INTERVAL.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_cache()
+                self.refresh()
+            elif self._library_mtime is not None and (
+                    _mtime_ns(DOCUMENT_LIBRARY_PATH) != self._library_mtime
+                    or time.monotonic() - self._last_scan >= _RESCAN_INTERVAL):
+                self.refresh()
 
     def _save_cache(self):
-        """Save index to cache file."""
+        """Save the index to the cache file.
+
+        Documents added or changed since the file was written go to its
+        delta segment, with tombstones for those removed, so a small change
+        costs a small write. Once the delta outgrows DELTA_MAX_FRACTION of
+        the library, both are merged into a new index file.
+        """
+        try:
+            delta = [name for name in self.entries
+                     if name not in self._base_names or name in self._removed]
+            if self._base_id is not None and \
+                    len(delta) + len(self._removed) <= DELTA_MAX_FRACTION * len(self.entries):
+                self._save_delta(delta)
+                return
+
+            self._materialize()
+            self._base_id = None  # Until the new file is complete
+            documents = [self._stored_document(entry) for entry in self.entries.values()]
+            self._base_id = write_index(INDEX_CACHE_PATH, documents, self.postings,
+                                        self.title_postings, self._scanned_at_ns)
+            self._base_names = set(self.entries)
+            self._removed.clear()
+            self._touched.clear()
+            remove_delta(INDEX_CACHE_PATH)
+        except Exception:
+            pass  # Cache is optional
+
+    def _save_delta(self, names: List[str]):
+        """Write the delta segment: these documents (all in memory) and the tombstones."""
+        postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        title_postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for name in names:
+            entry = self.entries[name]
+            for term, freq in entry.terms.items():
+                postings[term][name] = freq
+            for term, freq in self._tokenize(entry.title).items():
+                title_postings[term][name] = freq
+        write_delta(INDEX_CACHE_PATH, self._base_id,
+                    [self._stored_document(self.entries[name]) for name in names],
+                    postings, title_postings, self._removed,
+                    {name: self.fingerprints[name] for name in self._touched
+                     if name in self.fingerprints},
+                    self._scanned_at_ns)
+
+    def _stored_document(self, entry: IndexEntry) -> StoredDocument:
+        """A document as write_index() takes it; its content must be in memory."""
+        body_length, title_length = self._lengths.get(entry.name,
+                                                      (sum(entry.terms.values()), 0))
+        return StoredDocument(
+            name=entry.name,
+            path=entry.path,
+            doc_type=entry.doc_type,
+            title=entry.title,
+            body_length=body_length,
+            title_length=title_length,
+            fingerprint=self.fingerprints.get(entry.name),
+            content=entry.content,
+            passages=entry.passages,
+            positions=entry.positions
+        )
+
+    def _load_cache(self) -> bool:
+        """Open the cache file.
+
+        Only the document table is decoded: postings are looked up in the
+        mapped file per query term, and bodies are read when a snippet or
+        document needs them. The documents of the delta segment, if any,
+        are read into memory over it.
+        """
+        mapped = open_index(INDEX_CACHE_PATH)
+        if mapped is None:
+            return False
+
+        self._close_mapped()
+        self._mapped = mapped
+        self._base_id = mapped.build_id
+        self._base_names = set(mapped.doc_names)
+        self._removed = set()
+        self._touched = set()
+        self.entries = {}
+        self.fingerprints = {}
+        self._term_trigrams = self._name_trigrams = None
+        self._lengths = {}
+        for doc in mapped.documents:
+            self.entries[doc.name] = IndexEntry(
+                name=doc.name, path=doc.path, doc_type=doc.doc_type, title=doc.title,
+                content=None, passages=None, positions=None
+            )
+            if doc.fingerprint is not None:
+                self.fingerprints[doc.name] = doc.fingerprint
+            self._lengths[doc.name] = (doc.body_length, doc.title_length)
+        self.idf = {}
+        self.postings = DeltaPostings(mapped.postings, self._removed)
+        self.title_postings = DeltaPostings(mapped.title_postings, self._removed)
+        self._scanned_at_ns = mapped.scanned_at_ns
+        delta = open_delta(INDEX_CACHE_PATH, mapped.build_id)
+        if delta is not None:
+            self._apply_delta(delta)
+        self._calculate_norms(self._lengths)
+        self._loaded = True
+        return True
+
+    def _apply_delta(self, delta: Delta):
+        """Apply a delta segment's tombstones, then read its documents into memory."""
         try:
-            INDEX_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            cache_data = {
+            for name in delta.removed:
+                if name in self.entries:
+                    self._remove_entry(name)
+            fingerprints = {doc.name: doc.fingerprint for doc in delta.mapped.documents}
+            for name, entry in _read_entries(delta.mapped).items():
+                self._add_entry(entry)
+                if fingerprints.get(name) is not None:
+                    self.fingerprints[name] = fingerprints[name]
+            for name, fingerprint in delta.fingerprints.items():
+                if name in self.entries:
+                    self.fingerprints[name] = fingerprint
+                    self._touched.add(name)
+            self._scanned_at_ns = delta.scanned_at_ns
+        finally:
+            delta.mapped.close()
+
+    def _materialize(self):
+        """Read the mapped index into memory so it can be rewritten, then close it."""
+        mapped = self._mapped
+        if mapped is None:
+            return
+        self.entries.update(_read_entries(mapped, skip=self._removed))
+        self._close_mapped()
+        self._build_postings()
+        self._update_idf()
+
+    def _close_mapped(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def export_json(self, path: Path) -> int:
+        """Write the index as JSON, for inspection or other tools.
+
+        Returns the number of documents exported.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            data = {
+                "version": INDEX_CACHE_VERSION,
                 "entries": {
                     name: {
                         "name": e.name,
                         "path": e.path,
                         "doc_type": e.doc_type,
                         "title": e.title,
-                        "content": e.content,
-                        "terms": e.terms
+                        "content": self._content(e),
+                        "passages": [
+                            {"section": p.section, "start": p.start, "end": p.end}
+                            for p in self._passages(e)
+                        ]
                     }
                     for name, e in self.entries.items()
                 },
-                "idf": self.idf
-            }
-            INDEX_CACHE_PATH.write_text(json.dumps(cache_data, indent=2), encoding="utf-8")
-        except Exception:
-            pass  # Cache is optional
-
-    def _load_cache(self) -> bool:
-        """Load index from cache file."""
-        try:
-            if not INDEX_CACHE_PATH.exists():
-                return False
-
-            cache_data = json.loads(INDEX_CACHE_PATH.read_text(encoding="utf-8"))
-
-            self.entries = {
-                name: IndexEntry(**data)
-                for name, data in cache_data.get("entries", {}).items()
+                "idf": {term: self._term_idf(term) for term in self.postings},
+                "postings": dict(self.postings.items()),
+                "fingerprints": self.fingerprints,
+                "scanned_at_ns": self._scanned_at_ns
             }
-            self.idf = cache_data.get("idf", {})
-            self._loaded = True
-            return True
-        except Exception:
-            return False
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            return len(self.entries)
+
+
+def _has_phrase(node: Node) -> bool:
+    """Whether a query expression contains a phrase."""
+    if isinstance(node, Phrase):
+        return True
+    if isinstance(node, Not):
+        return _has_phrase(node.operand)
+    return isinstance(node, (And, Or)) and any(map(_has_phrase, node.operands))
+
+
+def _indexable(word: str) -> bool:
+    """Whether a word is indexed (stopwords and words under 3 letters are not)."""
+    return word not in STOPWORDS and len(word) > 2
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _fragment(data: bytes, spans: List[Tuple[int, int]], cut_before: bool,
+              cut_after: bool) -> Fragment:
+    """Build a Fragment from raw bytes and the byte spans of its matches."""
+    text, matches, cursor = "", [], 0
+    for start, end in spans + [(len(data), len(data))]:
+        gap = _WHITESPACE_RE.sub(" ", data[cursor:start].decode("utf-8", errors="ignore"))
+        text += gap.lstrip() if not text else gap
+        if start < end:
+            word = data[start:end].decode("utf-8", errors="replace")
+            matches.append((len(text), len(text) + len(word)))
+            text += word
+        cursor = end
+    text = text.rstrip()
+    if cut_before:
+        text = "..." + text
+        matches = [(start + 3, end + 3) for start, end in matches]
+    if cut_after:
+        text += "..."
+    return Fragment(text=text, matches=matches)
+
+
+def _read_entries(mapped: MappedIndex, skip: Set[str] = frozenset()) -> Dict[str, IndexEntry]:
+    """The documents of an index file (except skip) as entries, with everything read."""
+    entries = {}
+    for doc in mapped.documents:
+        if doc.name not in skip:
+            entries[doc.name] = IndexEntry(
+                name=doc.name, path=doc.path, doc_type=doc.doc_type, title=doc.title,
+                content=mapped.read_body(doc.name), passages=mapped.read_passages(doc.name),
+                positions={}
+            )
+    for term, docs in mapped.postings.items():
+        for name, freq in docs.items():
+            if name in entries:
+                entries[name].terms[term] = freq
+    for term, name, pairs in mapped.postings.iter_positions():
+        if name in entries:
+            entries[name].positions[term] = pairs
+    return entries
+
+
+def _heading_level(style_name: str) -> int:
+    """Heading level of a Word paragraph style ('Title' = 1; 0 = not a heading)."""
+    if style_name == "Title":
+        return 1
+    match = re.match(r"Heading (\d)$", style_name)
+    return int(match.group(1)) if match else 0
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 of a file's bytes ('' if unreadable)."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+# Parser for pool workers (in each worker process)
+_worker_index: Optional[DocumentIndex] = None
+
+
+def _ingest_file(path: Path, known_digest: Optional[str]) -> Tuple[str, Optional[IndexEntry]]:
+    """Hash a file and index it unless the hash is known; runs in pool workers."""
+    global _worker_index
+    digest = _hash_file(path)
+    if digest == known_digest:
+        return digest, None
+    if _worker_index is None:
+        _worker_index = DocumentIndex()
+    return digest, _worker_index._index_file(path)
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
 
 
 # Module-level singleton
@@ -343,10 +1535,26 @@ _index: Optional[DocumentIndex] = None
 
 
 def _get_index() -> DocumentIndex:
-    """Get or create the document index singleton."""
+    """Get or create the document index singleton, with the configured engine and scorer."""
     global _index
     if _index is None:
-        _index = DocumentIndex()
+        from ..config import get_config, KnowledgeConfig
+        try:
+            settings = get_config().knowledge
+        except Exception:
+            settings = KnowledgeConfig()  # Search works without a config file
+        index_class = DocumentIndex
+        if settings.engine == "sqlite":
+            from .fts import SQLiteDocumentIndex, fts5_available
+            if fts5_available():
+                index_class = SQLiteDocumentIndex
+        # Semantic ranking needs NumPy; without it search stays keyword-only
+        semantic = settings.semantic and numpy_available()
+        _index = index_class(
+            scorer=settings.scorer, k1=settings.bm25_k1, b=settings.bm25_b,
+            title_weight=settings.title_weight, semantic=semantic,
+            workers=settings.index_workers
+        )
     return _index
 
 
@@ -360,11 +1568,40 @@ def get_document(name: str) -> Optional[str]:
     return _get_index().get_document(name)
 
 
+def load_result(result: SearchResult) -> Optional[str]:
+    """Read a search result's passage (only its byte range of the document)."""
+    return _get_index().read_passage(result.name, result.start, result.end)
+
+
+def complete_document_names(prefix: str, limit: int = 10) -> List[str]:
+    """Document names containing prefix, best completions first."""
+    return _get_index().complete_names(prefix, limit)
+
+
 def list_documents() -> List[Dict[str, str]]:
     """List all documents in the Document Library."""
     return _get_index().list_documents()
 
 
 def refresh_index() -> int:
-    """Rebuild the document index. Returns number of documents indexed."""
-    return _get_index().build_index(force=True)
+    """Update the document index. Returns number of documents indexed."""
+    return refresh_index_stats().total
+
+
+def export_index(path: Path = INDEX_EXPORT_PATH) -> int:
+    """Export the document index as JSON. Returns number of documents exported."""
+    return _get_index().export_json(path)
+
+
+def refresh_index_stats(progress: Optional[Callable[[int, int], None]] = None) -> RefreshStats:
+    """Update the document index, re-indexing only files that changed.
+
+    Args:
+        progress: Called with (files read, files to read) as changed files are parsed
+    """
+    index = _get_index()
+    # The prewarm thread may be loading the same index
+    with index._lock:
+        if not index._loaded:
+            index._load_cache()
+        return index.refresh(progress)
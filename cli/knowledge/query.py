@@ -0,0 +1,193 @@
+"""Query syntax for Document Library search.
+
+Plain queries are a list of words, and a document matches if it contains
+any of them (ranking does the rest). Quotes and operators narrow that down:
+
+    "stream json"            exact phrase (words adjacent and in order)
+    claude AND gemini        both terms
+    claude OR gemini         either term
+    routing NOT learned      routing, but not learned
+    (claude OR gemini) AND "print mode"
+
+Operators are recognized in upper case only; AND binds tighter than OR, a
+NOT after a word implies AND, and words next to each other without an
+operator are OR-ed.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+# Words as the index sees them, before stopwords and short words are dropped
+WORD_RE = re.compile(r"\b[a-z][a-z0-9]+\b")
+
+_TOKEN_RE = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+OPERATORS = ("AND", "OR", "NOT")
+
+
+@dataclass(frozen=True)
+class Term:
+    """A single word."""
+    word: str
+
+
+@dataclass(frozen=True)
+class Phrase:
+    """Words that must appear next to each other, in order."""
+    words: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    operands: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    operands: Tuple["Node", ...]
+
+
+Node = Union[Term, Phrase, Not, And, Or]
+
+
+@dataclass(frozen=True)
+class Query:
+    """A parsed query.
+
+    Attributes:
+        text: The query as typed
+        root: Parsed expression (None if the query has no words)
+        structured: Whether the query uses quotes, parentheses or operators,
+            i.e. whether matching documents must be filtered beyond "any word"
+    """
+    text: str
+    root: Optional[Node]
+    structured: bool
+
+
+def _words(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def _word_node(text: str) -> Optional[Node]:
+    """A bare chunk: one word is a term, several (e.g. "stream-json") a phrase."""
+    words = _words(text)
+    if not words:
+        return None
+    return Term(words[0]) if len(words) == 1 else Phrase(tuple(words))
+
+
+def parse_query(text: str) -> Query:
+    """Parse a search query. Malformed input degrades to plain words, never an error."""
+    tokens = _TOKEN_RE.findall(text)
+    structured = any(token in OPERATORS or token in "()" or token.startswith('"')
+                     for token in tokens)
+    position = 0
+
+    def peek() -> Optional[str]:
+        return tokens[position] if position < len(tokens) else None
+
+    def parse_or() -> Optional[Node]:
+        nonlocal position
+        operands = []
+        while peek() is not None and peek() != ")":
+            if peek() == "OR":
+                position += 1
+                continue
+            node = parse_and()
+            if node is not None:
+                operands.append(node)
+        return _combine(Or, operands)
+
+    def parse_and() -> Optional[Node]:
+        nonlocal position
+        operands = [parse_unary()]
+        while peek() in ("AND", "NOT"):
+            if peek() == "AND":
+                position += 1
+            # "a NOT b" reads as "a AND NOT b"
+            operands.append(parse_unary())
+        return _combine(And, [node for node in operands if node is not None])
+
+    def parse_unary() -> Optional[Node]:
+        nonlocal position
+        token = peek()
+        if token is None or token == ")":
+            return None
+        position += 1
+        if token == "NOT":
+            operand = parse_unary()
+            return Not(operand) if operand is not None else None
+        if token == "(":
+            node = parse_or()
+            if peek() == ")":
+                position += 1
+            return node
+        if token in ("AND", "OR"):
+            return None  # Dangling operator
+        if token.startswith('"'):
+            words = _words(token.strip('"'))
+            if not words:
+                return None
+            return Phrase(tuple(words)) if len(words) > 1 else Term(words[0])
+        return _word_node(token)
+
+    root = None
+    while position < len(tokens):
+        node = parse_or()
+        if node is not None:
+            root = node if root is None else _combine(Or, [root, node])
+        if peek() == ")":
+            position += 1  # Unbalanced parenthesis
+    return Query(text=text, root=root, structured=structured)
+
+
+def _combine(kind, operands: List[Node]) -> Optional[Node]:
+    if not operands:
+        return None
+    if len(operands) == 1:
+        return operands[0]
+    flat = []
+    for operand in operands:
+        flat.extend(operand.operands if isinstance(operand, kind) else (operand,))
+    return kind(tuple(flat))
+
+
+def positive_words(node: Optional[Node]) -> List[str]:
+    """Words the results should be ranked by (everything outside a NOT)."""
+    if node is None or isinstance(node, Not):
+        return []
+    if isinstance(node, Term):
+        return [node.word]
+    if isinstance(node, Phrase):
+        return list(node.words)
+    return [word for operand in node.operands for word in positive_words(operand)]
+
+
+def query_words(node: Optional[Node]) -> List[str]:
+    """Every word of a query expression, negated ones included."""
+    if node is None:
+        return []
+    if isinstance(node, Not):
+        return query_words(node.operand)
+    if isinstance(node, (And, Or)):
+        return [word for operand in node.operands for word in query_words(operand)]
+    return positive_words(node)
+
+
+def replace_words(node: Optional[Node], replacements: Dict[str, str]) -> Optional[Node]:
+    """A copy of a query expression with words replaced (e.g. typos by known terms)."""
+    if node is None:
+        return None
+    if isinstance(node, Term):
+        return Term(replacements.get(node.word, node.word))
+    if isinstance(node, Phrase):
+        return Phrase(tuple(replacements.get(word, word) for word in node.words))
+    if isinstance(node, Not):
+        return Not(replace_words(node.operand, replacements))
+    return type(node)(tuple(replace_words(operand, replacements) for operand in node.operands))
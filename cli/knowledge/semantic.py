@@ -0,0 +1,270 @@
+"""Offline semantic ranking for the Document Library.
+
+Enabled with "semantic": true in the knowledge section of role_config.json
+(needs NumPy). There is no model and no network: each passage becomes a
+hashed feature vector of its words and their character trigrams, so that
+related word forms ("review", "reviewer", "reviewing") share most of their
+features. Features are hashed (with a sign) into DIMENSIONS buckets,
+weighted by 1 + log(tf) and the vector is L2-normalized.
+
+The vectors are the rows of one float32 matrix, stored as
+config/knowledge_vectors.npy and memory-mapped when opened, with the
+document and byte range of each row in knowledge_vectors.json. A query is
+vectorized the same way (weighted by IDF) and scored against every passage
+with one matrix-vector product; the best rows are picked with
+argpartition. DocumentIndex keeps the matrix in step with the lexical
+index, vectorizing only added and changed documents on refresh, and fuses
+both rankings with reciprocal rank fusion.
+"""
+
+import json
+import math
+import os
+import zlib
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+VECTORS_PATH = Path("config/knowledge_vectors.npy")
+# Bump when the features change; older vector files are rebuilt
+VECTORS_VERSION = 1
+DIMENSIONS = 512
+# Weight of each of a word's character trigrams, relative to the word itself
+SUBWORD_WEIGHT = 0.5
+# Rows vectorized together (bounds the temporary arrays)
+VECTORIZE_BATCH = 1000
+# Cosine similarity below which a passage is not a semantic match
+MIN_SIMILARITY = 0.2
+# Reciprocal rank fusion: a document scores sum(1 / (RRF_K + rank)) over the rankings
+RRF_K = 60
+
+
+def numpy_available() -> bool:
+    """Whether NumPy can be imported (semantic ranking is off without it)."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _hashed(feature: str, weight: float) -> Tuple[int, float]:
+    # crc32 rather than hash(): vectors are saved, so buckets must not change between runs
+    value = zlib.crc32(feature.encode("utf-8"))
+    return value % DIMENSIONS, weight if value & 0x80000000 else -weight
+
+
+def word_features(word: str) -> List[Tuple[int, float]]:
+    """(bucket, signed weight) of a word's features: the word and its trigrams."""
+    padded = f"<{word}>"
+    grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return [_hashed(word, 1.0)] + [_hashed("#" + gram, SUBWORD_WEIGHT) for gram in grams]
+
+
+class _FeatureTable:
+    """Hashed features of every word seen so far, flat, for NumPy to gather from.
+
+    Features do not depend on the library, so one table serves every index.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("q")  # word id -> index of its first feature
+        self.counts = array("q")  # word id -> number of features
+        self.buckets = array("q")
+        self.values = array("d")
+
+    def add(self, word: str) -> int:
+        """Id of a new word, whose features are computed and appended."""
+        features = word_features(word)
+        self.offsets.append(len(self.buckets))
+        self.counts.append(len(features))
+        for bucket, value in features:
+            self.buckets.append(bucket)
+            self.values.append(value)
+        word_id = self.ids[word] = len(self.ids)
+        return word_id
+
+
+_table = _FeatureTable()
+
+
+def vectorize(rows: Sequence[Mapping[str, float]]):
+    """L2-normalized hashed vectors of weighted words, as a (len(rows), DIMENSIONS) array.
+
+    Python only visits each (row, word) pair; the features of the words are
+    then scattered into the matrix by NumPy, VECTORIZE_BATCH rows at a time.
+    """
+    import numpy as np
+
+    matrix = np.zeros((len(rows), DIMENSIONS), dtype=np.float32)
+    table = _table
+    for first in range(0, len(rows), VECTORIZE_BATCH):
+        batch = rows[first:first + VECTORIZE_BATCH]
+        row_ids, word_ids, weights = array("q"), array("q"), array("d")
+        for row, row_weights in enumerate(batch):
+            for word, weight in row_weights.items():
+                word_id = table.ids.get(word)
+                if word_id is None:
+                    word_id = table.add(word)
+                row_ids.append(row)
+                word_ids.append(word_id)
+                weights.append(weight)
+        if not word_ids:
+            continue
+
+        # One entry per (row, word, feature of the word). The table is copied,
+        # as it cannot grow while NumPy holds a view of it.
+        word_ids = np.frombuffer(word_ids, dtype=np.int64)
+        repeat = np.array(table.counts)[word_ids]
+        ends = np.cumsum(repeat)
+        feature = (np.repeat(np.array(table.offsets)[word_ids] - ends + repeat, repeat)
+                   + np.arange(ends[-1]))
+        cells = (np.repeat(np.frombuffer(row_ids, dtype=np.int64), repeat) * DIMENSIONS
+                 + np.array(table.buckets)[feature])
+        scaled = (np.repeat(np.frombuffer(weights, dtype=np.float64), repeat)
+                  * np.array(table.values)[feature])
+        matrix[first:first + len(batch)] = np.bincount(
+            cells, weights=scaled, minlength=len(batch) * DIMENSIONS
+        ).reshape(len(batch), DIMENSIONS)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def term_weights(terms: Mapping[str, int]) -> Dict[str, float]:
+    """Sublinear weights of a passage's term counts."""
+    return {term: 1.0 + math.log(count) for term, count in terms.items() if count > 0}
+
+
+def fuse(rankings: Sequence[Sequence[str]]) -> List[Tuple[str, float]]:
+    """Reciprocal rank fusion of ranked document names, best first."""
+    scores: Counter = Counter()
+    for ranking in rankings:
+        for rank, name in enumerate(ranking, 1):
+            scores[name] += 1.0 / (RRF_K + rank)
+    return scores.most_common()
+
+
+@dataclass(frozen=True)
+class VectorRow:
+    """The document byte range (a passage) a matrix row stands for."""
+    name: str
+    section: str
+    start: int
+    end: Optional[int]
+
+
+class VectorIndex:
+    """Passage vectors of the library, one row per passage."""
+
+    def __init__(self):
+        self.rows: List[VectorRow] = []
+        self.matrix = None  # (rows, DIMENSIONS) float32; memory-mapped after load()
+        self.loaded = False
+
+    def clear(self):
+        """Drop every row (e.g. before a full rebuild)."""
+        import numpy as np
+
+        self.rows = []
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self.loaded = True
+
+    def load(self, path: Optional[Path] = None) -> bool:
+        """Open a saved matrix, memory-mapped. Returns False (and starts empty) if unusable."""
+        import numpy as np
+
+        path = path or VECTORS_PATH
+        self.clear()
+        try:
+            meta = json.loads(_rows_path(path).read_text(encoding="utf-8"))
+            if meta.get("version") != VECTORS_VERSION or meta.get("dimensions") != DIMENSIONS:
+                return False
+            matrix = np.load(path, mmap_mode="r")
+            rows = [VectorRow(*row) for row in meta["rows"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if matrix.dtype != np.float32 or matrix.shape != (len(rows), DIMENSIONS):
+            return False
+        self.rows = rows
+        self.matrix = matrix
+        return True
+
+    def save(self, path: Optional[Path] = None):
+        """Write the matrix and its rows (each file replaced atomically)."""
+        import numpy as np
+
+        path = path or VECTORS_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix))
+        meta = {
+            "version": VECTORS_VERSION,
+            "dimensions": DIMENSIONS,
+            "rows": [[row.name, row.section, row.start, row.end] for row in self.rows]
+        }
+        rows_path = _rows_path(path)
+        rows_tmp = rows_path.with_name(rows_path.name + ".tmp")
+        rows_tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, path)
+        os.replace(rows_tmp, rows_path)
+
+    def names(self) -> Set[str]:
+        """Documents that have rows."""
+        return {row.name for row in self.rows}
+
+    def update(self, removed: Iterable[str], added: Sequence[Tuple[VectorRow, Mapping[str, float]]]):
+        """Drop the rows of removed documents and append vectors for new rows.
+
+        Args:
+            removed: Names of documents whose rows go
+            added: (row, word weights) to vectorize and append
+        """
+        import numpy as np
+
+        removed = set(removed)
+        keep = [i for i, row in enumerate(self.rows) if row.name not in removed]
+        # Indexing copies, so the result no longer refers to the mapped file
+        parts = [np.asarray(self.matrix[keep], dtype=np.float32).reshape(-1, DIMENSIONS)]
+        if added:
+            parts.append(vectorize([weights for _, weights in added]))
+        self.rows = [self.rows[i] for i in keep] + [row for row, _ in added]
+        self.matrix = np.concatenate(parts)
+
+    def search(self, weights: Mapping[str, float], top_k: int) -> List[Tuple[float, VectorRow]]:
+        """(similarity, best row) of the top_k most similar documents.
+
+        Every row is scored with one matrix-vector product; argpartition
+        then picks the best rows without sorting them all. Rows are read
+        best first until top_k distinct documents are found.
+        """
+        import numpy as np
+
+        if not self.rows or not weights:
+            return []
+        scores = self.matrix @ vectorize([weights])[0]
+        count = min(len(scores), top_k * 4)
+        while True:
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            results: Dict[str, Tuple[float, VectorRow]] = {}
+            for i in best:
+                score = float(scores[i])
+                if score < MIN_SIMILARITY or len(results) == top_k:
+                    return list(results.values())
+                row = self.rows[i]
+                if row.name not in results:
+                    results[row.name] = (score, row)
+            if count == len(scores):
+                return list(results.values())
+            # Too many rows from the same documents: look further down
+            count = min(len(scores), count * 4)
+
+
+def _rows_path(path: Path) -> Path:
+    return path.with_suffix(".json")
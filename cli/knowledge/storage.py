@@ -0,0 +1,575 @@
+"""Compact on-disk format for the document index.
+
+The index is stored as two files, both opened with mmap:
+
+    knowledge_index.bin     header, document table, string pool, body and
+                            title term dictionaries, postings, passage table,
+                            per-passage term frequencies and term positions
+    knowledge_index.bodies  document bodies (UTF-8), read by offset on demand
+
+All integers are little-endian. The term dictionaries are tables of
+fixed-width records sorted by term, so a term is found by binary search
+without decoding the rest of the file, and its postings are a run of
+(document id, frequency, first position) records sorted by document id;
+each body posting points at its run of (word position, byte offset) pairs,
+so phrases and snippets need no document text. Each document owns a run of passages
+(sections), stored as a byte range of its body with (term number, frequency)
+pairs. Opening an index decodes only the document table; term lookups,
+passages and bodies cost nothing until a query needs them.
+
+Both files carry the same random build id, so a crash between writing one
+and the other is detected and the index is rebuilt instead of misread.
+
+A small change does not rewrite these files: documents added or changed
+since they were written go to a delta segment in the same format
+(knowledge_index.delta.bin and .bodies), and documents removed or
+replaced are listed as tombstones in knowledge_index.delta.json, with the
+build ids of both segments. DeltaPostings reads the two as one. A delta
+written against another build of the index is ignored.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from array import array
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+MAGIC = b"WFIX"
+BODIES_MAGIC = b"WFBD"
+FORMAT_VERSION = 3
+
+# magic, version, build id, documents, body terms, title terms, passages,
+# scanned_at_ns, then the offsets of the document table, string pool, body and
+# title term tables, postings, passage table, passage terms and positions
+_HEADER = struct.Struct("<4sI16sIIIIq8Q")
+# name, path, title (offset, length into the string pool), body offset and
+# length, body and title term counts, first passage and passage count, doc
+# type, mtime_ns, size, sha256
+_DOC = struct.Struct("<IIIIIIQIIIIIBxxxqQ32s")
+# term (offset, length into the string pool), postings offset, document frequency
+_TERM = struct.Struct("<IIQI")
+# document id, frequency, first (word position, byte offset) pair of the
+# occurrences (there are frequency of them), or _NO_POSITIONS
+_POSTING = struct.Struct("<III")
+_NO_POSITIONS = 0xFFFFFFFF
+# section path (offset, length into the string pool), byte range in the body,
+# first entry and count in the passage terms
+_PASSAGE = struct.Struct("<IIIIII")
+# passage terms: (term number, frequency); positions: (word position, byte offset)
+_PAIR = struct.Struct("<II")
+_BODIES_HEADER = struct.Struct("<4s16s")
+# Version of the delta segment's tombstone file
+DELTA_VERSION = 1
+
+DOC_TYPES = ("markdown", "docx")
+
+
+@dataclass
+class Passage:
+    """A section of a document: its heading path and byte range in the body."""
+    section: str  # e.g. "Gemini CLI > Authentication"; "" before the first heading
+    start: int  # byte offsets into the UTF-8 body
+    end: int
+    terms: Dict[str, int] = field(default_factory=dict)  # term -> frequency
+
+    @property
+    def length(self) -> int:
+        return sum(self.terms.values())
+
+
+@dataclass
+class StoredDocument:
+    """A document as stored in the index file."""
+    name: str
+    path: str
+    doc_type: str
+    title: str
+    body_length: int  # number of body terms
+    title_length: int  # number of title terms
+    fingerprint: Optional[Tuple[int, int, str]]  # (mtime_ns, size, sha256)
+    content: Optional[str] = None  # set when writing; read lazily when mapped
+    passages: Optional[List[Passage]] = None  # set when writing; read lazily when mapped
+    # term -> flat (word position, byte offset) pairs; set when writing
+    positions: Optional[Mapping[str, Sequence[int]]] = None
+
+
+def bodies_path(index_path: Path) -> Path:
+    """The bodies file stored next to an index file."""
+    return index_path.with_suffix(".bodies")
+
+
+def delta_path(index_path: Path) -> Path:
+    """The delta segment stored next to an index file."""
+    return index_path.with_name(index_path.stem + ".delta.bin")
+
+
+class _StringPool:
+    """Collects UTF-8 strings and hands out (offset, length) references."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def add(self, text: str) -> Tuple[int, int]:
+        encoded = text.encode("utf-8")
+        offset = len(self.data)
+        self.data += encoded
+        return offset, len(encoded)
+
+
+def write_index(index_path: Path, documents: List[StoredDocument],
+                postings: Mapping[str, Dict[str, int]],
+                title_postings: Mapping[str, Dict[str, int]],
+                scanned_at_ns: int = 0) -> bytes:
+    """Write an index and its bodies file, replacing any previous version.
+
+    Args:
+        index_path: Index file to write (the bodies file goes next to it)
+        documents: Documents in id order, with their content
+        postings: term -> {document name: frequency} for document bodies
+        title_postings: The same for document titles
+        scanned_at_ns: When the library was last scanned
+
+    Returns:
+        The build id stored in both files
+    """
+    build_id = os.urandom(16)
+    doc_ids = {doc.name: i for i, doc in enumerate(documents)}
+    pool = _StringPool()
+
+    body_terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    term_numbers = {term: i for i, term in enumerate(body_terms)}
+
+    bodies = bytearray(_BODIES_HEADER.pack(BODIES_MAGIC, build_id))
+    doc_table = bytearray()
+    passage_table = bytearray()
+    passage_terms = bytearray()
+    num_passages = num_passage_terms = 0
+    for doc in documents:
+        body = (doc.content or "").encode("utf-8")
+        body_offset = len(bodies)
+        bodies += body
+        first_passage = num_passages
+        for passage in doc.passages or ():
+            numbered = sorted((term_numbers[term], freq) for term, freq in passage.terms.items()
+                              if term in term_numbers)
+            passage_table += _PASSAGE.pack(*pool.add(passage.section), passage.start, passage.end,
+                                           num_passage_terms, len(numbered))
+            for number, freq in numbered:
+                passage_terms += _PAIR.pack(number, freq)
+            num_passage_terms += len(numbered)
+            num_passages += 1
+        mtime_ns, size, digest = doc.fingerprint or (0, 0, "")
+        doc_table += _DOC.pack(
+            *pool.add(doc.name), *pool.add(doc.path), *pool.add(doc.title),
+            body_offset, len(body), doc.body_length, doc.title_length,
+            first_passage, num_passages - first_passage,
+            DOC_TYPES.index(doc.doc_type) if doc.doc_type in DOC_TYPES else 0,
+            mtime_ns, size, bytes.fromhex(digest) if digest else b"",
+        )
+
+    postings_data = bytearray()
+    positions_data = array("I")
+    term_tables = []
+    for field_postings, terms in ((postings, body_terms),
+                                  (title_postings, sorted(title_postings,
+                                                          key=lambda t: t.encode("utf-8")))):
+        table = bytearray()
+        for term in terms:
+            docs = field_postings[term]
+            table += _TERM.pack(*pool.add(term), len(postings_data), len(docs))
+            for doc_id, freq in sorted((doc_ids[name], freq) for name, freq in docs.items()):
+                first = _NO_POSITIONS
+                occurrences = (documents[doc_id].positions or {}).get(term, ()) \
+                    if field_postings is postings else ()
+                if len(occurrences) == 2 * freq:
+                    first = len(positions_data) // 2
+                    positions_data.extend(occurrences)
+                postings_data += _POSTING.pack(doc_id, freq, first)
+        term_tables.append(table)
+    if sys.byteorder != "little":
+        positions_data.byteswap()
+
+    docs_offset = _HEADER.size
+    strings_offset = docs_offset + len(doc_table)
+    body_terms_offset = strings_offset + len(pool.data)
+    title_terms_offset = body_terms_offset + len(term_tables[0])
+    postings_offset = title_terms_offset + len(term_tables[1])
+    passages_offset = postings_offset + len(postings_data)
+    passage_terms_offset = passages_offset + len(passage_table)
+    positions_offset = passage_terms_offset + len(passage_terms)
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, build_id, len(documents),
+        len(term_tables[0]) // _TERM.size, len(term_tables[1]) // _TERM.size, num_passages,
+        scanned_at_ns, docs_offset, strings_offset, body_terms_offset, title_terms_offset,
+        postings_offset, passages_offset, passage_terms_offset, positions_offset,
+    )
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    # Bodies first: an index is only trusted when both build ids match
+    _write_atomic(bodies_path(index_path), bodies)
+    _write_atomic(index_path, b"".join((header, doc_table, pool.data, term_tables[0],
+                                        term_tables[1], postings_data, passage_table,
+                                        passage_terms, positions_data.tobytes())))
+    return build_id
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class _TermPostings(Mapping):
+    """Read-only term -> {document name: frequency} view over a term table."""
+
+    def __init__(self, index: "MappedIndex", table_offset: int, count: int):
+        self._index = index
+        self._table = table_offset
+        self._count = count
+
+    def _record(self, i: int) -> Tuple[int, int, int, int]:
+        return _TERM.unpack_from(self._index._mm, self._table + i * _TERM.size)
+
+    def _find(self, term: str) -> Optional[Tuple[int, int]]:
+        """Binary search for a term; returns (postings offset, document frequency)."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            string_offset, length, postings_offset, doc_freq = self._record(mid)
+            candidate = self._index._string_bytes(string_offset, length)
+            if candidate == key:
+                return postings_offset, doc_freq
+            if candidate < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def term(self, number: int) -> str:
+        """The term at a position of the sorted table."""
+        string_offset, length, _, _ = self._record(number)
+        return self._index._string_bytes(string_offset, length).decode("utf-8")
+
+    def _decode(self, postings_offset: int, doc_freq: int) -> Dict[str, int]:
+        names = self._index.doc_names
+        start = self._index._postings + postings_offset
+        data = self._index._mm[start:start + doc_freq * _POSTING.size]
+        return {names[doc_id]: freq for doc_id, freq, _ in _POSTING.iter_unpack(data)}
+
+    def positions(self, term: str, name: str) -> List[Tuple[int, int]]:
+        """(word position, byte offset) of each occurrence of a term in one document.
+
+        Postings are sorted by document id, so the document is found by
+        binary search and only its occurrences are decoded.
+        """
+        found = self._find(term)
+        doc_id = self._index.doc_ids.get(name)
+        if found is None or doc_id is None:
+            return []
+        mm = self._index._mm
+        start = self._index._postings + found[0]
+        lo, hi = 0, found[1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate, freq, first = _POSTING.unpack_from(mm, start + mid * _POSTING.size)
+            if candidate == doc_id:
+                if first == _NO_POSITIONS:
+                    return []
+                offset = self._index._positions + first * _PAIR.size
+                return list(_PAIR.iter_unpack(mm[offset:offset + freq * _PAIR.size]))
+            if candidate < doc_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return []
+
+    def iter_positions(self) -> Iterator[Tuple[str, str, array]]:
+        """(term, document name, flat positions) for every posting that has positions."""
+        mm, names = self._index._mm, self._index.doc_names
+        for string_offset, length, postings_offset, doc_freq in (
+                self._record(i) for i in range(self._count)):
+            term = self._index._string_bytes(string_offset, length).decode("utf-8")
+            start = self._index._postings + postings_offset
+            for doc_id, freq, first in _POSTING.iter_unpack(
+                    mm[start:start + doc_freq * _POSTING.size]):
+                occurrences = array("I")
+                if first == _NO_POSITIONS:
+                    continue
+                offset = self._index._positions + first * _PAIR.size
+                occurrences.frombytes(mm[offset:offset + freq * _PAIR.size])
+                if sys.byteorder != "little":
+                    occurrences.byteswap()
+                yield term, names[doc_id], occurrences
+
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        found = self._find(term) if isinstance(term, str) else None
+        if found is None:
+            raise KeyError(term)
+        return self._decode(*found)
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._find(term) is not None
+
+    def doc_freq(self, term: str) -> int:
+        found = self._find(term)
+        return found[1] if found else 0
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            string_offset, length, _, _ = self._record(i)
+            yield self._index._string_bytes(string_offset, length).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self):
+        for i in range(self._count):
+            string_offset, length, postings_offset, doc_freq = self._record(i)
+            term = self._index._string_bytes(string_offset, length).decode("utf-8")
+            yield term, self._decode(postings_offset, doc_freq)
+
+
+class DeltaPostings(Mapping):
+    """term -> {document name: frequency} of a mapped index with changes on top.
+
+    Documents in removed (tombstones) are hidden from the mapped postings,
+    and added holds the postings of documents indexed since the file was
+    written. A document that is still visible in the file is never in
+    added; a changed one is both removed and added.
+    """
+
+    def __init__(self, base: _TermPostings, removed: Set[str]):
+        self.base = base
+        self.removed = removed  # shared with the owner, which updates it
+        self.added: Dict[str, Dict[str, int]] = {}
+
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        docs = self.base.get(term)
+        if docs and self.removed:
+            docs = {name: freq for name, freq in docs.items() if name not in self.removed}
+        extra = self.added.get(term)
+        if extra:
+            docs = {**(docs or {}), **extra}
+        if not docs:
+            raise KeyError(term)
+        return docs
+
+    def __contains__(self, term) -> bool:
+        if not isinstance(term, str):
+            return False
+        if term in self.added:
+            return True
+        doc_freq = self.base.doc_freq(term)
+        if doc_freq > len(self.removed):
+            return True  # Not every document can be hidden
+        return doc_freq > 0 and any(name not in self.removed for name in self.base[term])
+
+    def doc_freq(self, term: str) -> int:
+        if not self.removed:
+            return self.base.doc_freq(term) + len(self.added.get(term) or ())
+        return len(self.get(term) or ())
+
+    def __iter__(self) -> Iterator[str]:
+        for term in self.base:
+            if term in self:
+                yield term
+        for term in self.added:
+            if term not in self.base:
+                yield term
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class MappedIndex:
+    """An index file opened with mmap.
+
+    Use open_index() to open one; close() releases the mappings.
+    """
+
+    def __init__(self, index_path: Path):
+        self._file = open(index_path, "rb")
+        self._bodies_file = None
+        self._mm = self._bodies = None
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, self.build_id, num_docs, body_terms, title_terms, _, self.scanned_at_ns,
+             self._docs, self._strings, body_table, title_table, self._postings,
+             self._passages, self._passage_terms,
+             self._positions) = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("not a current index file")
+
+            self._bodies_file = open(bodies_path(index_path), "rb")
+            self._bodies = mmap.mmap(self._bodies_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if _BODIES_HEADER.unpack_from(self._bodies, 0) != (BODIES_MAGIC, self.build_id):
+                raise ValueError("bodies file does not belong to this index")
+
+            self._read_documents(num_docs, body_table)
+            self.postings = _TermPostings(self, body_table, body_terms)
+            self.title_postings = _TermPostings(self, title_table, title_terms)
+        except Exception:
+            self.close()
+            raise
+
+    def _string_bytes(self, offset: int, length: int) -> bytes:
+        start = self._strings + offset
+        return self._mm[start:start + length]
+
+    def _read_documents(self, num_docs: int, strings_end: int) -> None:
+        """Decode the document table (the only part of the file read up front)."""
+        table = self._mm[self._docs:self._docs + num_docs * _DOC.size]
+        pool = self._mm[self._strings:strings_end]
+        self.documents: List[StoredDocument] = []
+        self._body_refs: Dict[str, Tuple[int, int]] = {}
+        self._passage_refs: Dict[str, Tuple[int, int]] = {}
+        for (name_off, name_len, path_off, path_len, title_off, title_len, body_offset, body_size,
+             body_length, title_length, first_passage, passage_count, doc_type, mtime_ns, size,
+             digest) in _DOC.iter_unpack(table):
+            name = pool[name_off:name_off + name_len].decode("utf-8")
+            self.documents.append(StoredDocument(
+                name=name,
+                path=pool[path_off:path_off + path_len].decode("utf-8"),
+                doc_type=DOC_TYPES[doc_type] if doc_type < len(DOC_TYPES) else DOC_TYPES[0],
+                title=pool[title_off:title_off + title_len].decode("utf-8"),
+                body_length=body_length,
+                title_length=title_length,
+                fingerprint=(mtime_ns, size, digest.hex()) if size or mtime_ns else None,
+            ))
+            self._body_refs[name] = (body_offset, body_size)
+            self._passage_refs[name] = (first_passage, passage_count)
+        self.doc_names = [doc.name for doc in self.documents]
+        self.doc_ids = {name: i for i, name in enumerate(self.doc_names)}
+
+    def read_body(self, name: str, start: int = 0, end: Optional[int] = None) -> str:
+        """Read one document's body, or a byte range of it, from the bodies file."""
+        return self.read_bytes(name, start, end).decode("utf-8", errors="replace")
+
+    def read_bytes(self, name: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """A byte range of one document's UTF-8 body."""
+        offset, size = self._body_refs[name]
+        end = size if end is None else min(end, size)
+        return self._bodies[offset + min(start, size):offset + end]
+
+    def read_passages(self, name: str) -> List[Passage]:
+        """Decode one document's passages."""
+        first, count = self._passage_refs[name]
+        records = self._mm[self._passages + first * _PASSAGE.size:
+                           self._passages + (first + count) * _PASSAGE.size]
+        passages = []
+        for section_off, section_len, start, end, terms_first, terms_count in \
+                _PASSAGE.iter_unpack(records):
+            pairs = self._mm[self._passage_terms + terms_first * _PAIR.size:
+                             self._passage_terms + (terms_first + terms_count) * _PAIR.size]
+            passages.append(Passage(
+                section=self._string_bytes(section_off, section_len).decode("utf-8"),
+                start=start,
+                end=end,
+                terms={self.postings.term(number): freq
+                       for number, freq in _PAIR.iter_unpack(pairs)},
+            ))
+        return passages
+
+    def close(self) -> None:
+        for resource in (self._mm, self._bodies, self._file, self._bodies_file):
+            if resource is not None:
+                try:
+                    resource.close()
+                except Exception:
+                    pass
+        self._mm = self._bodies = self._file = self._bodies_file = None
+
+
+@dataclass
+class Delta:
+    """The delta segment of an index, opened (see open_delta)."""
+    mapped: MappedIndex  # documents added or changed since the index was written
+    removed: Set[str]  # documents of the index removed or replaced (tombstones)
+    fingerprints: Dict[str, Tuple[int, int, str]]  # updated fingerprints of unchanged documents
+    scanned_at_ns: int
+
+
+def write_delta(index_path: Path, base_id: bytes, documents: List[StoredDocument],
+                postings: Mapping[str, Dict[str, int]],
+                title_postings: Mapping[str, Dict[str, int]], removed: Set[str],
+                fingerprints: Mapping[str, Tuple[int, int, str]], scanned_at_ns: int) -> None:
+    """Write the delta segment of an index, replacing any previous one.
+
+    Args:
+        index_path: Index file the delta applies to
+        base_id: Build id of that index file
+        documents: Documents added or changed since it was written
+        postings: term -> {document name: frequency} of those documents' bodies
+        title_postings: The same for their titles
+        removed: Documents of the index file removed or replaced
+        fingerprints: New fingerprints of documents touched but not changed
+        scanned_at_ns: When the library was last scanned
+    """
+    path = delta_path(index_path)
+    delta_id = write_index(path, documents, postings, title_postings, scanned_at_ns)
+    meta = {
+        "version": DELTA_VERSION,
+        "base": base_id.hex(),
+        "delta": delta_id.hex(),
+        "removed": sorted(removed),
+        "fingerprints": dict(fingerprints),
+        "scanned_at_ns": scanned_at_ns,
+    }
+    # Written last: it names the segments it joins
+    _write_atomic(_tombstones_path(path), json.dumps(meta).encode("utf-8"))
+
+
+def open_delta(index_path: Path, base_id: bytes) -> Optional[Delta]:
+    """Open the delta segment written against this build of an index, if any."""
+    path = delta_path(index_path)
+    try:
+        meta = json.loads(_tombstones_path(path).read_text(encoding="utf-8"))
+        if meta.get("version") != DELTA_VERSION or meta.get("base") != base_id.hex():
+            return None
+    except (OSError, ValueError, AttributeError):
+        return None
+    mapped = open_index(path)
+    if mapped is None:
+        return None
+    try:
+        if mapped.build_id.hex() != meta["delta"]:
+            raise ValueError("delta segment was replaced")
+        return Delta(
+            mapped=mapped,
+            removed=set(meta["removed"]),
+            fingerprints={name: tuple(fingerprint)
+                          for name, fingerprint in meta["fingerprints"].items()},
+            scanned_at_ns=int(meta["scanned_at_ns"]),
+        )
+    except (KeyError, TypeError, ValueError, AttributeError):
+        mapped.close()
+        return None
+
+
+def remove_delta(index_path: Path) -> None:
+    """Delete the delta segment of an index (once merged into the index)."""
+    path = delta_path(index_path)
+    for target in (_tombstones_path(path), path, bodies_path(path)):
+        try:
+            target.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _tombstones_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def open_index(index_path: Path) -> Optional[MappedIndex]:
+    """Open an index file, or None if it is missing, outdated or damaged."""
+    try:
+        if not index_path.exists():
+            return None
+        return MappedIndex(index_path)
+    except Exception:
+        return None
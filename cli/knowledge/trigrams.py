@@ -0,0 +1,139 @@
+"""Character n-gram index for substring, fuzzy and completion lookups.
+
+Each key (a vocabulary term or a document name) is filed under its
+padded trigrams ("  w", " wo", "wor", ...). A lookup only reads the keys
+filed under the query's own trigrams, so its cost follows how many keys
+share those trigrams rather than how many keys there are:
+
+- substring: keys filed under every trigram of the query, then checked
+  with `in`; a two-character query reads the trigrams starting with it
+- fuzzy: keys sharing enough trigrams to be within the edit distance
+  (each edit changes at most a few trigrams), then checked with a bounded
+  edit distance
+- completion: substring matches, ranked prefix-first
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Most trigrams one edit (insertion, deletion, substitution or transposition) can change
+_GRAMS_PER_EDIT = 4
+
+
+def trigrams(text: str, padded: bool = True) -> Set[str]:
+    """Trigrams of a lowercased string, padded so that its ends count too."""
+    text = f"  {text} " if padded else text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance counting a transposition as one edit.
+
+    Stops early once the distance must exceed limit, returning limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = char_a != char_b
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class TrigramIndex:
+    """Keys filed under their trigrams (matching is case-insensitive)."""
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self._by_prefix: Dict[str, Set[str]] = defaultdict(set)  # first two characters -> trigrams
+        self._keys: Set[str] = set()
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str):
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        for gram in trigrams(key.lower()):
+            keys = self._grams[gram]
+            if not keys:
+                self._by_prefix[gram[:2]].add(gram)
+            keys.add(key)
+
+    def discard(self, key: str):
+        if key not in self._keys:
+            return
+        self._keys.discard(key)
+        for gram in trigrams(key.lower()):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+                    self._by_prefix[gram[:2]].discard(gram)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def substring(self, text: str) -> List[str]:
+        """Keys containing text, in no particular order."""
+        text = text.lower()
+        if not text:
+            return []
+        if len(text) == 1:
+            # No n-gram to look up; single characters are rare queries
+            return [key for key in self._keys if text in key.lower()]
+        if len(text) == 2:
+            # Every occurrence starts a padded trigram (the padding covers the end)
+            found = set()
+            for gram in self._by_prefix.get(text, ()):
+                found.update(self._grams[gram])
+            return list(found)
+        postings = sorted((self._grams.get(gram, set()) for gram in trigrams(text, padded=False)),
+                          key=len)
+        if not postings[0]:
+            return []
+        candidates = postings[0].intersection(*postings[1:])
+        return [key for key in candidates if text in key.lower()]
+
+    def fuzzy(self, text: str, max_distance: int) -> List[Tuple[int, str]]:
+        """(distance, key) of the keys within max_distance edits, closest first."""
+        text = text.lower()
+        grams = trigrams(text)
+        shared = Counter(key for gram in grams for key in self._grams.get(gram, ()))
+        needed = max(1, len(grams) - _GRAMS_PER_EDIT * max_distance)
+        matches = []
+        for key, count in shared.items():
+            if count < needed:
+                continue
+            distance = edit_distance(text, key.lower(), max_distance)
+            if distance <= max_distance:
+                matches.append((distance, key))
+        return sorted(matches)
+
+    def complete(self, text: str, limit: int = 10) -> List[str]:
+        """Keys containing text, best completions first.
+
+        Keys starting with text come first, then matches at the start of a
+        word, then the rest; shorter keys first within each group.
+        """
+        text = text.lower()
+
+        def rank(key: str):
+            lowered = key.lower()
+            position = lowered.find(text)
+            at_word = position == 0 or not lowered[position - 1].isalnum()
+            return (position != 0, not at_word, len(key), lowered)
+
+        return sorted(self.substring(text), key=rank)[:limit]
@@ -0,0 +1,306 @@
+"""Learned routing from run history for Terminal AI Workflow CLI.
+
+A multinomial naive Bayes classifier over hashed token features. It is trained
+offline from routes recorded in logs/routes.jsonl (keyword-matched routes whose
+tool run succeeded) and consulted by route_sentence only for sentences that no
+keyword matches.
+"""
+
+import json
+import math
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROUTE_HISTORY_PATH = Path("logs/routes.jsonl")
+ROUTER_MODEL_PATH = Path("config/router_model.json")
+# The history is rotated to routes.jsonl.1 (replacing the previous one) past this size
+ROUTE_HISTORY_MAX_BYTES = 5 * 1024 * 1024
+
+# Hashed feature space (unigrams + bigrams)
+NUM_FEATURES = 1 << 14
+MODEL_VERSION = 1
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9_-]*")
+
+
+def extract_features(sentence: str) -> List[int]:
+    """Hash a sentence's unigrams and bigrams into feature buckets."""
+    words = _WORD.findall(sentence.lower())
+    features = [zlib.crc32(w.encode()) % NUM_FEATURES for w in words]
+    for first, second in zip(words, words[1:]):
+        features.append(zlib.crc32(f"{first} {second}".encode()) % NUM_FEATURES)
+    return features
+
+
+def record_routes(routes, exit_codes: Dict[str, int], path: Optional[Path] = None) -> None:
+    """Append routed sentences and their tool outcomes to the run history.
+
+    Only called when routing.record_history is enabled, since the history
+    holds the full text of every prompt.
+
+    Args:
+        routes: Routes from route_input (one per sentence)
+        exit_codes: tool -> exit code of the run that handled its sentences
+        path: History file (defaults to logs/routes.jsonl)
+    """
+    path = path or ROUTE_HISTORY_PATH
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if path.stat().st_size >= ROUTE_HISTORY_MAX_BYTES:
+                os.replace(path, path.with_name(path.name + ".1"))
+        except FileNotFoundError:
+            pass
+        now = time.time()
+        with open(path, "a", encoding="utf-8") as f:
+            for route in routes:
+                f.write(json.dumps({
+                    "ts": now,
+                    "sentence": route.task,
+                    "tool": route.tool,
+                    "role": route.matched_role,
+                    "keyword": route.matched_keyword,
+                    "exit_code": exit_codes.get(route.tool),
+                }) + "\n")
+    except Exception:
+        pass  # History is optional
+
+
+@dataclass
+class NaiveBayesRouter:
+    """Naive Bayes role classifier over hashed features.
+
+    Stores raw counts so training can continue incrementally; log
+    probabilities are derived on load.
+    """
+    roles: List[str] = field(default_factory=list)
+    doc_counts: Dict[str, int] = field(default_factory=dict)
+    feature_counts: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    history_offset: int = 0  # bytes of history already trained on
+    history_head: Optional[int] = None  # crc32 of the history's first line at that offset
+    alpha: float = 1.0
+
+    def __post_init__(self):
+        self._compiled: Optional[List[Tuple[str, float, Dict[int, float], float]]] = None
+
+    def train(self, examples: Iterable[Tuple[str, str]]) -> int:
+        """Add (sentence, role) examples. Returns the number added."""
+        added = 0
+        for sentence, role in examples:
+            if role not in self.doc_counts:
+                self.roles.append(role)
+                self.doc_counts[role] = 0
+                self.feature_counts[role] = {}
+            self.doc_counts[role] += 1
+            counts = self.feature_counts[role]
+            for feature in extract_features(sentence):
+                counts[feature] = counts.get(feature, 0) + 1
+            added += 1
+        self._compiled = None
+        return added
+
+    def _compile(self):
+        """Precompute log priors and per-feature log likelihoods."""
+        total_docs = sum(self.doc_counts.values())
+        compiled = []
+        for role in self.roles:
+            counts = self.feature_counts[role]
+            denom = sum(counts.values()) + self.alpha * NUM_FEATURES
+            log_prior = math.log(self.doc_counts[role] / total_docs)
+            log_likelihood = {f: math.log((c + self.alpha) / denom) for f, c in counts.items()}
+            unseen = math.log(self.alpha / denom)
+            compiled.append((role, log_prior, log_likelihood, unseen))
+        self._compiled = compiled
+
+    def predict(self, sentence: str) -> Optional[Tuple[str, float]]:
+        """Return (role, probability) for a sentence, or None if untrained."""
+        if not self.roles:
+            return None
+        if self._compiled is None:
+            self._compile()
+
+        features = extract_features(sentence)
+        if not features:
+            return None
+
+        scores = []
+        for role, log_prior, log_likelihood, unseen in self._compiled:
+            score = log_prior
+            for feature in features:
+                score += log_likelihood.get(feature, unseen)
+            scores.append(score)
+
+        # Softmax over roles for a probability
+        top = max(scores)
+        weights = [math.exp(s - top) for s in scores]
+        best = scores.index(top)
+        return self._compiled[best][0], weights[best] / sum(weights)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "num_features": NUM_FEATURES,
+            "alpha": self.alpha,
+            "history_offset": self.history_offset,
+            "history_head": self.history_head,
+            "roles": self.roles,
+            "doc_counts": self.doc_counts,
+            # Sparse counts as flat [bucket, count, ...] lists to keep the file small
+            "feature_counts": {
+                role: [x for item in sorted(counts.items()) for x in item]
+                for role, counts in self.feature_counts.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesRouter":
+        if data.get("version") != MODEL_VERSION or data.get("num_features") != NUM_FEATURES:
+            raise ValueError("Incompatible router model")
+        feature_counts = {}
+        for role, flat in data.get("feature_counts", {}).items():
+            feature_counts[role] = dict(zip(flat[0::2], flat[1::2]))
+        return cls(
+            roles=list(data.get("roles", [])),
+            doc_counts=dict(data.get("doc_counts", {})),
+            feature_counts=feature_counts,
+            history_offset=data.get("history_offset", 0),
+            history_head=data.get("history_head"),
+            alpha=data.get("alpha", 1.0),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "NaiveBayesRouter":
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+@dataclass
+class TrainStats:
+    """Summary of a train_router run."""
+    examples_added: int
+    records_read: int
+    total_examples: int
+    roles: Dict[str, int]
+
+
+def _read_history(path: Path, offset: int) -> Tuple[List[dict], int]:
+    """Read complete history records starting at a byte offset."""
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Partial line still being written
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, offset
+
+
+def _history_head(path: Path) -> int:
+    """crc32 of the history's first line, which changes when the file is rotated."""
+    with open(path, "rb") as f:
+        return zlib.crc32(f.readline())
+
+
+def train_router(history_path: Optional[Path] = None, model_path: Optional[Path] = None,
+                 full: bool = False) -> TrainStats:
+    """Train (or continue training) the router model from run history.
+
+    Only keyword-labelled routes whose tool run succeeded are used as examples;
+    routes the learned router chose itself are skipped, so the model never
+    trains on its own predictions.
+
+    Args:
+        history_path: Route history (defaults to logs/routes.jsonl)
+        model_path: Model file (defaults to config/router_model.json)
+        full: Retrain from scratch instead of continuing from the last offset
+
+    Returns:
+        TrainStats for the run
+    """
+    history_path = history_path or ROUTE_HISTORY_PATH
+    model_path = model_path or ROUTER_MODEL_PATH
+
+    model = NaiveBayesRouter()
+    if not full and model_path.exists():
+        try:
+            model = NaiveBayesRouter.load(model_path)
+        except (ValueError, KeyError):
+            model = NaiveBayesRouter()
+
+    records: List[dict] = []
+    if history_path.exists():
+        offset = model.history_offset
+        head = _history_head(history_path)
+        if offset > history_path.stat().st_size or \
+                (model.history_head is not None and model.history_head != head):
+            offset = 0  # Truncated or rotated since the last run: start over on the new file
+        records, model.history_offset = _read_history(history_path, offset)
+        model.history_head = head
+
+    examples = [
+        (r["sentence"], r["role"]) for r in records
+        if r.get("role") and r.get("keyword") and r.get("sentence") and r.get("exit_code") == 0
+    ]
+    added = model.train(examples)
+    model.save(model_path)
+    invalidate_learned_router()
+
+    return TrainStats(
+        examples_added=added,
+        records_read=len(records),
+        total_examples=sum(model.doc_counts.values()),
+        roles=dict(model.doc_counts),
+    )
+
+
+# Lazily loaded model: (path, mtime_ns, model)
+_model_cache: Optional[Tuple[Path, int, Optional[NaiveBayesRouter]]] = None
+
+
+def get_learned_router(path: Optional[Path] = None) -> Optional[NaiveBayesRouter]:
+    """Get the trained router model, or None if there is none.
+
+    Loaded on first use and reloaded when the model file changes.
+    """
+    global _model_cache
+    path = path or ROUTER_MODEL_PATH
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _model_cache is None or _model_cache[0] != path or _model_cache[1] != mtime:
+        try:
+            model = NaiveBayesRouter.load(path)
+        except (OSError, ValueError, KeyError):
+            model = None
+        _model_cache = (path, mtime, model)
+    return _model_cache[2]
+
+
+def model_signature(path: Optional[Path] = None) -> Optional[int]:
+    """Modification time of the model file, or None if there is no model."""
+    try:
+        return (path or ROUTER_MODEL_PATH).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def invalidate_learned_router() -> None:
+    """Drop the cached model so the next lookup reloads it."""
+    global _model_cache
+    _model_cache = None
+
@@ -0,0 +1,176 @@
+"""Startup prewarm for the Terminal AI Workflow REPL.
+
+While the user types their first command, background threads load the
+resources that command may need: the validated config, tool health, the
+routing tables, the document index, the CLI command reference and any tool
+worker pools. Each resource has a readiness flag, and a command only waits
+for the resources it uses, so /help never blocks on the document index.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Resources each command needs; anything not listed needs nothing
+COMMAND_RESOURCES: Dict[str, Tuple[str, ...]] = {
+    "/status": ("tools",),
+    "/docs": ("docs",),
+    "/ref": ("commands",),
+    "task": ("config", "tools", "routing"),
+}
+
+# Human-readable names for "waiting for ..." messages
+RESOURCE_LABELS = {
+    "config": "configuration",
+    "tools": "tool status",
+    "routing": "routing tables",
+    "docs": "document index",
+    "commands": "command reference",
+}
+
+
+@dataclass
+class PrewarmTask:
+    """State of one prewarm task."""
+    name: str
+    ready: threading.Event
+    started_at: float = 0.0
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _warm_config():
+    from .config import get_config
+    get_config()
+
+
+def _warm_tools():
+    from .health import get_health_registry
+    # Only the first snapshot: the REPL owns the background monitor, so a
+    # slow probe finishing after shutdown cannot restart it
+    get_health_registry().snapshot()
+
+
+def _warm_routing():
+    from .config import get_config
+    from .learned import get_learned_router
+
+    config = get_config()
+    get_learned_router()
+    if config.routing.strategy == "scored":
+        from .scoring import get_scoring_table
+        get_scoring_table(config)
+
+
+def _warm_docs():
+    from .knowledge.index import _get_index
+    index = _get_index()
+    with index._lock:
+        index._ensure_loaded()
+        # Trigram indexes for typo correction, substring search and name lookup
+        index._term_index()
+        index._name_index()
+
+
+def _warm_commands():
+    from .knowledge.commands import _parse_command_reference
+    _parse_command_reference()
+
+
+def _warm_workers():
+    from .config import get_config
+    from .workers import get_worker_pool
+
+    config = get_config()
+    for tool_id, tool_config in config.tools.items():
+        if tool_config.worker is not None:
+            get_worker_pool(tool_id, config).warm()
+
+
+DEFAULT_TASKS: Dict[str, Callable[[], None]] = {
+    "config": _warm_config,
+    "tools": _warm_tools,
+    "routing": _warm_routing,
+    "docs": _warm_docs,
+    "commands": _warm_commands,
+    "workers": _warm_workers,
+}
+
+
+class Prewarmer:
+    """Runs prewarm tasks in background threads and tracks readiness.
+
+    A task that fails is still marked ready: the command then does the work
+    itself and reports the error as it would without prewarming.
+
+    Args:
+        tasks: name -> callable to run (defaults to DEFAULT_TASKS)
+    """
+
+    def __init__(self, tasks: Optional[Dict[str, Callable[[], None]]] = None):
+        self.tasks = dict(DEFAULT_TASKS if tasks is None else tasks)
+        self._state: Dict[str, PrewarmTask] = {
+            name: PrewarmTask(name=name, ready=threading.Event()) for name in self.tasks
+        }
+        self._started = False
+
+    def start(self) -> "Prewarmer":
+        """Start one daemon thread per task."""
+        if self._started:
+            return self
+        self._started = True
+        for name, func in self.tasks.items():
+            threading.Thread(
+                target=self._run, args=(name, func), name=f"prewarm-{name}", daemon=True
+            ).start()
+        return self
+
+    def _run(self, name: str, func: Callable[[], None]) -> None:
+        task = self._state[name]
+        task.started_at = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            task.error = str(e)
+        finally:
+            task.duration = time.perf_counter() - task.started_at
+            task.ready.set()
+
+    def is_ready(self, name: str) -> bool:
+        """Whether a resource is ready (unknown resources always are)."""
+        task = self._state.get(name)
+        return task is None or not self._started or task.ready.is_set()
+
+    def pending(self, names: Iterable[str]) -> List[str]:
+        """The resources among names that are still loading."""
+        return [name for name in names if not self.is_ready(name)]
+
+    def wait(self, names: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """Block until the given resources are ready. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in self.pending(names):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not self._state[name].ready.wait(remaining):
+                return False
+        return True
+
+    def stats(self) -> Dict[str, str]:
+        """Per-task timing for /stats."""
+        stats = {}
+        for name, task in self._state.items():
+            if task.duration is None:
+                stats[name] = "loading" if self._started else "not started"
+            elif task.error:
+                stats[name] = f"failed after {task.duration * 1000:.0f} ms"
+            else:
+                stats[name] = f"{task.duration * 1000:.0f} ms"
+        return stats
+
+
+def resources_for(text: str) -> Tuple[str, ...]:
+    """Resources a REPL input needs before it can run."""
+    if not text.startswith("/"):
+        return COMMAND_RESOURCES["task"]
+    command = text.split(None, 1)[0].lower()
+    return COMMAND_RESOURCES.get(command, ())
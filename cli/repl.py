@@ -1,26 +1,35 @@
 """REPL loop for Terminal AI Workflow CLI."""
 
 import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from prompt_toolkit import PromptSession
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.styles import Style
-from prompt_toolkit.completion import WordCompleter
+from prompt_toolkit.completion import Completer, Completion, WordCompleter
 from rich.live import Live
 from rich.markdown import Markdown
 
 from . import display
-from .router import route_input, consolidate_routes
-from .executor import create_workspace, execute_tool_streaming, get_tools_status
+from .router import (
+    route_input, consolidate_routes, get_route_cache_stats, on_tool_health_changed
+)
+from .executor import create_workspace, execute_route, get_tools_status
 from .config import get_config
+from .health import get_health_registry
+from .prewarm import Prewarmer, RESOURCE_LABELS, resources_for
+from .speculative import SpeculativeSpawner
+from .workers import get_worker_pool_stats, shutdown_worker_pools
+from .watcher import start_config_watcher, stop_config_watcher
+from .learned import record_routes
 from .knowledge import (
-    search_documents, get_document, refresh_index,
+    search_documents, get_document, load_result, refresh_index_stats, export_index,
     get_commands, search_commands, get_all_tools_overview,
     get_role_info, get_workflow_overview, get_handoff_advice, get_all_roles
 )
-from .knowledge.index import list_documents
+from .knowledge.index import list_documents, complete_document_names, INDEX_EXPORT_PATH
 from .knowledge.workflow import get_workflow_diagram
 
 # Custom prompt style
@@ -30,10 +39,37 @@ PROMPT_STYLE = Style.from_dict({
 
 # Command completer - now includes documentation commands
 COMMANDS = [
-    '/help', '/status', '/tasks', '/log', '/clear', '/exit', '/quit',
+    '/help', '/status', '/stats', '/tasks', '/log', '/clear', '/exit', '/quit',
     '/docs', '/ref', '/workflow'
 ]
 command_completer = WordCompleter(COMMANDS, ignore_case=True)
+# /docs arguments that are not document names
+DOCS_SUBCOMMANDS = ('search', 'refresh', 'export')
+
+
+class DocsCompleter(Completer):
+    """Completes commands, and document names after /docs.
+
+    Args:
+        prewarm: Names are only offered once it has loaded the document
+            index, so that typing never waits for the index
+    """
+
+    def __init__(self, prewarm: Optional[Prewarmer] = None):
+        self.prewarm = prewarm
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        if not text.lower().startswith('/docs '):
+            yield from command_completer.get_completions(document, complete_event)
+            return
+        arg = text[6:].lstrip()
+        if ' ' in arg or arg.lower() in DOCS_SUBCOMMANDS:
+            return
+        if self.prewarm is not None and not self.prewarm.is_ready("docs"):
+            return
+        for name in complete_document_names(arg):
+            yield Completion(name, start_position=-len(arg))
 
 
 class REPL:
@@ -44,16 +80,43 @@ class REPL:
         self.verbose = verbose
         self.session: Optional[PromptSession] = None
         self.running = False
+        # Config reload notices from the watcher thread, shown before the next prompt
+        self._notices: List[tuple] = []
+        self.prewarm = Prewarmer()
+        # Speculative pre-spawn (execution.speculative); timer fires on typing pauses
+        self.spawner = SpeculativeSpawner()
+        self._idle_timer: Optional[threading.Timer] = None
+        # Results of the last /docs search, opened with /docs <number>
+        self._search_results: list = []
 
     def setup(self):
         """Set up the prompt session."""
         self.session = PromptSession(
             history=FileHistory(str(self.history_file)),
             auto_suggest=AutoSuggestFromHistory(),
-            completer=command_completer,
+            completer=DocsCompleter(self.prewarm),
             style=PROMPT_STYLE,
             complete_while_typing=False,
         )
+        self.session.default_buffer.on_text_changed += self._on_buffer_changed
+
+    def _on_buffer_changed(self, buffer):
+        """Restart the idle timer that routes the partial input."""
+        self._cancel_idle_timer()
+        execution = get_config().execution
+        if not execution.speculative:
+            return
+        self._idle_timer = threading.Timer(
+            execution.speculative_idle_ms / 1000, self.spawner.update,
+            args=(buffer.text, self.spawner.generation)
+        )
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        timer, self._idle_timer = self._idle_timer, None
+        if timer is not None:
+            timer.cancel()
 
     def handle_command(self, command: str) -> bool:
         """Handle a built-in command.
@@ -74,6 +137,9 @@ class REPL:
             status = get_tools_status()
             display.show_status(status)
 
+        elif cmd_lower == '/stats':
+            self._show_stats()
+
         elif cmd_lower == '/clear':
             display.clear_screen()
 
@@ -97,6 +163,20 @@ class REPL:
 
         return True
 
+    def _show_stats(self):
+        """Show runtime statistics."""
+        cache = get_route_cache_stats()
+        lookups = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = cache["hits"] / lookups if lookups else 0.0
+        sections = {
+            "Routing Cache": cache,
+            "Speculative Spawn": self.spawner.get_stats(),
+            "Startup Prewarm": self.prewarm.stats(),
+        }
+        for tool, stats in get_worker_pool_stats().items():
+            sections[f"Worker Pool: {tool}"] = stats
+        display.show_stats(sections)
+
     def _show_tasks(self):
         """Show current task files."""
         tasks_dir = Path("config/tasks")
@@ -141,8 +221,10 @@ class REPL:
         Usage:
             /docs              - List all documents
             /docs <name>       - Display document content
+            /docs <number>     - Display a section found by the last search
             /docs search <q>   - Search across documents
-            /docs refresh      - Rebuild document index
+            /docs refresh      - Update document index (changed files only)
+            /docs export [p]   - Write the document index as JSON
         """
         if not args:
             # List all documents
@@ -150,20 +232,44 @@ class REPL:
             display.show_document_list(docs)
 
         elif args.lower() == "refresh":
-            # Rebuild index
-            display.show_info("Rebuilding document index...")
-            count = refresh_index()
-            display.show_success(f"Indexed {count} documents")
+            # Update index: only added, changed and removed files are re-read
+            display.show_info("Refreshing document index...")
+            with display.show_progress("Indexing files") as progress:
+                stats = refresh_index_stats(progress)
+            display.show_success(
+                f"Indexed {stats.total} documents ({len(stats.added)} added, "
+                f"{len(stats.changed)} changed, {len(stats.removed)} removed, "
+                f"{stats.unchanged} unchanged) in {stats.duration * 1000:.0f} ms"
+            )
+
+        elif args.lower() == "export" or args.lower().startswith("export "):
+            # The index itself is binary; JSON is for inspection and other tools
+            target = args[6:].strip()
+            path = Path(target) if target else INDEX_EXPORT_PATH
+            count = export_index(path)
+            display.show_success(f"Exported {count} documents to {path}")
 
         elif args.lower().startswith("search "):
             # Search documents
             query = args[7:].strip()
             if query:
                 results = search_documents(query)
+                self._search_results = results
                 display.show_search_results(results, query)
             else:
                 display.show_error("Usage: /docs search <query>")
 
+        elif args.isdigit() and 0 < int(args) <= len(self._search_results):
+            # Open a search result: only its section is read
+            result = self._search_results[int(args) - 1]
+            content = load_result(result)
+            if content:
+                display.show_document(
+                    f"{result.name} > {result.section}" if result.section else result.name,
+                    content)
+            else:
+                display.show_error(f"Document not found: {result.name}")
+
         else:
             # Get specific document
             content = get_document(args)
@@ -253,8 +359,11 @@ class REPL:
 
     def process_input(self, text: str):
         """Process user input - route and execute."""
+        # One config snapshot for the whole request, even if a reload lands mid-run
+        config = get_config()
+
         # Route the input
-        routes = route_input(text)
+        routes = route_input(text, config)
 
         if self.verbose:
             display.show_routing(routes, verbose=True)
@@ -265,26 +374,41 @@ class REPL:
         # Create workspace
         workspace = create_workspace()
 
-        # Execute each tool
-        for route in consolidated:
-            self._execute_with_live_output(route, workspace)
+        # Execute each tool; the first may already be running from speculation
+        exit_codes = {}
+        for i, route in enumerate(consolidated):
+            process = self.spawner.take(route.tool) if i == 0 else None
+            result = self._execute_with_live_output(route, workspace, config, process)
+            exit_codes[route.tool] = result.exit_code
+        self.spawner.discard()
 
-    def _execute_with_live_output(self, route, workspace):
+        # Record routes and outcomes for `workflow train-router` (opt-in: prompts are stored)
+        if config.routing.record_history:
+            record_routes(routes, exit_codes)
+
+    def _execute_with_live_output(self, route, workspace, config=None, process=None):
         """Execute a tool and display output with live markdown rendering."""
         display.show_tool_header(route.tool_display_name)
 
         # Buffer for accumulating output
         buffer = []
         lock = threading.Lock()
+        started = time.perf_counter()
+        first_output = []
 
         def on_output(chunk: str):
             """Callback for each output chunk."""
             with lock:
+                if not first_output:
+                    first_output.append(time.perf_counter())
                 buffer.append(chunk)
 
         # We'll use a simpler approach - collect output then display
         # For true streaming, we'd need async, but this works for now
-        result = execute_tool_streaming(route, workspace, on_output)
+        result = execute_route(route, workspace, on_output, config, process)
+        if first_output:
+            # Measures the boot time a pre-spawned process saves
+            self.spawner.record_first_output(route.tool, (first_output[0] - started) * 1000)
 
         # Display the final output with markdown rendering
         if result.output.strip():
@@ -298,6 +422,8 @@ class REPL:
                 f"exit code: {result.exit_code}[/dim]"
             )
 
+        return result
+
     def run(self):
         """Run the REPL loop."""
         self.setup()
@@ -305,13 +431,59 @@ class REPL:
 
         display.show_header()
 
+        start_config_watcher(
+            on_reload=lambda _config: self._notices.append(("info", "Configuration reloaded")),
+            on_error=lambda e: self._notices.append(
+                ("error", f"Config change not applied: {e}")),
+        )
+        # Load what the first command will need while the user types; the
+        # tools task takes the first health snapshot, so the monitor waits
+        # an interval before its own
+        health = get_health_registry()
+        health.subscribe(on_tool_health_changed)
+        health.start(refresh_now=False)
+        self.prewarm.start()
+        try:
+            self._loop()
+        finally:
+            self._cancel_idle_timer()
+            self.spawner.discard()
+            health.stop()
+            health.unsubscribe(on_tool_health_changed)
+            stop_config_watcher()
+            shutdown_worker_pools()
+
+    def _show_notices(self):
+        """Show config reload notices queued by the watcher thread."""
+        while self._notices:
+            kind, message = self._notices.pop(0)
+            if kind == "error":
+                display.show_error(message)
+            else:
+                display.show_info(message)
+
+    def _wait_for_resources(self, text: str):
+        """Block until the resources this input needs have been prewarmed."""
+        pending = self.prewarm.pending(resources_for(text))
+        if not pending:
+            return
+        labels = ", ".join(RESOURCE_LABELS.get(name, name) for name in pending)
+        with display.console.status(f"[dim]Loading {labels}...[/dim]"):
+            self.prewarm.wait(pending)
+
+    def _loop(self):
+        """Prompt and dispatch until the user exits."""
         while self.running:
             try:
+                self._show_notices()
                 text = self.session.prompt("> ")
+                self._cancel_idle_timer()
 
                 if not text.strip():
                     continue
 
+                self._wait_for_resources(text.strip())
+
                 # Check for commands
                 if text.strip().startswith('/'):
                     self.running = self.handle_command(text.strip())
@@ -1,11 +1,19 @@
 """Task routing logic for Terminal AI Workflow CLI."""
 
 import re
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
-from .config import get_config
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Optional, Sequence
+from .config import Config, get_config
 from .errors import NoAvailableToolError, RoutingError
 
+# Tools tried, in order, when no role matches or the matched role has no available tool
+DEFAULT_CHAIN = ["claude", "openai", "gemini"]
+
 
 @dataclass
 class Route:
@@ -15,6 +23,102 @@ class Route:
     tool_display_name: str
     matched_keyword: Optional[str] = None
     matched_role: Optional[str] = None
+    confidence: Optional[float] = None  # set by the scored router
+
+
+@dataclass
+class RouteBatch:
+    """Columnar routing results for many inputs.
+
+    Row ``i`` describes one routed sentence: it came from ``texts[input_index[i]]``
+    and spans ``text[start[i]:end[i]]`` in that input.
+    """
+    input_index: array = field(default_factory=lambda: array("i"))
+    tool: List[str] = field(default_factory=list)
+    role: List[Optional[str]] = field(default_factory=list)
+    keyword: List[Optional[str]] = field(default_factory=list)
+    start: array = field(default_factory=lambda: array("i"))
+    end: array = field(default_factory=lambda: array("i"))
+    display_names: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.tool)
+
+    def to_route(self, i: int, texts: Sequence[str]) -> Route:
+        """Materialize row ``i`` as a Route."""
+        text = texts[self.input_index[i]]
+        tool = self.tool[i]
+        return Route(
+            tool=tool,
+            task=text[self.start[i]:self.end[i]],
+            tool_display_name=self.display_names.get(tool, tool.title()),
+            matched_keyword=self.keyword[i],
+            matched_role=self.role[i]
+        )
+
+    def tool_counts(self) -> Dict[str, int]:
+        """Count routed sentences per tool."""
+        counts: Dict[str, int] = {}
+        for tool in self.tool:
+            counts[tool] = counts.get(tool, 0) + 1
+        return counts
+
+
+class KeywordMatcher:
+    """Compiled matcher for one keyword list.
+
+    Gives the same answer as scanning the list keyword by keyword, but uses a
+    single regex pass over the sentence.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(keywords)
+        # lowercased keyword -> (list position, original keyword); first occurrence wins
+        self._by_lower: Dict[str, Tuple[int, str]] = {}
+        for i, keyword in enumerate(self.keywords):
+            self._by_lower.setdefault(keyword.lower(), (i, keyword))
+
+        self._pattern = None
+        if self._by_lower:
+            # Zero-width lookahead so overlapping keywords at every word boundary are seen.
+            # Alternatives are in list order, so each position reports its earliest keyword.
+            alternatives = "|".join(
+                r'\b' + re.escape(kw) + r'\b' for kw in self._by_lower
+            )
+            self._pattern = re.compile(f"(?=({alternatives}))")
+
+    def match(self, sentence_lower: str, first_word: str = "") -> Optional[str]:
+        """Return the matched keyword for an already-lowercased sentence."""
+        if self._pattern is None:
+            return None
+
+        hit = self._by_lower.get(first_word) if first_word else None
+        if hit is not None:
+            return hit[1]
+
+        best = None
+        for m in self._pattern.finditer(sentence_lower):
+            hit = self._by_lower[m.group(1)]
+            if best is None or hit[0] < best[0]:
+                best = hit
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+@lru_cache(maxsize=256)
+def _get_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Get a compiled matcher for a keyword tuple."""
+    return KeywordMatcher(keywords)
+
+
+# Common extensions that shouldn't trigger sentence splits
+_EXTENSIONS = ['.json', '.py', '.js', '.ts', '.md', '.txt', '.yaml', '.yml',
+               '.toml', '.xml', '.html', '.css', '.sh', '.bat', '.exe', '.dll']
+# One alternation in list order, so '.json' wins over '.js' just like sequential replacement
+_EXTENSION_PATTERN = re.compile("|".join(re.escape(ext) for ext in _EXTENSIONS), re.IGNORECASE)
+_EXTENSION_PLACEHOLDERS = {ext: f"__EXT{i}__" for i, ext in enumerate(_EXTENSIONS)}
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])|(?<=[!?])\s+')
 
 
 def split_sentences(text: str) -> List[str]:
@@ -25,23 +129,20 @@ def split_sentences(text: str) -> List[str]:
     or on ! and ? which are more reliable sentence boundaries.
     """
     # First, protect file extensions by temporarily replacing them
-    # Common extensions that shouldn't trigger sentence splits
-    extensions = ['.json', '.py', '.js', '.ts', '.md', '.txt', '.yaml', '.yml',
-                  '.toml', '.xml', '.html', '.css', '.sh', '.bat', '.exe', '.dll']
-
     protected = text
     placeholders = {}
-    for i, ext in enumerate(extensions):
-        placeholder = f"__EXT{i}__"
-        if ext in protected.lower():
-            # Case-insensitive replacement while preserving original case
-            pattern = re.compile(re.escape(ext), re.IGNORECASE)
-            protected = pattern.sub(placeholder, protected)
+    if "." in text:
+        def protect(match):
+            ext = match.group().lower()
+            placeholder = _EXTENSION_PLACEHOLDERS[ext]
             placeholders[placeholder] = ext
+            return placeholder
+
+        protected = _EXTENSION_PATTERN.sub(protect, text)
 
     # Split on sentence boundaries: period/!/? followed by space and capital letter, or end of string
     # Also split on ! and ? which are clear sentence boundaries
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])|(?<=[!?])\s+', protected)
+    sentences = _SENTENCE_BOUNDARY.split(protected)
 
     # Restore file extensions
     result = []
@@ -74,37 +175,121 @@ def find_keyword_match(sentence: str, keywords: List[str]) -> Optional[str]:
         The matched keyword or None
     """
     sentence_lower = sentence.lower()
-    words = sentence_lower.split()
-
-    # First, check first word (highest priority)
-    if words:
-        first_word = words[0]
-        for keyword in keywords:
-            if first_word == keyword.lower():
-                return keyword
-
-    # Then check if any keyword appears anywhere in the sentence
-    for keyword in keywords:
-        keyword_lower = keyword.lower()
-        # Match as a whole word (not as substring of another word)
-        pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-        if re.search(pattern, sentence_lower):
-            return keyword
+    # First word has priority, then any whole-word match anywhere in the sentence
+    return _get_matcher(tuple(keywords)).match(sentence_lower, _first_word_lower(sentence_lower))
 
+
+def _first_word_lower(sentence_lower: str) -> str:
+    """First whitespace-delimited word of an already-lowercased sentence."""
+    words = sentence_lower.split(None, 1)
+    return words[0] if words else ""
+
+
+def _pick_tool(candidates: Sequence[str], is_available: Callable[[str], bool]) -> Optional[str]:
+    """Return the first available tool from candidates."""
+    for tool in candidates:
+        if is_available(tool):
+            return tool
     return None
 
 
-def route_sentence(sentence: str, strict: bool = False) -> Route:
+# Bounded LRU of routing decisions, keyed on the exact sentence
+ROUTE_CACHE_SIZE = 1024
+# How long an availability snapshot is trusted before tools are re-checked (seconds)
+AVAILABILITY_TTL = 2.0
+
+_route_cache: "OrderedDict[Tuple[str, bool], tuple]" = OrderedDict()
+_route_cache_lock = threading.Lock()
+_route_cache_epoch: Optional[tuple] = None
+_route_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+# (config snapshot, checked at, availability)
+_availability: Optional[Tuple[Config, float, Tuple[bool, ...]]] = None
+
+
+def _availability_snapshot(config: Config) -> Tuple[bool, ...]:
+    """Availability of every configured tool.
+
+    Read from the tool health monitor when it is running; otherwise tools are
+    re-checked at most every AVAILABILITY_TTL.
+    """
+    global _availability
+    from .health import peek_availability
+
+    monitored = peek_availability(config)
+    if monitored is not None:
+        return monitored
+
+    now = time.monotonic()
+    current = _availability
+    if (current is None or current[0] is not config
+            or now - current[1] > AVAILABILITY_TTL):
+        current = (config, now, tuple(config.is_tool_available(tool) for tool in config.tools))
+        _availability = current
+    return current[2]
+
+
+def notify_availability_changed() -> None:
+    """Force the next route to re-check tool availability."""
+    global _availability
+    _availability = None
+
+
+def on_tool_health_changed(events) -> None:
+    """Health registry subscriber: re-check availability when a tool flips."""
+    if any(event.availability_changed for event in events):
+        notify_availability_changed()
+
+
+def invalidate_route_cache() -> None:
+    """Drop all cached routing decisions."""
+    global _route_cache_epoch
+    with _route_cache_lock:
+        if _route_cache:
+            _route_cache_stats["invalidations"] += 1
+        _route_cache.clear()
+        _route_cache_epoch = None
+
+
+def get_route_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and current size of the routing cache."""
+    with _route_cache_lock:
+        stats = dict(_route_cache_stats)
+        stats["size"] = len(_route_cache)
+        stats["max_size"] = ROUTE_CACHE_SIZE
+    return stats
+
+
+def _reset_route_cache() -> None:
+    """Clear the routing cache and its counters (for testing)."""
+    invalidate_route_cache()
+    notify_availability_changed()
+    with _route_cache_lock:
+        for key in _route_cache_stats:
+            _route_cache_stats[key] = 0
+
+
+def route_sentence(sentence: str, strict: bool = False,
+                   config: Optional[Config] = None) -> Route:
     """Route a single sentence to the appropriate tool.
 
     Uses enhanced keyword matching that:
     1. Prioritizes first-word matches
     2. Falls back to matching anywhere in the sentence
     3. Supports multi-word phrases
+    4. Asks the learned router (if trained) when no keyword matches
+
+    When routing.strategy is "scored", every role is scored instead and the
+    route carries a confidence (see cli.scoring).
+
+    Decisions are cached in a bounded LRU keyed on the exact sentence the
+    matcher sees (so a hit always equals an uncached call); the
+    cache is dropped when the config, tool availability or learned model changes.
 
     Args:
         sentence: The sentence to route
         strict: If True, raise NoAvailableToolError when no tools available
+        config: Config snapshot to route against (defaults to the global config)
 
     Returns:
         Route with tool assignment
@@ -112,7 +297,62 @@ def route_sentence(sentence: str, strict: bool = False) -> Route:
     Raises:
         NoAvailableToolError: If strict=True and no tools are available
     """
-    config = get_config()
+    global _route_cache_epoch
+    from .learned import model_signature
+
+    if config is None:
+        config = get_config()
+
+    # Decisions depend on the config snapshot, tool availability and the learned model
+    epoch = (config, _availability_snapshot(config), model_signature())
+    key = (sentence, strict)
+    with _route_cache_lock:
+        if epoch != _route_cache_epoch:
+            if _route_cache:
+                _route_cache_stats["invalidations"] += 1
+            _route_cache.clear()
+            _route_cache_epoch = epoch
+        cached = _route_cache.get(key)
+        if cached is not None:
+            _route_cache.move_to_end(key)
+            _route_cache_stats["hits"] += 1
+        else:
+            _route_cache_stats["misses"] += 1
+
+    if cached is not None:
+        tool, display_name, keyword, role, confidence = cached
+        return Route(
+            tool=tool,
+            task=sentence,
+            tool_display_name=display_name,
+            matched_keyword=keyword,
+            matched_role=role,
+            confidence=confidence
+        )
+
+    is_available = dict(zip(config.tools, epoch[1])).get
+    route = _route_sentence_uncached(sentence, strict, config, is_available)
+
+    with _route_cache_lock:
+        if epoch == _route_cache_epoch:
+            _route_cache[key] = (route.tool, route.tool_display_name, route.matched_keyword,
+                                 route.matched_role, route.confidence)
+            if len(_route_cache) > ROUTE_CACHE_SIZE:
+                _route_cache.popitem(last=False)
+                _route_cache_stats["evictions"] += 1
+
+    return route
+
+
+def _route_sentence_uncached(sentence: str, strict: bool, config: Config,
+                             is_available: Optional[Callable[[str], bool]] = None) -> Route:
+    """Route a sentence without consulting the routing cache."""
+    if is_available is None:
+        is_available = config.is_tool_available
+    if config.routing.strategy == "scored":
+        from .scoring import route_sentence_scored
+        return route_sentence_scored(sentence, strict=strict, config=config,
+                                     is_available=is_available)
 
     matched_tool = None
     matched_role = None
@@ -125,24 +365,22 @@ def route_sentence(sentence: str, strict: bool = False) -> Route:
             # Found a matching role
             matched_role = role_name
             matched_keyword = match
-            primary = role.primary
-            if config.is_tool_available(primary):
-                matched_tool = primary
-            else:
-                # Try fallbacks
-                for fallback in role.fallback:
-                    if config.is_tool_available(fallback):
-                        matched_tool = fallback
-                        break
+            # Primary first, then fallbacks
+            matched_tool = _pick_tool([role.primary] + role.fallback, is_available)
             break
 
+    confidence = None
+    if matched_role is None:
+        # No keyword hit - ask the learned router, if one has been trained
+        prediction = _predict_role(sentence, config)
+        if prediction is not None:
+            matched_role, confidence = prediction
+            role = config.roles[matched_role]
+            matched_tool = _pick_tool([role.primary] + role.fallback, is_available)
+
     # Default fallback chain if no keyword match or matched tool unavailable
     if matched_tool is None:
-        default_chain = ["claude", "openai", "gemini"]
-        for tool in default_chain:
-            if config.is_tool_available(tool):
-                matched_tool = tool
-                break
+        matched_tool = _pick_tool(DEFAULT_CHAIN, is_available)
 
     # Handle case where no tools are available
     if matched_tool is None:
@@ -160,27 +398,79 @@ def route_sentence(sentence: str, strict: bool = False) -> Route:
         task=sentence,
         tool_display_name=display_name,
         matched_keyword=matched_keyword,
-        matched_role=matched_role
+        matched_role=matched_role,
+        confidence=confidence
     )
 
 
-def route_input(text: str) -> List[Route]:
+def _scored_role(sentence: str, best: Tuple[Optional[str], float, Optional[str]], config,
+                 model=None) -> Tuple[Optional[str], float, Optional[str]]:
+    """(role, confidence, keyword) of a sentence routed by scores.
+
+    best is the top (role, confidence, keyword) from the scoring table. With
+    no keyword hit, the learned router (model, if any) is asked; a role
+    below routing.min_confidence is then replaced by routing.fallback_role.
+    """
+    role_name, confidence, keyword = best
+    if role_name is None and model is not None:
+        prediction = _predict_role(sentence, config, model)
+        if prediction is not None:
+            role_name, confidence = prediction
+    if role_name is not None and confidence < config.routing.min_confidence:
+        role_name, keyword = config.routing.fallback_role, None
+    return role_name, confidence, keyword
+
+
+def _predict_role(sentence: str, config, model=None) -> Optional[Tuple[str, float]]:
+    """Predict a configured role with the learned router (see cli.learned)."""
+    from .learned import get_learned_router
+
+    if model is None:
+        model = get_learned_router()
+    if model is None:
+        return None
+    prediction = model.predict(sentence)
+    if prediction is None or prediction[1] < config.routing.learned_min_confidence:
+        return None
+    if prediction[0] not in config.roles:
+        return None
+    return prediction
+
+
+def route_input(text: str, config: Optional[Config] = None,
+                use_cache: bool = True, strict: bool = False) -> List[Route]:
     """Route input text to appropriate tools.
 
+    All sentences are routed against one config snapshot (the global config
+    unless one is given).
+
+    Args:
+        text: Input text
+        config: Config snapshot to route against (defaults to the global config)
+        use_cache: Whether to use the routing cache; off for throwaway input
+            such as a half-typed buffer, which would evict real entries and
+            skew the cache stats
+        strict: If True, raise NoAvailableToolError when no tools available
+
     Returns a list of (tool, task) tuples.
     """
+    if config is None:
+        config = get_config()
+
+    is_available = None if use_cache else dict(zip(config.tools, _availability_snapshot(config))).get
+
+    def route(sentence: str) -> Route:
+        if is_available is None:
+            return route_sentence(sentence, strict=strict, config=config)
+        return _route_sentence_uncached(sentence, strict, config, is_available)
+
     sentences = split_sentences(text)
 
     if not sentences:
         # If no sentences parsed, treat entire input as one task
-        return [route_sentence(text)]
-
-    routes = []
-    for sentence in sentences:
-        route = route_sentence(sentence)
-        routes.append(route)
+        return [route(text)]
 
-    return routes
+    return [route(sentence) for sentence in sentences]
 
 
 def consolidate_routes(routes: List[Route]) -> List[Route]:
@@ -204,3 +494,117 @@ def consolidate_routes(routes: List[Route]) -> List[Route]:
         ))
 
     return consolidated
+
+
+def _sentence_spans(text: str, sentences: List[str]) -> List[Tuple[int, int]]:
+    """Locate each split sentence in the original text as (start, end) offsets.
+
+    split_sentences normalizes file extensions to lowercase, so the search is
+    done on the lowercased text (same length as the original).
+    """
+    text_lower = text.lower()
+    spans = []
+    pos = 0
+    for sentence in sentences:
+        start = text_lower.find(sentence.lower(), pos)
+        if start < 0:
+            start = pos
+        end = start + len(sentence)
+        spans.append((start, end))
+        pos = end
+    return spans
+
+
+def route_many(texts: Sequence[str], config: Optional[Config] = None,
+               strict: bool = False) -> RouteBatch:
+    """Route many input texts at once.
+
+    Tool availability is resolved once per call, so each role maps straight to
+    its tool and each sentence only pays for keyword matching.
+
+    Args:
+        texts: Input texts, each routed like route_input()
+        config: Config snapshot to route against (defaults to the global config)
+        strict: If True, raise NoAvailableToolError when a sentence has no
+            available tool (otherwise it goes to claude, as in route_sentence)
+
+    Returns:
+        RouteBatch with one row per routed sentence
+
+    Raises:
+        NoAvailableToolError: If strict=True and no tools are available
+    """
+    from .health import peek_availability
+
+    if config is None:
+        config = get_config()
+
+    availability: Dict[str, bool] = {}
+    # Start from the health monitor's snapshot when it is running
+    monitored = peek_availability(config)
+    if monitored is not None:
+        availability.update(zip(config.tools, monitored))
+
+    def is_available(tool: str) -> bool:
+        if tool not in availability:
+            availability[tool] = config.is_tool_available(tool)
+        return availability[tool]
+
+    default_tool = _pick_tool(DEFAULT_CHAIN, is_available)
+
+    # (role name, matcher, resolved tool) in config order
+    table = []
+    for role_name, role in config.roles.items():
+        tool = _pick_tool([role.primary] + role.fallback, is_available) or default_tool
+        table.append((role_name, _get_matcher(tuple(role.keywords)), tool))
+
+    from .learned import get_learned_router
+    learned = get_learned_router()
+
+    scoring_table = None
+    role_tools = {role_name: tool for role_name, _, tool in table}
+    if config.routing.strategy == "scored":
+        from .scoring import get_scoring_table
+        scoring_table = get_scoring_table(config)
+
+    batch = RouteBatch()
+    batch.display_names = {
+        tool_id: tool_config.name for tool_id, tool_config in config.tools.items()
+    }
+
+    for index, text in enumerate(texts):
+        sentences = split_sentences(text)
+        for (start, end), sentence in zip(_sentence_spans(text, sentences), sentences):
+            tool, role_hit, keyword = default_tool, None, None
+            if scoring_table is not None:
+                role_hit, _, keyword = _scored_role(
+                    sentence, scoring_table.score(sentence).best(), config, learned)
+            else:
+                sentence_lower = sentence.lower()
+                first_word = _first_word_lower(sentence_lower)
+                for role_name, matcher, _ in table:
+                    keyword = matcher.match(sentence_lower, first_word)
+                    if keyword:
+                        role_hit = role_name
+                        break
+                else:
+                    if learned is not None:
+                        prediction = _predict_role(sentence, config, learned)
+                        role_hit = prediction[0] if prediction else None
+
+            if role_hit is not None:
+                tool = role_tools[role_hit]
+            if tool is None:
+                if strict:
+                    raise NoAvailableToolError()
+                # Last resort - use claude even if not authenticated
+                tool = "claude"
+
+            batch.input_index.append(index)
+            batch.tool.append(tool)
+            batch.role.append(role_hit)
+            batch.keyword.append(keyword)
+            batch.start.append(start)
+            batch.end.append(end)
+
+    return batch
@@ -0,0 +1,187 @@
+"""Scored multi-role routing for Terminal AI Workflow CLI.
+
+Unlike the first-match router, every role is scored in a single pass over the
+sentence using a precomputed keyword -> (role, weight) table, and the route
+carries a confidence value (winning score / total score).
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import Config, get_config
+from .errors import NoAvailableToolError
+from .router import Route, DEFAULT_CHAIN, _pick_tool, _scored_role
+
+# Tokens that can be looked up directly in the single-word table
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass
+class RoleScores:
+    """Scores for every role, in config order."""
+    roles: List[str]
+    scores: List[float]
+    keywords: List[Optional[str]]  # best-scoring keyword per role
+
+    @property
+    def total(self) -> float:
+        return sum(self.scores)
+
+    def best(self) -> Tuple[Optional[str], float, Optional[str]]:
+        """Return (role, confidence, keyword) for the top role; ties go to config order."""
+        total = self.total
+        if total <= 0:
+            return None, 0.0, None
+        best_i = max(range(len(self.scores)), key=lambda i: (self.scores[i], -i))
+        return self.roles[best_i], self.scores[best_i] / total, self.keywords[best_i]
+
+
+class ScoringTable:
+    """Keyword -> role weight table compiled from a Config."""
+
+    def __init__(self, config: Config):
+        routing = config.routing
+        self.first_word_bonus = routing.first_word_bonus
+        self.position_weight = routing.position_weight
+        self.roles = list(config.roles)
+
+        # lowercased keyword -> [(role index, weight, original keyword)]
+        self.single: Dict[str, List[Tuple[int, float, str]]] = {}
+        phrases: Dict[str, List[Tuple[int, float, str]]] = {}
+        for role_index, role in enumerate(config.roles.values()):
+            weights = {k.lower(): w for k, w in role.weights.items()}
+            seen = set()
+            for keyword in role.keywords:
+                lower = keyword.lower()
+                if lower in seen:
+                    continue
+                seen.add(lower)
+                entry = (role_index, weights.get(lower, 1.0), keyword)
+                target = self.single if _TOKEN.fullmatch(lower) else phrases
+                target.setdefault(lower, []).append(entry)
+
+        # Multi-word / punctuated keywords go through one lookahead regex
+        self.phrases = phrases
+        self._phrase_pattern = None
+        if phrases:
+            alternatives = "|".join(
+                r'\b' + re.escape(p) + r'\b'
+                for p in sorted(phrases, key=len, reverse=True)
+            )
+            self._phrase_pattern = re.compile(f"(?=({alternatives}))")
+        self._phrase_heads = {_TOKEN.findall(p)[0] for p in phrases if _TOKEN.findall(p)}
+
+    def score(self, sentence: str) -> RoleScores:
+        """Score every role for a sentence in one pass."""
+        lower = sentence.lower()
+        tokens = _TOKEN.findall(lower)
+        count = len(tokens)
+        scores = [0.0] * len(self.roles)
+        best_kw: List[Optional[str]] = [None] * len(self.roles)
+        best_points = [0.0] * len(self.roles)
+        if not count:
+            return RoleScores(roles=self.roles, scores=scores, keywords=best_kw)
+
+        hits = []  # (position, entries)
+        single = self.single
+        for position, token in enumerate(tokens):
+            entries = single.get(token)
+            if entries:
+                hits.append((position, entries))
+
+        # Phrase regex only runs when a phrase's leading token is present
+        if self._phrase_pattern is not None and not self._phrase_heads.isdisjoint(tokens):
+            starts = [m.start() for m in _TOKEN.finditer(lower)]
+            for m in self._phrase_pattern.finditer(lower):
+                position = max(bisect_right(starts, m.start()) - 1, 0)
+                hits.append((position, self.phrases[m.group(1)]))
+
+        counted = set()
+        bonus, spread = self.first_word_bonus, self.position_weight
+        for position, entries in hits:
+            # Earlier keywords count more; the first word gets an extra boost
+            factor = 1.0 + spread * (1.0 - position / count)
+            if position == 0:
+                factor += bonus
+            for role_index, weight, keyword in entries:
+                if (role_index, keyword) in counted:
+                    continue
+                counted.add((role_index, keyword))
+                points = weight * factor
+                scores[role_index] += points
+                if points > best_points[role_index]:
+                    best_points[role_index] = points
+                    best_kw[role_index] = keyword
+
+        return RoleScores(roles=self.roles, scores=scores, keywords=best_kw)
+
+
+# Table compiled for the most recently seen config
+_table_cache: Optional[Tuple[Config, ScoringTable]] = None
+
+
+def get_scoring_table(config: Config) -> ScoringTable:
+    """Get the scoring table for a config, compiling it on first use."""
+    global _table_cache
+    if _table_cache is None or _table_cache[0] is not config:
+        _table_cache = (config, ScoringTable(config))
+    return _table_cache[1]
+
+
+def route_sentence_scored(sentence: str, strict: bool = False,
+                          config: Optional[Config] = None,
+                          is_available: Optional[Callable[[str], bool]] = None) -> Route:
+    """Route a sentence by scoring every role.
+
+    The top-scoring role wins. When its confidence is below
+    routing.min_confidence, the sentence goes to routing.fallback_role, or to
+    the default chain if no fallback role is configured.
+
+    Args:
+        sentence: The sentence to route
+        strict: If True, raise NoAvailableToolError when no tools available
+        config: Config to route against (defaults to the global config)
+        is_available: Tool availability lookup (defaults to config.is_tool_available)
+
+    Returns:
+        Route with tool assignment and confidence
+
+    Raises:
+        NoAvailableToolError: If strict=True and no tools are available
+    """
+    if config is None:
+        config = get_config()
+    if is_available is None:
+        is_available = config.is_tool_available
+
+    from .learned import get_learned_router
+
+    role_name, confidence, keyword = _scored_role(
+        sentence, get_scoring_table(config).score(sentence).best(), config, get_learned_router())
+
+    matched_tool = None
+    if role_name is not None:
+        role = config.roles[role_name]
+        matched_tool = _pick_tool([role.primary] + role.fallback, is_available)
+
+    if matched_tool is None:
+        matched_tool = _pick_tool(DEFAULT_CHAIN, is_available)
+
+    if matched_tool is None:
+        if strict:
+            raise NoAvailableToolError()
+        matched_tool = "claude"
+
+    tool_display = config.tools.get(matched_tool)
+    display_name = tool_display.name if tool_display else matched_tool.title()
+
+    return Route(
+        tool=matched_tool,
+        task=sentence,
+        tool_display_name=display_name,
+        matched_keyword=keyword,
+        matched_role=role_name,
+        confidence=confidence
+    )
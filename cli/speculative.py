@@ -0,0 +1,175 @@
+"""Speculative tool pre-spawn for the Terminal AI Workflow REPL.
+
+Vendor CLIs spend a noticeable time booting before they can accept a prompt.
+With execution.speculative enabled, the REPL routes the partially typed
+buffer whenever the user pauses, and starts the likely tool early. The tool
+must use stdin input mode, so the process can wait for its task on stdin.
+On Enter the task is handed to the waiting process; if the route changed in
+the meantime the process is discarded.
+
+The time saved per hit is the tool's boot time, measured as how much sooner
+a pre-spawned process answers than a tool spawned on Enter, and capped at
+how long the process had been waiting.
+"""
+
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .config import Config, get_config
+from .executor import spawn_tool, discard_process
+from .router import Route, route_input, consolidate_routes
+
+# Buffers shorter than this are not worth routing
+MIN_SPECULATIVE_CHARS = 8
+
+
+@dataclass
+class _Pending:
+    """A pre-spawned tool process waiting for its task."""
+    tool: str
+    process: subprocess.Popen
+    spawned_at: float
+
+
+class SpeculativeSpawner:
+    """Keeps at most one pre-spawned process for the likely next tool.
+
+    Args:
+        config: Config snapshot to route against (defaults to the global config)
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        self._config = config
+        self._pending: Optional[_Pending] = None
+        self._lock = threading.Lock()
+        # Bumped when the input is submitted or discarded; a late update() from
+        # an earlier generation must not spawn
+        self.generation = 0
+        # (tool, ms it waited) of the last claimed process, until its first output
+        self._claimed: Optional[Tuple[str, float]] = None
+        # tool -> (total ms, runs) from dispatch to first output without pre-spawn
+        self._cold: Dict[str, Tuple[float, int]] = {}
+        self.stats = {"spawned": 0, "hits": 0, "misses": 0, "discarded": 0, "saved_ms": 0.0}
+
+    def _predict(self, text: str, config: Config) -> Optional[Route]:
+        """The route whose tool will run first for this input, if it can be pre-spawned."""
+        routes = consolidate_routes(route_input(text, config, use_cache=False))
+        if not routes:
+            return None
+        route = routes[0]
+        tool_config = config.tools.get(route.tool)
+        if tool_config is None or tool_config.input_mode != "stdin":
+            return None
+        return route
+
+    def update(self, text: str, generation: Optional[int] = None) -> Optional[str]:
+        """Route a partial buffer and pre-spawn its tool.
+
+        Args:
+            text: The partial input
+            generation: The generation the buffer was read in; nothing is
+                spawned once the input has since been submitted or discarded
+
+        Returns the tool that is now waiting, if any.
+        """
+        config = self._config or get_config()
+        text = text.strip()
+        if len(text) < MIN_SPECULATIVE_CHARS or text.startswith("/"):
+            return self.current_tool
+
+        route = self._predict(text, config)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return None
+            pending = self._pending
+            if pending is not None and route is not None and pending.tool == route.tool \
+                    and pending.process.poll() is None:
+                return pending.tool
+            self._pending = None
+        if pending is not None:
+            self._discard(pending)
+        if route is None:
+            return None
+
+        try:
+            process = spawn_tool(route, config, new_group=True)
+        except Exception:
+            return None
+        with self._lock:
+            self.stats["spawned"] += 1
+            if generation is not None and generation != self.generation:
+                # Submitted or discarded while the tool was starting
+                stale, current = _Pending(route.tool, process, time.perf_counter()), None
+            else:
+                stale, self._pending = self._pending, _Pending(route.tool, process, time.perf_counter())
+                current = route.tool
+        if stale is not None:
+            self._discard(stale)
+        return current
+
+    @property
+    def current_tool(self) -> Optional[str]:
+        pending = self._pending
+        return pending.tool if pending is not None else None
+
+    def take(self, tool: str) -> Optional[subprocess.Popen]:
+        """Claim the waiting process for a tool that is about to run.
+
+        Returns None (and discards any waiting process for another tool) on a
+        miss.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self.generation += 1
+            self._claimed = None
+        if pending is None:
+            return None
+        if pending.tool != tool or pending.process.poll() is not None:
+            self.stats["misses"] += 1
+            self._discard(pending)
+            return None
+
+        self.stats["hits"] += 1
+        with self._lock:
+            self._claimed = (tool, (time.perf_counter() - pending.spawned_at) * 1000)
+        return pending.process
+
+    def record_first_output(self, tool: str, latency_ms: float) -> None:
+        """Record how long a run took from dispatch to its first output.
+
+        Runs on a claimed process add the boot time they saved to saved_ms;
+        other runs are the baseline that boot time is measured against.
+        """
+        with self._lock:
+            claimed, self._claimed = self._claimed, None
+            if claimed is None or claimed[0] != tool:
+                total, runs = self._cold.get(tool, (0.0, 0))
+                self._cold[tool] = (total + latency_ms, runs + 1)
+                return
+            if tool in self._cold:
+                total, runs = self._cold[tool]
+                boot_ms = max(total / runs - latency_ms, 0.0)
+                # The boot overlapped with typing only while the process waited
+                self.stats["saved_ms"] += min(boot_ms, claimed[1])
+
+    def discard(self) -> None:
+        """Drop the waiting process, if any."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self.generation += 1
+        if pending is not None:
+            self._discard(pending)
+
+    def _discard(self, pending: _Pending) -> None:
+        self.stats["discarded"] += 1
+        discard_process(pending.process)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Counters for /stats, with the hit rate over claimed spawns."""
+        stats = dict(self.stats)
+        claims = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / claims if claims else 0.0
+        return stats
@@ -1,12 +1,21 @@
 """Tool availability and execution management for Terminal AI Workflow CLI."""
 
+import json
+import os
 import shutil
 import subprocess
+import threading
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from .config import get_config
+from .config import Config, get_config
 from .errors import ToolNotFoundError, ToolNotAvailableError, ToolExecutionError
+from .health import ToolHealth, get_health_registry
+
+# Persistent `--version` results, keyed by resolved binary path
+VERSION_CACHE_PATH = Path("config/.tool_versions.cache")
+VERSION_CACHE_VERSION = 1
 
 
 @dataclass
@@ -17,24 +26,96 @@ class ToolStatus:
     command: str
     installed: bool
     authenticated: bool
-    available: bool  # installed AND authenticated
+    available: bool  # as decided by health.probe_tool
     version: Optional[str] = None
     error: Optional[str] = None
 
 
-def check_tool_installed(command: str) -> Tuple[bool, Optional[str]]:
+# resolved path -> {"mtime_ns", "size", "version"}; loaded on first probe
+_version_cache: Optional[Dict[str, dict]] = None
+_version_cache_lock = threading.Lock()
+
+
+def _load_version_cache() -> Dict[str, dict]:
+    """Read the version cache file (empty if missing or unreadable)."""
+    try:
+        data = json.loads(VERSION_CACHE_PATH.read_text(encoding="utf-8"))
+        if data.get("version") == VERSION_CACHE_VERSION:
+            return dict(data.get("binaries", {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _cached_version(resolved: str, st: os.stat_result) -> Tuple[bool, Optional[str]]:
+    """Look up a binary's version; returns (hit, version)."""
+    global _version_cache
+    with _version_cache_lock:
+        if _version_cache is None:
+            _version_cache = _load_version_cache()
+        entry = _version_cache.get(resolved)
+    if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return True, entry.get("version")
+    return False, None
+
+
+def _store_version(resolved: str, st: os.stat_result, version: Optional[str]) -> None:
+    """Record a binary's version and persist the cache."""
+    with _version_cache_lock:
+        if _version_cache is None:
+            return
+        _version_cache[resolved] = {
+            "mtime_ns": st.st_mtime_ns, "size": st.st_size, "version": version
+        }
+        try:
+            VERSION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = VERSION_CACHE_PATH.with_name(VERSION_CACHE_PATH.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({
+                "version": VERSION_CACHE_VERSION, "binaries": _version_cache
+            }), encoding="utf-8")
+            os.replace(tmp, VERSION_CACHE_PATH)
+        except Exception:
+            pass  # Cache is optional
+
+
+def _reset_version_cache() -> None:
+    """Forget the in-memory version cache (for testing)."""
+    global _version_cache
+    with _version_cache_lock:
+        _version_cache = None
+
+
+def check_tool_installed(command: str, use_cache: bool = True) -> Tuple[bool, Optional[str]]:
     """Check if a tool is installed on the system.
 
+    `<command> --version` only runs when the resolved binary is new or its
+    mtime/size changed since the last probe; otherwise the cached version is
+    returned.
+
     Args:
         command: The command to check (e.g., 'claude', 'gemini')
+        use_cache: Consult and update the persistent version cache
 
     Returns:
         Tuple of (is_installed, version_or_error)
     """
     # First check if command exists in PATH
-    if shutil.which(command) is None:
+    path = shutil.which(command)
+    if path is None:
         return False, f"Command '{command}' not found in PATH"
 
+    st = None
+    resolved = os.path.realpath(path)
+    if use_cache:
+        try:
+            st = os.stat(resolved)
+        except OSError:
+            st = None
+        if st is not None:
+            hit, version = _cached_version(resolved, st)
+            if hit:
+                return True, version
+
     # Try to get version info
     try:
         result = subprocess.run(
@@ -45,11 +126,11 @@ def check_tool_installed(command: str) -> Tuple[bool, Optional[str]]:
         )
         if result.returncode == 0:
             version = result.stdout.strip().split('\n')[0]
-            return True, version
         else:
             # Command exists but --version failed, still consider installed
-            return True, None
+            version = None
     except subprocess.TimeoutExpired:
+        # Not cached, so the next probe retries
         return True, "timeout checking version"
     except FileNotFoundError:
         return False, f"Command '{command}' not found"
@@ -57,21 +138,41 @@ def check_tool_installed(command: str) -> Tuple[bool, Optional[str]]:
         # Command might exist but errored
         return True, str(e)
 
+    if st is not None:
+        _store_version(resolved, st, version)
+    return True, version
+
+
+def _status_from_health(health: ToolHealth) -> ToolStatus:
+    return ToolStatus(
+        name=health.name,
+        tool_id=health.tool_id,
+        command=health.command,
+        installed=health.installed,
+        authenticated=health.auth is True,
+        available=health.available,
+        version=health.version,
+        error=health.error
+    )
+
 
-def get_tool_status(tool_id: str) -> ToolStatus:
+def get_tool_status(tool_id: str, config: Optional[Config] = None) -> ToolStatus:
     """Get comprehensive status for a specific tool.
 
+    A view of the health registry's snapshot, so availability follows the
+    same rule as /status and routing (see health.probe_tool).
+
     Args:
         tool_id: Tool identifier ('claude', 'gemini', 'openai')
+        config: Config snapshot (defaults to the global config)
 
     Returns:
         ToolStatus with all availability information
     """
-    config = get_config()
+    if config is None:
+        config = get_config()
 
-    # Get tool config
-    tool_config = config.tools.get(tool_id)
-    if tool_config is None:
+    if tool_id not in config.tools:
         return ToolStatus(
             name=tool_id.title(),
             tool_id=tool_id,
@@ -81,40 +182,19 @@ def get_tool_status(tool_id: str) -> ToolStatus:
             available=False,
             error=f"Tool '{tool_id}' not defined in configuration"
         )
-
-    command = tool_config.command
-    name = tool_config.name
-
-    # Check if installed
-    installed, version_or_error = check_tool_installed(command)
-
-    # Check auth status from config/env
-    auth_status = config.get_effective_auth_status(tool_id)
-    authenticated = auth_status is True
-
-    # Available = installed AND not explicitly unauthenticated
-    available = installed and (auth_status is not False)
-
-    return ToolStatus(
-        name=name,
-        tool_id=tool_id,
-        command=command,
-        installed=installed,
-        authenticated=authenticated,
-        available=available,
-        version=version_or_error if installed else None,
-        error=version_or_error if not installed else None
-    )
+    return _status_from_health(get_health_registry().snapshot(config)[tool_id])
 
 
 def get_all_tools_status() -> List[ToolStatus]:
     """Get status for all configured tools.
 
+    Reads the health registry's snapshot, which probes every tool
+    concurrently when there is none yet for the current config.
+
     Returns:
-        List of ToolStatus for each tool
+        List of ToolStatus for each tool, in config order
     """
-    config = get_config()
-    return [get_tool_status(tool_id) for tool_id in config.tools.keys()]
+    return [_status_from_health(health) for health in get_health_registry().snapshot().values()]
 
 
 def require_tool(tool_id: str) -> ToolStatus:
@@ -128,14 +208,14 @@ def require_tool(tool_id: str) -> ToolStatus:
 
     Raises:
         ToolNotFoundError: If tool is not installed
-        ToolNotAvailableError: If tool is installed but not authenticated
+        ToolNotAvailableError: If tool is installed but not available (e.g. auth missing)
     """
     status = get_tool_status(tool_id)
 
     if not status.installed:
         raise ToolNotFoundError(tool_id, status.command)
 
-    if not status.authenticated:
+    if not status.available:
         raise ToolNotAvailableError(tool_id, "not authenticated in config")
 
     return status
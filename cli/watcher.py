@@ -0,0 +1,254 @@
+"""Config hot reload for Terminal AI Workflow CLI.
+
+A background thread watches config/role_config.json and the .env files the
+config loader reads. When one changes, the config is rebuilt and validated off
+the main thread and swapped in atomically; an invalid edit leaves the current
+snapshot in place. Work already in progress keeps the Config object it started
+with, since snapshots are immutable.
+
+Linux uses inotify (through ctypes, no extra dependency); other platforms poll
+file stats once a second.
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import Config, CONFIG_PATH, _env_candidates, _swap_config
+
+# Seconds between stat checks for the polling backend
+POLL_INTERVAL = 1.0
+# Quiet period after a change before reloading (editors write in several steps)
+DEBOUNCE = 0.1
+
+# inotify constants (linux/inotify.h)
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _InotifyBackend:
+    """Waits for writes to the watched files using inotify."""
+
+    def __init__(self, paths: List[Path]):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Watch directories so atomic replaces (rename over the file) are seen
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        self._names: Dict[int, set] = {}
+        for path in paths:
+            directory = path.parent
+            if not directory.is_dir():
+                continue
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+            if wd < 0:
+                continue
+            self._names.setdefault(wd, set()).add(os.fsencode(path.name))
+        if not self._names:
+            os.close(self._fd)
+            raise OSError("No watchable config directories")
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to timeout seconds; return True if a watched file changed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        changed = False
+        offset = 0
+        while offset + _IN_EVENT.size <= len(data):
+            wd, _mask, _cookie, length = _IN_EVENT.unpack_from(data, offset)
+            offset += _IN_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name in self._names.get(wd, ()):
+                changed = True
+        return changed
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+class _PollingBackend:
+    """Detects changes to the watched files by comparing stat results."""
+
+    def __init__(self, paths: List[Path], interval: float = POLL_INTERVAL):
+        self._paths = paths
+        self._interval = interval
+        self._last = [_stat_key(p) for p in paths]
+        self._stop = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        if self._stop.wait(min(timeout, self._interval)):
+            return False
+        current = [_stat_key(p) for p in self._paths]
+        if current != self._last:
+            self._last = current
+            return True
+        return False
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+class ConfigWatcher:
+    """Background thread that reloads the config when its files change.
+
+    Args:
+        config_path: Config file to watch (defaults to config/role_config.json)
+        on_reload: Called with the new Config after a successful swap
+        on_error: Called with the exception when a changed config fails to load
+        use_inotify: Try inotify before falling back to polling
+        poll_interval: Seconds between checks for the polling backend
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        on_reload: Optional[Callable[[Config], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        use_inotify: bool = True,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.config_path = Path(config_path) if config_path else CONFIG_PATH
+        self.on_reload = on_reload
+        self.on_error = on_error
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.backend_name: Optional[str] = None
+        self.reload_count = 0
+        self.last_error: Optional[Exception] = None
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def watched_paths(self) -> List[Path]:
+        """Config file plus every .env location up to the one in use.
+
+        A new .env nearer than the current one would shadow it, so those
+        locations are watched too.
+        """
+        paths = [self.config_path]
+        candidates = _env_candidates()
+        for candidate in candidates:
+            paths.append(candidate)
+            if candidate.is_file():
+                break
+        else:
+            paths = [self.config_path] + candidates[:2]
+        return paths
+
+    def start(self) -> "ConfigWatcher":
+        """Start watching in a daemon thread."""
+        if self._thread is not None:
+            return self
+        paths = self.watched_paths
+        self._backend = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._backend = _InotifyBackend(paths)
+                self.backend_name = "inotify"
+            except (OSError, AttributeError):
+                self._backend = None
+        if self._backend is None:
+            self._backend = _PollingBackend(paths, self.poll_interval)
+            self.backend_name = "polling"
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the watcher thread and release its resources."""
+        self._stop.set()
+        backend = self._backend
+        if isinstance(backend, _PollingBackend):
+            backend.close()  # Wake the thread from its sleep
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if backend is not None:
+            backend.close()
+            self._backend = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._backend.wait(0.5):
+                continue
+            # Let the writer finish; collapse bursts of events into one reload
+            while not self._stop.is_set() and self._backend.wait(DEBOUNCE):
+                pass
+            if not self._stop.is_set():
+                self.reload()
+
+    def reload(self) -> bool:
+        """Rebuild the config and swap it in. Returns False if it failed to load."""
+        try:
+            # Edited .env values must replace the ones loaded at startup
+            config = Config.load(self.config_path, override_env=True)
+        except Exception as e:
+            # Keep serving the previous snapshot
+            self.last_error = e
+            if self.on_error:
+                self.on_error(e)
+            return False
+
+        self.last_error = None
+        self.reload_count += 1
+        _swap_config(config)
+        if self.on_reload:
+            self.on_reload(config)
+        return True
+
+
+# Module-level watcher used by the REPL
+_watcher: Optional[ConfigWatcher] = None
+
+
+def start_config_watcher(**kwargs) -> ConfigWatcher:
+    """Start the global config watcher (no-op if already running)."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ConfigWatcher(**kwargs).start()
+    return _watcher
+
+
+def stop_config_watcher() -> None:
+    """Stop the global config watcher if it is running."""
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
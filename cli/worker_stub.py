@@ -0,0 +1,58 @@
+"""Local stand-in for a tool worker session.
+
+Speaks the worker protocol from cli/workers.py, so worker pools can be tried
+and tested without a vendor CLI:
+
+    python -m cli.worker_stub [--sentinel TEXT] [--delay SECONDS]
+
+Each request is answered with the task echoed back, prefixed by the worker's
+pid and request number. A task starting with "!exit N" answers with exit
+code N; "!crash" makes the worker exit without answering.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+DEFAULT_SENTINEL = "<<<WORKFLOW-END>>>"
+
+
+def serve(sentinel: str, delay: float = 0.0) -> None:
+    """Answer requests from stdin until it closes."""
+    served = 0
+    lines = []
+    for line in sys.stdin:
+        if line.rstrip("\r\n") != sentinel:
+            lines.append(line)
+            continue
+
+        task = "".join(lines).rstrip("\n")
+        lines = []
+        served += 1
+        if task.startswith("!crash"):
+            sys.exit(3)
+
+        exit_code = 0
+        if task.startswith("!exit"):
+            parts = task.split()
+            exit_code = int(parts[1]) if len(parts) > 1 else 1
+
+        if delay:
+            time.sleep(delay)
+        sys.stdout.write(f"[worker pid={os.getpid()} request={served}]\n")
+        sys.stdout.write(task + "\n")
+        sys.stdout.write(f"{sentinel} {exit_code}\n")
+        sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub tool worker")
+    parser.add_argument("--sentinel", default=DEFAULT_SENTINEL)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait per request")
+    options = parser.parse_args()
+    serve(options.sentinel, options.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Persistent tool worker pools for Terminal AI Workflow CLI.
+
+Tools with a "worker" block in role_config.json run tasks on long-lived
+session processes instead of spawning a new process per prompt. Each pool
+keeps up to `size` warm workers and recycles a worker after `max_requests`
+tasks or once its memory use passes `max_memory_mb`. A worker still busy
+after `timeout` seconds is killed and replaced.
+
+Worker protocol (line based, over the worker's stdin/stdout):
+
+    request:   the task text, then a line containing only the sentinel
+    response:  output lines, then a line "<sentinel>" or "<sentinel> <exit code>"
+
+There is no escaping, so tasks with a line equal to the sentinel are not
+sent to workers (see WorkerPool.accepts).
+
+Vendor CLIs are wired in through a small wrapper that speaks this protocol;
+`python -m cli.worker_stub` is a local implementation for testing.
+"""
+
+import atexit
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import Config, ToolConfig, WorkerConfig
+from .errors import ToolExecutionError
+from .executor import _write_stdin, join_command, kill_process_tree, new_process_group
+
+
+class ToolWorker:
+    """One persistent session process for a tool."""
+
+    def __init__(self, tool_id: str, command: str, sentinel: str):
+        self.tool_id = tool_id
+        self.command = command
+        self.sentinel = sentinel
+        self.requests = 0
+        self.started_at = time.time()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            encoding='utf-8',
+            errors='replace',
+            shell=True,  # Required for Windows .CMD files (npm-installed CLIs)
+            # Own process group, so kill() reaches the tool and not just the shell
+            **new_process_group()
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, task: str, on_output: Callable[[str], None],
+            timeout: float = 0) -> Tuple[str, int]:
+        """Send one task and stream its response.
+
+        The task is written from a helper thread, so a worker that starts
+        answering before it has read a large task cannot fill its stdout pipe
+        and deadlock with us.
+
+        Args:
+            task: Task text
+            on_output: Called with each output line
+            timeout: Seconds before the worker is killed (0 = no limit)
+
+        Returns:
+            Tuple of (output, exit_code)
+
+        Raises:
+            ToolExecutionError: If the worker exits or times out before finishing the response
+        """
+        self.requests += 1
+        writer = threading.Thread(
+            target=_write_stdin,
+            args=(self.process.stdin, f"{task.rstrip(chr(10))}\n{self.sentinel}\n"),
+            kwargs={"close": False},
+            name=f"worker-stdin-{self.tool_id}",
+            daemon=True
+        )
+        writer.start()
+
+        # Killing a hung worker closes its stdout, which ends the read loop below
+        timed_out = threading.Event()
+        timer = None
+        if timeout:
+            def expire():
+                timed_out.set()
+                self.kill()
+
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+
+        lines = []
+        marker = self.sentinel + " "
+        try:
+            for line in iter(self.process.stdout.readline, ''):
+                stripped = line.rstrip("\r\n")
+                if stripped == self.sentinel or stripped.startswith(marker):
+                    code = stripped[len(self.sentinel):].strip()
+                    exit_code = int(code) if code.lstrip("-").isdigit() else 0
+                    writer.join()
+                    return "".join(lines), exit_code
+                lines.append(line)
+                on_output(line)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if timed_out.is_set():
+            reason = f"worker timed out after {timeout:g}s"
+        else:
+            reason = "worker exited before finishing the response"
+        raise ToolExecutionError(
+            self.tool_id, self.command, self.process.poll() or -1,
+            f"{reason}:\n" + "".join(lines)
+        )
+
+    def memory_mb(self) -> Optional[float]:
+        """Resident memory of the worker process, where the platform reports it."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            with open(f"/proc/{self.process.pid}/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    def kill(self) -> None:
+        """Kill the worker and anything its shell started."""
+        kill_process_tree(self.process)
+
+    def close(self) -> None:
+        """End the session: close stdin, then kill if it does not exit."""
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            self.process.wait()
+        try:
+            self.process.stdout.close()
+        except Exception:
+            pass
+
+
+class WorkerPool:
+    """Up to `size` warm workers for one tool.
+
+    Args:
+        tool_id: Tool identifier
+        tool_config: The tool's config; its worker block must be set
+    """
+
+    def __init__(self, tool_id: str, tool_config: ToolConfig):
+        self.tool_id = tool_id
+        self.settings: WorkerConfig = tool_config.worker
+        self.command = join_command([tool_config.command] + list(self.settings.args))
+        # Most recently used first, so one worker stays warm under light load
+        self._idle: "queue.LifoQueue[ToolWorker]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.settings.size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._live = 0  # started and not yet closed, idle or busy
+        self.stats = {"started": 0, "requests": 0, "recycled": 0, "failed": 0}
+
+    def _start_worker(self, reserved: bool = False) -> ToolWorker:
+        """Start a worker; reserved means warm() already counted it as live."""
+        try:
+            worker = ToolWorker(self.tool_id, self.command, self.settings.sentinel)
+        except Exception:
+            if reserved:
+                with self._lock:
+                    self._live -= 1
+            raise
+        with self._lock:
+            self.stats["started"] += 1
+            if not reserved:
+                self._live += 1
+        return worker
+
+    def _retire(self, worker: ToolWorker) -> None:
+        worker.close()
+        with self._lock:
+            self._live -= 1
+
+    def warm(self) -> None:
+        """Start idle workers until idle plus busy workers reach the pool size."""
+        with self._lock:
+            missing = max(self.settings.size - self._live, 0)
+            self._live += missing
+        for _ in range(missing):
+            self._idle.put(self._start_worker(reserved=True))
+
+    def _should_recycle(self, worker: ToolWorker) -> bool:
+        if not worker.alive or worker.requests >= self.settings.max_requests:
+            return True
+        if self.settings.max_memory_mb:
+            memory = worker.memory_mb()
+            return memory is not None and memory > self.settings.max_memory_mb
+        return False
+
+    def run(self, task: str, on_output: Callable[[str], None]) -> Tuple[str, int]:
+        """Run a task on a free worker, waiting for one if all are busy.
+
+        Returns:
+            Tuple of (output, exit_code)
+
+        Raises:
+            ValueError: If the task contains the sentinel line (see accepts())
+        """
+        if not self.accepts(task):
+            raise ValueError(f"Task contains the worker sentinel line {self.settings.sentinel!r}")
+        self._slots.acquire()
+        worker = None
+        try:
+            try:
+                worker = self._idle.get_nowait()
+                if not worker.alive:
+                    self._retire(worker)
+                    worker = self._start_worker()
+            except queue.Empty:
+                worker = self._start_worker()
+
+            with self._lock:
+                self.stats["requests"] += 1
+            try:
+                result = worker.run(task, on_output, timeout=self.settings.timeout)
+            except Exception:
+                with self._lock:
+                    self.stats["failed"] += 1
+                self._retire(worker)
+                worker = None
+                # Replace the dead or killed worker, so the pool stays warm
+                if not self._closed:
+                    self._idle.put(self._start_worker())
+                raise
+
+            if self._should_recycle(worker) or self._closed:
+                with self._lock:
+                    self.stats["recycled"] += 1
+                self._retire(worker)
+            else:
+                self._idle.put(worker)
+            worker = None
+            return result
+        finally:
+            if worker is not None:
+                self._retire(worker)
+            self._slots.release()
+
+    def accepts(self, task: str) -> bool:
+        """Whether a task can be sent to a worker.
+
+        The protocol has no escaping, so a task with a line equal to the
+        sentinel would end the request early and desync the worker.
+        """
+        sentinel = self.settings.sentinel
+        return not any(line.rstrip("\r") == sentinel for line in task.split("\n"))
+
+    def close(self) -> None:
+        """Stop all idle workers; busy ones stop when their task finishes."""
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+# Pools by tool id, with the config they were built from
+_pools: Dict[str, Tuple[Tuple[str, WorkerConfig], WorkerPool]] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(tool_id: str, config: Config) -> WorkerPool:
+    """Get the worker pool for a tool, replacing it if its settings changed."""
+    tool_config = config.tools[tool_id]
+    if tool_config.worker is None:
+        raise ValueError(f"Tool '{tool_id}' has no worker pool configured")
+
+    key = (tool_config.command, tool_config.worker)
+    stale = None
+    with _pools_lock:
+        current = _pools.get(tool_id)
+        if current is None or current[0] != key:
+            stale = current[1] if current else None
+            current = (key, WorkerPool(tool_id, tool_config))
+            _pools[tool_id] = current
+    if stale is not None:
+        stale.close()
+    return current[1]
+
+
+def get_worker_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Per-tool pool counters for /stats."""
+    with _pools_lock:
+        pools = {tool_id: entry[1] for tool_id, entry in _pools.items()}
+    return {
+        tool_id: dict(pool.stats, idle=pool._idle.qsize(), size=pool.settings.size)
+        for tool_id, pool in pools.items()
+    }
+
+
+def shutdown_worker_pools() -> None:
+    """Stop every pool's idle workers."""
+    with _pools_lock:
+        pools = [entry[1] for entry in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(shutdown_worker_pools)
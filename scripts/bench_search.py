@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Document Library Search Benchmark
+
+Measures ranking quality on the bundled docs/library against a set of
+judged queries, then builds the index over generated libraries and measures
+build time, no-op refresh time, the time to open the saved index and /docs search latency
+as the library grows. Every scorer of the Python engine is benchmarked, and the
+SQLite FTS5 engine next to them.
+
+Usage:
+    python scripts/bench_search.py                    # 100, 1000 and 10000 documents
+    python scripts/bench_search.py --sizes 20000      # Custom library sizes
+    python scripts/bench_search.py --scorers bm25     # One scorer only
+    python scripts/bench_search.py --engines sqlite   # SQLite FTS5 engine only
+    python scripts/bench_search.py --semantic         # Also with semantic fusion (needs NumPy)
+    python scripts/bench_search.py --workers 1        # Build without a process pool
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from cli.knowledge.index import DocumentIndex, SCORERS  # noqa: E402
+from cli.knowledge.fts import SQLiteDocumentIndex, fts5_available  # noqa: E402
+from cli.knowledge.semantic import numpy_available  # noqa: E402
+
+ENGINES = ("python", "sqlite")
+
+# Interactive /docs search budget per query, in milliseconds
+SEARCH_BUDGET_MS = 50
+
+# Vocabulary for generated documents: common words plus a long tail of rare ones
+_COMMON = ("workflow routing research build review tool config prompt output "
+           "session index document search terminal model context").split()
+
+QUERIES = ["routing", "review prompt", "session config output", "term4711", "zzzmissing",
+           '"review prompt"', "routing AND review NOT output", "reviwe", "ut"]
+
+# Judged queries over docs/library: query -> the document that should rank first
+RELEVANCE_QUERIES = {
+    "gemini cli best practices": "gemini_cli.md",
+    "gemini authentication": "gemini_cli.md",
+    "claude code slash commands": "claude_cli.md",
+    "claude permissions": "claude_cli.md",
+    "codex cli configuration": "codex_cli.md",
+    "codex approval mode": "codex_cli.md",
+    "auditor": "Workflow_Strategy.md",
+    "scout researcher": "Workflow_Strategy.md",
+    "3-model architecture strategy": "Workflow_Strategy.md",
+    "autogen crewai comparison": "multi_agent_frameworks_comparison.md",
+    "langgraph": "multi_agent_frameworks_comparison.md",
+    "command reference": "AI_CLI_Commands_Reference.md",
+}
+
+
+@dataclass
+class RelevanceBenchmark:
+    """Ranking quality of one engine and scorer on the judged queries."""
+    scorer: str
+    ranks: Dict[str, int]  # query -> rank of the expected document (0 = not found)
+
+    @property
+    def mrr(self) -> float:
+        return statistics.mean(1 / rank if rank else 0.0 for rank in self.ranks.values())
+
+    @property
+    def precision_at_1(self) -> float:
+        return statistics.mean(1.0 if rank == 1 else 0.0 for rank in self.ranks.values())
+
+
+@dataclass
+class SearchBenchmark:
+    """Timings for one library size."""
+    num_docs: int
+    build_ms: float
+    refresh_ms: float  # refresh of the unchanged library
+    open_ms: float  # opening the saved index in a new DocumentIndex
+    trigrams_ms: float  # building the vocabulary and name trigram indexes
+    query_ms: List[float]
+
+    @property
+    def median_query_ms(self) -> float:
+        return statistics.median(self.query_ms)
+
+
+def generate_library(directory: Path, num_docs: int, seed: int = 0) -> None:
+    """Write num_docs markdown files of ~200 words each."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(num_docs):
+        words = [rng.choice(_COMMON) if rng.random() < 0.6 else f"term{rng.randrange(50_000)}"
+                 for _ in range(200)]
+        (directory / f"doc_{i:05d}.md").write_text(f"# Document {i}\n\n" + " ".join(words),
+                                                  encoding="utf-8")
+
+
+def _new_index(engine: str, scorer: str, semantic: bool = False,
+               workers: int = 0) -> DocumentIndex:
+    index_class = SQLiteDocumentIndex if engine == "sqlite" else DocumentIndex
+    return index_class(scorer=scorer, semantic=semantic, workers=workers)
+
+
+def _variants(engines: List[str], scorers: List[str],
+              semantic: bool = False) -> Iterator[Tuple[str, str, str, bool]]:
+    """(label, engine, scorer, semantic) to benchmark.
+
+    The SQLite engine always ranks with bm25(); with semantic, each variant
+    is also run with semantic fusion.
+    """
+    for engine in engines:
+        if engine == "sqlite":
+            if not fts5_available():
+                continue
+            labels = [("sqlite", "bm25")]
+        else:
+            labels = [(scorer, scorer) for scorer in scorers]
+        for label, scorer in labels:
+            yield label, engine, scorer, False
+            if semantic:
+                yield f"{label}+sem", engine, scorer, True
+
+
+def bench_relevance(scorer: str, library: Path = PROJECT_ROOT / "docs" / "library",
+                    engine: str = "python", semantic: bool = False) -> RelevanceBenchmark:
+    """Rank of the expected document for each judged query."""
+    with tempfile.TemporaryDirectory() as tmp, \
+            patch("cli.knowledge.index.DOCUMENT_LIBRARY_PATH", library), \
+            patch("cli.knowledge.index.INDEX_CACHE_PATH", Path(tmp) / "index.bin"), \
+            patch("cli.knowledge.fts.INDEX_DB_PATH", Path(tmp) / "index.db"), \
+            patch("cli.knowledge.semantic.VECTORS_PATH", Path(tmp) / "vectors.npy"):
+        index = _new_index(engine, scorer, semantic)
+        index.build_index()
+        ranks = {}
+        for query, expected in RELEVANCE_QUERIES.items():
+            names = [result.name for result in index.search(query, top_k=len(index.entries))]
+            ranks[query] = names.index(expected) + 1 if expected in names else 0
+        if engine == "sqlite":
+            index.close()
+    return RelevanceBenchmark(scorer=scorer, ranks=ranks)
+
+
+def bench_library(num_docs: int, repeat: int = 5, scorer: str = "bm25",
+                  engine: str = "python", semantic: bool = False,
+                  workers: int = 0) -> SearchBenchmark:
+    """Build an index over a generated library and time each query."""
+    with tempfile.TemporaryDirectory() as tmp:
+        library = Path(tmp) / "library"
+        generate_library(library, num_docs)
+        with patch("cli.knowledge.index.DOCUMENT_LIBRARY_PATH", library), \
+                patch("cli.knowledge.index.INDEX_CACHE_PATH", Path(tmp) / "index.bin"), \
+                patch("cli.knowledge.fts.INDEX_DB_PATH", Path(tmp) / "index.db"), \
+                patch("cli.knowledge.semantic.VECTORS_PATH", Path(tmp) / "vectors.npy"):
+            index = _new_index(engine, scorer, semantic, workers)
+            start = time.perf_counter()
+            index.build_index()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            # Built by prewarm in the CLI, before the first query
+            start = time.perf_counter()
+            index._term_index()
+            index._name_index()
+            trigrams_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            index.refresh()
+            refresh_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            reopened = _new_index(engine, scorer, semantic)
+            reopened._load_cache()
+            open_ms = (time.perf_counter() - start) * 1000
+
+            query_ms = []
+            for query in QUERIES:
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    index.search(query)
+                    query_ms.append((time.perf_counter() - start) * 1000)
+            if engine == "sqlite":
+                index.close()
+                reopened.close()
+
+    return SearchBenchmark(num_docs=num_docs, build_ms=build_ms, refresh_ms=refresh_ms,
+                           open_ms=open_ms, trigrams_ms=trigrams_ms, query_ms=query_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Document Library search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Library sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    parser.add_argument("--scorers", nargs="+", choices=SCORERS, default=list(SCORERS),
+                        help="Scorers of the Python engine to benchmark")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES),
+                        help="Search engines to benchmark")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processes that parse files on build (0 = one per CPU)")
+    parser.add_argument("--semantic", action="store_true",
+                        help="Also benchmark each variant with semantic fusion (needs NumPy)")
+    options = parser.parse_args()
+    if options.semantic and not numpy_available():
+        parser.error("--semantic needs NumPy")
+    variants = list(_variants(options.engines, options.scorers, options.semantic))
+
+    print(f"Relevance on docs/library ({len(RELEVANCE_QUERIES)} judged queries)")
+    for label, engine, scorer, semantic in variants:
+        relevance = bench_relevance(scorer, engine=engine, semantic=semantic)
+        missed = [query for query, rank in relevance.ranks.items() if rank != 1]
+        print(f"  {label:10}  MRR {relevance.mrr:.3f}  P@1 {relevance.precision_at_1:.3f}")
+        for query in missed:
+            print(f"              rank {relevance.ranks[query] or '-'}: {query}")
+    print()
+
+    failed = False
+    for size in options.sizes:
+        print(f"{size} documents")
+        for label, engine, scorer, semantic in variants:
+            result = bench_library(size, options.repeat, scorer, engine, semantic,
+                                   options.workers)
+            worst = max(result.query_ms)
+            over = worst > SEARCH_BUDGET_MS
+            failed = failed or over
+
+            print(f"  {label}")
+            print(f"    build:        {result.build_ms:9.1f} ms")
+            print(f"    refresh:      {result.refresh_ms:9.1f} ms (nothing changed)")
+            print(f"    open index:   {result.open_ms:9.1f} ms")
+            print(f"    trigrams:     {result.trigrams_ms:9.1f} ms")
+            print(f"    query median: {result.median_query_ms:9.2f} ms")
+            print(f"    query worst:  {worst:9.2f} ms (budget {SEARCH_BUDGET_MS} ms)"
+                  f"{'  OVER' if over else ''}")
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+
+Measures cold-start cost of short CLI invocations using `python -X importtime`.
+
+Usage:
+    python scripts/bench_startup.py              # --version and --status
+    python scripts/bench_startup.py --top 15     # Show 15 slowest imports
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Cumulative import-time budget per invocation, in milliseconds
+STARTUP_BUDGETS_MS = {
+    "--version": 250,
+    "--status": 400,
+}
+
+# Modules that short invocations must never import
+HEAVY_MODULES = ["prompt_toolkit", "rich.markdown", "cli.repl", "cli.knowledge"]
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Runs the CLI entry point in-process so -X importtime sees every import
+_RUNNER = (
+    "import sys; sys.argv = ['workflow'] + sys.argv[1:]\n"
+    "from cli.app import cli\n"
+    "try:\n"
+    "    cli()\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+
+@dataclass
+class StartupProfile:
+    """Import profile of one CLI invocation."""
+    args: List[str]
+    wall_ms: float
+    import_ms: float  # sum of top-level cumulative import times
+    modules: Dict[str, float]  # module -> cumulative import time (ms)
+
+    def slowest(self, n: int) -> List[Tuple[str, float]]:
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def profile_startup(args: List[str]) -> StartupProfile:
+    """Run the CLI with -X importtime and parse the import profile."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _RUNNER] + args,
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    modules: Dict[str, float] = {}
+    import_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        modules[match.group(4)] = cumulative_ms
+        if len(match.group(3)) == 1:  # top-level import
+            import_ms += cumulative_ms
+
+    return StartupProfile(args=args, wall_ms=wall_ms, import_ms=import_ms, modules=modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show")
+    options = parser.parse_args()
+
+    failed = False
+    for flag, budget in STARTUP_BUDGETS_MS.items():
+        profile = profile_startup([flag])
+        over = profile.import_ms > budget
+        heavy = [m for m in HEAVY_MODULES if m in profile.modules]
+        failed = failed or over or bool(heavy)
+
+        print(f"workflow {flag}")
+        print(f"  wall time:   {profile.wall_ms:7.1f} ms")
+        print(f"  import time: {profile.import_ms:7.1f} ms (budget {budget} ms){'  OVER' if over else ''}")
+        if heavy:
+            print(f"  heavy imports: {', '.join(heavy)}")
+        for module, ms in profile.slowest(options.top):
+            print(f"    {ms:7.1f} ms  {module}")
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Tests for cli/knowledge/fts.py module."""
+
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from cli.knowledge.fts import SQLiteDocumentIndex, fts5_available
+from cli.knowledge.index import _get_index
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite built without FTS5")
+
+
+@pytest.fixture
+def fts_library(temp_docs_library):
+    """Patch the library and database paths; yields the library directory."""
+    with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+            patch('cli.knowledge.fts.INDEX_DB_PATH', temp_docs_library.parent / "index.db"):
+        yield temp_docs_library
+
+
+class TestSQLiteSearch:
+    """Tests for searching through FTS5."""
+
+    def test_build_and_search(self, fts_library):
+        """Test documents are indexed and ranked by bm25()."""
+        index = SQLiteDocumentIndex()
+        assert index.build_index() == 2
+
+        results = index.search("claude")
+        assert results[0].name == "test_commands.md"
+        assert results[0].score > 0
+        assert "claude" in results[0].snippet.lower()
+        assert index.search("zzzmissing") == []
+
+    def test_best_section(self, fts_library):
+        """Test results point at the best matching section and read only its range."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        result = index.search("gemini prompt")[0]
+        assert result.section == "Test Commands Reference > 2. Gemini CLI > Commands"
+        assert "One-shot prompt" in result.snippet
+        assert index.read_passage(result.name, result.start, result.end) == \
+            '### Commands\n- `gemini` Start interactive mode\n- `gemini -p "query"` One-shot prompt\n'
+
+    def test_snippet_markers(self, fts_library):
+        """Test snippet() marks matches with the configured markers."""
+        index = SQLiteDocumentIndex(snippet_markers=("<", ">"))
+        index.build_index()
+        assert "<Claude>" in index.search("claude")[0].snippet
+
+    def test_phrase_and_boolean_queries(self, fts_library):
+        """Test phrases and operators are translated to FTS5 expressions."""
+        (fts_library / "output.md").write_text("# Output\n\nUse stream-json for a JSON stream.\n")
+        index = SQLiteDocumentIndex()
+        index.build_index()
+
+        def names(query):
+            return sorted(r.name for r in index.search(query, top_k=10))
+
+        assert names('"stream json"') == ["output.md"]
+        assert names('"format json"') == []
+        assert names("claude NOT auditor") == ["test_commands.md"]
+        assert names("claude AND auditor") == ["Workflow_Strategy.md"]
+        assert names("NOT claude") == []
+
+    def test_fragments(self, fts_library):
+        """Test snippet() matches are returned as fragment ranges."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        fragment = index.search("auditor")[0].fragments[0]
+        assert [fragment.text[s:e] for s, e in fragment.matches] == ["Auditor"]
+
+    def test_typo_and_substring(self, fts_library):
+        """Test typos are corrected and short queries expand to vocabulary terms."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        assert index.search("wrokflow")[0].name == "Workflow_Strategy.md"
+        results = index.search("li")
+        assert [r.name for r in results] == ["test_commands.md"]
+        assert results[0].fragments[0].matches
+
+    def test_title_weight(self, fts_library):
+        """Test title matches outrank the same term in another body."""
+        (fts_library / "auditor.md").write_text("# Auditor guide\n\nsteps for the review")
+        (fts_library / "notes.md").write_text("# Review notes\n\nthe auditor checks steps")
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        assert index.search("auditor")[0].name == "auditor.md"
+
+    def test_substring_fallback(self, fts_library):
+        """Test queries without indexable terms fall back to substring matching."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        results = index.search("CL")
+        assert "test_commands.md" in [r.name for r in results]
+        assert all(r.score == 1.0 for r in results)
+
+    def test_get_document_and_highlight(self, fts_library):
+        """Test documents are read from the database and highlight() marks matches."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        content = (fts_library / "test_commands.md").read_text()
+        assert index.get_document("test_commands") == content
+        assert "**Claude**" in index.highlight("test_commands.md", "claude")
+        assert index.highlight("test_commands.md", "zzzmissing") is None
+
+    def test_export_json(self, fts_library, tmp_path):
+        """Test the JSON export carries entries and FTS5 postings."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        assert index.export_json(tmp_path / "index.json") == 2
+        data = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+        assert data["postings"]["claude"]["test_commands.md"] >= 1
+        assert set(data["fingerprints"]) == set(data["entries"])
+
+
+class TestSQLiteRefresh:
+    """Tests for incremental, transactional updates."""
+
+    def test_added_changed_removed(self, fts_library):
+        """Test only affected files are re-indexed and searches follow."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        (fts_library / "new_notes.md").write_text("# New\n\nzebrafish protocol")
+        (fts_library / "test_commands.md").write_text("# Changed\n\nplatypus only")
+        (fts_library / "Workflow_Strategy.md").unlink()
+        stats = index.refresh()
+
+        assert stats.added == ["new_notes.md"]
+        assert stats.changed == ["test_commands.md"]
+        assert stats.removed == ["Workflow_Strategy.md"]
+        assert index.search("zebrafish")[0].name == "new_notes.md"
+        assert index.search("platypus")[0].name == "test_commands.md"
+        assert index.search("claude") == []
+
+    def test_reopened_index_reads_nothing(self, fts_library):
+        """Test a new instance refreshes from stored fingerprints."""
+        SQLiteDocumentIndex().build_index()
+        loaded = SQLiteDocumentIndex()
+        with patch('cli.knowledge.index._RACY_WINDOW_NS', 0), \
+                patch.object(SQLiteDocumentIndex, '_index_file') as index_file:
+            loaded._ensure_loaded()
+        index_file.assert_not_called()
+        assert loaded.fingerprints.keys() == loaded.entries.keys() == {
+            "test_commands.md", "Workflow_Strategy.md"}
+
+    def test_failed_refresh_rolls_back(self, fts_library):
+        """Test an error mid-refresh leaves the previous index in place."""
+        index = SQLiteDocumentIndex()
+        index.build_index()
+        (fts_library / "new_notes.md").write_text("# New\n\nzebrafish protocol")
+        (fts_library / "Workflow_Strategy.md").unlink()
+        with patch.object(SQLiteDocumentIndex, '_save_cache',
+                          side_effect=sqlite3.OperationalError("disk I/O error")):
+            with pytest.raises(sqlite3.Error):
+                index.refresh()
+
+        assert set(index.entries) == {"test_commands.md", "Workflow_Strategy.md"}
+        assert index._find_entry("new_notes.md") is None
+        assert index.refresh().added == ["new_notes.md"]
+
+    def test_configured_engine(self, fts_library, temp_config_file, sample_role_config,
+                               monkeypatch):
+        """Test the singleton uses the engine from role_config.json."""
+        from cli.config import _reset_config
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        sample_role_config["knowledge"] = {"engine": "sqlite"}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        _reset_config()
+        try:
+            with patch('cli.knowledge.index._index', None):
+                assert isinstance(_get_index(), SQLiteDocumentIndex)
+        finally:
+            _reset_config()
@@ -3,6 +3,7 @@
 import json
 import pytest
 from pathlib import Path
+from typing import Dict
 from unittest.mock import patch, MagicMock
 
 from cli.knowledge.index import (
@@ -234,8 +235,8 @@ class TestDocumentIndex:
                 assert len(docs) >= 1
                 assert all("name" in d and "title" in d and "type" in d for d in docs)
 
-    def test_calculate_idf(self):
-        """Test IDF calculation."""
+    def test_update_idf(self):
+        """Test IDF calculation from the postings."""
         index = DocumentIndex()
         index.entries = {
             "doc1": IndexEntry(
@@ -247,7 +248,8 @@ class TestDocumentIndex:
                 title="Doc 2", content="", terms={"common": 1, "unique2": 1}
             )
         }
-        index._calculate_idf()
+        index._build_postings()
+        index._update_idf()
 
         # "common" appears in both docs, should have lower IDF
         # "unique1" and "unique2" appear in one doc each, should have higher IDF
@@ -325,3 +327,688 @@ class TestCaching:
         with patch('cli.knowledge.index.INDEX_CACHE_PATH', tmp_path / "nonexistent.json"):
             loaded = index._load_cache()
             assert loaded is False
+
+
+def _synthetic_index(num_docs: int, scorer: str = "bm25") -> DocumentIndex:
+    """An index of generated documents; doc7 alone mentions 'needle'."""
+    index = DocumentIndex(scorer=scorer)
+    for i in range(num_docs):
+        text = f"filler text number{i} shared words everywhere"
+        if i == 7:
+            text += " needle needle"
+        index.entries[f"doc{i}.md"] = IndexEntry(
+            name=f"doc{i}.md", path="", doc_type="markdown",
+            title=f"Doc {i}", content=text, terms=index._tokenize(text),
+            positions=index._term_positions(text)
+        )
+    index._build_postings()
+    index._update_idf()
+    index._loaded = True
+    return index
+
+
+class TestInvertedIndex:
+    """Tests for the term -> postings index."""
+
+    def test_postings_built(self, temp_docs_library):
+        """Test build_index records which documents contain each term."""
+        index = DocumentIndex()
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library):
+            with patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"):
+                index.build_index()
+        for name, entry in index.entries.items():
+            for term, freq in entry.terms.items():
+                assert index.postings[term][name] == freq
+
+    def test_rare_term_touches_only_its_documents(self):
+        """Test a rare term scores and snippets only the documents containing it."""
+        index = _synthetic_index(500)
+        with patch.object(index, '_fragments', wraps=index._fragments) as fragments:
+            results = index.search("needle", top_k=5)
+        assert [r.name for r in results] == ["doc7.md"]
+        assert fragments.call_count == 1
+
+    def test_top_k_matches_full_sort(self):
+        """Test heap selection returns the same ranking as scoring everything."""
+        index = _synthetic_index(50, scorer="tfidf")
+        query_terms = index._tokenize("needle filler number3")
+        scored = [
+            (sum(e.terms.get(term, 0) * index._term_idf(term) * freq
+                 for term, freq in query_terms.items()), e.name)
+            for e in index.entries.values()
+        ]
+        expected = sorted(item for item in scored if item[0] > 0)[::-1][:3]
+        results = index.search("needle filler number3", top_k=3)
+        assert [r.score for r in results] == pytest.approx([score for score, _ in expected])
+        assert results[0].name in ("doc7.md", "doc3.md")
+
+    def test_cache_round_trip(self, tmp_path):
+        """Test postings are persisted and term frequencies restored from them."""
+        index = _synthetic_index(10)
+        with patch('cli.knowledge.index.INDEX_CACHE_PATH', tmp_path / "cache.json"):
+            index._save_cache()
+            loaded = DocumentIndex()
+            assert loaded._load_cache()
+
+        assert loaded.postings == index.postings
+        assert [r.name for r in loaded.search("needle")] == ["doc7.md"]
+        loaded._materialize()
+        assert loaded.entries["doc7.md"].terms == index.entries["doc7.md"].terms
+
+    def test_old_cache_rebuilt(self, tmp_path):
+        """Test a cache without a matching version is ignored."""
+        cache_path = tmp_path / "cache.json"
+        cache_path.write_text(json.dumps({"entries": {}, "idf": {}}))
+        with patch('cli.knowledge.index.INDEX_CACHE_PATH', cache_path):
+            assert DocumentIndex()._load_cache() is False
+
+
+class TestBM25:
+    """Tests for BM25F ranking."""
+
+    def _index(self, docs: Dict[str, tuple], **kwargs) -> DocumentIndex:
+        index = DocumentIndex(**kwargs)
+        for name, (title, content) in docs.items():
+            index.entries[name] = IndexEntry(
+                name=name, path="", doc_type="markdown", title=title,
+                content=content, terms=index._tokenize(content)
+            )
+        index._build_postings()
+        index._update_idf()
+        index._loaded = True
+        return index
+
+    def test_unknown_scorer(self):
+        """Test an unknown scorer is rejected."""
+        with pytest.raises(ValueError):
+            DocumentIndex(scorer="pagerank")
+
+    def test_term_in_every_document_still_scores(self):
+        """Test BM25 IDF stays positive where log(N/df) is zero."""
+        docs = {"a.md": ("A", "routing notes"), "b.md": ("B", "routing table")}
+        assert self._index(docs, scorer="tfidf").search("routing") == []
+        assert len(self._index(docs).search("routing")) == 2
+
+    def test_long_document_does_not_dominate(self):
+        """Test length normalization favors the focused document."""
+        long_text = "gemini sandbox " + " ".join(f"filler{i}" for i in range(400)) + " gemini"
+        docs = {
+            "reference.md": ("Reference", long_text),
+            "sandbox.md": ("Notes", "gemini sandbox mode"),
+            "other.md": ("Other", "unrelated text"),
+        }
+        assert self._index(docs, scorer="tfidf").search("gemini")[0].name == "reference.md"
+        assert self._index(docs).search("gemini")[0].name == "sandbox.md"
+
+    def test_title_weighted(self):
+        """Test a title match outranks the same term in another body."""
+        docs = {
+            "a.md": ("Auditor guide", "steps for the review"),
+            "b.md": ("Review notes", "the auditor checks steps"),
+            "c.md": ("Other", "unrelated text"),
+        }
+        assert self._index(docs).search("auditor")[0].name == "a.md"
+        assert self._index(docs, title_weight=0).search("auditor")[0].name == "b.md"
+
+    def test_norms_precomputed(self):
+        """Test every document gets length norms averaging to one."""
+        docs = {"a.md": ("A", "one two three four"), "b.md": ("B", "five six")}
+        index = self._index(docs, b=1.0)
+        body_norms = [body for body, _ in index.norms.values()]
+        assert sum(body_norms) / len(body_norms) == pytest.approx(1.0)
+        assert index.norms["a.md"][0] > index.norms["b.md"][0]
+
+    def test_norms_restored_from_cache(self, tmp_path):
+        """Test title postings and norms are rebuilt when loading the cache."""
+        index = _synthetic_index(10)
+        with patch('cli.knowledge.index.INDEX_CACHE_PATH', tmp_path / "cache.json"):
+            index._save_cache()
+            loaded = DocumentIndex()
+            loaded._load_cache()
+        assert loaded.norms == pytest.approx(index.norms)
+        assert loaded.title_postings == index.title_postings
+
+    def test_configured_scorer(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test the singleton uses the knowledge settings from role_config.json."""
+        from cli.config import _reset_config
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        sample_role_config["knowledge"] = {"scorer": "tfidf", "title_weight": 3}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        _reset_config()
+        try:
+            with patch('cli.knowledge.index._index', None):
+                index = _get_index()
+                assert index.scorer == "tfidf"
+                assert index.title_weight == 3
+        finally:
+            _reset_config()
+
+
+class TestIncrementalRefresh:
+    """Tests for fingerprint-based incremental refresh."""
+
+    def test_unchanged_library_reads_nothing(self, temp_docs_library):
+        """Test a refresh of an unchanged library re-indexes nothing."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"), \
+                patch('cli.knowledge.index._RACY_WINDOW_NS', 0):
+            index = DocumentIndex()
+            total = index.build_index()
+            with patch.object(index, '_index_file') as index_file, \
+                    patch('cli.knowledge.index._hash_file') as hash_file:
+                stats = index.refresh()
+        assert not stats.modified
+        assert stats.unchanged == total
+        index_file.assert_not_called()
+        hash_file.assert_not_called()
+
+    def test_added_changed_removed(self, temp_docs_library):
+        """Test only affected files are re-indexed and postings follow."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"):
+            index = DocumentIndex()
+            index.build_index()
+
+            (temp_docs_library / "new_notes.md").write_text("# New\n\nzebrafish protocol")
+            (temp_docs_library / "test_commands.md").write_text("# Changed\n\nplatypus only")
+            (temp_docs_library / "Workflow_Strategy.md").unlink()
+            stats = index.refresh()
+
+            assert stats.added == ["new_notes.md"]
+            assert stats.changed == ["test_commands.md"]
+            assert stats.removed == ["Workflow_Strategy.md"]
+            assert "Workflow_Strategy.md" not in index.entries
+            assert index.search("zebrafish")[0].name == "new_notes.md"
+            assert index.search("platypus")[0].name == "test_commands.md"
+            assert index.search("claude") == [] or all(
+                r.name != "test_commands.md" for r in index.search("claude"))
+            assert all("Workflow_Strategy.md" not in docs for docs in index.postings.values())
+
+    def test_incremental_matches_full_rebuild(self, temp_docs_library):
+        """Test postings, IDF and norms after a refresh equal a clean build."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"):
+            index = DocumentIndex()
+            index.build_index()
+            (temp_docs_library / "extra.md").write_text("# Extra\n\nclaude extra words")
+            (temp_docs_library / "Workflow_Strategy.md").unlink()
+            index.refresh()
+
+            clean = DocumentIndex()
+            clean.build_index()
+
+        assert index.postings == clean.postings
+        assert index.title_postings == clean.title_postings
+        assert index.idf == pytest.approx(clean.idf)
+        assert index.norms == pytest.approx(clean.norms)
+
+    def test_touched_file_not_reindexed(self, temp_docs_library):
+        """Test a new mtime with identical content only updates the fingerprint."""
+        import os
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"):
+            index = DocumentIndex()
+            index.build_index()
+            path = temp_docs_library / "test_commands.md"
+            os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+            with patch.object(index, '_index_file') as index_file:
+                stats = index.refresh()
+        assert not stats.modified
+        index_file.assert_not_called()
+        assert index.fingerprints["test_commands.md"][0] == path.stat().st_mtime_ns
+
+    def test_search_never_stale(self, temp_docs_library):
+        """Test an in-place edit is picked up before results are served."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"):
+            index = DocumentIndex()
+            index.build_index()
+            assert index.get_document("test_commands.md")
+
+            # Same directory entries, so only the file itself changed
+            (temp_docs_library / "test_commands.md").write_text("# Commands\n\nrewritten body text")
+            assert index.get_document("test_commands.md") == "# Commands\n\nrewritten body text"
+
+            (temp_docs_library / "Workflow_Strategy.md").write_text("# Workflow\n\nbrand new commands")
+            with patch('cli.knowledge.index._RESCAN_INTERVAL', 0):
+                results = index.search("commands")
+            assert any("brand new" in r.snippet for r in results)
+
+    def test_cache_keeps_fingerprints(self, temp_docs_library):
+        """Test a reloaded index refreshes without re-reading unchanged files."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"), \
+                patch('cli.knowledge.index._RACY_WINDOW_NS', 0):
+            DocumentIndex().build_index()
+            loaded = DocumentIndex()
+            with patch.object(DocumentIndex, '_index_file') as index_file:
+                loaded._ensure_loaded()
+        index_file.assert_not_called()
+        assert loaded.entries
+        assert loaded.fingerprints.keys() == loaded.entries.keys()
+
+    def test_refresh_index_stats(self, temp_docs_library):
+        """Test the module function reports what changed."""
+        from cli.knowledge.index import refresh_index_stats
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.json"), \
+                patch('cli.knowledge.index._index', None):
+            first = refresh_index_stats()
+            assert len(first.added) == first.total
+            (temp_docs_library / "later.md").write_text("# Later\n\ncontent")
+            second = refresh_index_stats()
+        assert second.added == ["later.md"]
+        assert second.total == first.total + 1
+
+
+
+class TestDeltaSegment:
+    """Tests for saving small changes to a mapped index as a delta segment."""
+
+    @pytest.fixture
+    def library(self, temp_docs_library):
+        """A library of 50 documents, indexed and saved; yields (library, cache path)."""
+        for i in range(48):
+            (temp_docs_library / f"note_{i}.md").write_text(f"# Note {i}\n\nclaude {_word(i)} text")
+        cache = temp_docs_library.parent / "index.bin"
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', cache):
+            DocumentIndex().build_index()
+            yield temp_docs_library, cache
+
+    def test_small_change_writes_delta(self, library):
+        """Test a refresh of a mapped index leaves the index file alone."""
+        from cli.knowledge.storage import bodies_path, delta_path
+        docs, cache = library
+        base = (cache.read_bytes(), bodies_path(cache).read_bytes())
+        index = DocumentIndex()
+        index._load_cache()
+
+        (docs / "note_1.md").write_text("# Note 1\n\nplatypus habitat")
+        (docs / "note_2.md").unlink()
+        (docs / "added.md").write_text("# Added\n\nzebrafish protocol")
+        with patch.object(DocumentIndex, '_materialize') as materialize:
+            stats = index.refresh()
+        materialize.assert_not_called()
+        assert (stats.added, stats.changed, stats.removed) == (
+            ["added.md"], ["note_1.md"], ["note_2.md"])
+        assert (cache.read_bytes(), bodies_path(cache).read_bytes()) == base
+        assert delta_path(cache).exists()
+
+        assert index.search("platypus")[0].name == "note_1.md"
+        assert "note_1.md" not in [r.name for r in index.search(_word(1))]
+        assert "note_2.md" not in [r.name for r in index.search(_word(2))]
+        assert index.get_document("note_3.md") == f"# Note 3\n\nclaude {_word(3)} text"
+
+        reopened = DocumentIndex()
+        reopened._load_cache()
+        clean = DocumentIndex()
+        clean.build_index()
+        assert reopened.entries.keys() == clean.entries.keys()
+        assert reopened.postings == clean.postings
+        assert reopened.title_postings == clean.title_postings
+        assert reopened.norms == pytest.approx(clean.norms)
+        assert reopened.fingerprints == clean.fingerprints
+        assert reopened.search("zebrafish")[0].name == "added.md"
+        assert reopened.get_document("note_1.md") == "# Note 1\n\nplatypus habitat"
+
+    def test_large_delta_merged(self, library):
+        """Test the delta is merged into a new index file once it grows too large."""
+        from cli.knowledge.storage import delta_path
+        docs, cache = library
+        index = DocumentIndex()
+        index._load_cache()
+        (docs / "note_1.md").write_text("# Note 1\n\nplatypus habitat")
+        index.refresh()
+        assert delta_path(cache).exists()
+
+        (docs / "note_2.md").write_text("# Note 2\n\nwombat burrow")
+        with patch('cli.knowledge.index.DELTA_MAX_FRACTION', 0):
+            index.refresh()
+        assert not delta_path(cache).exists()
+        assert index._mapped is None
+        reopened = DocumentIndex()
+        reopened._load_cache()
+        assert reopened.search("platypus")[0].name == "note_1.md"
+        assert reopened.search("wombat")[0].name == "note_2.md"
+
+    def test_delta_of_other_build_ignored(self, library):
+        """Test a delta segment written against another index file is not applied."""
+        from cli.knowledge.storage import bodies_path, delta_path
+        docs, cache = library
+        index = DocumentIndex()
+        index._load_cache()
+        (docs / "note_1.md").write_text("# Note 1\n\nplatypus habitat")
+        index.refresh()
+        delta = delta_path(cache)
+        saved = {path: path.read_bytes()
+                 for path in (delta, bodies_path(delta), delta.with_suffix(".json"))}
+
+        DocumentIndex().build_index()  # The library still holds the edit
+        (docs / "note_1.md").write_text(f"# Note 1\n\nclaude {_word(1)} text")
+        DocumentIndex().build_index()
+        for path, data in saved.items():
+            path.write_bytes(data)
+
+        reopened = DocumentIndex()
+        reopened._load_cache()
+        assert reopened.search("platypus") == []
+        assert reopened.search(_word(1))[0].name == "note_1.md"
+
+
+def _word(i: int) -> str:
+    """A word found in one note of the TestDeltaSegment library."""
+    return "kiwi" + chr(ord("a") + i // 26) + chr(ord("a") + i % 26)
+
+
+class TestThreadSafety:
+    """Tests for one index used from the prewarm thread and the prompt."""
+
+    def test_concurrent_refresh(self, temp_docs_library):
+        """Test two threads loading and refreshing the same index do not interfere."""
+        import threading
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library.parent / "index.bin"):
+            DocumentIndex().build_index()
+            (temp_docs_library / "test_commands.md").write_text("# Commands\n\nplatypus habitat")
+            index = DocumentIndex()
+            errors = []
+
+            def load():
+                try:
+                    index._ensure_loaded()
+                    index.complete_names("test")
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=load) for _ in range(2)]
+            with patch.object(DocumentIndex, '_load_cache', autospec=True,
+                              side_effect=DocumentIndex._load_cache) as load_cache:
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            assert errors == []
+            load_cache.assert_called_once()
+            assert index.search("platypus")[0].name == "test_commands.md"
+
+    def test_refresh_index_stats_waits_for_prewarm(self, temp_docs_library):
+        """Test /refresh does not load the index while the prewarm thread holds it."""
+        import threading
+        from cli.knowledge.index import refresh_index_stats
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library.parent / "index.bin"), \
+                patch('cli.knowledge.index._index', DocumentIndex()) as index:
+            results = []
+            thread = threading.Thread(target=lambda: results.append(refresh_index_stats()))
+            with patch.object(DocumentIndex, '_load_cache', autospec=True,
+                              side_effect=DocumentIndex._load_cache) as load_cache:
+                with index._lock:
+                    thread.start()
+                    thread.join(0.2)
+                    assert thread.is_alive()
+                    load_cache.assert_not_called()
+                    index._ensure_loaded()
+                thread.join(5)
+            load_cache.assert_called_once()
+            assert results[0].total == len(index.entries)
+
+
+class TestParallelIngestion:
+    """Tests for parsing files in a process pool."""
+
+    def _library(self, directory):
+        for i in range(6):
+            (directory / f"notes_{i}.md").write_text(f"# Notes {i}\n\n## Part\nrouting term{i} review")
+
+    def test_pool_matches_serial(self, temp_docs_library):
+        """Test a pool build indexes the same entries, in order, and reports progress."""
+        self._library(temp_docs_library)
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"), \
+                patch('cli.knowledge.index.PARALLEL_MIN_FILES', 1):
+            serial = DocumentIndex(workers=1)
+            serial.build_index()
+            updates = []
+            pooled = DocumentIndex(workers=2)
+            # Parsed in the workers only (they do not see this patch)
+            with patch.object(DocumentIndex, '_index_file', side_effect=AssertionError):
+                assert pooled.build_index(
+                    progress=lambda done, total: updates.append((done, total))) == 8
+
+        assert list(pooled.entries) == list(serial.entries)
+        assert pooled.postings == serial.postings
+        assert pooled.entries["notes_3.md"].passages == serial.entries["notes_3.md"].passages
+        assert updates == [(done, 8) for done in range(1, 9)]
+
+    def test_pool_failure_falls_back(self, temp_docs_library):
+        """Test files are parsed in-process if the pool cannot start."""
+        self._library(temp_docs_library)
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"), \
+                patch('cli.knowledge.index.PARALLEL_MIN_FILES', 1), \
+                patch('cli.knowledge.index.ProcessPoolExecutor', side_effect=OSError("no fork")):
+            index = DocumentIndex(workers=4)
+            assert index.build_index() == 8
+            assert index.search("term5")[0].name == "notes_5.md"
+
+    def test_small_refresh_stays_in_process(self, temp_docs_library):
+        """Test a refresh of a few files does not start a pool."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"), \
+                patch('cli.knowledge.index.ProcessPoolExecutor') as pool:
+            DocumentIndex(workers=4).build_index()
+        pool.assert_not_called()
+
+
+class TestPassages:
+    """Tests for section-level indexing and retrieval."""
+
+    def test_markdown_split_by_headings(self):
+        """Test passages follow the heading hierarchy and skip code fences."""
+        content = ("Intro text\n# Guide\nOverview\n## Setup\nInstall ü\n```\n# not a heading\n```\n"
+                   "### Linux\napt get\n## Usage\nRun it\n")
+        passages = DocumentIndex()._markdown_passages(content)
+        assert [p.section for p in passages] == [
+            "", "Guide", "Guide > Setup", "Guide > Setup > Linux", "Guide > Usage"]
+
+        body = content.encode("utf-8")
+        assert body[passages[2].start:passages[2].end].decode() == \
+            "## Setup\nInstall ü\n```\n# not a heading\n```\n"
+        assert passages[-1].end == len(body)
+        assert passages[3].terms == {"linux": 1, "apt": 1, "get": 1}
+
+    def test_docx_heading_styles(self):
+        """Test Word heading styles map to section levels."""
+        from cli.knowledge.index import _heading_level
+        assert [_heading_level(name) for name in ("Title", "Heading 1", "Heading 3", "Normal")] \
+            == [1, 1, 3, 0]
+
+    def test_search_returns_best_section(self, temp_docs_library):
+        """Test a result points at the section that matches, with its snippet."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            result = index.search("gemini prompt")[0]
+        assert result.name == "test_commands.md"
+        assert result.section == "Test Commands Reference > 2. Gemini CLI > Commands"
+        assert "One-shot prompt" in result.snippet
+        assert "claude" not in result.snippet.lower()
+
+    def test_load_result_reads_only_the_section(self, temp_docs_library):
+        """Test loading a result from the mapped index reads just its byte range."""
+        from cli.knowledge.index import load_result
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"), \
+                patch('cli.knowledge.index._index', None):
+            DocumentIndex().build_index()
+            result = search_documents("auditor")[0]
+            index = _get_index()
+            with patch.object(index._mapped, 'read_body', wraps=index._mapped.read_body) as read:
+                section = load_result(result)
+        assert result.section == "Workflow Strategy > 3. OpenAI: The Auditor"
+        assert section == "## 3. OpenAI: The Auditor\n- Role: Review\n"
+        read.assert_called_once_with("Workflow_Strategy.md", result.start, result.end)
+
+    def test_passages_survive_cache(self, temp_docs_library):
+        """Test passages are stored in the index file and restored on materialize."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            built = DocumentIndex()
+            built.build_index()
+            loaded = DocumentIndex()
+            assert loaded._load_cache()
+            assert loaded._passages(loaded.entries["test_commands.md"]) == \
+                built.entries["test_commands.md"].passages
+            loaded._materialize()
+        assert loaded.entries["test_commands.md"].passages == \
+            built.entries["test_commands.md"].passages
+
+
+class TestPositionalIndex:
+    """Tests for term positions, phrase and boolean queries, and fragments."""
+
+    def _index(self, temp_docs_library) -> DocumentIndex:
+        (temp_docs_library / "output.md").write_text(
+            "# Output\n\nUse --output-format stream-json for a JSON stream.\n")
+        index = DocumentIndex()
+        index.build_index()
+        return index
+
+    def test_positions_recorded(self):
+        """Test positions count every word and offsets are UTF-8 bytes."""
+        positions = DocumentIndex()._term_positions("Ünïcode the Claude and claude")
+        assert list(positions["claude"]) == [1, 14, 3, 25]
+        assert "the" not in positions
+
+    def test_phrase_query(self, temp_docs_library):
+        """Test quoted phrases require adjacent words in order."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = self._index(temp_docs_library)
+            assert [r.name for r in index.search('"stream json"')] == ["output.md"]
+            assert index.search('"json stream"')[0].name == "output.md"
+            assert index.search('"format json"') == []
+            assert [r.name for r in index.search('"interactive mode"')] == ["test_commands.md"]
+
+    def test_boolean_operators(self, temp_docs_library):
+        """Test AND, OR and NOT filter the matching documents."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = self._index(temp_docs_library)
+
+            def names(query):
+                return sorted(r.name for r in index.search(query, top_k=10))
+
+            assert names("claude AND auditor") == ["Workflow_Strategy.md"]
+            assert names("claude NOT auditor") == ["test_commands.md"]
+            assert names("auditor OR json") == ["Workflow_Strategy.md", "output.md"]
+            assert names('(gemini OR json) AND "one shot"') == ["test_commands.md"]
+            assert names("NOT claude") == []
+
+    def test_phrase_on_mapped_index(self, temp_docs_library):
+        """Test phrases are verified from positions stored in the index file."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            built = self._index(temp_docs_library)
+            loaded = DocumentIndex()
+            assert loaded._load_cache()
+            loaded._library_mtime = None
+            assert [r.name for r in loaded._search('"stream json"', 5)] == ["output.md"]
+            assert loaded._search('"format json"', 5) == []
+            loaded._materialize()
+        assert loaded.entries["output.md"].positions == built.entries["output.md"].positions
+
+    def test_fragments_highlight_matches(self):
+        """Test fragments come from positions and mark every matched word."""
+        text = ("intro " * 40 + "alpha beta " + "filler " * 40 + "beta gamma " +
+                "filler " * 40 + "alpha")
+        index = DocumentIndex()
+        entry = IndexEntry(name="a.md", path="", doc_type="markdown", title="A",
+                           content=text, terms=index._tokenize(text),
+                           positions=index._term_positions(text))
+        fragments = index._fragments(entry, ["alpha", "beta"])
+        assert len(fragments) == 3
+        assert fragments[0].text.startswith("...") and fragments[0].text.endswith("...")
+        assert "**alpha** **beta**" in fragments[0].marked()
+        assert [fragments[0].text[s:e] for s, e in fragments[0].matches] == ["alpha", "beta"]
+        assert not fragments[-1].text.endswith("...")
+
+    def test_substring_uses_vocabulary(self, temp_docs_library):
+        """Test alphanumeric substring queries match terms without scanning text."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = self._index(temp_docs_library)
+            with patch.object(index, '_content') as content:
+                results = index.search("fl")
+            content.assert_not_called()
+            assert [r.name for r in results] == ["Workflow_Strategy.md"]
+            assert results[0].fragments[0].matches
+
+
+class TestTrigramLookups:
+    """Tests for typo correction, substring search and name lookup through trigrams."""
+
+    def test_typo_corrected(self, temp_docs_library):
+        """Test an unknown query word is replaced by the closest known term."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            assert index.search("wrokflow")[0].name == "Workflow_Strategy.md"
+            assert [r.name for r in index.search("claude NOT audtior")] == ["test_commands.md"]
+            assert index.search("zqxjvw") == []
+
+    def test_known_words_not_corrected(self, temp_docs_library):
+        """Test the trigram index is not built for queries of known words."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            index.search("gemini review")
+            assert index._term_trigrams is None
+
+    def test_substring_search(self, temp_docs_library):
+        """Test short queries match within terms without reading document text."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            with patch.object(index, '_content') as content:
+                results = index.search("li")
+            content.assert_not_called()
+            assert [r.name for r in results] == ["test_commands.md"]
+            assert "**CLI**" in results[0].fragments[0].marked()
+            assert [r.name for r in index.search("-p")] == ["test_commands.md"]
+
+    def test_trigrams_follow_refresh(self, temp_docs_library):
+        """Test added and removed documents update the trigram indexes in place."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            index.search("wrokflow")
+            index._find_entry("strategy")
+            terms, names = index._term_trigrams, index._name_trigrams
+            (temp_docs_library / "zebra_notes.md").write_text("# Zebra\n\nplatypus notes")
+            (temp_docs_library / "Workflow_Strategy.md").unlink()
+            index.refresh()
+            assert index._term_trigrams is terms and index._name_trigrams is names
+            assert "platypus" in terms and "auditor" not in terms
+            assert index.search("platipus")[0].name == "zebra_notes.md"
+            assert index.complete_names("notes") == ["zebra_notes.md"]
+            assert index.complete_names("strat") == []
+
+    def test_name_lookup_ranked(self, temp_docs_library):
+        """Test partial names resolve to the best completion."""
+        (temp_docs_library / "old_test_commands_backup.md").write_text("# Backup")
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "cache.bin"):
+            index = DocumentIndex()
+            index.build_index()
+            assert index._find_entry("TEST_COMMANDS.MD").name == "test_commands.md"
+            assert index._find_entry("commands").name == "test_commands.md"
+            assert index.complete_names("command") == ["test_commands.md",
+                                                       "old_test_commands_backup.md"]
+            assert index.complete_names("work") == ["Workflow_Strategy.md"]
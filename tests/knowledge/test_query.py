@@ -0,0 +1,46 @@
+"""Tests for cli/knowledge/query.py module."""
+
+from cli.knowledge.query import And, Not, Or, Phrase, Term, parse_query, positive_words
+
+
+class TestParseQuery:
+    """Tests for the search query parser."""
+
+    def test_plain_words(self):
+        """Test plain words are OR-ed and not structured."""
+        query = parse_query("Claude gemini")
+        assert query.root == Or((Term("claude"), Term("gemini")))
+        assert not query.structured
+
+    def test_phrases(self):
+        """Test quoted and hyphenated words become phrases."""
+        assert parse_query('"stream json"').root == Phrase(("stream", "json"))
+        assert parse_query("stream-json").root == Phrase(("stream", "json"))
+        assert parse_query('"claude"').root == Term("claude")
+
+    def test_operator_precedence(self):
+        """Test AND binds tighter than OR, and parentheses group."""
+        assert parse_query("a1 OR b1 AND c1").root == \
+            Or((Term("a1"), And((Term("b1"), Term("c1")))))
+        assert parse_query("(a1 OR b1) AND NOT c1").root == \
+            And((Or((Term("a1"), Term("b1"))), Not(Term("c1"))))
+        assert parse_query("a1 NOT b1").root == And((Term("a1"), Not(Term("b1"))))
+
+    def test_lowercase_operators_are_words(self):
+        """Test operators only count in upper case."""
+        query = parse_query("rock and roll")
+        assert query.root == Or((Term("rock"), Term("and"), Term("roll")))
+        assert not query.structured
+
+    def test_malformed_input(self):
+        """Test unbalanced quotes, parentheses and dangling operators degrade."""
+        assert parse_query('"stream json').root == Phrase(("stream", "json"))
+        assert parse_query("(claude OR").root == Term("claude")
+        assert parse_query("claude) AND").root == Term("claude")
+        assert parse_query("AND OR NOT").root is None
+        assert parse_query("").root is None
+
+    def test_positive_words(self):
+        """Test negated words are not used for ranking."""
+        root = parse_query('routing NOT learned AND "print mode"').root
+        assert positive_words(root) == ["routing", "print", "mode"]
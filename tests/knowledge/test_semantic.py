@@ -0,0 +1,142 @@
+"""Tests for cli/knowledge/semantic.py module."""
+
+import json
+import pytest
+from unittest.mock import patch
+
+np = pytest.importorskip("numpy")
+
+from cli.knowledge.index import DocumentIndex, _get_index  # noqa: E402
+from cli.knowledge.semantic import VectorIndex, VectorRow, fuse, vectorize  # noqa: E402
+
+
+@pytest.fixture
+def semantic_library(temp_docs_library):
+    """Patch the library, cache and vector paths; yields the library directory."""
+    with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+            patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library.parent / "index.bin"), \
+            patch('cli.knowledge.semantic.VECTORS_PATH',
+                  temp_docs_library.parent / "vectors.npy"):
+        yield temp_docs_library
+
+
+class TestVectorize:
+    """Tests for hashed feature vectors."""
+
+    def test_word_forms_are_similar(self):
+        """Test related word forms share features and unrelated words do not."""
+        review, reviewer, prompt = vectorize([{"review": 1.0}, {"reviewer": 1.0}, {"prompt": 1.0}])
+        assert review @ reviewer > 0.4
+        assert abs(review @ prompt) < 0.1
+
+    def test_rows_are_normalized(self):
+        """Test rows have unit length, and empty rows stay zero."""
+        matrix = vectorize([{"claude": 2.0, "gemini": 1.0}, {}])
+        assert matrix.shape == (2, 512)
+        assert matrix.dtype == np.float32
+        assert np.linalg.norm(matrix[0]) == pytest.approx(1.0)
+        assert not matrix[1].any()
+
+    def test_fuse(self):
+        """Test reciprocal rank fusion favors documents ranked well by both."""
+        fused = [name for name, _ in fuse([["a", "b", "c"], ["b", "c"]])]
+        assert fused == ["b", "c", "a"]
+
+
+class TestVectorIndex:
+    """Tests for the passage matrix."""
+
+    def test_update_and_search(self):
+        """Test rows are added and dropped by document, and search returns one row per document."""
+        vectors = VectorIndex()
+        vectors.clear()
+        vectors.update([], [
+            (VectorRow("a.md", "Intro", 0, 10), {"routing": 1.0}),
+            (VectorRow("a.md", "Rules", 10, None), {"routing": 1.0, "rules": 1.0}),
+            (VectorRow("b.md", "", 0, None), {"prompt": 1.0}),
+        ])
+        results = vectors.search({"routing": 1.0}, top_k=5)
+        assert [(row.name, row.section) for _, row in results] == [("a.md", "Intro")]
+
+        vectors.update(["a.md"], [])
+        assert vectors.names() == {"b.md"}
+        assert vectors.search({"routing": 1.0}, top_k=5) == []
+
+    def test_save_and_load(self, tmp_path):
+        """Test the matrix round-trips and is memory-mapped when loaded."""
+        path = tmp_path / "vectors.npy"
+        vectors = VectorIndex()
+        vectors.clear()
+        vectors.update([], [(VectorRow("a.md", "Intro", 0, None), {"routing": 1.0})])
+        vectors.save(path)
+
+        loaded = VectorIndex()
+        assert loaded.load(path)
+        assert isinstance(loaded.matrix, np.memmap)
+        assert loaded.rows == vectors.rows
+        assert np.array_equal(loaded.matrix, vectors.matrix)
+
+        meta = json.loads(path.with_suffix(".json").read_text())
+        meta["rows"].append(["b.md", "", 0, None])
+        path.with_suffix(".json").write_text(json.dumps(meta))
+        assert not VectorIndex().load(path)  # Row count does not match the matrix
+
+
+class TestSemanticSearch:
+    """Tests for semantic ranking fused into DocumentIndex.search."""
+
+    def test_finds_related_word_forms(self, semantic_library):
+        """Test a document is found by similarity when no query word is indexed."""
+        (semantic_library / "review.md").write_text(
+            "# Code review\n\nThe reviewer checks each change.\n")
+        assert DocumentIndex().build_index() == 3
+        assert DocumentIndex().search("reviewing") == []
+
+        index = DocumentIndex(semantic=True)
+        index.build_index()
+        result = index.search("reviewing")[0]
+        assert result.name == "review.md"
+        assert result.section == "Code review"
+        assert "reviewer" in result.snippet
+
+    def test_keyword_results_fused(self, semantic_library):
+        """Test keyword matches keep their passages, and structured queries stay exact."""
+        index = DocumentIndex(semantic=True)
+        index.build_index()
+        result = index.search("gemini prompt")[0]
+        assert result.section == "Test Commands Reference > 2. Gemini CLI > Commands"
+        assert [r.name for r in index.search('"one-shot prompt"')] == ["test_commands.md"]
+
+    def test_incremental_refresh(self, semantic_library):
+        """Test only changed documents are vectorized, and a reopened index reads the matrix."""
+        index = DocumentIndex(semantic=True)
+        index.build_index()
+        (semantic_library / "Workflow_Strategy.md").unlink()
+        (semantic_library / "notes.md").write_text("# Notes\n\nplatypus habitat")
+        with patch.object(DocumentIndex, '_vector_rows',
+                          autospec=True, side_effect=DocumentIndex._vector_rows) as vector_rows:
+            index.refresh()
+        assert [call.args[1].name for call in vector_rows.call_args_list] == ["notes.md"]
+        assert index.vectors.names() == {"test_commands.md", "notes.md"}
+
+        reopened = DocumentIndex(semantic=True)
+        with patch('cli.knowledge.index._RACY_WINDOW_NS', 0), \
+                patch('cli.knowledge.semantic.vectorize') as vectorize_rows:
+            reopened._ensure_loaded()
+        vectorize_rows.assert_not_called()
+        assert isinstance(reopened.vectors.matrix, np.memmap)
+        assert reopened.search("platypus")[0].name == "notes.md"
+
+    def test_configured_semantic(self, semantic_library, temp_config_file, sample_role_config,
+                                 monkeypatch):
+        """Test the singleton turns semantic ranking on from role_config.json."""
+        from cli.config import _reset_config
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        sample_role_config["knowledge"] = {"semantic": True}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        _reset_config()
+        try:
+            with patch('cli.knowledge.index._index', None):
+                assert _get_index().vectors is not None
+        finally:
+            _reset_config()
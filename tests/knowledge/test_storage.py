@@ -0,0 +1,168 @@
+"""Tests for cli/knowledge/storage.py module."""
+
+import json
+from unittest.mock import patch
+
+from cli.knowledge.index import DocumentIndex, IndexEntry
+from cli.knowledge.storage import (
+    StoredDocument, bodies_path, open_index, write_index
+)
+
+
+def _documents():
+    return [
+        StoredDocument(name="a.md", path="docs/a.md", doc_type="markdown", title="Alpha",
+                       body_length=3, title_length=1, fingerprint=(10, 20, "ab" * 32),
+                       content="alpha routing notes"),
+        StoredDocument(name="b.docx", path="docs/b.docx", doc_type="docx", title="Beta – ü",
+                       body_length=2, title_length=1, fingerprint=None,
+                       content="routing ünïcode"),
+    ]
+
+
+def _write(path):
+    postings = {"alpha": {"a.md": 1}, "routing": {"a.md": 1, "b.docx": 2}}
+    title_postings = {"alpha": {"a.md": 1}, "beta": {"b.docx": 1}}
+    write_index(path, _documents(), postings, title_postings, scanned_at_ns=42)
+
+
+class TestIndexFile:
+    """Tests for writing and opening the binary index."""
+
+    def test_round_trip(self, tmp_path):
+        """Test documents, postings and bodies survive a write and open."""
+        _write(tmp_path / "index.bin")
+        mapped = open_index(tmp_path / "index.bin")
+        try:
+            assert mapped.scanned_at_ns == 42
+            a, b = mapped.documents
+            assert (a.name, a.path, a.title, a.fingerprint) == \
+                ("a.md", "docs/a.md", "Alpha", (10, 20, "ab" * 32))
+            assert (b.doc_type, b.title, b.fingerprint, b.body_length) == \
+                ("docx", "Beta – ü", None, 2)
+            assert a.content is None
+
+            assert mapped.postings["routing"] == {"a.md": 1, "b.docx": 2}
+            assert mapped.postings.doc_freq("routing") == 2
+            assert "beta" not in mapped.postings
+            assert mapped.postings.get("missing") is None
+            assert dict(mapped.title_postings.items()) == {"alpha": {"a.md": 1},
+                                                          "beta": {"b.docx": 1}}
+            assert mapped.read_body("b.docx") == "routing ünïcode"
+        finally:
+            mapped.close()
+
+    def test_positions_round_trip(self, tmp_path):
+        """Test term positions are stored per posting and looked up by document."""
+        documents = _documents()
+        documents[1].positions = {"routing": [0, 0, 5, 30]}
+        postings = {"alpha": {"a.md": 1}, "routing": {"a.md": 1, "b.docx": 2}}
+        write_index(tmp_path / "index.bin", documents, postings, {}, scanned_at_ns=0)
+        mapped = open_index(tmp_path / "index.bin")
+        try:
+            assert mapped.postings.positions("routing", "b.docx") == [(0, 0), (5, 30)]
+            assert mapped.postings.positions("routing", "a.md") == []
+            assert mapped.postings.positions("missing", "a.md") == []
+            assert [(term, name, list(pairs)) for term, name, pairs
+                    in mapped.postings.iter_positions()] == [("routing", "b.docx", [0, 0, 5, 30])]
+            assert mapped.read_bytes("b.docx", 8, 10) == "ü".encode("utf-8")
+        finally:
+            mapped.close()
+
+    def test_missing_or_damaged(self, tmp_path):
+        """Test unreadable index files open as None so the index is rebuilt."""
+        assert open_index(tmp_path / "missing.bin") is None
+
+        garbage = tmp_path / "garbage.bin"
+        garbage.write_bytes(b"not an index")
+        assert open_index(garbage) is None
+
+        legacy = tmp_path / "legacy.bin"
+        legacy.write_text(json.dumps({"version": 3, "entries": {}}))
+        assert open_index(legacy) is None
+
+    def test_bodies_from_another_build(self, tmp_path):
+        """Test a bodies file from a different write is rejected."""
+        _write(tmp_path / "index.bin")
+        stale = bodies_path(tmp_path / "index.bin").read_bytes()
+        _write(tmp_path / "index.bin")
+        bodies_path(tmp_path / "index.bin").write_bytes(stale)
+        assert open_index(tmp_path / "index.bin") is None
+
+
+class TestMappedDocumentIndex:
+    """Tests for DocumentIndex served from the binary index."""
+
+    def _saved(self, tmp_path) -> DocumentIndex:
+        index = DocumentIndex()
+        for i in range(20):
+            text = f"shared words document{i}" + (" needle" if i == 3 else "")
+            index.entries[f"doc{i}.md"] = IndexEntry(
+                name=f"doc{i}.md", path="", doc_type="markdown", title=f"Doc {i}",
+                content=text, terms=index._tokenize(text),
+                positions=index._term_positions(text)
+            )
+        index._build_postings()
+        index._update_idf()
+        index._save_cache()
+        return index
+
+    def test_bodies_read_on_demand(self, tmp_path):
+        """Test loading reads no bodies and a search reads only its results."""
+        with patch('cli.knowledge.index.INDEX_CACHE_PATH', tmp_path / "index.bin"):
+            self._saved(tmp_path)
+            loaded = DocumentIndex()
+            assert loaded._load_cache()
+            loaded._library_mtime = None
+
+        assert all(entry.content is None for entry in loaded.entries.values())
+        with patch.object(loaded._mapped, 'read_bytes', wraps=loaded._mapped.read_bytes) as read:
+            results = loaded.search("needle")
+            assert [r.name for r in results] == ["doc3.md"]
+            assert "needle" in results[0].snippet
+            assert loaded.get_document("doc5.md") == "shared words document5"
+        assert [call.args[0] for call in read.call_args_list] == ["doc3.md", "doc5.md"]
+
+    def test_same_ranking_as_in_memory(self, tmp_path):
+        """Test both scorers rank the mapped index like the one it was saved from."""
+        with patch('cli.knowledge.index.INDEX_CACHE_PATH', tmp_path / "index.bin"):
+            index = self._saved(tmp_path)
+            for scorer in ("bm25", "tfidf"):
+                index.scorer = scorer
+                loaded = DocumentIndex(scorer=scorer)
+                loaded._load_cache()
+                loaded._library_mtime = None
+                expected = [(r.name, r.score) for r in index._search("needle document3", 5)]
+                assert [(r.name, r.score) for r in loaded._search("needle document3", 5)] == expected
+
+    def test_refresh_after_load(self, temp_docs_library):
+        """Test changes after loading are applied and saved."""
+        cache_path = temp_docs_library / "index.bin"
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', cache_path):
+            DocumentIndex().build_index()
+            loaded = DocumentIndex()
+            assert loaded._load_cache()
+            (temp_docs_library / "new.md").write_text("# New\n\nzebrafish protocol")
+            stats = loaded.refresh()
+            assert stats.added == ["new.md"]
+            assert loaded._mapped is None
+            assert loaded.search("zebrafish")[0].name == "new.md"
+
+            reopened = DocumentIndex()
+            assert reopened._load_cache()
+            assert "new.md" in reopened.entries
+
+    def test_export_json(self, temp_docs_library, tmp_path):
+        """Test the JSON export carries entries, content and postings."""
+        with patch('cli.knowledge.index.DOCUMENT_LIBRARY_PATH', temp_docs_library), \
+                patch('cli.knowledge.index.INDEX_CACHE_PATH', temp_docs_library / "index.bin"):
+            DocumentIndex().build_index()
+            loaded = DocumentIndex()
+            exported = loaded.export_json(tmp_path / "index.json")
+
+        data = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+        assert exported == len(data["entries"]) == 2
+        assert "Claude CLI" in data["entries"]["test_commands.md"]["content"]
+        assert data["postings"]["claude"]["test_commands.md"] >= 1
+        assert set(data["fingerprints"]) == set(data["entries"])
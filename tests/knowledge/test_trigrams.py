@@ -0,0 +1,73 @@
+"""Tests for cli/knowledge/trigrams.py module."""
+
+from unittest.mock import patch
+
+from cli.knowledge.trigrams import TrigramIndex, edit_distance, trigrams
+
+
+class TestEditDistance:
+    """Tests for the bounded edit distance."""
+
+    def test_distances(self):
+        """Test insertions, deletions, substitutions and transpositions count one each."""
+        assert edit_distance("workflow", "workflow", 2) == 0
+        assert edit_distance("wrokflow", "workflow", 2) == 1
+        assert edit_distance("workflw", "workflow", 2) == 1
+        assert edit_distance("workflows", "workflow", 2) == 1
+        assert edit_distance("wirkflow", "workflow", 2) == 1
+
+    def test_limit(self):
+        """Test distances beyond the limit stop early at limit + 1."""
+        assert edit_distance("routing", "workflow", 2) == 3
+        assert edit_distance("a", "abcdef", 1) == 2
+
+
+class TestTrigramIndex:
+    """Tests for substring, fuzzy and completion lookups."""
+
+    def _index(self) -> TrigramIndex:
+        return TrigramIndex(["workflow", "workspace", "routing", "router", "claude", "cli"])
+
+    def test_trigrams_padded(self):
+        """Test padding gives the start and end of a word their own trigrams."""
+        assert trigrams("cli") == {"  c", " cl", "cli", "li "}
+        assert trigrams("cli", padded=False) == {"cli"}
+
+    def test_substring(self):
+        """Test keys containing the text are found, case-insensitively."""
+        index = self._index()
+        assert sorted(index.substring("out")) == ["router", "routing"]
+        assert sorted(index.substring("CL")) == ["claude", "cli"]
+        assert sorted(index.substring("l")) == ["claude", "cli", "workflow"]
+        assert index.substring("xyz") == []
+
+    def test_substring_reads_only_matching_grams(self):
+        """Test a lookup touches the query's grams, not every key."""
+        index = TrigramIndex(f"term{i}" for i in range(5000))
+        index.add("needle")
+        with patch.object(index, '_keys', set()):
+            assert index.substring("eedl") == ["needle"]
+
+    def test_fuzzy(self):
+        """Test keys within the edit distance are found, closest first."""
+        index = self._index()
+        assert index.fuzzy("wrokflow", 1) == [(1, "workflow")]
+        assert index.fuzzy("routr", 1) == [(1, "router")]
+        assert index.fuzzy("zzzzzz", 2) == []
+
+    def test_complete_ranking(self):
+        """Test prefix matches rank before matches inside a word, shorter first."""
+        index = TrigramIndex(["test_commands.md", "commands_v2.md", "my-commands.md",
+                              "recommends.md"])
+        assert index.complete("comm") == ["commands_v2.md", "my-commands.md",
+                                          "test_commands.md", "recommends.md"]
+        assert index.complete("comm", limit=1) == ["commands_v2.md"]
+
+    def test_add_and_discard(self):
+        """Test keys can be added and removed incrementally."""
+        index = self._index()
+        index.discard("routing")
+        index.add("gemini")
+        assert "routing" not in index and "gemini" in index
+        assert index.substring("out") == ["router"]
+        assert index.fuzzy("gemnii", 1) == [(1, "gemini")]
@@ -0,0 +1,202 @@
+"""Tests for cli/adapters.py module."""
+
+import asyncio
+import json
+import pytest
+
+from cli.adapters import (
+    AdapterExit, FunctionAdapter, SimulatorAdapter, ToolAdapter,
+    check_adapter, get_adapter, resolve_entry_point, run_adapter, _reset_adapters
+)
+from cli.config import Config, ToolConfig, _reset_config
+from cli.executor import execute_route, execute_tool_async, execute_tool_sync
+from cli.health import get_health_registry, _reset_health_registry
+from cli.router import Route
+
+
+def shout(task):
+    """Plain function entry point."""
+    return task.upper() + "\n"
+
+
+def count_words(task):
+    """Generator entry point."""
+    for word in task.split():
+        yield word + "\n"
+
+
+async def async_words(task):
+    """Async generator entry point."""
+    for word in task.split():
+        await asyncio.sleep(0)
+        yield word + "\n"
+
+
+def failing(task):
+    """Entry point that ends with a non-zero exit code."""
+    yield "partial\n"
+    raise AdapterExit(2, "gave up")
+
+
+class AsyncOnly(ToolAdapter):
+    """Adapter implementing only the async variant."""
+
+    async def astream(self, task):
+        yield f"{self.options.get('prefix', '')}{task}\n"
+
+
+def _tool(adapter, **options):
+    return ToolConfig(name="Sim", command="sim", context_file="SIM.md",
+                      adapter=adapter, options=options)
+
+
+@pytest.fixture
+def adapter_config_file(temp_config_file, sample_role_config):
+    """Config whose claude tool is the in-process simulator."""
+    sample_role_config["tools"]["claude"] = {
+        "name": "Claude Code",
+        "adapter": "cli.adapters:SimulatorAdapter",
+        "options": {"response": "sim: {task}"},
+    }
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    return temp_config_file
+
+
+class TestGetAdapter:
+    """Tests for entry point loading."""
+
+    def setup_method(self):
+        """Forget loaded adapters before each test."""
+        _reset_adapters()
+
+    def test_resolve_entry_point(self):
+        """Test module:attr specs resolve to the named object."""
+        assert resolve_entry_point("cli.adapters:SimulatorAdapter") is SimulatorAdapter
+        with pytest.raises(ValueError):
+            resolve_entry_point("cli.adapters")
+
+    def test_class_instantiated_with_options(self):
+        """Test ToolAdapter subclasses get the tool id and options."""
+        adapter = get_adapter("sim", _tool("cli.adapters:SimulatorAdapter", delay=0))
+        assert isinstance(adapter, SimulatorAdapter)
+        assert adapter.tool_id == "sim"
+        assert adapter.options == {"delay": 0}
+
+    def test_function_wrapped(self):
+        """Test plain functions are wrapped in a FunctionAdapter."""
+        adapter = get_adapter("sim", _tool("tests.test_adapters:shout"))
+        assert isinstance(adapter, FunctionAdapter)
+        assert list(adapter.stream("hi")) == ["HI\n"]
+
+    def test_cached_until_settings_change(self):
+        """Test the same settings reuse the loaded adapter."""
+        first = get_adapter("sim", _tool("cli.adapters:SimulatorAdapter"))
+        assert get_adapter("sim", _tool("cli.adapters:SimulatorAdapter")) is first
+        assert get_adapter("sim", _tool("cli.adapters:SimulatorAdapter", delay=1)) is not first
+
+    def test_check_adapter(self):
+        """Test loadable adapters report a version and broken ones an error."""
+        assert check_adapter("sim", _tool("cli.adapters:SimulatorAdapter")) == (True, "simulator")
+        loaded, error = check_adapter("sim", _tool("cli.nope:Missing"))
+        assert loaded is False
+        assert "not loadable" in error
+
+
+class TestRunAdapter:
+    """Tests for sync and async adapter runs."""
+
+    def setup_method(self):
+        """Forget loaded adapters before each test."""
+        _reset_adapters()
+
+    def test_generator_streams_chunks(self):
+        """Test each yielded chunk reaches on_output."""
+        chunks = []
+        output, code = run_adapter("sim", _tool("tests.test_adapters:count_words"),
+                                   "one two", chunks.append)
+        assert chunks == ["one\n", "two\n"]
+        assert (output, code) == ("one\ntwo\n", 0)
+
+    def test_adapter_exit(self):
+        """Test AdapterExit sets the exit code and keeps partial output."""
+        output, code = run_adapter("sim", _tool("tests.test_adapters:failing"), "x", lambda _: None)
+        assert code == 2
+        assert output == "partial\ngave up\n"
+
+    def test_async_generator_from_sync(self):
+        """Test an async-only adapter runs from sync callers."""
+        output, _ = run_adapter("sim", _tool("tests.test_adapters:async_words"), "a b", lambda _: None)
+        assert output == "a\nb\n"
+
+        output, _ = run_adapter("sim", _tool("tests.test_adapters:AsyncOnly", prefix="> "),
+                                "task", lambda _: None)
+        assert output == "> task\n"
+
+    def test_sync_adapter_from_async(self):
+        """Test a sync-only adapter streams through astream."""
+        adapter = get_adapter("sim", _tool("tests.test_adapters:count_words"))
+
+        async def collect():
+            return [chunk async for chunk in adapter.astream("x y")]
+
+        assert asyncio.run(collect()) == ["x\n", "y\n"]
+
+    def test_missing_implementation(self):
+        """Test an adapter implementing neither variant fails clearly."""
+        with pytest.raises(NotImplementedError):
+            list(ToolAdapter("sim").stream("task"))
+
+
+class TestExecutorDispatch:
+    """Tests for running adapter tools through the executor."""
+
+    def setup_method(self):
+        """Reset shared state before each test."""
+        _reset_config()
+        _reset_adapters()
+        _reset_health_registry()
+
+    def teardown_method(self):
+        """Reset shared state after each test."""
+        _reset_config()
+        _reset_adapters()
+        _reset_health_registry()
+
+    def test_streaming_and_sync(self, adapter_config_file, tmp_path, monkeypatch):
+        """Test adapter tools return the usual ExecutionResult and output file."""
+        monkeypatch.chdir(adapter_config_file.parent.parent)
+        route = Route(tool="claude", task="build it", tool_display_name="Claude Code")
+
+        lines = []
+        result = execute_route(route, tmp_path, lines.append)
+        assert result.output == "sim: build it\n"
+        assert result.exit_code == 0
+        assert lines == ["sim: build it\n"]
+        assert result.output_file.read_text() == "sim: build it\n"
+
+        assert execute_tool_sync(route, tmp_path).output == "sim: build it\n"
+
+    def test_async(self, adapter_config_file, tmp_path, monkeypatch):
+        """Test execute_tool_async runs adapters on the event loop."""
+        monkeypatch.chdir(adapter_config_file.parent.parent)
+        route = Route(tool="claude", task="build it", tool_display_name="Claude Code")
+
+        result = asyncio.run(execute_tool_async(route, tmp_path, lambda _: None))
+        assert result.output == "sim: build it\n"
+        assert result.tool == "claude"
+
+    def test_outcome_recorded(self, adapter_config_file, tmp_path, monkeypatch):
+        """Test adapter runs feed the health registry like command runs."""
+        monkeypatch.chdir(adapter_config_file.parent.parent)
+        route = Route(tool="claude", task="build it", tool_display_name="Claude Code")
+
+        execute_route(route, tmp_path, lambda _: None)
+        health = get_health_registry().snapshot()["claude"]
+        assert health.installed
+        assert health.version == "simulator"
+        assert health.recent_exit_codes == (0,)
+
+    def test_adapter_tool_installed(self, adapter_config_file):
+        """Test adapter tools count as installed when their module exists."""
+        config = Config.load(adapter_config_file)
+        assert config.is_tool_installed("claude")
@@ -1,12 +1,14 @@
 """Tests for cli/config.py module."""
 
 import json
+import os
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 from cli.config import (
     Config, RoleConfig, ToolConfig,
-    load_config, get_config, _reset_config
+    load_config, get_config, _reset_config, _config_cache_path
 )
 from cli.errors import ConfigNotFoundError, ConfigParseError, ConfigValidationError
 
@@ -101,6 +103,72 @@ class TestConfigLoad:
         assert config.auth_status["claude"] is True
         assert config.auth_status["gemini"] is True
 
+    def test_load_routing_defaults(self, temp_config_file):
+        """Test routing settings default to first-match."""
+        config = Config.load(temp_config_file)
+
+        assert config.routing.strategy == "first_match"
+        assert config.routing.fallback_role is None
+        assert config.routing.record_history is False
+        assert config.roles["research"].weights == {}
+
+    def test_load_routing_and_weights(self, temp_config_file, sample_role_config):
+        """Test routing settings and keyword weights are parsed."""
+        sample_role_config["routing"] = {"strategy": "scored", "min_confidence": 0.6,
+                                         "record_history": True}
+        sample_role_config["roles"]["research"]["weights"] = {"find": 2}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        config = Config.load(temp_config_file)
+        assert config.routing.strategy == "scored"
+        assert config.routing.min_confidence == 0.6
+        assert config.routing.record_history is True
+        assert config.roles["research"].weights == {"find": 2.0}
+
+    def test_load_execution_settings(self, temp_config_file, sample_role_config):
+        """Test execution settings are parsed with defaults."""
+        assert Config.load(temp_config_file).execution.reduce_prompt is None
+
+        sample_role_config["execution"] = {"max_task_chars": 500, "reduce_prompt": "Merge"}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        execution = Config.load(temp_config_file).execution
+        assert execution.max_task_chars == 500
+        assert execution.max_parallel == 4
+        assert execution.reduce_prompt == "Merge"
+
+    def test_load_knowledge_settings(self, temp_config_file, sample_role_config):
+        """Test knowledge settings are parsed with defaults."""
+        assert Config.load(temp_config_file).knowledge.scorer == "bm25"
+        assert Config.load(temp_config_file).knowledge.engine == "python"
+
+        assert Config.load(temp_config_file).knowledge.semantic is False
+
+        sample_role_config["knowledge"] = {"engine": "sqlite", "scorer": "tfidf", "bm25_b": 0.5,
+                                           "semantic": True, "index_workers": 4}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        knowledge = Config.load(temp_config_file).knowledge
+        assert knowledge.engine == "sqlite"
+        assert knowledge.scorer == "tfidf"
+        assert knowledge.bm25_b == 0.5
+        assert knowledge.title_weight == 2.0
+        assert knowledge.semantic is True
+        assert knowledge.index_workers == 4
+
+    def test_load_worker_settings(self, temp_config_file, sample_role_config):
+        """Test worker blocks are parsed with defaults, and can be disabled."""
+        assert Config.load(temp_config_file).tools["claude"].worker is None
+
+        sample_role_config["tools"]["claude"]["worker"] = {"size": 3, "args": ["--session"]}
+        sample_role_config["tools"]["gemini"]["worker"] = {"enabled": False}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        config = Config.load(temp_config_file)
+        worker = config.tools["claude"].worker
+        assert worker.size == 3
+        assert worker.args == ["--session"]
+        assert worker.max_requests == 50
+        assert worker.timeout == 600
+        assert config.tools["gemini"].worker is None
+
     def test_load_file_not_found(self, tmp_path):
         """Test loading config from non-existent file raises error."""
         fake_path = tmp_path / "nonexistent.json"
@@ -119,6 +187,111 @@ class TestConfigLoad:
         assert "bad.json" in str(exc_info.value)
 
 
+class TestCompiledConfigCache:
+    """Tests for the compiled config cache."""
+
+    def test_cache_written_next_to_config(self, temp_config_file):
+        """Test a validated load writes the cache file."""
+        Config.load(temp_config_file)
+        assert _config_cache_path(temp_config_file).exists()
+        assert _config_cache_path(temp_config_file).parent == temp_config_file.parent
+
+    def test_unchanged_config_skips_validation(self, temp_config_file):
+        """Test a cache hit skips parsing and validation."""
+        first = Config.load(temp_config_file)
+        with patch("cli.config.validate_config_data") as validate:
+            second = Config.load(temp_config_file)
+        validate.assert_not_called()
+        assert second.roles == first.roles
+        assert second.tools == first.tools
+        assert second is not first
+
+    def test_changed_config_rebuilds(self, temp_config_file, sample_role_config):
+        """Test editing the config invalidates the cache."""
+        Config.load(temp_config_file)
+        sample_role_config["roles"]["research"]["keywords"] = ["scout"]
+        temp_config_file.write_text(json.dumps(sample_role_config, indent=2))
+
+        assert Config.load(temp_config_file).roles["research"].keywords == ["scout"]
+
+    def test_same_size_rewrite_detected(self, temp_config_file):
+        """Test a same-size, same-mtime rewrite is caught by the content hash."""
+        Config.load(temp_config_file)
+        stat = temp_config_file.stat()
+        content = temp_config_file.read_text().replace('"find"', '"fond"')
+        temp_config_file.write_text(content)
+        os.utime(temp_config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert "fond" in Config.load(temp_config_file).roles["research"].keywords
+
+    def test_invalid_config_not_cached(self, temp_config_file, sample_role_config):
+        """Test failed validation never reaches the cache."""
+        del sample_role_config["roles"]["research"]["primary"]
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        with pytest.raises(ConfigValidationError):
+            Config.load(temp_config_file)
+        assert not _config_cache_path(temp_config_file).exists()
+
+    def test_corrupt_cache_ignored(self, temp_config_file):
+        """Test an unreadable cache falls back to a normal load."""
+        _config_cache_path(temp_config_file).write_bytes(b"{not json")
+        assert "claude" in Config.load(temp_config_file).tools
+
+    def test_env_change_invalidates(self, temp_config_file, tmp_path, monkeypatch):
+        """Test a changed .env invalidates the cache and its values are applied."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("WORKFLOW_TEST_VAR=one\n")
+        monkeypatch.setattr("cli.config._env_candidates", lambda: [env_file])
+        monkeypatch.delenv("WORKFLOW_TEST_VAR", raising=False)
+
+        Config.load(temp_config_file)
+        assert os.environ["WORKFLOW_TEST_VAR"] == "one"
+
+        # Cache hit loads the unchanged .env again
+        monkeypatch.delenv("WORKFLOW_TEST_VAR")
+        with patch("cli.config.validate_config_data") as validate:
+            Config.load(temp_config_file)
+        validate.assert_not_called()
+        assert os.environ["WORKFLOW_TEST_VAR"] == "one"
+
+        env_file.write_text("WORKFLOW_TEST_VAR=two-two\n")
+        monkeypatch.delenv("WORKFLOW_TEST_VAR")
+        Config.load(temp_config_file)
+        assert os.environ["WORKFLOW_TEST_VAR"] == "two-two"
+
+    def test_env_edit_overrides_on_reload(self, temp_config_file, tmp_path, monkeypatch):
+        """Test an edited .env replaces loaded values only when reloading."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("WORKFLOW_TEST_VAR=one\n")
+        monkeypatch.setattr("cli.config._env_candidates", lambda: [env_file])
+        monkeypatch.delenv("WORKFLOW_TEST_VAR", raising=False)
+        Config.load(temp_config_file)
+
+        env_file.write_text("WORKFLOW_TEST_VAR=two-two\n")
+        Config.load(temp_config_file)
+        assert os.environ["WORKFLOW_TEST_VAR"] == "one"  # The environment wins at startup
+        Config.load(temp_config_file, override_env=True)
+        assert os.environ["WORKFLOW_TEST_VAR"] == "two-two"
+
+    def test_env_values_not_cached(self, temp_config_file, tmp_path, monkeypatch):
+        """Test .env values never reach the cache file, only its fingerprint."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("WORKFLOW_TEST_SECRET=sk-do-not-store\n")
+        monkeypatch.setattr("cli.config._env_candidates", lambda: [env_file])
+        monkeypatch.delenv("WORKFLOW_TEST_SECRET", raising=False)
+
+        Config.load(temp_config_file)
+        cached = _config_cache_path(temp_config_file).read_text()
+        assert "sk-do-not-store" not in cached
+        assert json.loads(cached)["env_path"] == str(env_file)
+
+    def test_use_cache_false(self, temp_config_file):
+        """Test the cache can be bypassed."""
+        Config.load(temp_config_file, use_cache=False)
+        assert not _config_cache_path(temp_config_file).exists()
+
+
 class TestConfigMethods:
     """Tests for Config instance methods."""
 
@@ -289,6 +289,177 @@ class TestValidateConfigData:
         assert result.valid is True  # Warning, not error
         assert any("unknown" in w for w in result.warnings)
 
+    def test_invalid_keyword_weight(self):
+        """Test error for a non-numeric keyword weight."""
+        data = {
+            "roles": {
+                "research": {
+                    "keywords": ["research"],
+                    "weights": {"research": "high"},
+                    "primary": "gemini"
+                }
+            },
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("weight" in e for e in result.errors)
+
+    def test_warning_weight_unknown_keyword(self):
+        """Test warning for a weight on a keyword the role doesn't have."""
+        data = {
+            "roles": {
+                "research": {
+                    "keywords": ["research"],
+                    "weights": {"explore": 2.0},
+                    "primary": "gemini"
+                }
+            },
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True}
+        }
+        result = validate_config_data(data)
+        assert result.valid is True
+        assert any("explore" in w for w in result.warnings)
+
+    def test_unknown_routing_strategy(self):
+        """Test error for an unknown routing strategy."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "routing": {"strategy": "random"}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("random" in e for e in result.errors)
+
+    def test_routing_fallback_role_unknown(self):
+        """Test error for a fallback_role that isn't defined."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "routing": {"strategy": "scored", "fallback_role": "nope"}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+
+    def test_record_history_must_be_bool(self):
+        """Test record_history only accepts true or false."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "routing": {"record_history": "yes"}
+        }
+        result = validate_config_data(data)
+        assert any("'record_history'" in e for e in result.errors)
+
+    def test_unknown_input_mode(self):
+        """Test error for an unknown tool input_mode."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {"input_mode": "carrier-pigeon"}},
+            "auth_status": {"gemini": True}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("carrier-pigeon" in e for e in result.errors)
+
+    def test_invalid_worker_block(self):
+        """Test errors for bad worker pool settings."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {"worker": {"size": 0, "sentinel": "", "max_memory_mb": -1,
+                                            "timeout": "soon"}}},
+            "auth_status": {"gemini": True}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("'size'" in e for e in result.errors)
+        assert any("'sentinel'" in e for e in result.errors)
+        assert any("'max_memory_mb'" in e for e in result.errors)
+        assert any("'timeout'" in e for e in result.errors)
+
+    def test_adapter_entry_point(self):
+        """Test adapters must be module:attr, and need no command."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {"adapter": "cli.adapters:SimulatorAdapter"}},
+            "auth_status": {"gemini": True}
+        }
+        result = validate_config_data(data)
+        assert result.valid is True
+        assert not any("command" in w for w in result.warnings)
+
+        data["tools"]["gemini"]["adapter"] = "cli.adapters"
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("module:attr" in e for e in result.errors)
+
+    def test_unknown_knowledge_scorer(self):
+        """Test errors for an unknown scorer and out-of-range BM25 settings."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "knowledge": {"scorer": "pagerank", "bm25_b": 2}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("pagerank" in e for e in result.errors)
+        assert any("bm25_b" in e for e in result.errors)
+
+    def test_unknown_knowledge_engine(self):
+        """Test error for an unknown search engine."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "knowledge": {"engine": "lucene"}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("lucene" in e for e in result.errors)
+
+    def test_semantic_must_be_bool(self):
+        """Test error for a non-boolean knowledge.semantic."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "knowledge": {"semantic": "yes"}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+        assert any("semantic" in e for e in result.errors)
+
+    def test_index_workers_must_be_non_negative(self):
+        """Test error for a negative or non-integer knowledge.index_workers."""
+        for workers in (-1, 2.5, True):
+            data = {
+                "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+                "tools": {"gemini": {}},
+                "auth_status": {"gemini": True},
+                "knowledge": {"index_workers": workers}
+            }
+            result = validate_config_data(data)
+            assert result.valid is False
+            assert any("index_workers" in e for e in result.errors)
+
+    def test_speculative_must_be_bool(self):
+        """Test error for a non-boolean execution.speculative."""
+        data = {
+            "roles": {"research": {"keywords": ["research"], "primary": "gemini"}},
+            "tools": {"gemini": {}},
+            "auth_status": {"gemini": True},
+            "execution": {"speculative": "yes"}
+        }
+        result = validate_config_data(data)
+        assert result.valid is False
+
 
 class TestFormatErrorForDisplay:
     """Tests for format_error_for_display function."""
@@ -0,0 +1,260 @@
+"""Tests for cli/executor.py module."""
+
+import json
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from cli import executor as executor_module
+from cli.executor import (
+    build_tool_command, chunk_task, execute_route, execute_tool_sync, ExecutionResult,
+    _write_stdin
+)
+from cli.router import Route
+from cli.config import _reset_config
+
+
+@pytest.fixture
+def echo_config_file(temp_config_file, sample_role_config):
+    """Config whose claude tool is `echo`, so runs print their task."""
+    sample_role_config["tools"]["claude"]["command"] = "echo"
+    sample_role_config["tools"]["claude"]["args"] = []
+    sample_role_config["execution"] = {"max_task_chars": 40, "max_parallel": 3}
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    return temp_config_file
+
+
+@pytest.fixture
+def stdin_config_file(temp_config_file, sample_role_config):
+    """Config whose claude tool is `cat` reading the task from stdin."""
+    sample_role_config["tools"]["claude"].update(
+        {"command": "cat", "args": ["-p", "{task}"], "input_mode": "stdin"}
+    )
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    return temp_config_file
+
+
+class TestInputMode:
+    """Tests for tools that take the task on stdin."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_command_omits_task(self, stdin_config_file, monkeypatch):
+        """Test stdin-mode commands carry no task argument."""
+        monkeypatch.chdir(stdin_config_file.parent.parent)
+        route = Route(tool="claude", task="build it", tool_display_name="Claude Code")
+        assert build_tool_command(route) == "cat -p"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses cat as the tool")
+    def test_task_sent_on_stdin(self, stdin_config_file, tmp_path, monkeypatch):
+        """Test streaming and sync execution write the task to stdin."""
+        monkeypatch.chdir(stdin_config_file.parent.parent)
+        sample_role = json.loads(stdin_config_file.read_text())
+        sample_role["tools"]["claude"]["args"] = []
+        stdin_config_file.write_text(json.dumps(sample_role))
+
+        route = Route(tool="claude", task='say "hi" & exit', tool_display_name="Claude Code")
+        assert execute_route(route, tmp_path, lambda _: None).output == 'say "hi" & exit'
+        assert execute_tool_sync(route, tmp_path).output == 'say "hi" & exit'
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses cat as the tool")
+    def test_large_task_on_stdin(self, stdin_config_file, tmp_path, monkeypatch):
+        """Test a multi-hundred-KB task streams through without deadlocking."""
+        monkeypatch.chdir(stdin_config_file.parent.parent)
+        sample_role = json.loads(stdin_config_file.read_text())
+        sample_role["tools"]["claude"]["args"] = []
+        sample_role["execution"] = {"max_task_chars": 10_000_000}
+        stdin_config_file.write_text(json.dumps(sample_role))
+
+        # cat echoes while still reading, which fills both pipes
+        task = "log line with ünïcode\n" * 40_000
+        route = Route(tool="claude", task=task, tool_display_name="Claude Code")
+        assert execute_route(route, tmp_path, lambda _: None).output == task
+        assert execute_tool_sync(route, tmp_path).output == task
+
+    def test_tempfile_command(self, stdin_config_file, monkeypatch):
+        """Test tempfile mode substitutes or appends the task file path."""
+        monkeypatch.chdir(stdin_config_file.parent.parent)
+        sample_role = json.loads(stdin_config_file.read_text())
+        sample_role["tools"]["claude"].update(
+            {"input_mode": "tempfile", "args": ["-p", "{task}", "--file={task_file}"]}
+        )
+        stdin_config_file.write_text(json.dumps(sample_role))
+        route = Route(tool="claude", task="build it", tool_display_name="Claude Code")
+
+        assert build_tool_command(route, task_file=Path("/tmp/t.txt")) == "cat -p --file=/tmp/t.txt"
+
+        sample_role["tools"]["claude"]["args"] = ["-p"]
+        stdin_config_file.write_text(json.dumps(sample_role))
+        _reset_config()
+        assert build_tool_command(route, task_file=Path("/tmp/t.txt")) == "cat -p /tmp/t.txt"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses cat as the tool")
+    def test_task_sent_in_tempfile(self, stdin_config_file, tmp_path, monkeypatch):
+        """Test tempfile mode passes the task in a file that is removed afterwards."""
+        monkeypatch.chdir(stdin_config_file.parent.parent)
+        sample_role = json.loads(stdin_config_file.read_text())
+        sample_role["tools"]["claude"].update({"input_mode": "tempfile", "args": []})
+        stdin_config_file.write_text(json.dumps(sample_role))
+
+        created = []
+        original = executor_module.write_task_file
+
+        def tracking(task):
+            created.append(original(task))
+            return created[-1]
+
+        monkeypatch.setattr(executor_module, "write_task_file", tracking)
+        route = Route(tool="claude", task='say "hi" & exit', tool_display_name="Claude Code")
+        assert execute_route(route, tmp_path, lambda _: None).output == 'say "hi" & exit'
+        assert execute_tool_sync(route, tmp_path).output == 'say "hi" & exit'
+        assert len(created) == 2
+        assert not any(path.exists() for path in created)
+
+    def test_write_stdin_chunks(self):
+        """Test tasks are written in bounded chunks and the pipe is closed."""
+        class Pipe:
+            def __init__(self):
+                self.writes = []
+                self.closed = False
+
+            def write(self, data):
+                self.writes.append(bytes(data))
+
+            def flush(self):
+                pass
+
+            def close(self):
+                self.closed = True
+
+        pipe = Pipe()
+        _write_stdin(pipe, "x" * 10, chunk_size=4)
+        assert pipe.writes == [b"xxxx", b"xxxx", b"xx"]
+        assert pipe.closed
+
+
+class TestChunkTask:
+    """Tests for chunk_task function."""
+
+    def test_short_task_unchanged(self):
+        """Test tasks within the limit are not split."""
+        assert chunk_task("build it. test it", 100) == ["build it. test it"]
+
+    def test_splits_on_sentences(self):
+        """Test chunks break at the consolidation separator."""
+        task = "build feature A. build feature B. build feature C"
+        chunks = chunk_task(task, 35)
+        assert chunks == ["build feature A. build feature B.", "build feature C"]
+        assert " ".join(chunks) == task
+
+    def test_long_sentence_split_on_whitespace(self):
+        """Test a single oversized sentence is split on spaces."""
+        chunks = chunk_task("word " * 30, 20)
+        assert all(len(c) <= 20 for c in chunks)
+        assert " ".join(chunks).split() == ["word"] * 30
+
+    def test_unbreakable_text(self):
+        """Test text without spaces is hard-split."""
+        assert chunk_task("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+class TestExecuteRoute:
+    """Tests for execute_route map-reduce execution."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def _route(self, task: str) -> Route:
+        return Route(tool="claude", task=task, tool_display_name="Claude Code")
+
+    def test_small_task_single_run(self, echo_config_file, tmp_path, monkeypatch):
+        """Test small tasks run once without chunk files."""
+        monkeypatch.chdir(echo_config_file.parent.parent)
+
+        result = execute_route(self._route("build it"), tmp_path, lambda _: None)
+        assert result.exit_code == 0
+        assert result.output.strip() == "build it"
+        assert result.chunks == []
+        assert not (tmp_path / "claude_chunks.json").exists()
+
+    def test_oversized_task_is_chunked(self, echo_config_file, tmp_path, monkeypatch):
+        """Test oversized tasks run as parallel chunks with tracked results."""
+        monkeypatch.chdir(echo_config_file.parent.parent)
+
+        task = "build feature one. build feature two. build feature three"
+        streamed = []
+        result = execute_route(self._route(task), tmp_path, streamed.append)
+
+        assert len(result.chunks) == 2
+        assert all(isinstance(c, ExecutionResult) for c in result.chunks)
+        assert "Part 1/2" in result.output and "feature three" in result.output
+        # Chunk output reaches the callback in order
+        assert "".join(streamed).index("feature one") < "".join(streamed).index("feature three")
+
+        manifest = json.loads((tmp_path / "claude_chunks.json").read_text())
+        assert [c["index"] for c in manifest] == [0, 1]
+        assert all(c["exit_code"] == 0 for c in manifest)
+        assert (tmp_path / "claude_chunk_000_output.txt").exists()
+        assert (tmp_path / "claude_output.txt").read_text() == result.output
+
+    @pytest.fixture
+    def reduce_config_file(self, echo_config_file, sample_role_config):
+        """Echo config whose tool prints 6 characters of its task, with a reduce prompt."""
+        sample_role_config["tools"]["claude"].update({"command": "printf", "args": ["%.6s"]})
+        sample_role_config["execution"].update({"max_task_chars": 60, "reduce_prompt": "MERGE:"})
+        echo_config_file.write_text(json.dumps(sample_role_config))
+        return echo_config_file
+
+    def test_reduce_prompt(self, reduce_config_file, tmp_path, monkeypatch):
+        """Test a reduce prompt triggers a final merge run."""
+        monkeypatch.chdir(reduce_config_file.parent.parent)
+
+        task = "build feature one. build feature two. build feature three. build feature four"
+        result = execute_route(self._route(task), tmp_path, lambda _: None)
+
+        assert result.output == "MERGE:"
+        assert len(result.chunks) == 2
+
+    def test_reduce_in_rounds(self, reduce_config_file, tmp_path, monkeypatch):
+        """Test chunk outputs are reduced in groups that fit max_task_chars."""
+        monkeypatch.chdir(reduce_config_file.parent.parent)
+
+        task = " ".join(f"build feature {i}." for i in range(12))
+        with patch.object(executor_module, "execute_tool_streaming",
+                          wraps=executor_module.execute_tool_streaming) as run:
+            result = execute_route(self._route(task), tmp_path, lambda _: None)
+
+        tasks = [call.args[0].task for call in run.call_args_list]
+        assert all(len(t) <= 60 for t in tasks)
+        assert len(result.chunks) == 4
+        assert len([t for t in tasks if t.startswith("MERGE:")]) == 3
+        assert (tmp_path / "claude_reduce_0_001_output.txt").exists()
+        assert result.output == "MERGE:"
+
+    def test_reduce_stops_without_progress(self, echo_config_file, sample_role_config,
+                                           tmp_path, monkeypatch):
+        """Test outputs that do not shrink are concatenated rather than reduced past the limit."""
+        sample_role_config["execution"]["reduce_prompt"] = "MERGE:"
+        echo_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(echo_config_file.parent.parent)
+
+        task = "build feature one. build feature two. build feature three"
+        with patch.object(executor_module, "execute_tool_streaming",
+                          wraps=executor_module.execute_tool_streaming) as run:
+            result = execute_route(self._route(task), tmp_path, lambda _: None)
+
+        assert all(len(call.args[0].task) <= 40 for call in run.call_args_list)
+        assert result.output.startswith("## Part 1/2")
+        assert "feature three" in result.output
@@ -0,0 +1,212 @@
+"""Tests for cli/health.py module."""
+
+import json
+import time
+from unittest.mock import patch
+
+from cli.config import Config, get_config, reload_config, _reset_config
+from cli.executor import get_tools_status
+from cli.health import (
+    HealthRegistry, probe_tool,
+    get_health_registry, _reset_health_registry
+)
+from cli.router import route_sentence, on_tool_health_changed, _reset_route_cache
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    """Poll until predicate() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestProbeTool:
+    """Tests for probe_tool function."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_installed_and_authenticated(self, temp_config_file, monkeypatch):
+        """Test a configured, installed tool is available."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            health = probe_tool("claude", get_config())
+        assert health.installed and health.available
+        assert health.version == "1.0"
+        assert health.probe_ms >= 0
+
+    def test_explicit_auth_false(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test auth_status false makes a tool unavailable even when installed."""
+        sample_role_config["auth_status"]["gemini"] = False
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            health = probe_tool("gemini", get_config())
+        assert health.installed and not health.available
+        assert "Auth missing" in health.status_text
+
+    def test_auto_requires_install(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test auth_status auto follows install state."""
+        sample_role_config["auth_status"]["openai"] = "auto"
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        with patch('cli.tools.check_tool_installed', return_value=(False, "not found")):
+            health = probe_tool("openai", get_config())
+        assert not health.available
+        assert health.error == "not found"
+
+
+class TestHealthRegistry:
+    """Tests for HealthRegistry."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_snapshot_probes_once(self, temp_config_file, monkeypatch):
+        """Test reads after the first come from the snapshot."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = HealthRegistry()
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")) as probe:
+            first = registry.snapshot()
+            second = registry.snapshot()
+        assert probe.call_count == 3
+        assert list(first) == ["claude", "gemini", "openai"]
+        assert first == second
+
+    def test_refresh_publishes_changes(self, temp_config_file, monkeypatch):
+        """Test subscribers get one event per changed tool."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = HealthRegistry()
+        seen = []
+        registry.subscribe(seen.append)
+
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            registry.refresh()
+            registry.refresh()  # Nothing changed
+        assert len(seen) == 1 and len(seen[0]) == 3
+
+        with patch('cli.tools.check_tool_installed', return_value=(True, "2.0")):
+            registry.refresh()
+        assert len(seen) == 2
+        assert all(not e.availability_changed for e in seen[1])
+
+    def test_record_outcome(self, temp_config_file, monkeypatch):
+        """Test execution outcomes feed the snapshot."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = HealthRegistry()
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            registry.snapshot()
+            registry.record_outcome("claude", 0)
+            registry.record_outcome("claude", 1)
+            health = registry.snapshot()["claude"]
+            assert health.recent_exit_codes == (0, 1)
+            assert health.success_rate == 0.5
+
+            # Outcomes survive a re-probe
+            assert registry.refresh()["claude"].recent_exit_codes == (0, 1)
+
+    def test_background_refresh_on_config_swap(self, temp_config_file, sample_role_config,
+                                               monkeypatch):
+        """Test the monitor re-probes when the config is swapped."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = HealthRegistry(interval=60)
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            registry.start()
+            try:
+                assert _wait_for(lambda: registry.peek(get_config()) is not None)
+                sample_role_config["auth_status"]["gemini"] = False
+                temp_config_file.write_text(json.dumps(sample_role_config))
+                config = reload_config()
+                assert _wait_for(lambda: registry.availability(config) == (True, False, True))
+            finally:
+                registry.stop()
+        assert not registry.running
+
+    def test_start_without_first_refresh(self, temp_config_file, monkeypatch):
+        """Test the monitor can leave the first snapshot to the caller."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = HealthRegistry(interval=60)
+        config = get_config()
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            registry.start(refresh_now=False)
+            try:
+                assert not _wait_for(lambda: registry.peek(config) is not None, timeout=0.3)
+            finally:
+                registry.stop()
+
+
+class TestHealthConsumers:
+    """Tests for /status and routing reading the registry."""
+
+    def setup_method(self):
+        """Reset config, caches and the global registry before each test."""
+        _reset_config()
+        _reset_route_cache()
+        _reset_health_registry()
+
+    def teardown_method(self):
+        """Reset config, caches and the global registry after each test."""
+        _reset_config()
+        _reset_route_cache()
+        _reset_health_registry()
+
+    def test_status_reads_registry(self, temp_config_file, monkeypatch):
+        """Test get_tools_status is a view over the registry snapshot."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")) as probe:
+            get_tools_status()
+            status = get_tools_status()
+        assert probe.call_count == 3
+        assert status["claude"]["available"] is True
+        assert status["claude"]["version"] == "1.0"
+        assert "Available" in status["claude"]["status"]
+
+    def test_routing_uses_monitored_snapshot(self, temp_config_file, monkeypatch):
+        """Test routing does not probe inline while the monitor runs."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = get_health_registry()
+        registry.subscribe(on_tool_health_changed)
+        config = get_config()
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            registry.start()
+            assert _wait_for(lambda: registry.peek(config) is not None)
+
+            with patch.object(Config, "is_tool_available", autospec=True) as inline:
+                assert route_sentence("research AI trends").tool == "gemini"
+            assert inline.call_count == 0
+
+    def test_availability_event_reroutes(self, temp_config_file, sample_role_config,
+                                         monkeypatch):
+        """Test an availability flip reaches cached routes."""
+        sample_role_config["auth_status"]["gemini"] = "auto"
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        registry = get_health_registry()
+        registry.subscribe(on_tool_health_changed)
+        missing = set()
+
+        def probe(command):
+            return (False, "not found") if command in missing else (True, "1.0")
+
+        with patch('cli.tools.check_tool_installed', side_effect=probe):
+            registry.start()
+            assert _wait_for(lambda: registry.peek(get_config()) is not None)
+            assert route_sentence("research AI trends").tool == "gemini"
+
+            # Gemini's binary disappears
+            missing.add("gemini")
+            registry.refresh()
+            assert route_sentence("research AI trends").tool == "claude"
@@ -0,0 +1,242 @@
+"""Tests for cli/learned.py module."""
+
+import json
+import pytest
+from pathlib import Path
+
+from cli import learned
+from cli.learned import (
+    NaiveBayesRouter, extract_features, record_routes, train_router,
+    get_learned_router, invalidate_learned_router, NUM_FEATURES
+)
+from cli.router import Route, route_sentence, route_many
+from cli.config import _reset_config
+
+
+EXAMPLES = [
+    ("look into the latest api docs", "research"),
+    ("gather background on vector databases", "research"),
+    ("look around the codebase for the parser", "research"),
+    ("double-check the auth logic is sound", "analysis"),
+    ("give a second opinion on this design", "analysis"),
+    ("sanity-check the migration plan", "analysis"),
+]
+
+
+@pytest.fixture
+def history_file(tmp_path: Path) -> Path:
+    """Route history with labelled successes, a failure and an unlabelled route."""
+    path = tmp_path / "logs" / "routes.jsonl"
+    routes = [Route(tool="gemini", task=s, tool_display_name="Gemini",
+                    matched_keyword=s.split()[0], matched_role=r)
+              for s, r in EXAMPLES]
+    record_routes(routes, {"gemini": 0}, path)
+    record_routes([Route(tool="claude", task="broken thing", tool_display_name="Claude",
+                         matched_keyword="broken", matched_role="deep_work")], {"claude": 1}, path)
+    record_routes([Route(tool="claude", task="hello", tool_display_name="Claude")],
+                  {"claude": 0}, path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def clear_model_cache():
+    """Drop the cached model between tests."""
+    invalidate_learned_router()
+    yield
+    invalidate_learned_router()
+
+
+class TestExtractFeatures:
+    """Tests for extract_features function."""
+
+    def test_unigrams_and_bigrams(self):
+        """Test features include words and word pairs."""
+        assert len(extract_features("look into docs")) == 5
+
+    def test_stable_buckets(self):
+        """Test hashing is deterministic and in range."""
+        features = extract_features("Review the parser")
+        assert features == extract_features("review the parser")
+        assert all(0 <= f < NUM_FEATURES for f in features)
+
+    def test_empty(self):
+        """Test empty input has no features."""
+        assert extract_features("  ") == []
+
+
+class TestNaiveBayesRouter:
+    """Tests for NaiveBayesRouter."""
+
+    def test_untrained_predicts_nothing(self):
+        """Test an empty model returns None."""
+        assert NaiveBayesRouter().predict("anything") is None
+
+    def test_predicts_trained_role(self):
+        """Test the model separates trained roles."""
+        model = NaiveBayesRouter()
+        model.train(EXAMPLES)
+        role, probability = model.predict("look into the parser docs")
+        assert role == "research"
+        assert 0.5 < probability <= 1.0
+        assert model.predict("second opinion on the auth plan")[0] == "analysis"
+
+    def test_round_trip(self, tmp_path):
+        """Test save/load preserves predictions."""
+        model = NaiveBayesRouter()
+        model.train(EXAMPLES)
+        path = tmp_path / "model.json"
+        model.save(path)
+
+        loaded = NaiveBayesRouter.load(path)
+        assert loaded.doc_counts == model.doc_counts
+        assert loaded.predict("check the auth design") == model.predict("check the auth design")
+
+    def test_incompatible_model(self):
+        """Test loading a model with another feature space fails."""
+        data = NaiveBayesRouter().to_dict()
+        data["num_features"] = 8
+        with pytest.raises(ValueError):
+            NaiveBayesRouter.from_dict(data)
+
+
+class TestTrainRouter:
+    """Tests for train_router function."""
+
+    def test_trains_on_successful_labelled_routes(self, history_file, tmp_path):
+        """Test only labelled routes with exit code 0 are used."""
+        model_path = tmp_path / "config" / "router_model.json"
+        stats = train_router(history_file, model_path)
+
+        assert stats.records_read == 8
+        assert stats.examples_added == 6
+        assert stats.roles == {"research": 3, "analysis": 3}
+        assert model_path.exists()
+
+    def test_history_rotated(self, history_file, monkeypatch):
+        """Test the history moves to routes.jsonl.1 once it passes the size cap."""
+        monkeypatch.setattr(learned, "ROUTE_HISTORY_MAX_BYTES", history_file.stat().st_size)
+        old = history_file.read_text()
+        record_routes([Route(tool="claude", task="new prompt", tool_display_name="Claude")],
+                      {"claude": 0}, history_file)
+        assert history_file.with_name("routes.jsonl.1").read_text() == old
+        assert len(history_file.read_text().splitlines()) == 1
+
+    def test_incremental(self, history_file, tmp_path):
+        """Test retraining only reads new history."""
+        model_path = tmp_path / "router_model.json"
+        train_router(history_file, model_path)
+
+        record_routes([Route(tool="openai", task="audit the plan", tool_display_name="Codex",
+                             matched_keyword="audit", matched_role="analysis")],
+                      {"openai": 0}, history_file)
+        stats = train_router(history_file, model_path)
+        assert stats.records_read == 1
+        assert stats.total_examples == 7
+
+    def test_truncated_history_read_from_start(self, history_file, tmp_path):
+        """Test a history shorter than the stored offset is read again from the start."""
+        model_path = tmp_path / "router_model.json"
+        train_router(history_file, model_path)
+
+        history_file.write_text("")
+        record_routes([Route(tool="openai", task="audit the plan", tool_display_name="Codex",
+                             matched_keyword="audit", matched_role="analysis")],
+                      {"openai": 0}, history_file)
+        stats = train_router(history_file, model_path)
+        assert stats.records_read == 1
+        assert stats.examples_added == 1
+
+    def test_rotated_history_read_from_start(self, history_file, tmp_path, monkeypatch):
+        """Test a rotated history that regrew past the old offset is not skipped."""
+        model_path = tmp_path / "router_model.json"
+        train_router(history_file, model_path)
+
+        routes = [Route(tool="gemini", task=f"look into option {i}", tool_display_name="Gemini",
+                        matched_keyword="look", matched_role="research") for i in range(20)]
+        monkeypatch.setattr(learned, "ROUTE_HISTORY_MAX_BYTES", history_file.stat().st_size)
+        record_routes(routes[:1], {"gemini": 0}, history_file)
+        monkeypatch.setattr(learned, "ROUTE_HISTORY_MAX_BYTES", 1 << 30)
+        record_routes(routes[1:], {"gemini": 0}, history_file)
+        assert history_file.stat().st_size > learned.NaiveBayesRouter.load(model_path).history_offset
+        assert train_router(history_file, model_path).records_read == 20
+
+    def test_own_predictions_not_trained_on(self, history_file, tmp_path):
+        """Test routes chosen by the learned router (no keyword) are not examples."""
+        model_path = tmp_path / "router_model.json"
+        record_routes([Route(tool="gemini", task="survey the options", tool_display_name="Gemini",
+                             matched_role="research", confidence=0.7)], {"gemini": 0}, history_file)
+        stats = train_router(history_file, model_path)
+        assert stats.records_read == 9
+        assert stats.examples_added == 6
+
+    def test_full_retrain(self, history_file, tmp_path):
+        """Test --full starts over."""
+        model_path = tmp_path / "router_model.json"
+        train_router(history_file, model_path)
+        stats = train_router(history_file, model_path, full=True)
+        assert stats.total_examples == 6
+
+
+class TestLearnedRouting:
+    """Tests for learned routing in route_sentence."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    @pytest.fixture
+    def trained(self, temp_config_file, history_file, monkeypatch):
+        """Train a model at the default location in the temp project."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        train_router(history_file, learned.ROUTER_MODEL_PATH)
+
+    def test_unmatched_sentence_uses_model(self, trained):
+        """Test sentences without keywords are classified."""
+        route = route_sentence("look into the latest parser docs")
+        assert route.matched_role == "research"
+        assert route.matched_keyword is None
+        assert route.tool == "gemini"
+        assert route.confidence is not None
+
+    def test_keyword_match_wins(self, trained):
+        """Test keyword matches never consult the model."""
+        route = route_sentence("build the docs")
+        assert route.matched_role == "deep_work"
+        assert route.confidence is None
+
+    def test_low_confidence_ignored(self, trained, temp_config_file, sample_role_config):
+        """Test predictions below learned_min_confidence fall back to the default chain."""
+        sample_role_config["routing"] = {"learned_min_confidence": 1.01}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        route = route_sentence("look into the latest parser docs")
+        assert route.matched_role is None
+
+    def test_route_many_uses_model(self, trained):
+        """Test route_many agrees with route_sentence."""
+        batch = route_many(["look into the latest parser docs"])
+        assert batch.role == ["research"]
+
+    def test_route_many_applies_min_confidence(self, trained, temp_config_file,
+                                               sample_role_config):
+        """Test scored batch routing sends low-confidence predictions to the fallback role."""
+        from cli.scoring import route_sentence_scored
+        sample_role_config["routing"] = {
+            "strategy": "scored", "min_confidence": 1.01, "learned_min_confidence": 0.0,
+            "fallback_role": "analysis"
+        }
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        sentence = "look into the latest parser docs"
+        assert route_sentence_scored(sentence).matched_role == "analysis"
+        assert route_many([sentence]).role == ["analysis"]
+
+    def test_no_model(self, temp_config_file, monkeypatch):
+        """Test routing without a trained model."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        assert get_learned_router() is None
+        assert route_sentence("hello world").matched_role is None
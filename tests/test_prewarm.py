@@ -0,0 +1,121 @@
+"""Tests for cli/prewarm.py module."""
+
+import threading
+from unittest.mock import patch
+
+from cli.config import _reset_config, get_config
+from cli.health import get_health_registry, _reset_health_registry
+from cli.knowledge import commands as commands_module
+from cli.knowledge import index as index_module
+from cli.prewarm import Prewarmer, resources_for
+
+
+class TestResourcesFor:
+    """Tests for resources_for function."""
+
+    def test_commands(self):
+        """Test commands map to the resources they use."""
+        assert resources_for("/docs search routing") == ("docs",)
+        assert resources_for("/REF claude") == ("commands",)
+        assert resources_for("/status") == ("tools",)
+
+    def test_commands_without_resources(self):
+        """Test cheap commands need nothing."""
+        assert resources_for("/help") == ()
+        assert resources_for("/unknown") == ()
+
+    def test_tasks(self):
+        """Test routed prompts need config, tools and routing."""
+        assert resources_for("build the parser") == ("config", "tools", "routing")
+
+
+class TestPrewarmer:
+    """Tests for Prewarmer."""
+
+    def test_not_started_is_ready(self):
+        """Test nothing blocks when prewarm never ran."""
+        prewarm = Prewarmer({"docs": lambda: None})
+        assert prewarm.pending(["docs"]) == []
+        assert prewarm.wait(["docs"], timeout=0)
+
+    def test_blocks_only_pending_resources(self):
+        """Test a slow resource does not block others."""
+        release = threading.Event()
+        prewarm = Prewarmer({"slow": release.wait, "fast": lambda: None}).start()
+
+        assert prewarm.wait(["fast"], timeout=2)
+        assert prewarm.pending(["slow", "fast"]) == ["slow"]
+        assert not prewarm.wait(["slow"], timeout=0.05)
+
+        release.set()
+        assert prewarm.wait(["slow"], timeout=2)
+        assert prewarm.stats()["slow"].endswith("ms")
+
+    def test_failure_marks_ready(self):
+        """Test a failed task unblocks its commands and is reported."""
+        def broken():
+            raise RuntimeError("boom")
+
+        prewarm = Prewarmer({"docs": broken}).start()
+        assert prewarm.wait(["docs"], timeout=2)
+        assert prewarm.stats()["docs"].startswith("failed")
+
+    def test_unknown_resource(self):
+        """Test resources without a task never block."""
+        prewarm = Prewarmer({}).start()
+        assert prewarm.is_ready("docs")
+
+
+class TestDocsCompleter:
+    """Tests for document name completion while prewarm loads the index."""
+
+    def test_waits_for_docs(self):
+        """Test names are offered only once the document index is prewarmed."""
+        from prompt_toolkit.document import Document
+        from cli.repl import DocsCompleter
+
+        release = threading.Event()
+        completer = DocsCompleter(Prewarmer({"docs": release.wait}).start())
+        with patch('cli.repl.complete_document_names', return_value=["notes.md"]) as complete:
+            assert list(completer.get_completions(Document("/docs no"), None)) == []
+            complete.assert_not_called()
+
+            release.set()
+            completer.prewarm.wait(["docs"], timeout=2)
+            names = [c.text for c in completer.get_completions(Document("/docs no"), None)]
+        assert names == ["notes.md"]
+
+
+class TestDefaultTasks:
+    """Tests for the default prewarm tasks."""
+
+    def setup_method(self):
+        """Reset shared state before each test."""
+        _reset_config()
+        _reset_health_registry()
+        index_module._index = None
+        commands_module._commands_cache = None
+
+    def teardown_method(self):
+        """Reset shared state after each test."""
+        _reset_config()
+        _reset_health_registry()
+        index_module._index = None
+        commands_module._commands_cache = None
+
+    def test_warms_everything(self, temp_config_file, temp_docs_library, monkeypatch):
+        """Test the default tasks load every resource."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        (temp_docs_library / "AI_CLI_Commands_Reference.md").write_text(
+            (temp_docs_library / "test_commands.md").read_text()
+        )
+
+        with patch('cli.tools.check_tool_installed', return_value=(True, "1.0")):
+            prewarm = Prewarmer().start()
+            assert prewarm.wait(["config", "tools", "routing", "docs", "commands", "workers"], timeout=10)
+
+        assert all(value.endswith(" ms") for value in prewarm.stats().values())
+        assert index_module._index._loaded
+        assert commands_module._commands_cache is not None
+        assert get_health_registry().peek(get_config()) is not None
+        assert not get_health_registry().running  # The REPL starts the monitor
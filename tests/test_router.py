@@ -5,10 +5,13 @@ import pytest
 from unittest.mock import patch, MagicMock
 
 from cli.router import (
-    Route, split_sentences, get_first_word, find_keyword_match,
-    route_sentence, route_input, consolidate_routes
+    Route, RouteBatch, KeywordMatcher, split_sentences, get_first_word,
+    find_keyword_match, route_sentence, route_input, route_many, consolidate_routes,
+    get_route_cache_stats, invalidate_route_cache, notify_availability_changed,
+    _reset_route_cache
 )
-from cli.config import Config, RoleConfig, ToolConfig, _reset_config
+from cli.config import Config, RoleConfig, ToolConfig, _reset_config, reload_config
+from cli.errors import NoAvailableToolError
 
 
 class TestRoute:
@@ -150,6 +153,39 @@ class TestFindKeywordMatch:
         assert find_keyword_match("", keywords) is None
 
 
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher compiled matching."""
+
+    def test_earliest_keyword_in_list_wins(self):
+        """Test list order decides between keywords found anywhere."""
+        matcher = KeywordMatcher(["fix", "review"])
+        assert matcher.match("please review and fix it") == "fix"
+
+    def test_first_word_priority(self):
+        """Test first word beats list order."""
+        matcher = KeywordMatcher(["fix", "review"])
+        assert matcher.match("review and fix it", "review") == "review"
+
+    def test_overlapping_keywords(self):
+        """Test overlapping multi-word keywords match like a linear scan."""
+        keywords = ["code review", "code"]
+        matcher = KeywordMatcher(keywords)
+        assert matcher.match("do a code review") == "code review"
+        assert KeywordMatcher(["review", "code review"]).match("code review now") == "review"
+
+    def test_matches_linear_scan(self):
+        """Test compiled matching agrees with find_keyword_match."""
+        keywords = ["build", "multi-step", "Fix", "test"]
+        for sentence in ["a multi-step plan", "FIX the test", "testing only", "build"]:
+            lower = sentence.lower()
+            assert KeywordMatcher(keywords).match(lower, lower.split()[0]) == \
+                find_keyword_match(sentence, keywords)
+
+    def test_empty_keywords(self):
+        """Test matcher with no keywords never matches."""
+        assert KeywordMatcher([]).match("anything") is None
+
+
 class TestRouteSetence:
     """Tests for route_sentence function."""
 
@@ -257,6 +293,165 @@ class TestRouteInput:
         assert routes[2].tool == "openai"  # review -> analysis
 
 
+class TestRouteMany:
+    """Tests for route_many bulk routing."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_columnar_results(self, temp_config_file, monkeypatch):
+        """Test route_many returns one row per sentence."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        texts = ["Research AI trends. Build a prototype.", "review the code"]
+        batch = route_many(texts)
+
+        assert isinstance(batch, RouteBatch)
+        assert len(batch) == 3
+        assert list(batch.input_index) == [0, 0, 1]
+        assert batch.tool == ["gemini", "claude", "openai"]
+        assert batch.role == ["research", "deep_work", "analysis"]
+        assert batch.keyword == ["research", "build", "review"]
+
+    def test_offsets_point_into_input(self, temp_config_file, monkeypatch):
+        """Test sentence offsets slice the original text."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        texts = ["Research AI trends. Build a prototype."]
+        batch = route_many(texts)
+        tasks = [texts[0][batch.start[i]:batch.end[i]] for i in range(len(batch))]
+        assert tasks == split_sentences(texts[0])
+
+    def test_matches_route_input(self, temp_config_file, sample_sentences, monkeypatch):
+        """Test route_many agrees with route_input."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        texts = [sentence for sentence, _ in sample_sentences]
+        batch = route_many(texts)
+        expected = [route for text in texts for route in route_input(text)]
+        assert [batch.to_route(i, texts) for i in range(len(batch))] == expected
+
+    def test_availability_resolved_once(self, temp_config_file, monkeypatch):
+        """Test availability is checked once per tool, not per sentence."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        with patch.object(Config, "is_tool_available", autospec=True, return_value=True) as mock:
+            route_many(["build it"] * 50)
+        assert mock.call_count <= 3
+
+    def test_tool_counts(self, temp_config_file, monkeypatch):
+        """Test per-tool counts."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        batch = route_many(["build it", "fix it", "research it"])
+        assert batch.tool_counts() == {"claude": 2, "gemini": 1}
+
+    def test_no_available_tool(self, temp_config_file, monkeypatch):
+        """Test route_many follows route_input when no tool is available."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        with patch.object(Config, "is_tool_available", autospec=True, return_value=False):
+            with pytest.raises(NoAvailableToolError):
+                route_many(["build it"], strict=True)
+            with pytest.raises(NoAvailableToolError):
+                route_input("build it", strict=True)
+            assert route_many(["build it"]).tool == [route_input("build it")[0].tool]
+
+    def test_empty_batch(self, temp_config_file, monkeypatch):
+        """Test routing no texts."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        assert len(route_many([])) == 0
+
+
+class TestRouteCache:
+    """Tests for the route_sentence LRU cache."""
+
+    def setup_method(self):
+        """Reset config and cache before each test."""
+        _reset_config()
+        _reset_route_cache()
+
+    def teardown_method(self):
+        """Reset config and cache after each test."""
+        _reset_config()
+        _reset_route_cache()
+
+    def test_repeat_is_a_hit(self, temp_config_file, monkeypatch):
+        """Test the same sentence hits the cache."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        first = route_sentence("Research AI trends")
+        second = route_sentence("Research AI trends")
+        stats = get_route_cache_stats()
+
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert second == first
+
+    def test_keyed_on_exact_text(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test sentences differing in spacing or case are cached apart, matching uncached routing."""
+        sample_role_config["roles"]["research"]["keywords"].append("code review")
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        sentences = ["code  review the parser", "code review the parser", "Code Review the parser"]
+        cached = [route_sentence(sentence) for sentence in sentences]
+        _reset_route_cache()
+        uncached = [route_sentence(sentence) for sentence in reversed(sentences)][::-1]
+
+        assert cached == uncached
+        assert [route.matched_keyword for route in cached] == ["review", "code review", "code review"]
+        assert get_route_cache_stats()["hits"] == 0
+
+    def test_reload_config_invalidates(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test reload_config drops cached decisions."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        assert route_sentence("research AI trends").tool == "gemini"
+        sample_role_config["auth_status"]["gemini"] = False
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        reload_config()
+
+        assert route_sentence("research AI trends").tool == "claude"
+        assert get_route_cache_stats()["hits"] == 0
+
+    def test_availability_change_invalidates(self, temp_config_file, monkeypatch):
+        """Test a changed availability snapshot drops cached decisions."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        assert route_sentence("research AI trends").tool == "gemini"
+        monkeypatch.setattr(Config, "is_tool_available", lambda self, tool: tool != "gemini")
+        notify_availability_changed()
+
+        assert route_sentence("research AI trends").tool == "claude"
+        assert get_route_cache_stats()["invalidations"] == 1
+
+    def test_bounded(self, temp_config_file, monkeypatch):
+        """Test the cache evicts least recently used entries."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        monkeypatch.setattr("cli.router.ROUTE_CACHE_SIZE", 2)
+
+        for text in ("build a", "build b", "build c"):
+            route_sentence(text)
+        stats = get_route_cache_stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+
+    def test_invalidate(self, temp_config_file, monkeypatch):
+        """Test explicit invalidation empties the cache."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        route_sentence("build a")
+        invalidate_route_cache()
+        assert get_route_cache_stats()["size"] == 0
+
+
 class TestConsolidateRoutes:
     """Tests for consolidate_routes function."""
 
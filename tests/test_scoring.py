@@ -0,0 +1,132 @@
+"""Tests for cli/scoring.py module."""
+
+import json
+import pytest
+
+from cli.scoring import ScoringTable, get_scoring_table, route_sentence_scored
+from cli.router import route_sentence, route_many
+from cli.config import Config, _reset_config
+
+
+@pytest.fixture
+def scored_config_file(temp_config_file, sample_role_config):
+    """Config file with the scored strategy enabled."""
+    sample_role_config["routing"] = {"strategy": "scored"}
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    return temp_config_file
+
+
+class TestScoringTable:
+    """Tests for ScoringTable scoring."""
+
+    def test_scores_every_role(self, temp_config_file):
+        """Test all matching roles receive a score."""
+        table = ScoringTable(Config.load(temp_config_file))
+        scores = table.score("review and fix the parser")
+        by_role = dict(zip(scores.roles, scores.scores))
+        assert by_role["analysis"] > 0
+        assert by_role["deep_work"] > 0
+        assert by_role["research"] == 0
+
+    def test_first_word_boost(self, temp_config_file):
+        """Test the first keyword outranks a later equal-weight keyword."""
+        table = ScoringTable(Config.load(temp_config_file))
+        assert table.score("review and fix the parser").best()[0] == "analysis"
+        assert table.score("fix the parser after review").best()[0] == "deep_work"
+
+    def test_keyword_weights(self, temp_config_file, sample_role_config):
+        """Test per-keyword weights can outrank the first-word boost."""
+        sample_role_config["roles"]["deep_work"]["weights"] = {"fix": 5.0}
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        table = ScoringTable(Config.load(temp_config_file))
+        role, confidence, keyword = table.score("review and fix the parser").best()
+        assert role == "deep_work"
+        assert keyword == "fix"
+        assert 0.5 < confidence < 1.0
+
+    def test_multi_word_keywords(self, temp_config_file, sample_role_config):
+        """Test phrase keywords are scored."""
+        sample_role_config["roles"]["analysis"]["keywords"].append("code review")
+        temp_config_file.write_text(json.dumps(sample_role_config))
+
+        table = ScoringTable(Config.load(temp_config_file))
+        role, _, keyword = table.score("please do a code review").best()
+        assert role == "analysis"
+
+    def test_no_match(self, temp_config_file):
+        """Test a sentence without keywords has no winner."""
+        table = ScoringTable(Config.load(temp_config_file))
+        assert table.score("hello world").best() == (None, 0.0, None)
+
+    def test_table_cached_per_config(self, temp_config_file):
+        """Test the table is compiled once per config snapshot."""
+        config = Config.load(temp_config_file)
+        assert get_scoring_table(config) is get_scoring_table(config)
+        assert get_scoring_table(Config.load(temp_config_file)) is not get_scoring_table(config)
+
+
+class TestRouteSentenceScored:
+    """Tests for route_sentence_scored and strategy dispatch."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_confidence_reported(self, scored_config_file, monkeypatch):
+        """Test the scored route carries a confidence."""
+        monkeypatch.chdir(scored_config_file.parent.parent)
+
+        route = route_sentence("build a new feature")
+        assert route.tool == "claude"
+        assert route.matched_role == "deep_work"
+        assert route.confidence == 1.0
+
+    def test_low_confidence_uses_fallback_role(self, scored_config_file, sample_role_config, monkeypatch):
+        """Test routes below min_confidence go to the fallback role."""
+        sample_role_config["routing"] = {
+            "strategy": "scored", "min_confidence": 0.9, "fallback_role": "research"
+        }
+        scored_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(scored_config_file.parent.parent)
+
+        route = route_sentence("review and fix the parser")
+        assert route.matched_role == "research"
+        assert route.tool == "gemini"
+        assert route.confidence < 0.9
+
+    def test_low_confidence_without_fallback_role(self, scored_config_file, sample_role_config, monkeypatch):
+        """Test low-confidence routes use the default chain without a fallback role."""
+        sample_role_config["routing"] = {"strategy": "scored", "min_confidence": 0.9}
+        scored_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(scored_config_file.parent.parent)
+
+        route = route_sentence("research and review the parser")
+        assert route.matched_role is None
+        assert route.tool == "claude"
+
+    def test_first_match_unchanged(self, temp_config_file, monkeypatch):
+        """Test the default strategy still routes by first match."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        route = route_sentence("fix the parser after review")
+        assert route.matched_role == "analysis"
+        assert route.confidence is None
+
+    def test_route_many_uses_scoring(self, scored_config_file, monkeypatch):
+        """Test route_many honors the scored strategy."""
+        monkeypatch.chdir(scored_config_file.parent.parent)
+
+        texts = ["fix the parser after review", "hello world"]
+        batch = route_many(texts)
+        assert batch.role == [route_sentence(t).matched_role for t in texts]
+        assert batch.tool == [route_sentence(t).tool for t in texts]
+
+    def test_explicit_config(self, temp_config_file):
+        """Test routing against an explicit config snapshot."""
+        route = route_sentence_scored("research AI trends", config=Config.load(temp_config_file))
+        assert route.tool == "gemini"
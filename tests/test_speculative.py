@@ -0,0 +1,163 @@
+"""Tests for cli/speculative.py module."""
+
+import json
+import subprocess
+import sys
+import time
+import pytest
+
+from cli.config import _reset_config
+from cli.executor import discard_process, execute_route, new_process_group
+from cli.router import Route, _reset_route_cache
+from cli.speculative import SpeculativeSpawner
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses cat as the tool")
+
+
+@pytest.fixture
+def stdin_tools(temp_config_file, sample_role_config, monkeypatch):
+    """Claude and Gemini as stdin-mode `cat`; OpenAI stays in argv mode."""
+    for tool in ("claude", "gemini"):
+        sample_role_config["tools"][tool].update(
+            {"command": "cat", "args": [], "input_mode": "stdin"}
+        )
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    monkeypatch.chdir(temp_config_file.parent.parent)
+    return temp_config_file
+
+
+def _running(pid: int) -> bool:
+    """Whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+class TestSpeculativeSpawner:
+    """Tests for SpeculativeSpawner."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+        _reset_route_cache()
+        self.spawner = SpeculativeSpawner()
+
+    def teardown_method(self):
+        """Discard spawned processes and reset config after each test."""
+        self.spawner.discard()
+        _reset_config()
+        _reset_route_cache()
+
+    def test_hit_hands_task_to_waiting_process(self, stdin_tools, tmp_path):
+        """Test the pre-spawned process runs the final task."""
+        assert self.spawner.update("build the parser") == "claude"
+
+        process = self.spawner.take("claude")
+        assert process is not None and process.poll() is None
+
+        route = Route(tool="claude", task="build the parser fully", tool_display_name="Claude")
+        result = execute_route(route, tmp_path, lambda _: None, process=process)
+        assert result.output == "build the parser fully"
+
+        stats = self.spawner.get_stats()
+        assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+
+    def test_saved_ms_is_boot_time_capped_at_wait(self, stdin_tools):
+        """Test a hit saves the measured boot time, at most how long it waited."""
+        self.spawner.record_first_output("claude", 500.0)  # Spawned on Enter
+        self.spawner.update("build the parser")
+        self.spawner.take("claude")
+        waited = self.spawner._claimed[1]
+        self.spawner.record_first_output("claude", 100.0)
+        assert 0 < self.spawner.stats["saved_ms"] == pytest.approx(min(400.0, waited))
+
+        self.spawner.update("build the parser")
+        self.spawner._pending.spawned_at -= 10  # Waited ten seconds
+        self.spawner.take("claude")
+        self.spawner.record_first_output("claude", 100.0)
+        assert self.spawner.stats["saved_ms"] == pytest.approx(min(400.0, waited) + 400.0)
+
+    def test_no_saving_without_baseline(self, stdin_tools):
+        """Test nothing is counted as saved before a cold run was measured."""
+        self.spawner.update("build the parser")
+        self.spawner.take("claude")
+        self.spawner.record_first_output("claude", 100.0)
+        assert self.spawner.stats["saved_ms"] == 0
+
+    def test_stale_update_does_not_spawn(self, stdin_tools):
+        """Test a timer firing after submit or discard spawns nothing."""
+        generation = self.spawner.generation
+        self.spawner.discard()
+        assert self.spawner.update("build the parser", generation) is None
+        assert self.spawner.stats["spawned"] == 0
+        assert self.spawner.current_tool is None
+
+    def test_discard_while_spawning(self, stdin_tools, monkeypatch):
+        """Test a process started during a discard is dropped, not left waiting."""
+        from cli import speculative
+
+        def spawn_then_discard(route, config, **kwargs):
+            process = spawn_tool(route, config, **kwargs)
+            self.spawner.discard()
+            return process
+
+        spawn_tool = speculative.spawn_tool
+        monkeypatch.setattr(speculative, "spawn_tool", spawn_then_discard)
+        assert self.spawner.update("build the parser", self.spawner.generation) is None
+        assert self.spawner.current_tool is None
+        assert self.spawner.stats["discarded"] == 1
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+    def test_discard_kills_tool_behind_shell(self):
+        """Test discarding kills the tool itself, not just the shell running it."""
+        process = subprocess.Popen("sleep 30 & echo $!; wait", shell=True, text=True,
+                                   stdout=subprocess.PIPE, **new_process_group())
+        tool_pid = int(process.stdout.readline())
+        discard_process(process)
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and _running(tool_pid):
+            time.sleep(0.02)
+        assert not _running(tool_pid)
+
+    def test_route_change_discards(self, stdin_tools):
+        """Test a different route replaces the waiting process."""
+        self.spawner.update("build the parser")
+        self.spawner.update("research the parser")
+        assert self.spawner.current_tool == "gemini"
+        assert self.spawner.stats["spawned"] == 2
+        assert self.spawner.stats["discarded"] == 1
+
+    def test_same_route_keeps_process(self, stdin_tools):
+        """Test more typing on the same route reuses the process."""
+        self.spawner.update("build the parser")
+        self.spawner.update("build the parser and tests")
+        assert self.spawner.stats["spawned"] == 1
+
+    def test_miss(self, stdin_tools):
+        """Test claiming another tool discards the waiting process."""
+        self.spawner.update("build the parser")
+        assert self.spawner.take("gemini") is None
+        assert self.spawner.get_stats()["misses"] == 1
+        assert self.spawner.current_tool is None
+
+    def test_partial_input_skips_route_cache(self, stdin_tools):
+        """Test routing half-typed buffers leaves the route cache and its stats alone."""
+        from cli.router import get_route_cache_stats
+        self.spawner.update("build the parser")
+        self.spawner.update("build the parser and tests")
+        stats = get_route_cache_stats()
+        assert stats["size"] == stats["hits"] == stats["misses"] == 0
+
+    def test_argv_tools_not_spawned(self, stdin_tools):
+        """Test tools without stdin input mode are never pre-spawned."""
+        assert self.spawner.update("review the parser") is None
+        assert self.spawner.stats["spawned"] == 0
+
+    def test_short_and_command_input_ignored(self, stdin_tools):
+        """Test short buffers and /commands are not routed."""
+        assert self.spawner.update("build") is None
+        assert self.spawner.update("/docs search build") is None
+        assert self.spawner.stats["spawned"] == 0
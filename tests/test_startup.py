@@ -0,0 +1,36 @@
+"""Startup-time budget tests for the CLI entry point."""
+
+import importlib.util
+import pytest
+from pathlib import Path
+
+BENCH_PATH = Path(__file__).parent.parent / "scripts" / "bench_startup.py"
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_startup", BENCH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bench = _load_bench()
+
+
+@pytest.mark.parametrize("flag", sorted(bench.STARTUP_BUDGETS_MS))
+class TestStartupBudget:
+    """Cold start of short invocations must stay light."""
+
+    def test_no_heavy_imports(self, flag):
+        """Test short invocations skip the REPL and knowledge stacks."""
+        profile = bench.profile_startup([flag])
+        assert profile.modules, "no -X importtime output captured"
+        heavy = [m for m in bench.HEAVY_MODULES if m in profile.modules]
+        assert heavy == [], f"workflow {flag} imported {heavy}"
+
+    def test_import_time_budget(self, flag):
+        """Test cumulative import time stays within budget."""
+        budget = bench.STARTUP_BUDGETS_MS[flag]
+        # Best of three to ride out a cold disk cache or a busy machine
+        best = min(bench.profile_startup([flag]).import_ms for _ in range(3))
+        assert best <= budget, f"workflow {flag} imports took {best:.0f} ms (budget {budget} ms)"
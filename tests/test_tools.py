@@ -1,8 +1,13 @@
 """Tests for cli/tools.py module."""
 
+import os
+import subprocess
+import sys
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
+from cli import tools
 from cli.tools import (
     ToolStatus, check_tool_installed, get_tool_status,
     get_all_tools_status, require_tool, get_available_tools,
@@ -10,6 +15,7 @@ from cli.tools import (
 )
 from cli.errors import ToolNotFoundError, ToolNotAvailableError
 from cli.config import _reset_config
+from cli.health import get_health_registry, _reset_health_registry
 
 
 class TestToolStatus:
@@ -83,12 +89,14 @@ class TestGetToolStatus:
     """Tests for get_tool_status function."""
 
     def setup_method(self):
-        """Reset config before each test."""
+        """Reset config and tool health before each test."""
         _reset_config()
+        _reset_health_registry()
 
     def teardown_method(self):
-        """Reset config after each test."""
+        """Reset config and tool health after each test."""
         _reset_config()
+        _reset_health_registry()
 
     def test_get_status_available_tool(self, temp_config_file, monkeypatch):
         """Test getting status for available tool."""
@@ -101,8 +109,11 @@ class TestGetToolStatus:
             assert status.authenticated is True
             assert status.available is True
 
-    def test_get_status_not_installed(self, temp_config_file, monkeypatch):
-        """Test getting status for non-installed tool."""
+    def test_get_status_not_installed(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test a non-installed tool is unavailable unless auth_status forces it."""
+        import json
+        sample_role_config["auth_status"]["claude"] = "auto"
+        temp_config_file.write_text(json.dumps(sample_role_config))
         monkeypatch.chdir(temp_config_file.parent.parent)
 
         with patch('cli.tools.check_tool_installed', return_value=(False, "not found")):
@@ -118,17 +129,32 @@ class TestGetToolStatus:
         assert status.available is False
         assert "not defined" in status.error
 
+    def test_matches_health_registry(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test availability follows the registry's rule, adapters included."""
+        import json
+        sample_role_config["tools"]["claude"]["adapter"] = "cli.adapters:SimulatorAdapter"
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        with patch('cli.tools.check_tool_installed', return_value=(False, "not found")):
+            status = get_tool_status("claude")
+        health = get_health_registry().snapshot()["claude"]
+        assert status.installed is health.installed is True
+        assert status.available is health.available is True
+
 
 class TestGetAllToolsStatus:
     """Tests for get_all_tools_status function."""
 
     def setup_method(self):
-        """Reset config before each test."""
+        """Reset config and tool health before each test."""
         _reset_config()
+        _reset_health_registry()
 
     def teardown_method(self):
-        """Reset config after each test."""
+        """Reset config and tool health after each test."""
         _reset_config()
+        _reset_health_registry()
 
     def test_returns_all_tools(self, temp_config_file, monkeypatch):
         """Test that all configured tools are returned."""
@@ -141,17 +167,83 @@ class TestGetAllToolsStatus:
             assert "gemini" in tool_ids
             assert "openai" in tool_ids
 
+    def test_probes_concurrently(self, temp_config_file, monkeypatch):
+        """Test slow probes overlap instead of adding up."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+
+        def slow_probe(command):
+            time.sleep(0.3)
+            return True, "1.0"
+
+        with patch('cli.tools.check_tool_installed', side_effect=slow_probe):
+            start = time.perf_counter()
+            statuses = get_all_tools_status()
+            elapsed = time.perf_counter() - start
+
+        assert [s.tool_id for s in statuses] == ["claude", "gemini", "openai"]
+        assert elapsed < 0.8
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a shell script as the fake tool")
+class TestVersionCache:
+    """Tests for the persistent --version cache."""
+
+    @pytest.fixture
+    def fake_tool(self, tmp_path, monkeypatch):
+        """An executable `faketool` on PATH and a private cache file."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        tool = bin_dir / "faketool"
+        tool.write_text("#!/bin/sh\necho faketool 1.0\n")
+        tool.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+        monkeypatch.setattr(tools, "VERSION_CACHE_PATH", tmp_path / "versions.cache")
+        tools._reset_version_cache()
+        yield tool
+        tools._reset_version_cache()
+
+    def _probe(self):
+        with patch('cli.tools.subprocess.run', wraps=subprocess.run) as run:
+            result = check_tool_installed("faketool")
+        return result, run.call_count
+
+    def test_second_probe_is_cached(self, fake_tool):
+        """Test --version runs once for an unchanged binary."""
+        assert self._probe() == ((True, "faketool 1.0"), 1)
+        assert self._probe() == ((True, "faketool 1.0"), 0)
+
+    def test_cache_persists(self, fake_tool):
+        """Test the cache survives a new process (fresh in-memory state)."""
+        self._probe()
+        tools._reset_version_cache()
+        assert self._probe() == ((True, "faketool 1.0"), 0)
+
+    def test_changed_binary_reprobed(self, fake_tool):
+        """Test a new binary (different size/mtime) is probed again."""
+        self._probe()
+        fake_tool.write_text("#!/bin/sh\necho faketool 2.0.1\n")
+        assert self._probe() == ((True, "faketool 2.0.1"), 1)
+
+    def test_cache_disabled(self, fake_tool):
+        """Test use_cache=False always probes."""
+        self._probe()
+        with patch('cli.tools.subprocess.run', wraps=subprocess.run) as run:
+            check_tool_installed("faketool", use_cache=False)
+        assert run.call_count == 1
+
 
 class TestRequireTool:
     """Tests for require_tool function."""
 
     def setup_method(self):
-        """Reset config before each test."""
+        """Reset config and tool health before each test."""
         _reset_config()
+        _reset_health_registry()
 
     def teardown_method(self):
-        """Reset config after each test."""
+        """Reset config and tool health after each test."""
         _reset_config()
+        _reset_health_registry()
 
     def test_require_available_tool(self, temp_config_file, monkeypatch):
         """Test requiring available tool succeeds."""
@@ -185,12 +277,14 @@ class TestGetAvailableTools:
     """Tests for get_available_tools function."""
 
     def setup_method(self):
-        """Reset config before each test."""
+        """Reset config and tool health before each test."""
         _reset_config()
+        _reset_health_registry()
 
     def teardown_method(self):
-        """Reset config after each test."""
+        """Reset config and tool health after each test."""
         _reset_config()
+        _reset_health_registry()
 
     def test_returns_available_tools(self, temp_config_file, monkeypatch):
         """Test returns list of available tool IDs."""
@@ -206,12 +300,14 @@ class TestGetBestAvailableTool:
     """Tests for get_best_available_tool function."""
 
     def setup_method(self):
-        """Reset config before each test."""
+        """Reset config and tool health before each test."""
         _reset_config()
+        _reset_health_registry()
 
     def teardown_method(self):
-        """Reset config after each test."""
+        """Reset config and tool health after each test."""
         _reset_config()
+        _reset_health_registry()
 
     def test_returns_first_available(self, temp_config_file, monkeypatch):
         """Test returns first available tool from preference list."""
@@ -221,8 +317,12 @@ class TestGetBestAvailableTool:
             best = get_best_available_tool(["gemini", "claude"])
             assert best in ["gemini", "claude"]
 
-    def test_returns_none_if_none_available(self, temp_config_file, monkeypatch):
+    def test_returns_none_if_none_available(self, temp_config_file, sample_role_config,
+                                            monkeypatch):
         """Test returns None if no tools available."""
+        import json
+        sample_role_config["auth_status"] = {tool: "auto" for tool in sample_role_config["tools"]}
+        temp_config_file.write_text(json.dumps(sample_role_config))
         monkeypatch.chdir(temp_config_file.parent.parent)
 
         with patch('cli.tools.check_tool_installed', return_value=(False, "not found")):
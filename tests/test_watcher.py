@@ -0,0 +1,154 @@
+"""Tests for cli/watcher.py module."""
+
+import json
+import os
+import sys
+import time
+import pytest
+
+from cli.config import (
+    get_config, get_config_generation, add_config_listener, remove_config_listener,
+    reload_config, _reset_config
+)
+from cli.errors import ConfigParseError
+from cli.router import route_sentence
+from cli.watcher import ConfigWatcher
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    """Poll until predicate() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _write_config(path, data):
+    """Rewrite the config the way editors do (new file renamed over the old)."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    tmp.replace(path)
+
+
+class TestConfigSwap:
+    """Tests for snapshot swapping in cli/config.py."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    def test_reload_swaps_snapshot(self, temp_config_file, sample_role_config, monkeypatch):
+        """Test reload_config replaces the global config and bumps the generation."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        old = get_config()
+        generation = get_config_generation()
+
+        sample_role_config["roles"]["research"]["keywords"].append("investigate")
+        temp_config_file.write_text(json.dumps(sample_role_config))
+        new = reload_config()
+
+        assert new is get_config() and new is not old
+        assert get_config_generation() > generation
+        assert "investigate" not in old.roles["research"].keywords
+
+    def test_snapshots_are_immutable(self, temp_config_file, monkeypatch):
+        """Test config snapshots cannot be modified in place."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        with pytest.raises(AttributeError):
+            get_config().routing.strategy = "scored"
+
+    def test_listeners(self, temp_config_file, monkeypatch):
+        """Test listeners are told about swaps until removed."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        seen = []
+        add_config_listener(seen.append)
+        try:
+            config = reload_config()
+        finally:
+            remove_config_listener(seen.append)
+        reload_config()
+        assert seen == [config]
+
+    def test_reload_applies_env_edit(self, temp_config_file, tmp_path, monkeypatch):
+        """Test a reload replaces variables whose value changed in .env."""
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        env_file = tmp_path / ".env"
+        env_file.write_text("WORKFLOW_TEST_VAR=one\n")
+        monkeypatch.setattr("cli.config._env_candidates", lambda: [env_file])
+        monkeypatch.delenv("WORKFLOW_TEST_VAR", raising=False)
+        get_config()
+
+        env_file.write_text("WORKFLOW_TEST_VAR=two-two\n")
+        ConfigWatcher(config_path=temp_config_file).reload()
+        assert os.environ["WORKFLOW_TEST_VAR"] == "two-two"
+
+
+class TestConfigWatcher:
+    """Tests for ConfigWatcher."""
+
+    def setup_method(self):
+        """Reset config before each test."""
+        _reset_config()
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        _reset_config()
+
+    @pytest.fixture(params=["polling", "inotify"])
+    def watcher(self, request, temp_config_file, monkeypatch):
+        """A running watcher on the temp config, for each backend."""
+        if request.param == "inotify" and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux-only")
+        monkeypatch.chdir(temp_config_file.parent.parent)
+        errors = []
+        watcher = ConfigWatcher(
+            config_path=temp_config_file,
+            on_error=errors.append,
+            use_inotify=request.param == "inotify",
+            poll_interval=0.05,
+        )
+        watcher.errors = errors
+        get_config()
+        watcher.start()
+        yield watcher
+        watcher.stop()
+
+    def test_backend(self, watcher, request):
+        """Test the requested backend is used."""
+        assert watcher.backend_name == request.node.callspec.params["watcher"]
+
+    def test_change_is_swapped_in(self, watcher, temp_config_file, sample_role_config):
+        """Test an edit reaches routing without a restart."""
+        held = get_config()
+        assert route_sentence("investigate the logs").matched_role is None
+
+        sample_role_config["roles"]["research"]["keywords"].append("investigate")
+        _write_config(temp_config_file, sample_role_config)
+
+        assert _wait_for(lambda: get_config() is not held)
+        assert route_sentence("investigate the logs").matched_role == "research"
+        # In-flight work keeps the snapshot it started with
+        assert route_sentence("investigate the logs", config=held).matched_role is None
+
+    def test_invalid_edit_keeps_snapshot(self, watcher, temp_config_file):
+        """Test a broken config is reported and the old snapshot stays live."""
+        held = get_config()
+        temp_config_file.write_text("{ not json")
+
+        assert _wait_for(lambda: watcher.errors)
+        assert get_config() is held
+        assert isinstance(watcher.last_error, ConfigParseError)
+
+    def test_stop(self, watcher, temp_config_file, sample_role_config):
+        """Test no reloads happen after stop()."""
+        watcher.stop()
+        held = get_config()
+        _write_config(temp_config_file, sample_role_config)
+        time.sleep(0.3)
+        assert get_config() is held
@@ -0,0 +1,186 @@
+"""Tests for cli/workers.py module."""
+
+import json
+import re
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+
+from cli.config import Config, _reset_config
+from cli.errors import ToolExecutionError
+from cli.executor import execute_route
+from cli.router import Route
+from cli.workers import WorkerPool, get_worker_pool, get_worker_pool_stats, shutdown_worker_pools
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="worker stub runs via sh")
+
+
+@pytest.fixture
+def worker_config_file(temp_config_file, sample_role_config, monkeypatch):
+    """Config whose claude tool is a pool of worker stubs."""
+    monkeypatch.setenv("PYTHONPATH", str(REPO_ROOT))
+    sample_role_config["tools"]["claude"].update({
+        "command": sys.executable,
+        "args": ["-p", "{task}"],
+        "worker": {"size": 2, "args": ["-m", "cli.worker_stub"], "max_requests": 3},
+    })
+    temp_config_file.write_text(json.dumps(sample_role_config))
+    return temp_config_file
+
+
+def _pid(output: str) -> int:
+    return int(re.search(r"pid=(\d+)", output).group(1))
+
+
+class TestWorkerPool:
+    """Tests for WorkerPool."""
+
+    def setup_method(self):
+        """Reset shared state before each test."""
+        _reset_config()
+        shutdown_worker_pools()
+
+    def teardown_method(self):
+        """Stop workers after each test."""
+        _reset_config()
+        shutdown_worker_pools()
+
+    def _pool(self, config_file) -> WorkerPool:
+        config = Config.load(config_file)
+        return get_worker_pool("claude", config)
+
+    def test_worker_reused(self, worker_config_file):
+        """Test consecutive tasks run on the same warm process."""
+        pool = self._pool(worker_config_file)
+        lines = []
+        first, code = pool.run("build it", lines.append)
+        second, _ = pool.run("build more\nover two lines", lambda _: None)
+
+        assert code == 0
+        assert "build it" in first
+        assert "over two lines" in second
+        assert _pid(first) == _pid(second)
+        assert "request=2" in second
+        assert "".join(lines) == first
+        assert pool.stats["started"] == 1
+
+    def test_recycled_after_max_requests(self, worker_config_file):
+        """Test a worker is replaced once it served max_requests tasks."""
+        pool = self._pool(worker_config_file)
+        pids = [_pid(pool.run(f"task {i}", lambda _: None)[0]) for i in range(4)]
+
+        assert pids[0] == pids[1] == pids[2]
+        assert pids[3] != pids[0]
+        assert pool.stats["recycled"] == 1
+
+    def test_exit_code_reported(self, worker_config_file):
+        """Test the exit code after the sentinel is returned."""
+        pool = self._pool(worker_config_file)
+        assert pool.run("!exit 2", lambda _: None)[1] == 2
+
+    def test_crash_raises_and_recovers(self, worker_config_file):
+        """Test a dead worker raises, and the next task gets a fresh one."""
+        pool = self._pool(worker_config_file)
+        with pytest.raises(ToolExecutionError):
+            pool.run("!crash", lambda _: None)
+        assert pool.stats["failed"] == 1
+
+        output, code = pool.run("still works", lambda _: None)
+        assert code == 0
+        assert "still works" in output
+
+    def test_timeout_kills_and_replaces_worker(self, worker_config_file, sample_role_config):
+        """Test a worker past its deadline is killed, and a fresh one takes its place."""
+        sample_role_config["tools"]["claude"]["worker"].update(
+            {"args": ["-m", "cli.worker_stub", "--delay", "5"], "timeout": 0.5})
+        worker_config_file.write_text(json.dumps(sample_role_config))
+        pool = self._pool(worker_config_file)
+        with pytest.raises(ToolExecutionError, match="timed out"):
+            pool.run("slow task", lambda _: None)
+        assert pool.stats["failed"] == 1
+        assert pool.stats["started"] == 2
+        assert get_worker_pool_stats()["claude"]["idle"] == 1
+
+    def test_warm_counts_busy_workers(self, worker_config_file, sample_role_config):
+        """Test warm() while a worker is busy starts only up to the pool size."""
+        sample_role_config["tools"]["claude"]["worker"]["args"] += ["--delay", "0.5"]
+        worker_config_file.write_text(json.dumps(sample_role_config))
+        pool = self._pool(worker_config_file)
+        pool.warm()
+        busy = threading.Thread(target=pool.run, args=("slow task", lambda _: None))
+        busy.start()
+        deadline = time.monotonic() + 5
+        while pool._idle.qsize() == 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.warm()
+        busy.join(10)
+
+        assert pool.stats["started"] == 2
+        assert get_worker_pool_stats()["claude"]["idle"] == 2
+
+    def test_sentinel_in_task(self, worker_config_file, tmp_path, monkeypatch):
+        """Test a task containing the sentinel line never reaches a worker."""
+        monkeypatch.chdir(worker_config_file.parent.parent)
+        pool = self._pool(worker_config_file)
+        task = f"first part\n{pool.settings.sentinel}\nsecond part"
+        assert not pool.accepts(task)
+        assert pool.accepts(f"mentions {pool.settings.sentinel} inline")
+        with pytest.raises(ValueError):
+            pool.run(task, lambda _: None)
+
+        route = Route(tool="claude", task=task, tool_display_name="Claude Code")
+        execute_route(route, tmp_path, lambda _: None)
+        assert pool.stats["requests"] == 0  # Ran as a one-off process instead
+
+        output, _ = pool.run("next task", lambda _: None)
+        assert "request=1" in output
+
+    def test_large_task(self, worker_config_file):
+        """Test a task larger than the pipe buffers does not deadlock."""
+        pool = self._pool(worker_config_file)
+        task = "\n".join(f"line {i} " + "x" * 100 for i in range(10000))
+        output, code = pool.run(task, lambda _: None)
+        assert code == 0
+        assert "line 9999" in output
+
+    def test_concurrent_tasks_use_separate_workers(self, worker_config_file):
+        """Test the pool runs up to size tasks at once."""
+        pool = self._pool(worker_config_file)
+        pool.warm()
+        assert get_worker_pool_stats()["claude"]["idle"] == 2
+
+        outputs = []
+        threads = [
+            threading.Thread(target=lambda: outputs.append(pool.run("task", lambda _: None)[0]))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        assert len({_pid(output) for output in outputs}) == 2
+        assert pool.stats["started"] == 2
+
+    def test_pool_replaced_when_settings_change(self, worker_config_file, sample_role_config):
+        """Test a config change swaps in a new pool."""
+        pool = self._pool(worker_config_file)
+        sample_role_config["tools"]["claude"]["worker"]["size"] = 1
+        worker_config_file.write_text(json.dumps(sample_role_config))
+        assert self._pool(worker_config_file) is not pool
+
+    def test_execute_route_uses_pool(self, worker_config_file, tmp_path, monkeypatch):
+        """Test routed execution dispatches to the worker pool."""
+        monkeypatch.chdir(worker_config_file.parent.parent)
+        route = Route(tool="claude", task="review the diff", tool_display_name="Claude Code")
+
+        first = execute_route(route, tmp_path, lambda _: None)
+        second = execute_route(route, tmp_path, lambda _: None)
+
+        assert first.exit_code == 0
+        assert "review the diff" in first.output
+        assert _pid(first.output) == _pid(second.output)